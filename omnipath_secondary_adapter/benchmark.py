@@ -0,0 +1,539 @@
+"""
+Benchmark the pipeline on synthetic OmniPath tables, without network access.
+
+Usage:
+    # Time each stage of every resource, up to the fusion, on 10k and 100k rows, and save the results.
+    poetry run omnipath-bench
+
+    # Write with BioCypher too, which downloads the Biolink model for its ontology.
+    poetry run omnipath-bench --until write
+
+    # Compare the networks on 1M rows with the results of a previous commit.
+    poetry run omnipath-bench --resources networks --sizes 1000000 \
+    --compare benchmark-results/20260101120000-0123456789.json
+
+Run it from the root of the repository, as the pipeline reads its mapping and
+configuration files from there.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from importlib import metadata
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+import ontoweaver
+
+# The pipeline script, at the root of the repository.
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter.decompress import read_throughputs
+from omnipath_secondary_adapter.extraction import (
+    EXTRACTORS,
+    Elements,
+    element_lists,
+)
+from omnipath_secondary_adapter.fusion import (
+    FUSION_METHODS,
+    DiskFusion,
+)
+from omnipath_secondary_adapter.metrics import StageMetrics
+from omnipath_secondary_adapter.options import PipelineOptions
+from omnipath_secondary_adapter.readers import ENGINES
+from omnipath_secondary_adapter.scheduler import (
+    MEGABYTE,
+    run_jobs,
+)
+from omnipath_secondary_adapter.synthetic import (
+    TEMPLATE_FILES,
+    synthetic_tables,
+)
+
+
+BENCHMARK_STAGES = ("load", "validate", "transform", "extract", "fuse", "write")
+DEFAULT_UNTIL = "fuse"  # writing needs the BioCypher ontology, downloaded from the Biolink model
+DEFAULT_SIZES = (10_000, 100_000)
+RESULTS_FORMAT_VERSION = 2  # 2: the stages are the records of `metrics.StageMetrics`
+RESULTS_DIRECTORY = "benchmark-results"
+SYNTHETIC_DIRECTORY = os.path.join(pipeline.CACHE_DATA_PATH, "synthetic")
+REGRESSION_TOLERANCE = 0.2  # relative increase of time or memory reported as a regression
+# Increases below these are measurement noise, whatever their ratio.
+REGRESSION_MIN_INCREASES = {
+    "wall_time": 0.5,  # seconds
+    "peak_rss": 32 * MEGABYTE,
+}
+VERSIONED_LIBRARIES = ("ontoweaver", "biocypher", "pandas", "pyarrow", "numpy")
+# The pipeline options of the command line, recorded with the results.
+BENCHMARK_OPTIONS = ("cache", "engine", "extractor", "workers", "fusion", "validation", "columns")
+
+logger = logging.getLogger("biocypher")
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Stages      -------------------------------
+# -----------------------------------------------------------------------
+def _read_throughput(reads: List[Dict[str, Any]]) -> Optional[Dict[str, float]]:
+    """The decompression and parsing throughputs of the gzip files read, in MB/s, if any."""
+    if not reads:
+        return None
+    size = sum(read["decompressed_size"] for read in reads)
+    return {
+        "decompressed_size": size,
+        "decompression_mb_per_second": size / max(sum(read["decompression_time"] for read in reads), 1e-9),
+        "parsing_mb_per_second": size / max(sum(read["parsing_time"] for read in reads), 1e-9),
+    }
+
+
+def fuse(nodes: Elements, edges: Elements, options: PipelineOptions) -> Tuple[int, int]:
+    """
+    Fuse the nodes and edges as `weave_knowledge_graph.fuse_and_write` does, without writing them.
+
+    Args:
+        nodes (Elements): The extracted nodes.
+        edges (Elements): The extracted edges.
+        options (PipelineOptions): The `fusion` method.
+
+    Returns:
+        Tuple[int, int]: The numbers of fused nodes and edges.
+    """
+    if options.fusion == "disk":
+        with DiskFusion(pipeline.CACHE_DATA_PATH, separator=", ") as disk_fusion:
+            disk_fusion.add(nodes, edges)
+            for _ in disk_fusion.node_table_batches():
+                pass
+            for _ in disk_fusion.edge_table_batches():
+                pass
+            return disk_fusion.nb_fused_nodes, disk_fusion.nb_fused_edges
+    fused_nodes, fused_edges = ontoweaver.fusion.reconciliate(*element_lists(nodes, edges), separator=", ")
+    return len(fused_nodes), len(fused_edges)
+
+
+def run_case(
+    resource_name: str,
+    path: str,
+    result_path: str,
+    until: str = DEFAULT_UNTIL,
+    options: Optional[PipelineOptions] = None,
+) -> None:
+    """
+    Run the pipeline on a table, stage by stage up to `until`, and save the measures as JSON.
+
+    Each stage is measured by a `metrics.StageMetrics`, as when processing a
+    resource: the fusion and writing are measured by `fuse_and_write` itself.
+    The measures of the stages that completed are saved even if a stage fails,
+    as well as the decompression and parsing throughputs of a compressed table.
+
+    Args:
+        resource_name (str): Name of the database, i.e networks, annotations, etc.
+        path (str): Path to the TSV file.
+        result_path (str): Path to the JSON file receiving the measures.
+        until (str): The last stage run, one of `BENCHMARK_STAGES`.
+        options (Optional[PipelineOptions]): The pipeline options (default: no cache and the
+            fast validation).
+    """
+    options = options or PipelineOptions(cache=False, validation="fast")
+    stages = BENCHMARK_STAGES[: BENCHMARK_STAGES.index(until) + 1]
+    stage_metrics = StageMetrics(resource_name)
+    result = {}
+    os.makedirs(pipeline.CACHE_DATA_PATH, exist_ok=True)
+    output_directory = tempfile.mkdtemp(prefix="bench-", dir=pipeline.CACHE_DATA_PATH)
+    try:
+        with stage_metrics.stage("load") as record:
+            usecols = pipeline.select_columns(resource_name, path, options.columns)
+            dataframe = pipeline.load_dataframe(
+                path, resource_name, cache=options.cache, engine=options.engine, usecols=usecols
+            )
+            record.count(rows=len(dataframe))
+        result["rows"] = len(dataframe)
+        result["read"] = _read_throughput(read_throughputs())
+
+        if "validate" in stages:
+            with stage_metrics.stage("validate") as record:
+                pipeline.validate_schema(
+                    dataframe, resource_name, validation=options.validation, columns=usecols
+                )
+                record.count(rows=len(dataframe))
+
+        if "transform" in stages:
+            with stage_metrics.stage("transform") as record:
+                dataframe = pipeline.transform_json_columns(resource_name, dataframe)
+                record.count(rows=len(dataframe))
+
+        if "extract" in stages:
+            with stage_metrics.stage("extract") as record:
+                with pipeline.process_pool(options.workers) as executor:
+                    nodes, edges = pipeline.extract_nodes_edges_parallel(
+                        resource_name, dataframe, options=options, executor=executor
+                    )
+                record.count(rows=len(dataframe), nodes=len(nodes), edges=len(edges))
+            del dataframe
+            result["nodes"], result["edges"] = len(nodes), len(edges)
+
+        if "write" in stages:
+            pipeline.fuse_and_write(
+                nodes,
+                edges,
+                resource_name,
+                options,
+                output_directory=output_directory,
+                stage_metrics=stage_metrics,
+            )
+        elif "fuse" in stages:
+            with stage_metrics.stage("fuse") as record:
+                nb_nodes, nb_edges = fuse(nodes, edges, options)
+                record.count(nodes=nb_nodes, edges=nb_edges)
+    finally:
+        shutil.rmtree(output_directory, ignore_errors=True)
+        result["stages"] = [record.as_dict() for record in stage_metrics.records.values()]
+        with open(result_path, "w") as fd:
+            json.dump(result, fd)
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Benchmark      ----------------------------
+# -----------------------------------------------------------------------
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _library_versions() -> Dict[str, Optional[str]]:
+    versions = {}
+    for name in VERSIONED_LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def run_benchmark(
+    resource_names: List[str],
+    sizes: List[int],
+    options: PipelineOptions,
+    until: str = DEFAULT_UNTIL,
+    data_directory: str = SYNTHETIC_DIRECTORY,
+    seed: int = 0,
+    memory_budget: Optional[int] = None,
+    compressed: bool = True,
+) -> Dict[str, Any]:
+    """
+    Benchmark the pipeline on synthetic tables of the given resources and sizes.
+
+    The tables are generated once (see `synthetic.synthetic_tables`), then each
+    one is processed in a fresh process, one at a time, so that the peak
+    memory of a case does not depend on the previous ones.
+
+    Args:
+        resource_names (List[str]): The names of the resources.
+        sizes (List[int]): The numbers of rows.
+        options (PipelineOptions): The pipeline options, see `run_case`.
+        until (str): The last stage run, one of `BENCHMARK_STAGES`.
+        data_directory (str): The directory holding the synthetic tables.
+        seed (int): The seed of the synthetic tables.
+        memory_budget (Optional[int]): The memory limit of each case, in megabytes.
+        compressed (bool): Whether the tables are gzip-compressed, as the OmniPath dumps.
+
+    Returns:
+        Dict[str, Any]: The results: the environment, the options, and the timings of each case.
+    """
+    paths = synthetic_tables(data_directory, resource_names, sizes, seed=seed, compressed=compressed)
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as result_directory:
+        jobs = {
+            f"{resource_name}-{nb_rows}": dict(
+                resource_name=resource_name,
+                path=path,
+                result_path=os.path.join(result_directory, f"{resource_name}-{nb_rows}.json"),
+                until=until,
+                options=options,
+            )
+            for (resource_name, nb_rows), path in paths.items()
+        }
+        reports = run_jobs(
+            run_case,
+            jobs,
+            max_jobs=1,
+            memory_budget=memory_budget * MEGABYTE if memory_budget else None,
+        )
+
+        cases = []
+        for (resource_name, nb_rows), path in paths.items():
+            name = f"{resource_name}-{nb_rows}"
+            case = {
+                "resource": resource_name,
+                "size": nb_rows,
+                "file_size": os.path.getsize(path),
+                "wall_time": reports[name].wall_time,
+                "peak_rss": reports[name].peak_rss,
+                "error": reports[name].error,
+                "stages": [],
+            }
+            if os.path.isfile(jobs[name]["result_path"]):
+                with open(jobs[name]["result_path"]) as fd:
+                    case.update(json.load(fd))
+            cases.append(case)
+            logger.info(str(reports[name]))
+
+    return {
+        "format": RESULTS_FORMAT_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "libraries": _library_versions(),
+        "seed": seed,
+        "compressed": compressed,
+        "until": until,
+        "options": {key: getattr(options, key) for key in BENCHMARK_OPTIONS},
+        "cases": cases,
+    }
+
+
+def results_path(results: Dict[str, Any], directory: str = RESULTS_DIRECTORY) -> str:
+    """The default path of the results, named after their date and commit."""
+    timestamp = datetime.fromisoformat(results["created"]).strftime("%Y%m%d%H%M%S")
+    commit = (results["commit"] or "unknown")[:10]
+    return os.path.join(directory, f"{timestamp}-{commit}.json")
+
+
+def write_results(results: Dict[str, Any], path: str) -> None:
+    """Save the results of a benchmark as JSON."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as fd:
+        json.dump(results, fd, indent=2)
+    logger.info(f"Benchmark results saved to: {path}")
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Report      -------------------------------
+# -----------------------------------------------------------------------
+def _measures(results: Dict[str, Any]) -> Dict[tuple, Dict[str, float]]:
+    """The wall time and peak memory of each stage and case, by (resource, size, stage).
+
+    The total of a case sums the time of its stages, leaving out the start of its process.
+    """
+    measures = {}
+    for case in results["cases"]:
+        for stage in case["stages"]:
+            # The stages of the results of format 1 are named by "name".
+            measures[case["resource"], case["size"], stage.get("stage", stage.get("name"))] = stage
+        if case["peak_rss"] is not None and not case["error"]:
+            measures[case["resource"], case["size"], "total"] = {
+                "wall_time": sum(stage["wall_time"] for stage in case["stages"]),
+                "peak_rss": case["peak_rss"],
+            }
+    return measures
+
+
+def format_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Format the results as a table, with the ratios to the baseline results if any.
+
+    Args:
+        results (Dict[str, Any]): The results, see `run_benchmark`.
+        baseline (Optional[Dict[str, Any]]): The results of a previous benchmark.
+
+    Returns:
+        str: One line per stage of each case.
+    """
+    reference = _measures(baseline) if baseline else {}
+    lines = [f"{'case':<24}{'stage':<11}{'time (s)':>10}{'peak (MB)':>11}"]
+    for key, measure in _measures(results).items():
+        resource_name, nb_rows, stage = key
+        line = (
+            f"{resource_name + '-' + str(nb_rows):<24}{stage:<11}"
+            f"{measure['wall_time']:>10.2f}{measure['peak_rss'] / MEGABYTE:>11.0f}"
+        )
+        if key in reference:
+            line += (
+                f"  x{measure['wall_time'] / max(reference[key]['wall_time'], 1e-9):.2f} time"
+                f"  x{measure['peak_rss'] / reference[key]['peak_rss']:.2f} memory"
+            )
+        lines.append(line)
+    for case in results["cases"]:
+        if case.get("read"):
+            lines.append(
+                f"{case['resource']}-{case['size']} read {case['read']['decompressed_size']:.1f} MB: "
+                f"decompression {case['read']['decompression_mb_per_second']:.1f} MB/s, "
+                f"parsing {case['read']['parsing_mb_per_second']:.1f} MB/s"
+            )
+    for case in results["cases"]:
+        if case["error"]:
+            lines.append(f"{case['resource']}-{case['size']} FAILED: {case['error']}")
+    return "\n".join(lines)
+
+
+def regressions(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = REGRESSION_TOLERANCE,
+) -> List[str]:
+    """
+    List the stages whose time or peak memory grew by more than `tolerance` since the baseline.
+
+    Increases smaller than `REGRESSION_MIN_INCREASES` are ignored, as stages
+    lasting a few milliseconds vary by more than any sensible tolerance.
+
+    Args:
+        results (Dict[str, Any]): The results, see `run_benchmark`.
+        baseline (Dict[str, Any]): The results of a previous benchmark, e.g. of another commit.
+        tolerance (float): The relative increase allowed.
+
+    Returns:
+        List[str]: A description of each regression.
+    """
+    reference = _measures(baseline)
+    found = []
+    for key, measure in _measures(results).items():
+        if key not in reference:
+            continue
+        for field, min_increase in REGRESSION_MIN_INCREASES.items():
+            before, after = reference[key][field], measure[field]
+            if after > before * (1 + tolerance) and after - before > min_increase:
+                found.append(f"{'-'.join(map(str, key))}: {field} {before:.4g} -> {after:.4g}")
+    return found
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Command line      -------------------------
+# -----------------------------------------------------------------------
+def parse_arguments(arguments: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line of the benchmark."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pipeline on synthetic OmniPath tables.",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument(
+        "--resources",
+        nargs="+",
+        choices=list(TEMPLATE_FILES),
+        default=list(TEMPLATE_FILES),
+        help="the resources to benchmark (default: all of them).",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        metavar="N",
+        type=pipeline.positive_int,
+        default=list(DEFAULT_SIZES),
+        help="the numbers of rows of the synthetic tables, e.g. 10000 100000 1000000 10000000\n"
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="the seed of the synthetic tables (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--data-directory",
+        default=SYNTHETIC_DIRECTORY,
+        help="where the synthetic tables are generated, and reused by later runs\n"
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--uncompressed",
+        action="store_true",
+        help="generate and read uncompressed tables, instead of gzip-compressed ones as the\n"
+        "OmniPath dumps, whose decompression and parsing throughputs are reported.",
+    )
+    parser.add_argument(
+        "--until",
+        choices=BENCHMARK_STAGES,
+        default=DEFAULT_UNTIL,
+        help="the last stage run, e.g. 'extract' to leave out the fusion, or 'write' to write with\n"
+        "BioCypher, which downloads the Biolink model for its ontology (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="JSON",
+        default=None,
+        help=f"where the results are saved (default: '{RESULTS_DIRECTORY}/DATE-COMMIT.json').",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="JSON",
+        default=None,
+        help="results of a previous benchmark: report the ratios to them, and exit with an\n"
+        "error if a stage got slower or larger by more than --tolerance (default: none).",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=REGRESSION_TOLERANCE,
+        help="relative increase of time or memory reported as a regression (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        metavar="MB",
+        type=pipeline.positive_int,
+        default=None,
+        help="limit the memory of each case to MB megabytes (default: no limit).",
+    )
+
+    pipeline_options = parser.add_argument_group("pipeline options, as in weave_knowledge_graph.py")
+    pipeline_options.add_argument("--cache", action="store_true", help="reuse (or create) the parsed data cache.")
+    pipeline_options.add_argument("--engine", choices=ENGINES, default="c")
+    pipeline_options.add_argument("--extractor", choices=EXTRACTORS, default="ontoweaver")
+    pipeline_options.add_argument("--workers", type=pipeline.positive_int, default=1)
+    pipeline_options.add_argument("--fusion", choices=FUSION_METHODS, default="ontoweaver")
+    pipeline_options.add_argument(
+        "--validate", dest="validation", type=pipeline.validation_mode, default="fast"
+    )
+    pipeline_options.add_argument("--columns", choices=pipeline.COLUMN_SELECTIONS, default="all")
+
+    return parser.parse_args(arguments)
+
+
+def main() -> None:
+    cli_arguments = parse_arguments()
+    options = PipelineOptions(**{key: getattr(cli_arguments, key) for key in BENCHMARK_OPTIONS})
+
+    results = run_benchmark(
+        cli_arguments.resources,
+        cli_arguments.sizes,
+        options,
+        until=cli_arguments.until,
+        data_directory=cli_arguments.data_directory,
+        seed=cli_arguments.seed,
+        memory_budget=cli_arguments.memory_budget,
+        compressed=not cli_arguments.uncompressed,
+    )
+    write_results(results, cli_arguments.output or results_path(results))
+
+    baseline = None
+    if cli_arguments.compare:
+        with open(cli_arguments.compare) as fd:
+            baseline = json.load(fd)
+    print(format_results(results, baseline))
+
+    failed = any(case["error"] for case in results["cases"])
+    if baseline is not None:
+        found = regressions(results, baseline, cli_arguments.tolerance)
+        for regression in found:
+            print(f"REGRESSION {regression}")
+        failed = failed or bool(found)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
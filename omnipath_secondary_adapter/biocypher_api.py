@@ -0,0 +1,149 @@
+import re
+from functools import lru_cache
+from importlib.metadata import version as package_version
+from typing import (
+    Any,
+    List,
+    Optional,
+    Tuple,
+)
+
+from biocypher import BioCypher
+from biocypher.output.write._batch_writer import parse_label as _parse_label
+from biocypher.output.write.graph._neo4j import _Neo4jBatchWriter
+
+
+# The writers of this package reach into private parts of BioCypher (its writer,
+# translator and ontology, and some of their methods), which may change in any
+# release. They only do so through this module, for the versions it was checked
+# against: from the first one, up to the second one excluded.
+SUPPORTED_VERSIONS = ((0, 9, 1), (0, 10))
+
+
+class UnsupportedBioCypherError(RuntimeError):
+    """The installed BioCypher is not one whose internals this package was checked against."""
+
+
+def _version_tuple(version: str) -> Tuple[int, ...]:
+    """The release numbers of a version, e.g. (0, 9, 6) for '0.9.6rc1'."""
+    return tuple(int(number) for number in re.findall(r"\d+", version.split("+")[0])[:3])
+
+
+@lru_cache(maxsize=None)
+def check_version() -> str:
+    """
+    Check that the installed BioCypher is in `SUPPORTED_VERSIONS`.
+
+    Returns:
+        str: The installed version.
+
+    Raises:
+        UnsupportedBioCypherError: If the installed version is not supported.
+    """
+    installed = package_version("biocypher")
+    low, high = SUPPORTED_VERSIONS
+    if not low <= _version_tuple(installed) < high:
+        supported = f">={'.'.join(map(str, low))},<{'.'.join(map(str, high))}"
+        raise UnsupportedBioCypherError(
+            f"BioCypher {installed} is installed, but this package uses BioCypher internals "
+            f"only checked for versions {supported}."
+        )
+    return installed
+
+
+# ----- BioCypher instance -----
+def get_translator(bc: BioCypher) -> Any:
+    """The translator of a BioCypher instance, created if needed."""
+    check_version()
+    return bc._get_translator()
+
+
+def get_ontology(bc: BioCypher) -> Any:
+    """The ontology of a BioCypher instance, loaded if needed."""
+    check_version()
+    return bc._get_ontology()
+
+
+def get_writer(bc: BioCypher) -> Any:
+    """The batch writer of a BioCypher instance, created (with its output directory) if needed."""
+    check_version()
+    if bc._writer is None:
+        if hasattr(bc, "_get_writer"):
+            bc._get_writer()  # up to BioCypher 0.9.5
+        else:
+            bc._initialize_writer()
+    return bc._writer
+
+
+def get_output_directory(bc: BioCypher) -> str:
+    """The output directory of a BioCypher instance, timestamped unless it is configured."""
+    get_writer(bc)  # sets the output directory
+    return bc._output_directory
+
+
+# ----- Translator -----
+def get_ontology_class(translator: Any, label: str) -> Optional[str]:
+    """The ontology class of an input label, or None if the schema does not map it."""
+    return translator._get_ontology_mapping(label)
+
+
+def preferred_id(translator: Any, ontology_class: str) -> str:
+    """The `preferred_id` property given by BioCypher to the nodes of a class."""
+    return translator._get_preferred_id(ontology_class)
+
+
+def translate_nodes(translator: Any, nodes: List[tuple]) -> List[Any]:
+    """Translate node tuples into the BioCypher nodes of the ontology classes."""
+    return list(translator.translate_nodes(nodes)) if nodes else []
+
+
+def translate_edges(translator: Any, edges: List[tuple]) -> List[Any]:
+    """Translate edge tuples into BioCypher edges; the translator fails on an empty list of them."""
+    return list(translator.translate_edges(edges)) if edges else []
+
+
+def parse_label(label: str) -> str:
+    """A label as BioCypher writes it, without the characters Neo4j does not accept."""
+    return _parse_label(label)
+
+
+# ----- Neo4j writer -----
+def is_neo4j_writer(writer: Any) -> bool:
+    """Whether a BioCypher writer writes neo4j-admin import files."""
+    return isinstance(writer, _Neo4jBatchWriter)
+
+
+def array_string(writer: Any, values: List[Any]) -> str:
+    """A list property as the Neo4j writer writes it, with its quotes and array delimiter."""
+    return writer._write_array_string(values)
+
+
+def write_headers(writer: Any, kind: str) -> None:
+    """
+    Write the header files of the labels written so far by the Neo4j writer.
+
+    Args:
+        writer (Any): The Neo4j writer.
+        kind (str): Either "nodes" or "edges".
+    """
+    if kind == "edges":
+        writer._write_edge_headers()
+    else:
+        writer._write_node_headers()
+
+
+def set_import_call_files(
+    writer: Any,
+    nodes: List[Tuple[str, str]],
+    edges: List[Tuple[str, str]],
+) -> None:
+    """
+    Replace the files listed in the import call of the Neo4j writer.
+
+    Args:
+        writer (Any): The Neo4j writer.
+        nodes (List[Tuple[str, str]]): The header file and the comma-separated part files
+            of each group of nodes.
+        edges (List[Tuple[str, str]]): The same for the edges.
+    """
+    writer.import_call_nodes, writer.import_call_edges = nodes, edges
@@ -0,0 +1,309 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from omnipath_secondary_adapter.readers import table_to_dataframe
+
+
+CACHE_FORMAT_VERSION = 3
+CACHE_SUBDIRECTORY = "parsed"
+CACHE_FILE_EXTENSION = ".arrow"
+HASH_BLOCK_SIZE = 8 * 1024**2  # bytes read at once when hashing a file
+
+logger = logging.getLogger("biocypher")
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Cache keys      ---------------------------
+# -----------------------------------------------------------------------
+def file_digest(path: str) -> str:
+    """
+    Compute the SHA-256 digest of a file content.
+
+    The digest is computed once per process for a given file, size and
+    modification time, however many keys it is part of.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    stat = os.stat(path)
+    return _content_digest(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=None)
+def _content_digest(path: str, size: int, mtime_ns: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fd:
+        for block in iter(lambda: fd.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def schema_version(pandas_dtypes: Optional[Dict[str, str]]) -> str:
+    """
+    Compute a version string identifying the schema a dump is parsed with.
+
+    Any change in the column types, or in the cache format itself, changes
+    the version and thus invalidates the cached files.
+
+    Args:
+        pandas_dtypes (Optional[Dict[str, str]]): The dtypes given to the reader, if any.
+
+    Returns:
+        str: The hexadecimal version string.
+    """
+    description = {
+        "format": CACHE_FORMAT_VERSION,
+        "dtypes": {col: str(dtype) for col, dtype in (pandas_dtypes or {}).items()},
+    }
+    description = json.dumps(description, sort_keys=True)
+    return hashlib.sha256(description.encode()).hexdigest()
+
+
+def reader_key(engine: str = "c", columns: Optional[List[str]] = None) -> str:
+    """
+    Compute a key identifying how a dump is read: by which engine, and which columns.
+
+    Each combination has its own cached file, so that switching between them
+    reuses the file of each one instead of parsing the dump again.
+
+    Args:
+        engine (str): The engine used to parse the dump.
+        columns (Optional[List[str]]): The columns read, if not all of them.
+
+    Returns:
+        str: The hexadecimal key.
+    """
+    description = json.dumps({"engine": engine, "columns": columns}, sort_keys=True)
+    return hashlib.sha256(description.encode()).hexdigest()
+
+
+def cache_file_path(
+    cache_directory: str,
+    resource_name: str,
+    reader: str,
+    digest: str,
+    version: str,
+) -> str:
+    """
+    Build the path of the cached file for a given reader, dump and schema version.
+
+    Args:
+        cache_directory (str): The root cache directory.
+        resource_name (str): The name of the resource, i.e networks, annotations, etc.
+        reader (str): The engine and columns read, see `reader_key`.
+        digest (str): The digest of the source file, see `file_digest`.
+        version (str): The schema version, see `schema_version`.
+
+    Returns:
+        str: The path to the cached file.
+    """
+    file_name = f"{resource_name}-{reader[:8]}-{digest[:16]}-{version[:12]}{CACHE_FILE_EXTENSION}"
+    return os.path.join(cache_directory, CACHE_SUBDIRECTORY, file_name)
+
+
+def _prune_stale_files(cache_path: str, resource_name: str) -> None:
+    """Remove the cached files of a resource read the same way, but from another dump or schema.
+
+    The files of the other engines and column selections are kept, except
+    the ones named as by an older cache format.
+    """
+    reader = os.path.basename(cache_path)[len(resource_name) + 1 :].split("-")[0]
+    pattern = os.path.join(
+        os.path.dirname(cache_path), f"{resource_name}-*{CACHE_FILE_EXTENSION}"
+    )
+    for stale_path in glob.glob(pattern):
+        fields = os.path.basename(stale_path)[len(resource_name) + 1 : -len(CACHE_FILE_EXTENSION)].split("-")
+        if stale_path != cache_path and (len(fields) != 3 or fields[0] == reader):
+            logger.info(f"Removing stale cache file: {stale_path}")
+            os.remove(stale_path)
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Read / Write      -------------------------
+# -----------------------------------------------------------------------
+def read_cached_table(cache_path: str) -> pa.Table:
+    """
+    Memory-map a cached file as an Arrow table, without copying its buffers.
+
+    Args:
+        cache_path (str): Path to the cached file.
+
+    Returns:
+        pa.Table: The memory-mapped table.
+    """
+    source = pa.memory_map(cache_path, "r")
+    return ipc.open_file(source).read_all()
+
+
+def read_cached_dataframe(
+    cache_path: str,
+    types_mapper: Optional[Callable] = None,
+    row_mask: Optional[Callable[[pa.Table], np.ndarray]] = None,
+) -> pd.DataFrame:
+    """
+    Load a cached file as a pandas DataFrame, restoring the pandas dtypes.
+
+    Args:
+        cache_path (str): Path to the cached file.
+        types_mapper (Optional[Callable]): Mapping from Arrow types to pandas dtypes,
+            e.g. `pd.ArrowDtype` to keep the memory-mapped Arrow buffers.
+        row_mask (Optional[Callable[[pa.Table], np.ndarray]]): Computes which rows to keep,
+            see `readers.table_to_dataframe` (default: all of them).
+
+    Returns:
+        pd.DataFrame: The cached DataFrame.
+    """
+    return table_to_dataframe(read_cached_table(cache_path), row_mask, types_mapper=types_mapper)
+
+
+def iter_cached_dataframe(
+    cache_path: str,
+    chunksize: int,
+    types_mapper: Optional[Callable] = None,
+    row_mask: Optional[Callable[[pa.Table], np.ndarray]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a cached file as pandas DataFrames of at most `chunksize` rows.
+
+    The row index keeps increasing across chunks, as when streaming the TSV file.
+
+    Args:
+        cache_path (str): Path to the cached file.
+        chunksize (int): The maximum number of rows per chunk.
+        types_mapper (Optional[Callable]): Mapping from Arrow types to pandas dtypes.
+        row_mask (Optional[Callable[[pa.Table], np.ndarray]]): Computes which rows of each
+            chunk to keep, see `readers.table_to_dataframe` (default: all of them).
+
+    Yields:
+        pd.DataFrame: The successive chunks.
+    """
+    table = read_cached_table(cache_path)
+    for offset in range(0, table.num_rows, chunksize):
+        yield table_to_dataframe(
+            table.slice(offset, chunksize), row_mask, offset, types_mapper=types_mapper
+        )
+
+
+def _wide_dictionaries(schema: pa.Schema) -> pa.Schema:
+    """The schema, with 32-bit indices for its dictionary-encoded columns."""
+    for n_field, field in enumerate(schema):
+        if pa.types.is_dictionary(field.type):
+            schema = schema.set(n_field, field.with_type(pa.dictionary(pa.int32(), field.type.value_type)))
+    return schema
+
+
+class ArrowCacheWriter:
+    """Write a DataFrame, possibly chunk by chunk, to an Arrow IPC cache file.
+
+    The file is written under a temporary name and only moved to its final
+    path when closed without error, so that an interrupted run never leaves
+    a truncated cache behind. If a chunk cannot be converted to the schema
+    of the first one, caching is abandoned but the caller is not interrupted.
+
+    The dictionaries of the categorical columns are written as deltas: the
+    categories of a chunk must extend the ones of the previous chunks, see
+    `readers.share_categories`. Their indices are widened to 32 bits, so that
+    the categories can grow past the ones of the first chunk.
+    """
+
+    def __init__(self, cache_path: str, resource_name: str):
+        self.cache_path = cache_path
+        self.resource_name = resource_name
+        self.temporary_path = f"{cache_path}.tmp"
+        self._sink = None
+        self._writer = None
+        self._schema = None
+        self.failed = False
+
+    def write(self, dataframe: pd.DataFrame) -> None:
+        """Append a DataFrame (or chunk of it) to the cache file."""
+        if self.failed:
+            return
+
+        try:
+            table = pa.Table.from_pandas(
+                dataframe, schema=self._schema, preserve_index=False
+            )
+            if self._writer is None:
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                self._schema = _wide_dictionaries(table.schema)
+                table = table.cast(self._schema)
+                self._sink = pa.OSFile(self.temporary_path, "wb")
+                self._writer = ipc.new_file(
+                    self._sink, self._schema, options=ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+                )
+            self._writer.write_table(table)
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            logger.warning(f"Cannot cache the parsed {self.resource_name} data: {e}")
+            self.abort()
+
+    def abort(self) -> None:
+        """Stop caching and remove the partially written file."""
+        self.failed = True
+        self._close_streams()
+        if os.path.exists(self.temporary_path):
+            os.remove(self.temporary_path)
+
+    def close(self) -> None:
+        """Finalize the cache file and move it to its final path."""
+        if self.failed or self._writer is None:
+            return
+
+        self._close_streams()
+        os.replace(self.temporary_path, self.cache_path)
+        _prune_stale_files(self.cache_path, self.resource_name)
+        logger.info(f"Parsed data cached to: {self.cache_path}")
+
+    def _close_streams(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_cached_dataframe(
+    dataframe: pd.DataFrame,
+    cache_path: str,
+    resource_name: str,
+) -> None:
+    """
+    Store a parsed DataFrame as an Arrow IPC file that later runs can memory-map.
+
+    Args:
+        dataframe (pd.DataFrame): The typed and cleaned DataFrame.
+        cache_path (str): Path to the cached file.
+        resource_name (str): The name of the resource, i.e networks, annotations, etc.
+    """
+    with ArrowCacheWriter(cache_path, resource_name) as writer:
+        writer.write(dataframe)
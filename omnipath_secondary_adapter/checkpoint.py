@@ -0,0 +1,231 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+from importlib import metadata
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from omnipath_secondary_adapter.extraction import (
+    Elements,
+    element_tables,
+)
+
+
+CHECKPOINT_SUBDIRECTORY = "checkpoints"
+TABLE_STAGE = "table"  # the typed, filtered and transformed table, before extraction
+ELEMENTS_STAGE = "elements"  # the node and edge tables, before fusion
+STAGE_FILES = {  # the Arrow IPC files of each stage, by suffix
+    TABLE_STAGE: ("",),
+    ELEMENTS_STAGE: ("-nodes", "-edges"),
+}
+STAGE_FILE_EXTENSION = ".arrow"
+STAGE_MODULES = (  # modules of the package the checkpointed stages run
+    "cache",
+    "decompress",
+    "extraction",
+    "filters",
+    "json_columns",
+    "models",
+    "readers",
+    "sharding",
+    "validation",
+)
+VERSIONED_LIBRARIES = ("ontoweaver", "pandas", "pyarrow")  # libraries shaping the stage outputs
+SOURCE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+logger = logging.getLogger("biocypher")
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Keys      ---------------------------------
+# -----------------------------------------------------------------------
+def _library_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def code_version(extra_paths: Iterable[str] = ()) -> str:
+    """
+    Compute a version string identifying the code producing the stage outputs.
+
+    It covers the modules of the adapter package listed in `STAGE_MODULES`,
+    the given files (e.g. the pipeline script), and the versions of the
+    libraries listed in `VERSIONED_LIBRARIES`: editing any of them
+    invalidates every checkpoint, while editing the other modules (fusion,
+    writers, benchmark, ...) does not.
+
+    Args:
+        extra_paths (Iterable[str]): Other source files the stages depend on.
+
+    Returns:
+        str: The hexadecimal version string.
+    """
+    digest = hashlib.sha256()
+    paths = [os.path.join(SOURCE_DIRECTORY, f"{module}.py") for module in STAGE_MODULES] + list(extra_paths)
+    for path in paths:
+        with open(path, "rb") as fd:
+            digest.update(os.path.basename(path).encode())
+            digest.update(hashlib.sha256(fd.read()).digest())
+    for name in VERSIONED_LIBRARIES:
+        digest.update(f"{name}=={_library_version(name)}".encode())
+    return digest.hexdigest()
+
+
+def stage_key(stage: str, **inputs: Any) -> str:
+    """
+    Compute the key of a stage output from everything it depends on.
+
+    Args:
+        stage (str): The stage, i.e. `TABLE_STAGE` or `ELEMENTS_STAGE`.
+        **inputs (Any): The digests and options the output depends on, JSON-serializable
+            (or represented by their `str`). A stage depending on another one is given
+            the key of that stage.
+
+    Returns:
+        str: The hexadecimal key.
+    """
+    description = json.dumps({"stage": stage, **inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(description.encode()).hexdigest()
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Checkpoints      --------------------------
+# -----------------------------------------------------------------------
+class Checkpoints:
+    """The outputs of the stages of a resource, kept under `directory` between runs.
+
+    Each stage keeps a single output, made of the Arrow IPC files named
+    after its key, and an output is only reused when its key matches, i.e.
+    when the input file, the mapping, the code and the options it was built
+    from are unchanged. Files are written under a temporary name and moved to
+    their final path once complete, the last one of a stage being moved last,
+    so that an interrupted run never leaves a truncated or partial output.
+
+    Args:
+        directory (str): The directory holding the checkpoints of every resource.
+        resource_name (str): The name of the resource, i.e networks, annotations, etc.
+        resume (bool): Whether valid outputs are reused; if not, they are only written.
+    """
+
+    def __init__(self, directory: str, resource_name: str, resume: bool = True):
+        self.directory = directory
+        self.resource_name = resource_name
+        self.resume = resume
+
+    def _path(self, stage: str, key: str, suffix: str = "") -> str:
+        file_name = f"{self.resource_name}-{stage}-{key[:16]}{suffix}{STAGE_FILE_EXTENSION}"
+        return os.path.join(self.directory, file_name)
+
+    def _valid_paths(self, stage: str, key: str) -> Optional[List[str]]:
+        paths = [self._path(stage, key, suffix) for suffix in STAGE_FILES[stage]]
+        if not self.resume or not all(os.path.isfile(path) for path in paths):
+            return None
+        logger.info(f"Resuming {self.resource_name} from its {stage} checkpoint: {', '.join(paths)}")
+        return paths
+
+    def _write(self, stage: str, key: str, tables: List[pa.Table]) -> None:
+        paths = [self._path(stage, key, suffix) for suffix in STAGE_FILES[stage]]
+        os.makedirs(self.directory, exist_ok=True)
+        for path, table in zip(paths, tables):
+            temporary_path = f"{path}.tmp"
+            try:
+                _write_table(temporary_path, table)
+            except BaseException:
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+                raise
+            os.replace(temporary_path, path)
+
+        pattern = os.path.join(self.directory, f"{self.resource_name}-{stage}-*{STAGE_FILE_EXTENSION}")
+        for stale_path in glob.glob(pattern):
+            if stale_path not in paths:
+                logger.info(f"Removing stale checkpoint: {stale_path}")
+                os.remove(stale_path)
+        logger.info(f"Checkpointed the {stage} of {self.resource_name} to: {', '.join(paths)}")
+
+    # ----- Table -----
+    def table(self, key: str, types_mapper: Optional[Callable] = None) -> Optional[pd.DataFrame]:
+        """
+        Load the checkpointed table, with its dtypes and row index.
+
+        Args:
+            key (str): The key of the table stage, see `stage_key`.
+            types_mapper (Optional[Callable]): Mapping from Arrow types to pandas dtypes,
+                as used when the table was loaded.
+
+        Returns:
+            Optional[pd.DataFrame]: The table, or None if there is no valid checkpoint.
+        """
+        paths = self._valid_paths(TABLE_STAGE, key)
+        if paths is None:
+            return None
+        dataframe = _read_table(paths[0]).to_pandas(types_mapper=types_mapper)
+        if not isinstance(dataframe.index, pd.RangeIndex):
+            # The positions of the rows in the file, whatever the types mapper.
+            dataframe.index = pd.Index(dataframe.index.to_numpy())
+        return dataframe
+
+    def write_table(self, key: str, dataframe: pd.DataFrame) -> None:
+        """
+        Checkpoint the table, as an Arrow IPC file keeping its dtypes and row index.
+
+        Args:
+            key (str): The key of the table stage, see `stage_key`.
+            dataframe (pd.DataFrame): The table extraction starts from.
+        """
+        self._write(TABLE_STAGE, key, [pa.Table.from_pandas(dataframe)])
+
+    # ----- Elements -----
+    def elements(self, key: str) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Load the checkpointed nodes and edges.
+
+        Args:
+            key (str): The key of the elements stage, see `stage_key`.
+
+        Returns:
+            Optional[Tuple[pd.DataFrame, pd.DataFrame]]: The node and edge tables, as built by
+                `extraction.element_tables`, or None if there is no valid checkpoint.
+        """
+        paths = self._valid_paths(ELEMENTS_STAGE, key)
+        if paths is None:
+            return None
+        nodes, edges = (_read_table(path).to_pandas() for path in paths)
+        return nodes, edges
+
+    def write_elements(self, key: str, nodes: Elements, edges: Elements) -> None:
+        """
+        Checkpoint the nodes and edges, as an Arrow IPC file of nodes and one of edges.
+
+        Args:
+            key (str): The key of the elements stage, see `stage_key`.
+            nodes (Elements): The nodes, as a table or as BioCypher tuples `(id, label, properties)`.
+            edges (Elements): The edges, as a table or as BioCypher tuples
+                `(id, source, target, label, properties)`.
+        """
+        tables = [pa.Table.from_pandas(table, preserve_index=False) for table in element_tables(nodes, edges)]
+        self._write(ELEMENTS_STAGE, key, tables)
+
+
+def _read_table(path: str) -> pa.Table:
+    return ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def _write_table(path: str, table: pa.Table) -> None:
+    with pa.OSFile(path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
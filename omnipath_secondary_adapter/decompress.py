@@ -0,0 +1,281 @@
+import gzip
+import io
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import (
+    BinaryIO,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
+
+try:
+    from isal import igzip
+except ImportError:  # python-isal is optional
+    igzip = None
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+DECOMPRESSION_BLOCK_SIZE = 4 * 1024**2  # bytes decompressed at once by the background thread
+PIPELINE_DEPTH = 8  # blocks decompressed ahead of the parser
+DECOMPRESSION_BACKENDS = ("isal", "pigz", "zlib")
+MEGABYTE = 1024**2
+
+logger = logging.getLogger("biocypher")
+
+_throughputs: List[Dict[str, float]] = []  # the throughput of each gzip file read by this process
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Backends      -----------------------------
+# -----------------------------------------------------------------------
+def is_gzip(path: str) -> bool:
+    """
+    Tell whether a file is gzip-compressed, from its first bytes.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        bool: True for a gzip file.
+    """
+    with open(path, "rb") as fd:
+        return fd.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+
+def decompression_backend() -> str:
+    """
+    Choose the fastest gzip decompressor available.
+
+    "isal" uses the Intel ISA-L inflater of python-isal, "pigz" runs the
+    pigz program in a separate process, and "zlib" is Python's gzip module.
+
+    Returns:
+        str: The name of the backend.
+    """
+    if igzip is not None:
+        return "isal"
+    if shutil.which("pigz"):
+        return "pigz"
+    return "zlib"
+
+
+class _PigzStream:
+    """Read the output of `pigz -dc` on a file."""
+
+    def __init__(self, path: str):
+        self.process = subprocess.Popen(
+            [shutil.which("pigz"), "-dc", path],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def read(self, size: int) -> bytes:
+        block = self.process.stdout.read(size)
+        if not block and self.process.wait() != 0:
+            raise OSError(f"pigz failed: {self.process.stderr.read().decode().strip()}")
+        return block
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        self.process.stdout.close()
+        self.process.stderr.close()
+
+
+def _open_decompressor(path: str, backend: str) -> BinaryIO:
+    if backend == "isal":
+        return igzip.open(path, "rb")
+    if backend == "pigz":
+        return _PigzStream(path)
+    return gzip.open(path, "rb")
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Pipeline      -----------------------------
+# -----------------------------------------------------------------------
+class PipelinedGzipReader(io.RawIOBase):
+    """Decompress a gzip file in a background thread, ahead of the parser reading it.
+
+    The decompressed blocks are handed over through a bounded queue, so that
+    the parser works on a block while the next ones are being decompressed,
+    and at most `depth` blocks are held in memory. zlib, ISA-L and the pipe
+    from pigz all release the GIL while they work.
+
+    The reader counts the time spent decompressing, in the background thread,
+    the time the parser spent waiting for decompressed data, and the time the
+    parser was paused while its output was consumed (see `pause_parsing`),
+    which is not part of the parsing time.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        backend: Optional[str] = None,
+        block_size: int = DECOMPRESSION_BLOCK_SIZE,
+        depth: int = PIPELINE_DEPTH,
+    ):
+        super().__init__()
+        self.path = path
+        self.backend = backend or decompression_backend()
+        self.block_size = block_size
+        self.compressed_bytes = os.path.getsize(path)
+        self.decompressed_bytes = 0
+        self.decompression_time = 0.0
+        self.wait_time = 0.0
+        self.paused_time = 0.0
+        self.start_time = time.perf_counter()
+
+        self._blocks = queue.Queue(maxsize=depth)
+        self._block = memoryview(b"")
+        self._eof = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._decompress, name=f"gunzip-{os.path.basename(path)}", daemon=True
+        )
+        self._thread.start()
+
+    def _decompress(self) -> None:
+        try:
+            source = _open_decompressor(self.path, self.backend)
+            try:
+                while not self._stop.is_set():
+                    start = time.perf_counter()
+                    block = source.read(self.block_size)
+                    self.decompression_time += time.perf_counter() - start
+                    self._put(block)
+                    if not block:
+                        return
+            finally:
+                source.close()
+        except BaseException as e:
+            self._put(e)
+
+    def _put(self, item: Union[bytes, BaseException]) -> None:
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._block and not self._eof:
+            start = time.perf_counter()
+            item = self._blocks.get()
+            self.wait_time += time.perf_counter() - start
+            if isinstance(item, BaseException):
+                raise item
+            self._eof = not item
+            self._block = memoryview(item)
+
+        size = min(len(buffer), len(self._block))
+        buffer[:size] = self._block[:size]
+        self._block = self._block[size:]
+        self.decompressed_bytes += size
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+        super().close()
+
+    def throughput(self) -> Dict[str, float]:
+        """
+        Measure the decompression and parsing throughputs, in MB of decompressed data per second.
+
+        The parsing time is the time since the file was opened, less the time
+        the parser waited for decompressed data and the time it was paused.
+
+        Returns:
+            Dict[str, float]: The sizes (MB), the times (s) and the throughputs (MB/s).
+        """
+        elapsed = time.perf_counter() - self.start_time
+        parsing_time = max(elapsed - self.paused_time - self.wait_time, 1e-9)
+        size = self.decompressed_bytes / MEGABYTE
+        return {
+            "compressed_size": self.compressed_bytes / MEGABYTE,
+            "decompressed_size": size,
+            "decompression_time": self.decompression_time,
+            "parsing_time": parsing_time,
+            "wait_time": self.wait_time,
+            "decompression_mb_per_second": size / max(self.decompression_time, 1e-9),
+            "parsing_mb_per_second": size / parsing_time,
+        }
+
+    def log_throughput(self) -> None:
+        """Log the decompression and parsing throughputs, and keep them, see `read_throughputs`."""
+        measures = self.throughput()
+        _throughputs.append({"path": self.path, "backend": self.backend, **measures})
+        logger.info(
+            f"Decompressed {measures['compressed_size']:.1f} MB into {measures['decompressed_size']:.1f} MB "
+            f"({self.backend}): decompression {measures['decompression_mb_per_second']:.1f} MB/s, "
+            f"parsing {measures['parsing_mb_per_second']:.1f} MB/s, parser waited "
+            f"{measures['wait_time']:.1f} s out of {measures['parsing_time'] + measures['wait_time']:.1f} s"
+        )
+
+
+def read_throughputs() -> List[Dict[str, float]]:
+    """
+    List the throughputs of the gzip files read by this process, in the order they were read.
+
+    Returns:
+        List[Dict[str, float]]: The `path` and `backend` of each file, and its measures,
+            see `PipelinedGzipReader.throughput`.
+    """
+    return list(_throughputs)
+
+
+@contextmanager
+def pause_parsing(source: Union[str, BinaryIO]) -> Iterator[None]:
+    """
+    Leave the time spent in the block out of the parsing time of a source, e.g. while a chunk is consumed.
+
+    Args:
+        source (Union[str, BinaryIO]): The source yielded by `open_source`.
+    """
+    reader = getattr(source, "raw", None)
+    if not isinstance(reader, PipelinedGzipReader):
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        reader.paused_time += time.perf_counter() - start
+
+
+@contextmanager
+def open_source(path: str) -> Iterator[Union[str, BinaryIO]]:
+    """
+    Open a file for parsing, decompressing it in a background thread if it is gzip-compressed.
+
+    Args:
+        path (str): Path to the (possibly compressed) file.
+
+    Yields:
+        Union[str, BinaryIO]: The decompressed stream, or the path itself for uncompressed files.
+    """
+    if not is_gzip(path):
+        yield path
+        return
+
+    reader = PipelinedGzipReader(path)
+    try:
+        yield io.BufferedReader(reader, buffer_size=DECOMPRESSION_BLOCK_SIZE)
+        reader.log_throughput()
+    finally:
+        reader.close()
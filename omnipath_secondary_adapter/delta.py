@@ -0,0 +1,614 @@
+import json
+import logging
+import os
+import re
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from omnipath_secondary_adapter.readers import arrow_types_mapper
+
+
+DELTA_SUBDIRECTORY = "delta"
+ROWS_FILE_SUFFIX = "-rows.arrow"  # the rows of the previous build, with their fingerprints
+COUNTS_FILE_SUFFIX = "-elements.arrow"  # the number of rows producing each node and edge
+VALUES_FILE_SUFFIX = "-values.arrow"  # the number of rows producing each property value of each node and edge
+BUILD_FILE_SUFFIX = "-build.json"  # what the rows were read and extracted with
+KEY_HASH_COLUMN = "__key_hash"
+ROW_HASH_COLUMN = "__row_hash"
+MISSING_TEXT = "\x00"  # hashed in place of missing values, whatever their dtype
+HASH_MULTIPLIER = np.uint64(0x100000001B3)  # mixes the hashes of successive columns
+CYPHER_BATCH_SIZE = 1000  # nodes or edges per UNWIND statement
+
+NAME_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")  # names written without backticks in Cypher
+
+NODE, EDGE = "node", "edge"
+ELEMENT_KEY_COLUMNS = ["kind", "id", "target", "label"]  # nodes have an empty target
+ELEMENT_VALUE_COLUMNS = ELEMENT_KEY_COLUMNS + ["property", "value"]
+EDGE_ID_PROPERTY = ""  # the edge IDs are fused as a property of this name
+
+logger = logging.getLogger("biocypher")
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Fingerprints      -------------------------
+# -----------------------------------------------------------------------
+def _column_hashes(series: pd.Series) -> np.ndarray:
+    """Hash the text of each cell, computed once per distinct value, so that every engine gives the same hashes."""
+    codes, uniques = pd.factorize(series)
+    texts = np.array(
+        [str(value) for value in np.asarray(uniques, dtype=object)] + [MISSING_TEXT],
+        dtype=object,
+    )
+    return pd.util.hash_array(texts)[codes]
+
+
+def combine_hashes(dataframe: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """
+    Hash the values of some columns of each row into a single 64-bit fingerprint.
+
+    Args:
+        dataframe (pd.DataFrame): The rows to hash.
+        columns (List[str]): The columns hashed, in order.
+
+    Returns:
+        np.ndarray: The fingerprint of each row, as unsigned 64-bit integers.
+    """
+    fingerprints = np.zeros(len(dataframe), dtype=np.uint64)
+    for col in columns:
+        fingerprints = (fingerprints * HASH_MULTIPLIER) ^ _column_hashes(dataframe[col])
+    return fingerprints
+
+
+def row_fingerprints(
+    dataframe: pd.DataFrame,
+    key_columns: List[str],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the key fingerprint and the full fingerprint of each row.
+
+    Args:
+        dataframe (pd.DataFrame): The rows to fingerprint.
+        key_columns (List[str]): The columns identifying a row across releases,
+            e.g. `source`, `target` and `type` for the networks.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The hashes of the key columns, and of all the columns.
+    """
+    columns = sorted(dataframe.columns)
+    return combine_hashes(dataframe, key_columns), combine_hashes(dataframe, columns)
+
+
+def uses_row_index(mapping: Any) -> bool:
+    """Whether a mapping uses the `rowIndex` transformer, whose IDs change when rows are added or removed."""
+    if isinstance(mapping, dict):
+        return "rowIndex" in mapping or any(uses_row_index(value) for value in mapping.values())
+    if isinstance(mapping, list):
+        return any(uses_row_index(value) for value in mapping)
+    return False
+
+
+class RowDiff:
+    """The rows that differ between the previous build and the new dump.
+
+    Args:
+        new_positions (np.ndarray): Positions of the new dump rows that are not in the previous build.
+        gone_positions (np.ndarray): Positions of the previous build rows that are not in the new dump.
+        nb_added (int): New rows whose key is not in the previous build.
+        nb_changed (int): New rows whose key is in the previous build, with other values.
+        nb_removed (int): Previous rows whose key is not in the new dump.
+    """
+
+    def __init__(
+        self,
+        new_positions: np.ndarray,
+        gone_positions: np.ndarray,
+        nb_added: int,
+        nb_changed: int,
+        nb_removed: int,
+    ):
+        self.new_positions = new_positions
+        self.gone_positions = gone_positions
+        self.nb_added = nb_added
+        self.nb_changed = nb_changed
+        self.nb_removed = nb_removed
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.nb_added} added, {self.nb_changed} changed, {self.nb_removed} removed rows"
+        )
+
+
+def diff_rows(
+    old_keys: np.ndarray,
+    old_rows: np.ndarray,
+    new_keys: np.ndarray,
+    new_rows: np.ndarray,
+) -> RowDiff:
+    """
+    Compare the fingerprints of the previous build and of the new dump.
+
+    Args:
+        old_keys (np.ndarray): The key fingerprints of the previous build.
+        old_rows (np.ndarray): The row fingerprints of the previous build.
+        new_keys (np.ndarray): The key fingerprints of the new dump.
+        new_rows (np.ndarray): The row fingerprints of the new dump.
+
+    Returns:
+        RowDiff: The rows to extract from the new dump, and the ones to retract from the previous build.
+    """
+    new_positions = np.flatnonzero(~np.isin(new_rows, old_rows))
+    gone_positions = np.flatnonzero(~np.isin(old_rows, new_rows))
+    changed = np.isin(new_keys[new_positions], old_keys[gone_positions])
+    removed = ~np.isin(old_keys[gone_positions], new_keys[new_positions])
+    return RowDiff(
+        new_positions,
+        gone_positions,
+        nb_added=int((~changed).sum()),
+        nb_changed=int(changed.sum()),
+        nb_removed=int(removed.sum()),
+    )
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Element counts      -----------------------
+# -----------------------------------------------------------------------
+def element_counts(nodes: Iterable[tuple], edges: Iterable[tuple]) -> pd.DataFrame:
+    """
+    Count how many times each node and edge is produced, before fusion.
+
+    Each row produces its own copy of the nodes and edges it maps to, so that
+    the count of an element is the number of rows producing it.
+
+    Args:
+        nodes (Iterable[tuple]): The node tuples `(id, label, properties)`.
+        edges (Iterable[tuple]): The edge tuples `(id, source, target, label, properties)`.
+
+    Returns:
+        pd.DataFrame: One row per distinct element, with its key and `count`.
+    """
+    keys = pd.DataFrame(
+        [(NODE, node_id, "", label) for node_id, label, _ in nodes]
+        + [(EDGE, source, target, label) for _, source, target, label, _ in edges],
+        columns=ELEMENT_KEY_COLUMNS,
+        dtype=object,
+    )
+    return keys.groupby(ELEMENT_KEY_COLUMNS, sort=False).size().rename("count").reset_index()
+
+
+def element_values(nodes: Iterable[tuple], edges: Iterable[tuple]) -> pd.DataFrame:
+    """
+    Count how many times each property value of each node and edge is produced, before fusion.
+
+    The fusion joins the distinct values of a property over the rows producing
+    an element, so that these counts are enough to fuse it again when some of
+    its rows change, see `fuse_elements`. The edge IDs, also joined, are counted
+    as the values of the `EDGE_ID_PROPERTY` property.
+
+    Args:
+        nodes (Iterable[tuple]): The node tuples `(id, label, properties)`.
+        edges (Iterable[tuple]): The edge tuples `(id, source, target, label, properties)`.
+
+    Returns:
+        pd.DataFrame: One row per distinct value, with its element key, `property`, `value`
+            and `count`, in the order the values are first produced.
+    """
+    records = [
+        (NODE, node_id, "", label, prop, value)
+        for node_id, label, properties in nodes
+        for prop, value in properties.items()
+    ]
+    for edge_id, source, target, label, properties in edges:
+        records.append((EDGE, source, target, label, EDGE_ID_PROPERTY, edge_id))
+        records.extend(
+            (EDGE, source, target, label, prop, value) for prop, value in properties.items()
+        )
+    values = pd.DataFrame(records, columns=ELEMENT_VALUE_COLUMNS, dtype=object)
+    return (
+        values.groupby(ELEMENT_VALUE_COLUMNS, sort=False, dropna=False)
+        .size()
+        .rename("count")
+        .reset_index()
+    )
+
+
+def update_counts(
+    counts: pd.DataFrame,
+    added: pd.DataFrame,
+    retracted: pd.DataFrame,
+    columns: List[str] = ELEMENT_KEY_COLUMNS,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Update the element (or value) counts of the previous build with the extracted and retracted rows.
+
+    Args:
+        counts (pd.DataFrame): The counts of the previous build, see `element_counts`
+            (or `element_values`).
+        added (pd.DataFrame): The counts of the elements of the new rows.
+        retracted (pd.DataFrame): The counts of the elements of the rows gone from the dump.
+        columns (List[str]): The columns identifying what is counted: `ELEMENT_KEY_COLUMNS`
+            for the elements, `ELEMENT_VALUE_COLUMNS` for their values.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: The updated counts, and the keys of the
+            elements (or values) no row produces anymore.
+    """
+    retracted = retracted.assign(count=-retracted["count"])
+    updated = (
+        pd.concat([counts, added, retracted])
+        .groupby(columns, sort=False, dropna=False)["count"]
+        .sum()
+        .reset_index()
+    )
+    kept = updated["count"] > 0
+    return updated[kept].reset_index(drop=True), updated.loc[~kept, columns]
+
+
+def fuse_elements(
+    keys: pd.DataFrame,
+    values: pd.DataFrame,
+    dropped: pd.DataFrame,
+    separator: str,
+) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Fuse nodes and edges from the values of all the rows still producing them.
+
+    As `ontoweaver.fusion.reconciliate`, the distinct values of each property
+    are joined, here in the order they were first produced. The properties
+    that lost all their values are set to None, so that they are removed from
+    the database when the element is updated.
+
+    Args:
+        keys (pd.DataFrame): The keys of the elements to fuse, see `element_counts`.
+        values (pd.DataFrame): The counts of the values of the build, see `element_values`.
+        dropped (pd.DataFrame): The values no row produces anymore, see `update_counts`.
+        separator (str): The string joining the values of a property.
+
+    Returns:
+        Tuple[List[tuple], List[tuple]]: The fused node and edge tuples.
+    """
+    keys = keys[ELEMENT_KEY_COLUMNS].drop_duplicates()
+    properties: Dict[tuple, Dict[str, list]] = {
+        key: {} for key in keys.itertuples(index=False, name=None)
+    }
+    # Only the values of the fused elements are converted to Python objects.
+    dropped = dropped.merge(keys, on=ELEMENT_KEY_COLUMNS)
+    values = values.merge(keys, on=ELEMENT_KEY_COLUMNS)
+    for *key, prop, _ in dropped[ELEMENT_VALUE_COLUMNS].itertuples(index=False, name=None):
+        properties[tuple(key)].setdefault(prop, [])
+    for *key, prop, value in values[ELEMENT_VALUE_COLUMNS].itertuples(index=False, name=None):
+        properties[tuple(key)].setdefault(prop, []).append(value)
+
+    def join(items: list) -> Optional[str]:
+        return separator.join(items) if items else None
+
+    nodes, edges = [], []
+    for (kind, element_id, target, label), element in properties.items():
+        if kind == NODE:
+            nodes.append((element_id, label, {prop: join(items) for prop, items in element.items()}))
+        else:
+            edge_id = join(element.pop(EDGE_ID_PROPERTY, []))
+            fused = {prop: join(items) for prop, items in element.items()}
+            edges.append((edge_id or "", element_id, target, label, fused))
+    return nodes, edges
+
+
+def element_tuples(keys: pd.DataFrame) -> Tuple[List[tuple], List[tuple]]:
+    """Convert element keys back into node and edge tuples, without properties."""
+    nodes = keys[keys["kind"] == NODE]
+    edges = keys[keys["kind"] == EDGE]
+    return (
+        [(node_id, label, {}) for node_id, label in zip(nodes["id"], nodes["label"])],
+        [
+            ("", source, target, label, {})
+            for source, target, label in zip(edges["id"], edges["target"], edges["label"])
+        ],
+    )
+
+
+# -----------------------------------------------------------------------
+# -----------------------     State      --------------------------------
+# -----------------------------------------------------------------------
+def _write_arrow(table: pa.Table, path: str) -> None:
+    """Write an Arrow IPC file under a temporary name, then move it to its final path."""
+    temporary_path = f"{path}.tmp"
+    with pa.OSFile(temporary_path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temporary_path, path)
+
+
+def _read_arrow(path: str) -> pa.Table:
+    return ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+class DeltaState:
+    """The rows, element counts and value counts of the previous build of a resource, kept under `directory`.
+
+    The rows of the previous build are extracted again to retract their
+    nodes and edges, so that a build is only reusable when its rows were read
+    and extracted the same way, as described by `build` (e.g. the digest of
+    the mapping, the columns read and the row filters).
+
+    Args:
+        directory (str): The directory holding the state of every resource.
+        resource_name (str): The name of the resource, i.e networks, annotations, etc.
+        build (Optional[Dict[str, Any]]): What the rows are read and extracted with,
+            JSON-serializable.
+    """
+
+    def __init__(self, directory: str, resource_name: str, build: Optional[Dict[str, Any]] = None):
+        self.rows_path = os.path.join(directory, f"{resource_name}{ROWS_FILE_SUFFIX}")
+        self.counts_path = os.path.join(directory, f"{resource_name}{COUNTS_FILE_SUFFIX}")
+        self.values_path = os.path.join(directory, f"{resource_name}{VALUES_FILE_SUFFIX}")
+        self.build_path = os.path.join(directory, f"{resource_name}{BUILD_FILE_SUFFIX}")
+        # Compared with the recorded one once through JSON, so that tuples and lists are equal.
+        self.build = json.loads(json.dumps(build or {}))
+
+    def exists(self) -> bool:
+        paths = (self.rows_path, self.counts_path, self.values_path, self.build_path)
+        return all(os.path.isfile(path) for path in paths)
+
+    def matches(self) -> bool:
+        """Whether the previous build was read and extracted as the new one."""
+        with open(self.build_path) as fd:
+            return json.load(fd) == self.build
+
+    def fingerprints(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The key and row fingerprints of the previous build."""
+        table = _read_arrow(self.rows_path)
+        return (
+            table.column(KEY_HASH_COLUMN).to_numpy(),
+            table.column(ROW_HASH_COLUMN).to_numpy(),
+        )
+
+    def rows(self, positions: np.ndarray) -> pd.DataFrame:
+        """The rows of the previous build at the given positions, with their original index."""
+        table = _read_arrow(self.rows_path).take(positions)
+        table = table.drop_columns([KEY_HASH_COLUMN, ROW_HASH_COLUMN])
+        return table.to_pandas(types_mapper=arrow_types_mapper)
+
+    def counts(self) -> pd.DataFrame:
+        """The element counts of the previous build, see `element_counts`."""
+        return _read_arrow(self.counts_path).to_pandas()
+
+    def values(self) -> pd.DataFrame:
+        """The value counts of the previous build, see `element_values`."""
+        return _read_arrow(self.values_path).to_pandas()
+
+    def write(
+        self,
+        dataframe: pd.DataFrame,
+        key_hashes: np.ndarray,
+        row_hashes: np.ndarray,
+        counts: pd.DataFrame,
+        values: pd.DataFrame,
+    ) -> None:
+        """
+        Record a build, replacing the previous one.
+
+        Args:
+            dataframe (pd.DataFrame): The rows the nodes and edges were extracted from.
+            key_hashes (np.ndarray): Their key fingerprints, see `row_fingerprints`.
+            row_hashes (np.ndarray): Their full fingerprints.
+            counts (pd.DataFrame): The element counts of the build, see `element_counts`.
+            values (pd.DataFrame): The value counts of the build, see `element_values`.
+        """
+        os.makedirs(os.path.dirname(self.rows_path), exist_ok=True)
+        if os.path.exists(self.build_path):
+            os.remove(self.build_path)
+        rows = dataframe.assign(**{KEY_HASH_COLUMN: key_hashes, ROW_HASH_COLUMN: row_hashes})
+        _write_arrow(pa.Table.from_pandas(rows, preserve_index=True), self.rows_path)
+        _write_arrow(pa.Table.from_pandas(counts, preserve_index=False), self.counts_path)
+        _write_arrow(pa.Table.from_pandas(values, preserve_index=False), self.values_path)
+        # Written last: a build interrupted meanwhile is not recorded at all.
+        temporary_path = f"{self.build_path}.tmp"
+        with open(temporary_path, "w") as fd:
+            json.dump(self.build, fd)
+        os.replace(temporary_path, self.build_path)
+        logger.info(f"Delta state recorded: {self.rows_path}, {self.counts_path}, {self.values_path}")
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Cypher      -------------------------------
+# -----------------------------------------------------------------------
+def cypher_literal(value: Any) -> str:
+    """
+    Write a value as a Cypher literal.
+
+    Args:
+        value (Any): A string, number, boolean, None, or a list or dict of those.
+
+    Returns:
+        str: The Cypher expression of the value.
+    """
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "null"
+    if isinstance(value, (bool, np.bool_)):
+        return "true" if value else "false"
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return repr(value.item() if isinstance(value, np.generic) else value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(cypher_literal(item) for item in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ", ".join(
+            f"{_quote_name(key)}: {cypher_literal(item)}" for key, item in value.items()
+        ) + "}"
+    return json.dumps(str(value))  # JSON escapes are valid Cypher string escapes
+
+
+def _quote_name(name: str) -> str:
+    name = str(name)
+    if NAME_PATTERN.fullmatch(name):
+        return name
+    return "`" + name.replace("`", "``") + "`"
+
+
+def _batches(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class CypherPatchWriter:
+    """Write the Cypher statements patching a Neo4j database built by BioCypher.
+
+    Nodes are matched on their primary label and `id` property, edges on
+    their relationship type and the nodes they link. The statements work on
+    BioCypher nodes and edges, i.e. after translation to the ontology classes.
+
+    Args:
+        node_labels (Callable[[str], List[str]]): The Neo4j labels of an ontology class,
+            its primary label first.
+        relationship_type (Callable[[str], str]): The Neo4j type of an edge class.
+        batch_size (int): Nodes or edges per UNWIND statement.
+    """
+
+    def __init__(
+        self,
+        node_labels: Callable[[str], List[str]],
+        relationship_type: Callable[[str], str],
+        batch_size: int = CYPHER_BATCH_SIZE,
+    ):
+        self.node_labels = node_labels
+        self.relationship_type = relationship_type
+        self.batch_size = batch_size
+        self.primary_labels: Dict[str, str] = {}
+
+    def register_nodes(self, nodes: Iterable) -> None:
+        """Remember the primary label of nodes, used to match the ends of the edges."""
+        for node in nodes:
+            self.primary_labels[node.get_id()] = self.node_labels(node.get_label())[0]
+
+    @staticmethod
+    def _node_pattern(variable: str, id_expression: str, label: Optional[str]) -> str:
+        """Match a node by ID, and by label when known, so that the label index is used."""
+        label = f":{_quote_name(label)}" if label else ""
+        return f"({variable}{label} {{id: {id_expression}}})"
+
+    def _edge_groups(self, edges: Iterable) -> Dict[tuple, list]:
+        groups: Dict[tuple, list] = {}
+        for edge in edges:
+            key = (
+                self.relationship_type(edge.get_label()),
+                self.primary_labels.get(edge.get_source_id()),
+                self.primary_labels.get(edge.get_target_id()),
+            )
+            groups.setdefault(key, []).append(edge)
+        return groups
+
+    def _edge_match(self, key: tuple, edges: list, with_properties: bool = True) -> str:
+        """Start an UNWIND statement over edges of the same type and end labels."""
+        _, source_label, target_label = key
+        source_node = self._node_pattern("s", "row.source", source_label)
+        target_node = self._node_pattern("t", "row.target", target_label)
+        rows = [{"source": edge.get_source_id(), "target": edge.get_target_id()} for edge in edges]
+        if with_properties:
+            for row, edge in zip(rows, edges):
+                row["properties"] = edge.get_properties()
+        rows = cypher_literal(rows)
+        return f"UNWIND {rows} AS row\nMATCH {source_node}, {target_node}\n"
+
+    def merge_statements(self, nodes: List, edges: List) -> Iterator[str]:
+        """
+        Create or update nodes and edges, setting their properties.
+
+        The properties of a node or edge are updated, not replaced, so that the
+        ones set by other resources are kept: they must hold its whole fused
+        values, and None for the properties to remove, see `fuse_elements`.
+
+        Args:
+            nodes (List): The BioCypher nodes.
+            edges (List): The BioCypher edges; their ends must be registered.
+
+        Yields:
+            str: The Cypher statements.
+        """
+        by_label: Dict[str, list] = {}
+        for node in nodes:
+            by_label.setdefault(node.get_label(), []).append(node)
+        for label, labelled_nodes in by_label.items():
+            primary, *others = self.node_labels(label)
+            set_labels = "".join(f":{_quote_name(other)}" for other in others)
+            for batch in _batches(labelled_nodes, self.batch_size):
+                rows = cypher_literal(
+                    [{"id": node.get_id(), "properties": node.get_properties()} for node in batch]
+                )
+                yield (
+                    f"UNWIND {rows} AS row\n"
+                    f"MERGE (n:{_quote_name(primary)} {{id: row.id}})\n"
+                    f"SET n += row.properties" + (f", n{set_labels}" if set_labels else "") + ";"
+                )
+
+        for key, grouped_edges in self._edge_groups(edges).items():
+            for batch in _batches(grouped_edges, self.batch_size):
+                yield (
+                    self._edge_match(key, batch)
+                    + f"MERGE (s)-[r:{_quote_name(key[0])}]->(t)\n"
+                    "SET r += row.properties;"
+                )
+
+    def delete_statements(self, nodes: List, edges: List) -> Iterator[str]:
+        """
+        Delete edges, then the nodes left without any edge.
+
+        Nodes still linked to other nodes, e.g. by another resource, are kept.
+
+        Args:
+            nodes (List): The BioCypher nodes no row produces anymore.
+            edges (List): The BioCypher edges no row produces anymore; their ends must be registered.
+
+        Yields:
+            str: The Cypher statements.
+        """
+        for key, grouped_edges in self._edge_groups(edges).items():
+            for batch in _batches(grouped_edges, self.batch_size):
+                yield (
+                    self._edge_match(key, batch, with_properties=False)
+                    + f"MATCH (s)-[r:{_quote_name(key[0])}]->(t)\n"
+                    "DELETE r;"
+                )
+
+        by_label: Dict[str, list] = {}
+        for node in nodes:
+            by_label.setdefault(node.get_label(), []).append(node)
+        for label, labelled_nodes in by_label.items():
+            primary = self.node_labels(label)[0]
+            for batch in _batches(labelled_nodes, self.batch_size):
+                ids = cypher_literal([node.get_id() for node in batch])
+                yield (
+                    f"UNWIND {ids} AS id\n"
+                    f"MATCH (n:{_quote_name(primary)} {{id: id}})\n"
+                    "WHERE NOT (n)--()\n"
+                    "DELETE n;"
+                )
+
+    def write(self, path: str, statements: Iterable[str]) -> int:
+        """
+        Write statements to a script that `cypher-shell -f` can run.
+
+        Args:
+            path (str): Path to the script.
+            statements (Iterable[str]): The statements.
+
+        Returns:
+            int: The number of statements written.
+        """
+        nb_statements = 0
+        with open(path, "w") as fd:
+            for statement in statements:
+                fd.write(statement + "\n\n")
+                nb_statements += 1
+        logger.info(f"Wrote {nb_statements} Cypher statements to: {path}")
+        return nb_statements
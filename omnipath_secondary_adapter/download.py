@@ -0,0 +1,269 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+
+import requests
+
+
+DOWNLOAD_BLOCK_SIZE = 1024**2  # bytes written at once
+MAX_ATTEMPTS = 5  # interrupted downloads are resumed this many times
+RETRY_DELAY = 2  # seconds before the first retry, doubled at each attempt
+TIMEOUT = 60  # seconds without receiving data before an attempt is abandoned
+PARTIAL_FILE_EXTENSION = ".part"
+METADATA_FILE_EXTENSION = ".json"
+MEGABYTE = 1024**2
+
+logger = logging.getLogger("biocypher")
+
+
+class DownloadError(Exception):
+    """A file could not be downloaded, or its content does not match the expected one."""
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Metadata      -----------------------------
+# -----------------------------------------------------------------------
+def _read_metadata(path: str) -> Dict[str, Any]:
+    """Read the metadata stored next to a (possibly partial) download, if any."""
+    try:
+        with open(path + METADATA_FILE_EXTENSION) as fd:
+            return json.load(fd)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_metadata(path: str, metadata: Dict[str, Any]) -> None:
+    with open(path + METADATA_FILE_EXTENSION, "w") as fd:
+        json.dump(metadata, fd, indent=2)
+
+
+def _remove(path: str) -> None:
+    for file_path in (path, path + METADATA_FILE_EXTENSION):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def _file_sha256(path: str) -> Any:
+    """Hash a file, returning the hash object so that more data can be added to it."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fd:
+        for block in iter(lambda: fd.read(DOWNLOAD_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest
+
+
+def verify_file(path: str, metadata: Dict[str, Any]) -> bool:
+    """
+    Check that a downloaded file still has the size and SHA-256 recorded when it was downloaded.
+
+    Args:
+        path (str): Path to the downloaded file.
+        metadata (Dict[str, Any]): The metadata recorded with the file.
+
+    Returns:
+        bool: Whether the file is intact.
+    """
+    if not os.path.isfile(path) or "size" not in metadata or "sha256" not in metadata:
+        return False
+    if os.path.getsize(path) != metadata["size"]:
+        return False
+    return _file_sha256(path).hexdigest() == metadata["sha256"]
+
+
+def _validators(response: requests.Response) -> Dict[str, Optional[str]]:
+    """The headers identifying the version of a remote file."""
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+def _conditional_headers(metadata: Dict[str, Any]) -> Dict[str, str]:
+    headers = {}
+    if metadata.get("etag"):
+        headers["If-None-Match"] = metadata["etag"]
+    if metadata.get("last_modified"):
+        headers["If-Modified-Since"] = metadata["last_modified"]
+    return headers
+
+
+def _range_headers(metadata: Dict[str, Any], offset: int) -> Dict[str, str]:
+    """Ask for the rest of a partial download, only if the remote file did not change since."""
+    validator = metadata.get("etag") or metadata.get("last_modified")
+    if not offset or not validator:
+        return {}
+    return {"Range": f"bytes={offset}-", "If-Range": validator}
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Download      -----------------------------
+# -----------------------------------------------------------------------
+def _expected_size(response: requests.Response, offset: int) -> Optional[int]:
+    """The size of the complete file, from the headers of a full (200) or partial (206) response."""
+    content_range = response.headers.get("Content-Range")
+    if response.status_code == 206 and content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    content_length = response.headers.get("Content-Length")
+    if content_length is None or response.headers.get("Content-Encoding"):
+        return None
+    return offset + int(content_length) if response.status_code == 206 else int(content_length)
+
+
+def _check_content(path: str, size: int, sha256: str, metadata: Dict[str, Any]) -> None:
+    """Check a complete download against the size and checksums announced by the server or caller."""
+    if metadata.get("expected_size") is not None and size != metadata["expected_size"]:
+        raise DownloadError(
+            f"Size mismatch for {path}: got {size} bytes, expected {metadata['expected_size']}."
+        )
+    if metadata.get("expected_sha256") and sha256 != metadata["expected_sha256"]:
+        raise DownloadError(f"SHA-256 mismatch for {path}: got {sha256}.")
+    if metadata.get("content_md5"):
+        md5 = hashlib.md5()
+        with open(path, "rb") as fd:
+            for block in iter(lambda: fd.read(DOWNLOAD_BLOCK_SIZE), b""):
+                md5.update(block)
+        if base64.b64encode(md5.digest()).decode() != metadata["content_md5"]:
+            raise DownloadError(f"Content-MD5 mismatch for {path}.")
+
+
+def _fetch(
+    session: requests.Session,
+    url: str,
+    path: str,
+    metadata: Dict[str, Any],
+) -> Optional[Dict[str, Any]]:
+    """
+    Make one attempt at downloading a file, resuming the partial download if any.
+
+    Returns:
+        Optional[Dict[str, Any]]: The metadata of the complete file, or None if
+            the file recorded in `metadata` did not change on the server.
+    """
+    partial_path = path + PARTIAL_FILE_EXTENSION
+    partial = _read_metadata(partial_path)
+    if partial.get("url") != url or not os.path.exists(partial_path):
+        partial = {}
+    offset = os.path.getsize(partial_path) if partial else 0
+
+    headers = _conditional_headers(metadata) if verify_file(path, metadata) else {}
+    headers.update(_range_headers(partial, offset))
+
+    with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+
+        if response.status_code == 206:
+            logger.info(f"Resuming the download of {url} from {offset / MEGABYTE:.1f} MB")
+            digest = _file_sha256(partial_path)
+            mode = "ab"
+        else:
+            offset = 0
+            digest = hashlib.sha256()
+            mode = "wb"
+            partial = {
+                "url": url,
+                **_validators(response),
+                "content_md5": response.headers.get("Content-MD5"),
+                "expected_size": _expected_size(response, 0),
+                "expected_sha256": metadata.get("expected_sha256"),
+            }
+            _write_metadata(partial_path, partial)
+
+        with open(partial_path, mode) as fd:
+            for block in response.iter_content(chunk_size=DOWNLOAD_BLOCK_SIZE):
+                fd.write(block)
+                digest.update(block)
+
+    size = os.path.getsize(partial_path)
+    sha256 = digest.hexdigest()
+    _check_content(partial_path, size, sha256, partial)
+
+    os.replace(partial_path, path)
+    _remove(partial_path)
+    return {
+        **partial,
+        "size": size,
+        "sha256": sha256,
+        "date_downloaded": str(datetime.now()),
+    }
+
+
+def download_file(
+    url: str,
+    path: str,
+    expected_sha256: Optional[str] = None,
+    max_attempts: int = MAX_ATTEMPTS,
+) -> str:
+    """
+    Download a file, or reuse the local copy if it did not change on the server.
+
+    The ETag and Last-Modified headers of the file are recorded next to it,
+    with its size and SHA-256, so that later calls only ask the server whether
+    the file changed (conditional request), and check that the local copy is
+    intact. An interrupted download is resumed from where it stopped (range
+    request), as long as the remote file did not change in between. If the
+    server cannot be reached, an intact local copy is used.
+
+    Args:
+        url (str): The URL of the file.
+        path (str): Where to store the file.
+        expected_sha256 (Optional[str]): The SHA-256 the file must have, if known.
+        max_attempts (int): The maximum number of attempts, each resuming the previous one.
+
+    Returns:
+        str: The path to the downloaded file.
+
+    Raises:
+        DownloadError: If the file could not be downloaded, or does not match its expected size or checksum.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    metadata = _read_metadata(path)
+    if metadata.get("url") != url or (
+        expected_sha256 and metadata.get("sha256") != expected_sha256
+    ):
+        metadata = {}
+    metadata["expected_sha256"] = expected_sha256
+
+    delay = RETRY_DELAY
+    with requests.Session() as session:
+        for attempt in range(1, max_attempts + 1):
+            start = time.perf_counter()
+            try:
+                downloaded = _fetch(session, url, path, metadata)
+            except DownloadError:
+                _remove(path + PARTIAL_FILE_EXTENSION)
+                raise
+            except requests.RequestException as e:
+                if attempt == max_attempts:
+                    if verify_file(path, metadata):
+                        logger.warning(f"Cannot reach {url} ({e}), using the local copy: {path}")
+                        return path
+                    raise DownloadError(f"Cannot download {url}: {e}") from e
+                logger.warning(
+                    f"Download of {url} interrupted ({e}), retrying in {delay} s "
+                    f"(attempt {attempt}/{max_attempts})"
+                )
+                time.sleep(delay)
+                delay *= 2
+                continue
+
+            if downloaded is None:
+                logger.info(f"Not modified since last download: {url}")
+            else:
+                _write_metadata(path, downloaded)
+                elapsed = time.perf_counter() - start
+                logger.info(
+                    f"Downloaded {url} ({downloaded['size'] / MEGABYTE:.1f} MB in {elapsed:.1f} s) to: {path}"
+                )
+            return path
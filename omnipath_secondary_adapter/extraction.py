@@ -0,0 +1,633 @@
+import logging
+import re
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+EXTRACTORS = ("ontoweaver", "native")
+
+# Keywords accepted by OntoWeaver for each part of a mapping, in the same order of precedence.
+K_ROW = ["row", "entry", "line", "subject", "source"]
+K_SUBJECT_TYPE = ["to_subject", "to_label", "to_type", "id_from_column"]
+K_COLUMNS = ["columns", "fields", "column", "match_column", "id_from_column"]
+K_TARGET = ["to_target", "to_object", "to_node", "to_label", "to_type"]
+K_FROM_SUBJECT = ["from_subject", "from_source"]
+K_EDGE = ["via_edge", "via_relation", "via_predicate"]
+K_PROPERTIES = ["to_properties", "to_property"]
+K_PROP_TO_OBJECT = ["for_objects", "for_object"]
+K_FINAL_TYPE = ["final_type", "final_object", "final_node", "final_subject", "final_label", "final_target"]
+
+COMPILED_TRANSFORMERS = ("map", "split", "rowIndex")
+MAPPING_KEYS = set(K_ROW) | {"transformers"}
+SUBJECT_KEYS = set(K_SUBJECT_TYPE + K_COLUMNS + K_FINAL_TYPE)
+TARGET_KEYS = set(
+    K_COLUMNS + K_TARGET + K_FROM_SUBJECT + K_EDGE + K_FINAL_TYPE
+) | {"match", "match_type_from_column", "separator"}
+PROPERTY_KEYS = set(K_COLUMNS + K_PROPERTIES + K_PROP_TO_OBJECT) | {"separator"}
+# Columns of the extracted tables, named after the neo4j-admin import headers.
+NODE_ID, NODE_LABEL = ":ID", ":LABEL"
+EDGE_SOURCE, EDGE_TARGET, EDGE_LABEL = ":START_ID", ":END_ID", ":TYPE"
+EDGE_ID = NODE_ID  # optional in the edge tables
+NODE_COLUMNS = [NODE_ID, NODE_LABEL]
+EDGE_COLUMNS = [EDGE_SOURCE, EDGE_TARGET, EDGE_LABEL]
+RESERVED_COLUMNS = {"_pos"} | set(NODE_COLUMNS + EDGE_COLUMNS)
+
+# The nodes or edges of a table: a DataFrame of the native extraction, or BioCypher tuples.
+Elements = Union[pd.DataFrame, List[tuple]]
+
+logger = logging.getLogger("biocypher")
+
+
+class UnsupportedMapping(Exception):
+    """Raised when a mapping, or the data it is applied to, must be handled by OntoWeaver."""
+
+
+def _get(keys: List[str], config: dict):
+    """Return the value of the first of `keys` found in `config`, as OntoWeaver does."""
+    for key in keys:
+        if key in config:
+            return config[key]
+    return None
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def mapping_columns(mapping: Any) -> List[str]:
+    """
+    Find the columns read by a mapping, whatever its transformers, by walking its YAML tree.
+
+    Every value of the `column` keywords (and their synonyms), `id_from_column`
+    and `match_type_from_column` is collected, including in `match` branches.
+
+    Args:
+        mapping (Any): The mapping, as read from its YAML file, or a part of it.
+
+    Returns:
+        List[str]: The column names, in the order they appear in the mapping.
+    """
+    columns = []
+    if isinstance(mapping, dict):
+        for key, value in mapping.items():
+            if key in K_COLUMNS or key == "match_type_from_column":
+                columns += [col for col in _as_list(value) if isinstance(col, str)]
+            else:
+                columns += mapping_columns(value)
+    elif isinstance(mapping, list):
+        for value in mapping:
+            columns += mapping_columns(value)
+    return list(dict.fromkeys(columns))
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Column operations      --------------------
+# -----------------------------------------------------------------------
+def cell_text(series: pd.Series) -> np.ndarray:
+    """
+    Convert a column to the strings OntoWeaver gets with `str(row[column])`.
+
+    Each distinct value is converted once. Missing values keep their own
+    representation ("nan", "<NA>", "None"...), as they do in OntoWeaver.
+
+    Args:
+        series (pd.Series): The column to convert.
+
+    Returns:
+        np.ndarray: An object array of strings, one per row.
+    """
+    codes, uniques = pd.factorize(series)
+    texts = np.array(
+        [str(value) for value in np.asarray(uniques, dtype=object)] + [""], dtype=object
+    )
+    result = texts[codes]
+
+    missing = codes < 0
+    if missing.any():
+        result[missing] = [str(value) for value in series.to_numpy(dtype=object)[missing]]
+    return result
+
+
+def split_text(text: np.ndarray, separator: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split each string at `separator`, keeping track of the row each item comes from.
+
+    The whole column is split at once into an Arrow list array, and its items
+    are interned: each distinct item (e.g. a UniProt ID or a PubMed ID) is a
+    single Python string, shared by all the rows it appears in.
+
+    Args:
+        text (np.ndarray): The strings to split, one per row.
+        separator (str): The separator.
+
+    Returns:
+        tuple: The row position of each item, and the items, in row order.
+    """
+    lists = pc.split_pattern(pa.array(text, type=pa.large_string()), pattern=separator)
+    positions = pc.list_parent_indices(lists).to_numpy()
+    items = pc.list_flatten(lists).dictionary_encode()
+    uniques = np.array(items.dictionary.to_pylist(), dtype=object)
+    return positions, uniques[items.indices.to_numpy()]
+
+
+def last_items(positions: np.ndarray, items: np.ndarray) -> np.ndarray:
+    """
+    Return the last item of each row, from the output of `split_text`.
+
+    Splitting always gives at least one item per row.
+
+    Args:
+        positions (np.ndarray): The row position of each item, in row order.
+        items (np.ndarray): The items.
+
+    Returns:
+        np.ndarray: The last item of each row.
+    """
+    is_last = np.ones(len(positions), dtype=bool)
+    is_last[:-1] = positions[1:] != positions[:-1]
+    return items[is_last]
+
+
+def _check_identifiers(values: np.ndarray, description: str) -> None:
+    if len(values) and (values == "").any():
+        raise UnsupportedMapping(f"Empty identifier found for {description}.")
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Compiled transformers      ----------------
+# -----------------------------------------------------------------------
+class Extractor:
+    """A compiled `map`, `split` or `rowIndex` transformer of a mapping.
+
+    Args:
+        kind (str): The OntoWeaver transformer name.
+        column (Optional[str]): The column it reads (None for `rowIndex`).
+        separator (Optional[str]): The separator of a `split` transformer.
+    """
+
+    def __init__(self, kind: str, column: Optional[str] = None, separator: Optional[str] = None):
+        self.kind = kind
+        self.column = column
+        self.separator = separator
+
+    @classmethod
+    def from_config(cls, kind: str, config: dict) -> "Extractor":
+        if kind not in COMPILED_TRANSFORMERS:
+            raise UnsupportedMapping(f"Transformer `{kind}` cannot be compiled.")
+        if kind == "rowIndex":
+            return cls(kind)
+
+        columns = _as_list(_get(K_COLUMNS, config))
+        if len(columns) != 1:
+            raise UnsupportedMapping(f"Transformer `{kind}` must read exactly one column.")
+        separator = config.get("separator")
+        if kind == "split" and separator is None:
+            raise UnsupportedMapping("Transformer `split` without separator cannot be compiled.")
+        return cls(kind, columns[0], separator)
+
+    def items(self, dataframe: pd.DataFrame, text: Dict[Hashable, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the row position and value of every item produced on the DataFrame."""
+        if self.kind == "rowIndex":
+            values = np.array([str(i) for i in dataframe.index], dtype=object)
+            return np.arange(len(dataframe)), values
+
+        if self.kind == "split":
+            return _column_split(dataframe, self.column, self.separator, text)
+        values = _column_text(dataframe, self.column, text)
+        return np.arange(len(values)), values
+
+    def last_item(self, dataframe: pd.DataFrame, text: Dict[Hashable, Any]) -> np.ndarray:
+        """Return the last item of each row, i.e. the value kept when used as a property."""
+        if self.kind != "split":
+            return _column_text(dataframe, self.column, text)
+
+        positions, items = _column_split(dataframe, self.column, self.separator, text)
+        if len(items) and (items == "").any():
+            raise UnsupportedMapping(f"Empty property value found in column `{self.column}`.")
+        return last_items(positions, items)
+
+
+def _column_text(dataframe: pd.DataFrame, column: str, text: Dict[Hashable, Any]) -> np.ndarray:
+    """Return (and memoize) the text of a column."""
+    if column not in text:
+        if column not in dataframe.columns:
+            raise UnsupportedMapping(f"Column `{column}` not found in data.")
+        text[column] = cell_text(dataframe[column])
+    return text[column]
+
+
+def _column_split(
+    dataframe: pd.DataFrame, column: str, separator: str, text: Dict[Hashable, Any]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (and memoize) the split of a column, shared by the transformers splitting it alike."""
+    key = (column, separator)
+    if key not in text:
+        text[key] = split_text(_column_text(dataframe, column, text), separator)
+    return text[key]
+
+
+class Target:
+    """A compiled transformer creating an object node and the edge leading to it."""
+
+    def __init__(
+        self,
+        extractor: Extractor,
+        branches: List[Tuple[str, str, str]],
+        final_type: Optional[str] = None,
+        match_column: Optional[str] = None,
+        from_subject: Optional[str] = None,
+    ):
+        self.extractor = extractor
+        self.branches = branches  # (pattern, object type, relation)
+        self.final_type = final_type
+        self.match_column = match_column
+        self.from_subject = from_subject
+
+    @property
+    def object_type(self) -> Optional[str]:
+        """The object type, if it does not depend on the row."""
+        return self.branches[0][1] if self.match_column is None else None
+
+    def branch_of_rows(self, dataframe: pd.DataFrame) -> np.ndarray:
+        """Return, for each row, the index of the first branch whose pattern matches the match column."""
+        if self.match_column is None:
+            return np.zeros(len(dataframe), dtype=np.int64)
+        if self.match_column not in dataframe.columns:
+            raise UnsupportedMapping(f"Column `{self.match_column}` not found in data.")
+
+        codes, uniques = pd.factorize(dataframe[self.match_column])
+        if (codes < 0).any():
+            raise UnsupportedMapping(f"Missing value in match column `{self.match_column}`.")
+
+        branch_of_unique = []
+        for value in np.asarray(uniques, dtype=object):
+            if not isinstance(value, str):
+                raise UnsupportedMapping(f"Non-text value in match column `{self.match_column}`.")
+            for n_branch, (pattern, _, _) in enumerate(self.branches):
+                if re.search(pattern, value):
+                    branch_of_unique.append(n_branch)
+                    break
+            else:
+                raise UnsupportedMapping(f"No branch matches the value `{value}`.")
+        return np.asarray(branch_of_unique, dtype=np.int64)[codes]
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Compiled mapping      ---------------------
+# -----------------------------------------------------------------------
+class CompiledMapping:
+    """An OntoWeaver mapping compiled into column-wise operations.
+
+    Only mappings made of `map`, `split` and `rowIndex` transformers, with
+    plain or column-matched (`match_type_from_column`) object types, can be
+    compiled; `UnsupportedMapping` is raised otherwise.
+
+    The extracted nodes and edges are the ones OntoWeaver would produce, in
+    the same order, but as DataFrames: one row per element, with its ID,
+    label and one column per property (missing when the property does not
+    apply to the element label).
+
+    Args:
+        mapping (dict): The mapping, as read from its YAML file.
+    """
+
+    def __init__(self, mapping: dict):
+        unknown = set(mapping) - MAPPING_KEYS
+        if unknown:
+            raise UnsupportedMapping(f"Mapping sections {sorted(unknown)} cannot be compiled.")
+
+        self._compile_subject(_get(K_ROW, mapping) or {})
+        transformers = mapping.get("transformers") or []
+        self.properties = self._compile_properties(transformers)
+        self.targets = self._compile_targets(transformers)
+
+    def _compile_subject(self, row_config: dict) -> None:
+        if len(row_config) != 1:
+            raise UnsupportedMapping("The row must be mapped by exactly one transformer.")
+        kind, config = next(iter(row_config.items()))
+        config = config or {}
+        if set(config) - SUBJECT_KEYS or "match" in config:
+            raise UnsupportedMapping(f"Subject options {sorted(config)} cannot be compiled.")
+        if kind == "split":
+            raise UnsupportedMapping("A subject cannot be mapped by a `split` transformer.")
+
+        self.subject = Extractor.from_config(kind, config)
+        self.subject_type = _get(K_SUBJECT_TYPE, config)
+        self.subject_final_type = _get(K_FINAL_TYPE, config)
+
+    def _compile_properties(self, transformers: List[dict]) -> Dict[str, Dict[str, Extractor]]:
+        properties = {}
+        for transformer in transformers:
+            for kind, config in transformer.items():
+                if not config or not any(key in config for key in K_PROPERTIES):
+                    continue
+                if set(config) - PROPERTY_KEYS:
+                    raise UnsupportedMapping(f"Property options {sorted(config)} cannot be compiled.")
+
+                extractor = Extractor.from_config(kind, config)
+                object_types = _as_list(_get(K_PROP_TO_OBJECT, config))
+                if not object_types:
+                    # Attached to every possible type of the subject.
+                    object_types = [self.subject_type]
+                    if self.subject_final_type:
+                        object_types.append(self.subject_final_type)
+
+                property_names = _as_list(_get(K_PROPERTIES, config))
+                if set(property_names) & RESERVED_COLUMNS:
+                    raise UnsupportedMapping(f"Property names {property_names} are reserved.")
+
+                for object_type in object_types:
+                    for property_name in property_names:
+                        # A later transformer mapping the same property overrides the value.
+                        properties.setdefault(object_type, {})[property_name] = extractor
+        return properties
+
+    def _compile_targets(self, transformers: List[dict]) -> List[Target]:
+        targets = []
+        for transformer in transformers:
+            for kind, config in transformer.items():
+                if not config or any(key in config for key in K_PROPERTIES):
+                    continue
+                if set(config) - TARGET_KEYS:
+                    raise UnsupportedMapping(f"Transformer options {sorted(config)} cannot be compiled.")
+
+                extractor = Extractor.from_config(kind, config)
+                object_type, relation = _get(K_TARGET, config), _get(K_EDGE, config)
+                match_column = None
+                if object_type and relation:
+                    branches = [(None, object_type, relation)]
+                elif "match" in config and "match_type_from_column" in config:
+                    match_column = config["match_type_from_column"]
+                    branches = [
+                        (pattern, _get(K_TARGET, branch), _get(K_EDGE, branch))
+                        for entry in config["match"]
+                        for pattern, branch in entry.items()
+                        if isinstance(branch, dict)
+                    ]
+                else:
+                    raise UnsupportedMapping("Only plain and column-matched objects can be compiled.")
+
+                targets.append(
+                    Target(
+                        extractor,
+                        branches,
+                        final_type=_get(K_FINAL_TYPE, config),
+                        match_column=match_column,
+                        from_subject=_get(K_FROM_SUBJECT, config),
+                    )
+                )
+
+        for n_target, target in enumerate(targets):
+            if target.from_subject:
+                sources = [
+                    n for n, t in enumerate(targets)
+                    if target.from_subject in (branch[1] for branch in t.branches)
+                ]
+                # OntoWeaver looks the subject up among the transformers already applied to the row.
+                if (
+                    not sources
+                    or max(sources) >= n_target
+                    or any(targets[n].match_column for n in sources)
+                ):
+                    raise UnsupportedMapping(
+                        f"Subject `{target.from_subject}` must be created by a previous transformer."
+                    )
+        return targets
+
+    @property
+    def columns(self) -> List[str]:
+        """The columns read by the mapping."""
+        extractors = [self.subject] + [target.extractor for target in self.targets]
+        extractors += [e for props in self.properties.values() for e in props.values()]
+        columns = [e.column for e in extractors if e.column is not None]
+        columns += [target.match_column for target in self.targets if target.match_column]
+        return list(dict.fromkeys(columns))
+
+    # -------------------------------------------------------------------
+    def _property_columns(
+        self,
+        object_type: str,
+        positions: np.ndarray,
+        dataframe: pd.DataFrame,
+        text: Dict[Hashable, Any],
+        values_of: dict,
+    ) -> Dict[str, np.ndarray]:
+        """Return the properties of the elements of a type created at the given row positions."""
+        columns = {}
+        for property_name, extractor in self.properties.get(object_type, {}).items():
+            if extractor not in values_of:
+                values = extractor.last_item(dataframe, text)
+                if len(values) and (values == "").any():
+                    raise UnsupportedMapping(f"Empty property value found for `{property_name}`.")
+                # Replace quotes on distinct values only.
+                codes, uniques = pd.factorize(values)
+                escaped = np.array([value.replace("'", "`") for value in uniques], dtype=object)
+                values_of[extractor] = escaped[codes]
+            columns[property_name] = values_of[extractor][positions]
+        return columns
+
+    def extract(self, dataframe: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Extract the nodes and edges of a DataFrame.
+
+        Args:
+            dataframe (pd.DataFrame): The table to extract.
+
+        Returns:
+            tuple: The nodes DataFrame (`:ID`, `:LABEL` and property columns) and the
+            edges DataFrame (`:START_ID`, `:END_ID`, `:TYPE` and property columns).
+        """
+        if all(
+            pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)
+            for dtype in dataframe.dtypes
+        ):
+            # OntoWeaver would see numbers of a common type instead of the cell values.
+            raise UnsupportedMapping("Tables without any text column cannot be compiled.")
+
+        text, values_of = {}, {}
+        node_batches, edge_batches = [], []
+
+        subject_positions, subject_ids = self.subject.items(dataframe, text)
+        _check_identifiers(subject_ids, f"subject `{self.subject_type}`")
+        node_batches.append(
+            _batch(
+                subject_positions,
+                {NODE_ID: subject_ids, NODE_LABEL: self.subject_final_type or self.subject_type},
+                self._property_columns(
+                    self.subject_type, subject_positions, dataframe, text, values_of
+                ),
+            )
+        )
+
+        created = {}  # object type -> nodes created for it, by transformer
+        for target in self.targets:
+            positions, ids = target.extractor.items(dataframe, text)
+            _check_identifiers(ids, f"object `{target.object_type or target.match_column}`")
+            branch = target.branch_of_rows(dataframe)[positions]
+
+            for n_branch, (_, object_type, relation) in enumerate(target.branches):
+                selected = branch == n_branch
+                if not selected.any():
+                    continue
+                branch_positions, branch_ids = positions[selected], ids[selected]
+                node_batches.append(
+                    _batch(
+                        branch_positions,
+                        {NODE_ID: branch_ids, NODE_LABEL: target.final_type or object_type},
+                        self._property_columns(
+                            object_type, branch_positions, dataframe, text, values_of
+                        ),
+                    )
+                )
+
+                if target.from_subject:
+                    # One edge from each node created for the subject type in the same row.
+                    sources = pd.concat(created[target.from_subject], ignore_index=True)
+                    pairs = pd.DataFrame(
+                        {"_pos": branch_positions, EDGE_TARGET: branch_ids}
+                    ).merge(sources, on="_pos", how="inner", sort=False)
+                    edge_positions = pairs["_pos"].to_numpy()
+                    source_ids = pairs[EDGE_SOURCE].to_numpy()
+                    target_ids = pairs[EDGE_TARGET].to_numpy()
+                else:
+                    edge_positions = branch_positions
+                    source_ids, target_ids = subject_ids[branch_positions], branch_ids
+
+                edge_batches.append(
+                    _batch(
+                        edge_positions,
+                        {EDGE_SOURCE: source_ids, EDGE_TARGET: target_ids, EDGE_LABEL: relation},
+                        self._property_columns(
+                            relation, edge_positions, dataframe, text, values_of
+                        ),
+                    )
+                )
+
+            if target.object_type:
+                created.setdefault(target.object_type, []).append(
+                    pd.DataFrame({"_pos": positions, EDGE_SOURCE: ids})
+                )
+
+        return (
+            _merge_batches(node_batches, NODE_COLUMNS),
+            _merge_batches(edge_batches, EDGE_COLUMNS),
+        )
+
+
+def _batch(positions: np.ndarray, base: dict, properties: dict) -> pd.DataFrame:
+    return pd.DataFrame({"_pos": positions, **base, **properties})
+
+
+def _merge_batches(batches: List[pd.DataFrame], base_columns: List[str]) -> pd.DataFrame:
+    """Concatenate the batches and order their elements as OntoWeaver does: row by row."""
+    if not batches:
+        return pd.DataFrame(columns=base_columns)
+    elements = pd.concat(batches, ignore_index=True, sort=False)
+    order = np.argsort(elements["_pos"].to_numpy(), kind="stable")
+    return elements.iloc[order].drop(columns="_pos").reset_index(drop=True)
+
+
+# -----------------------------------------------------------------------
+# -----------------------     BioCypher tuples      ---------------------
+# -----------------------------------------------------------------------
+def _properties(columns: List[str], values: tuple) -> dict:
+    # Properties that do not apply to the element label are missing (NaN).
+    return {key: value for key, value in zip(columns, values) if isinstance(value, str)}
+
+
+def node_tuples(nodes: pd.DataFrame) -> Iterator[tuple]:
+    """Convert a nodes DataFrame into BioCypher node tuples `(id, label, properties)`."""
+    property_columns = [col for col in nodes.columns if col not in NODE_COLUMNS]
+    for node_id, label, *values in zip(
+        nodes[NODE_ID], nodes[NODE_LABEL], *(nodes[col] for col in property_columns)
+    ):
+        yield node_id, label, _properties(property_columns, values)
+
+
+def edge_tuples(edges: pd.DataFrame) -> Iterator[tuple]:
+    """Convert an edges DataFrame into BioCypher edge tuples `(id, source, target, label, properties)`.
+
+    The IDs are read from the optional `:ID` column, and are empty otherwise, as
+    for the edges OntoWeaver extracts from a mapping.
+    """
+    property_columns = [col for col in edges.columns if col not in EDGE_COLUMNS and col != EDGE_ID]
+    edge_ids = edges[EDGE_ID].fillna("") if EDGE_ID in edges else [""] * len(edges)
+    for edge_id, source, target, label, *values in zip(
+        edge_ids,
+        edges[EDGE_SOURCE],
+        edges[EDGE_TARGET],
+        edges[EDGE_LABEL],
+        *(edges[col] for col in property_columns),
+    ):
+        yield edge_id, source, target, label, _properties(property_columns, values)
+
+
+def node_table(nodes: Iterable[tuple]) -> pd.DataFrame:
+    """Convert BioCypher node tuples into a nodes DataFrame, as built by `CompiledMapping.extract`."""
+    return _element_table(list(nodes), NODE_COLUMNS)
+
+
+def edge_table(edges: Iterable[tuple]) -> pd.DataFrame:
+    """Convert BioCypher edge tuples into an edges DataFrame, with their IDs in an `:ID` column."""
+    return _element_table(list(edges), [EDGE_ID, *EDGE_COLUMNS])
+
+
+def _element_table(elements: List[tuple], key_columns: List[str]) -> pd.DataFrame:
+    """The key columns of the tuples, followed by one column per property, missing values being None."""
+    columns = {col: [element[position] for element in elements] for position, col in enumerate(key_columns)}
+    property_names = dict.fromkeys(prop for element in elements for prop in element[-1])
+    columns.update({prop: [element[-1].get(prop) for element in elements] for prop in property_names})
+    return pd.DataFrame({col: np.array(values, dtype=object) for col, values in columns.items()})
+
+
+def element_tables(nodes: Elements, edges: Elements) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """The nodes and edges as DataFrames, whether they are extracted as tables or as BioCypher tuples."""
+    return (
+        nodes if isinstance(nodes, pd.DataFrame) else node_table(nodes),
+        edges if isinstance(edges, pd.DataFrame) else edge_table(edges),
+    )
+
+
+def element_lists(nodes: Elements, edges: Elements) -> Tuple[List[tuple], List[tuple]]:
+    """The nodes and edges as lists of BioCypher tuples, whether they are extracted as tables or tuples."""
+    return (
+        list(node_tuples(nodes)) if isinstance(nodes, pd.DataFrame) else list(nodes),
+        list(edge_tuples(edges)) if isinstance(edges, pd.DataFrame) else list(edges),
+    )
+
+
+def concat_elements(parts: Iterable[Tuple[Elements, Elements]]) -> Tuple[Elements, Elements]:
+    """
+    Concatenate the nodes and edges extracted from successive parts of a table.
+
+    Args:
+        parts (Iterable[Tuple[Elements, Elements]]): The nodes and edges of each part, as tables
+            or as BioCypher tuples (e.g. when the native extraction of a part fell back to Ontoweaver).
+
+    Returns:
+        Tuple[Elements, Elements]: The nodes and edges, as tables unless every part is made of tuples.
+    """
+    parts = list(parts)
+    if not any(isinstance(nodes, pd.DataFrame) for nodes, _ in parts):
+        return [node for nodes, _ in parts for node in nodes], [edge for _, edges in parts for edge in edges]
+    tables = [element_tables(nodes, edges) for nodes, edges in parts]
+    return (
+        pd.concat([nodes for nodes, _ in tables], ignore_index=True, sort=False),
+        pd.concat([edges for _, edges in tables], ignore_index=True, sort=False),
+    )
@@ -0,0 +1,292 @@
+import logging
+import re
+from operator import (
+    ge,
+    gt,
+    le,
+    lt,
+)
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+)
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import yaml
+
+from omnipath_secondary_adapter.readers import arrow_types_mapper
+
+
+RESOURCE_SEPARATOR = ":"  # separates the resource from the condition on the command line
+VALUE_SEPARATOR = ","  # separates the values compared to, e.g. `type == a,b`
+ITEM_SEPARATOR = ";"  # separates the items of list columns, e.g. `sources`
+TRUE_TEXTS = ("true", "1")
+
+COMPARISONS = {
+    ">=": ge,
+    "<=": le,
+    ">": gt,
+    "<": lt,
+}
+MEMBERSHIPS = ("==", "!=")  # the value is (not) one of the given values
+ITEM_MEMBERSHIPS = ("~=", "!~")  # one of the items of the value is (none of them is) one of the given values
+OPERATORS = MEMBERSHIPS + ITEM_MEMBERSHIPS + tuple(COMPARISONS)
+
+EXPRESSION_PATTERN = re.compile(
+    r"^\s*([^\s=!<>~]+)\s*(" + "|".join(re.escape(op) for op in OPERATORS) + r")\s*(.*?)\s*$"
+)
+
+logger = logging.getLogger("biocypher")
+
+
+class RowFilter:
+    """A condition on the values of a column, compiled into a vectorized boolean mask.
+
+    Missing values only satisfy the negative conditions (`!=` and `!~`).
+
+    Args:
+        column (str): The column the condition reads.
+        operator (str): One of `OPERATORS`.
+        values (List[str]): The values compared to, as written in the expression.
+    """
+
+    def __init__(self, column: str, operator: str, values: List[str]):
+        if operator not in OPERATORS:
+            raise ValueError(f"Unknown filter operator: {operator}")
+        if not values or "" in values:
+            raise ValueError(f"Empty value in filter on column `{column}`.")
+        if operator in COMPARISONS and len(values) != 1:
+            raise ValueError(f"Operator `{operator}` expects a single value, got: {values}")
+        self.column = column
+        self.operator = operator
+        self.values = values
+
+    @property
+    def keeps_missing(self) -> bool:
+        return self.operator in ("!=", "!~")
+
+    def __repr__(self) -> str:
+        return f"{self.column} {self.operator} {VALUE_SEPARATOR.join(self.values)}"
+
+    def mask(self, series: pd.Series) -> np.ndarray:
+        """
+        Evaluate the condition on a column.
+
+        Categorical columns are evaluated once per category.
+
+        Args:
+            series (pd.Series): The column, with any dtype produced by the readers.
+
+        Returns:
+            np.ndarray: Whether each row satisfies the condition.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            category_mask = self._mask(pd.Series(series.cat.categories))
+            codes = series.cat.codes.to_numpy()
+            return np.append(category_mask, self.keeps_missing)[codes]
+        return self._mask(series)
+
+    def _mask(self, series: pd.Series) -> np.ndarray:
+        if self.operator in ITEM_MEMBERSHIPS:
+            # List columns repeat the same few combinations of items: split each distinct one once.
+            codes, uniques = pd.factorize(series)
+            wanted = set(self.values)
+            matches = np.array(
+                [not wanted.isdisjoint(str(value).split(ITEM_SEPARATOR)) for value in uniques],
+                dtype=bool,
+            )
+            if self.operator == "!~":
+                matches = ~matches
+            return np.append(matches, self.keeps_missing)[codes]
+
+        values = self._typed_values(series.dtype)
+        if self.operator == "==":
+            result = series.isin(values)
+        elif self.operator == "!=":
+            result = ~series.isin(values)
+        else:
+            result = COMPARISONS[self.operator](series, values[0])
+        return pd.Series(result).fillna(self.keeps_missing).to_numpy(dtype=bool)
+
+    def _typed_values(self, dtype) -> list:
+        """Convert the values of the expression to the type of the column."""
+        if pd.api.types.is_bool_dtype(dtype):
+            return [value.lower() in TRUE_TEXTS for value in self.values]
+        if pd.api.types.is_numeric_dtype(dtype):
+            try:
+                return pd.to_numeric(pd.Series(self.values)).tolist()
+            except ValueError:
+                raise ValueError(f"Non-numeric value in filter on numeric column: {self}")
+        return list(self.values)
+
+
+def parse_filter(expression: str) -> RowFilter:
+    """
+    Parse a condition such as `ncbi_tax_id_source == 9606`, `type == a,b` or `sources !~ Wang,SPIKE`.
+
+    Args:
+        expression (str): The condition: a column, an operator of `OPERATORS`, and the
+            values compared to, separated by commas.
+
+    Returns:
+        RowFilter: The parsed condition.
+
+    Raises:
+        ValueError: If the expression cannot be parsed.
+    """
+    match = EXPRESSION_PATTERN.match(expression)
+    if match is None:
+        raise ValueError(f"Invalid filter expression: {expression}")
+    column, op, values = match.groups()
+    return RowFilter(column, op, [value.strip() for value in values.split(VALUE_SEPARATOR)])
+
+
+def parse_resource_filter(expression: str) -> tuple:
+    """
+    Parse a command line filter, i.e. a resource and a condition: `networks:curation_effort >= 2`.
+
+    Args:
+        expression (str): The resource name, a colon, and the condition.
+
+    Returns:
+        tuple: The resource name and the parsed condition.
+
+    Raises:
+        ValueError: If the expression cannot be parsed.
+    """
+    resource_name, separator, condition = expression.partition(RESOURCE_SEPARATOR)
+    if not separator:
+        raise ValueError(f"Missing resource name in filter: {expression}")
+    return resource_name.strip(), parse_filter(condition)
+
+
+def read_filter_file(filter_path: str) -> Dict[str, List[RowFilter]]:
+    """
+    Read the conditions of each resource from a YAML file, e.g.:
+
+        networks:
+          - ncbi_tax_id_source == 9606
+          - sources !~ Wang,SPIKE
+
+    Args:
+        filter_path (str): Path to the YAML file.
+
+    Returns:
+        Dict[str, List[RowFilter]]: The parsed conditions of each resource.
+
+    Raises:
+        ValueError: If the file is not a mapping of resources to lists of conditions.
+    """
+    with open(filter_path) as fd:
+        spec = yaml.safe_load(fd) or {}
+    if not isinstance(spec, dict):
+        raise ValueError(f"Filter file must map resource names to conditions: {filter_path}")
+
+    filters = {}
+    for resource_name, expressions in spec.items():
+        if isinstance(expressions, str):
+            expressions = [expressions]
+        if not isinstance(expressions, list):
+            raise ValueError(f"Conditions of `{resource_name}` must be a list: {filter_path}")
+        filters[resource_name] = [parse_filter(str(expression)) for expression in expressions]
+    return filters
+
+
+def resource_filters(
+    resource_name: str,
+    expressions: Optional[List[str]] = None,
+    filter_path: Optional[str] = None,
+) -> List[RowFilter]:
+    """
+    Gather the conditions of a resource, from the filter file then from the command line.
+
+    Args:
+        resource_name (str): Name of the database, i.e networks, annotations, etc.
+        expressions (Optional[List[str]]): The command line filters, see `parse_resource_filter`.
+        filter_path (Optional[str]): Path to a YAML filter file, see `read_filter_file`.
+
+    Returns:
+        List[RowFilter]: The conditions all rows must satisfy.
+    """
+    filters = list(read_filter_file(filter_path).get(resource_name, [])) if filter_path else []
+    for expression in expressions or []:
+        name, row_filter = parse_resource_filter(expression)
+        if name == resource_name:
+            filters.append(row_filter)
+    return filters
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Masks      --------------------------------
+# -----------------------------------------------------------------------
+def _log_kept(filters: List[RowFilter], kept: int, total: int) -> None:
+    logger.info(
+        f"Row filters kept {kept} of {total} rows ({', '.join(map(repr, filters))})"
+    )
+
+
+def dataframe_mask(filters: List[RowFilter], dataframe: pd.DataFrame) -> np.ndarray:
+    """
+    Compute which rows of a DataFrame satisfy all the conditions.
+
+    Args:
+        filters (List[RowFilter]): The conditions.
+        dataframe (pd.DataFrame): The DataFrame (or chunk of it).
+
+    Returns:
+        np.ndarray: The boolean mask of the rows to keep.
+    """
+    mask = np.ones(len(dataframe), dtype=bool)
+    for row_filter in filters:
+        mask &= row_filter.mask(dataframe[row_filter.column])
+    _log_kept(filters, int(mask.sum()), len(mask))
+    return mask
+
+
+def table_mask(
+    filters: List[RowFilter],
+    table: pa.Table,
+    prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+) -> np.ndarray:
+    """
+    Compute which rows of an Arrow table satisfy all the conditions.
+
+    Only the columns read by the conditions are converted to pandas, so that
+    the rows filtered out of the other columns are never materialized.
+
+    Args:
+        filters (List[RowFilter]): The conditions.
+        table (pa.Table): The table, as read by the pyarrow parser or from the cache.
+        prepare (Optional[Callable[[pd.DataFrame], pd.DataFrame]]): Applied to the columns
+            read by the conditions before they are evaluated, e.g. the cleaning of
+            freshly parsed values (default: none).
+
+    Returns:
+        np.ndarray: The boolean mask of the rows to keep.
+    """
+    columns = list(dict.fromkeys(row_filter.column for row_filter in filters))
+    dataframe = table.select(columns).to_pandas(types_mapper=arrow_types_mapper)
+    if prepare is not None:
+        dataframe = prepare(dataframe)
+    return dataframe_mask(filters, dataframe)
+
+
+def filter_dataframe(filters: List[RowFilter], dataframe: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep the rows of a DataFrame satisfying all the conditions, with their original index.
+
+    Args:
+        filters (List[RowFilter]): The conditions; none keeps every row.
+        dataframe (pd.DataFrame): The DataFrame (or chunk of it).
+
+    Returns:
+        pd.DataFrame: The kept rows.
+    """
+    if not filters:
+        return dataframe
+    # `take` returns a new DataFrame rather than a view, which the cleaning steps can modify.
+    return dataframe.take(np.flatnonzero(dataframe_mask(filters, dataframe)))
@@ -0,0 +1,335 @@
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+import pandas as pd
+
+from omnipath_secondary_adapter.extraction import (
+    EDGE_COLUMNS,
+    EDGE_LABEL,
+    EDGE_SOURCE,
+    EDGE_TARGET,
+    NODE_ID,
+    NODE_LABEL,
+    Elements,
+    edge_tuples,
+    element_tables,
+    node_tuples,
+)
+from omnipath_secondary_adapter.interning import IdTable
+
+
+FUSION_METHODS = ("ontoweaver", "disk")
+NB_BUCKETS = 64
+SPILL_BATCH_SIZE = 10_000  # rows kept in memory per bucket before being written to disk
+BUCKET_FILE_EXTENSION = ".pickle"
+BUCKET_HASH_MULTIPLIER = np.uint64(0x9E3779B1)  # mixes the hashes of the columns of a key into its bucket
+
+logger = logging.getLogger("biocypher")
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Buckets      ------------------------------
+# -----------------------------------------------------------------------
+def buckets_of(keys: List[np.ndarray], nb_buckets: int) -> np.ndarray:
+    """
+    Compute the bucket of each element from its key, the same in every run.
+
+    Args:
+        keys (List[np.ndarray]): The columns of the key identifying duplicated elements,
+            e.g. the source, target and label of the edges.
+        nb_buckets (int): The number of buckets.
+
+    Returns:
+        np.ndarray: The bucket number of each element.
+    """
+    hashes = np.zeros(len(keys[0]), dtype=np.uint64)
+    for values in keys:
+        if values.dtype.kind in "iu":
+            column_hashes = values.astype(np.uint64)  # interned IDs, already spread over their codes
+        else:
+            column_hashes = pd.util.hash_array(values.astype(object))
+        hashes = hashes * BUCKET_HASH_MULTIPLIER + column_hashes
+    return (hashes % np.uint64(nb_buckets)).astype(np.int64)
+
+
+class SpilledBuckets:
+    """Hash-partition the rows of element tables into bucket files, written by batches.
+
+    Elements sharing the same key always land in the same bucket, so each
+    bucket can later be loaded and fused on its own.
+    """
+
+    def __init__(self, directory: str, name: str, nb_buckets: int = NB_BUCKETS):
+        self.directory = directory
+        self.name = name
+        self.nb_buckets = nb_buckets
+        self._pending: Dict[int, List[pd.DataFrame]] = {}
+        self._nb_pending: Dict[int, int] = {}
+        self.nb_elements = 0
+
+    def _path(self, bucket: int) -> str:
+        return os.path.join(self.directory, f"{self.name}-{bucket}{BUCKET_FILE_EXTENSION}")
+
+    def add(self, buckets: np.ndarray, table: pd.DataFrame) -> None:
+        """
+        Put the rows of a table in given buckets, a bucket at a time.
+
+        Args:
+            buckets (np.ndarray): The bucket of each row.
+            table (pd.DataFrame): The elements.
+        """
+        order = np.argsort(buckets, kind="stable")
+        for positions in np.split(order, np.flatnonzero(np.diff(buckets[order])) + 1):
+            if not len(positions):
+                continue
+            bucket = int(buckets[positions[0]])
+            self._pending.setdefault(bucket, []).append(table.iloc[positions])
+            self._nb_pending[bucket] = self._nb_pending.get(bucket, 0) + len(positions)
+            self.nb_elements += len(positions)
+            if self._nb_pending[bucket] >= SPILL_BATCH_SIZE:
+                self._spill(bucket)
+
+    def _spill(self, bucket: int) -> None:
+        pending = self._pending.pop(bucket, None)
+        self._nb_pending.pop(bucket, None)
+        if pending:
+            with open(self._path(bucket), "ab") as fd:
+                pickle.dump(pd.concat(pending, sort=False), fd, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def flush(self) -> None:
+        """Write every pending row to its bucket file."""
+        for bucket in list(self._pending):
+            self._spill(bucket)
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        """Yield the rows of each bucket in turn, in the order they were added."""
+        self.flush()
+        for bucket in range(self.nb_buckets):
+            path = self._path(bucket)
+            if not os.path.exists(path):
+                continue
+            tables = []
+            with open(path, "rb") as fd:
+                while True:
+                    try:
+                        tables.append(pickle.load(fd))
+                    except EOFError:
+                        break
+            yield pd.concat(tables, ignore_index=True, sort=False)
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Fusion      -------------------------------
+# -----------------------------------------------------------------------
+def join_values(values: Iterable[str], separator: Optional[str]) -> str:
+    """
+    Join the distinct values of a property, as Ontoweaver's `merge.dictry.Append` does.
+
+    Args:
+        values (Iterable[str]): The distinct values, in the order they were seen.
+        separator (Optional[str]): The separator, or None to format several values as a Python list.
+
+    Returns:
+        str: The merged value.
+    """
+    values = list(values)
+    if separator:
+        return separator.join(values)
+    if len(values) == 1:
+        return str(values[0])
+    return str(values) if values else ""
+
+
+def fuse_table(
+    table: pd.DataFrame,
+    key_columns: List[str],
+    separator: Optional[str],
+) -> pd.DataFrame:
+    """
+    Fuse the rows of an element table sharing the same key, column by column.
+
+    The other columns hold the distinct values of the fused rows, in the order
+    they were first seen, joined with `separator`; a column without any value
+    for a key stays missing. The fused rows are in the order their key was
+    first seen.
+
+    Args:
+        table (pd.DataFrame): The elements, e.g. a bucket of `SpilledBuckets`.
+        key_columns (List[str]): The columns identifying duplicated elements.
+        separator (Optional[str]): The separator of the joined values, see `join_values`.
+
+    Returns:
+        pd.DataFrame: One row per key.
+    """
+    groups = table.groupby(key_columns, sort=False, dropna=False).ngroup().to_numpy()
+    _, first_positions = np.unique(groups, return_index=True)
+    fused = table[key_columns].iloc[first_positions].reset_index(drop=True)
+
+    for col in table.columns:
+        if col in key_columns:
+            continue
+        values = table[col].to_numpy(dtype=object)
+        present = pd.notna(values)
+        distinct = pd.DataFrame({"group": groups[present], "value": values[present]}).drop_duplicates()
+        several = distinct["group"].duplicated(keep=False).to_numpy()
+        column = np.full(len(fused), np.nan, dtype=object)
+        single = distinct[~several]
+        column[single["group"].to_numpy()] = single["value"].to_numpy()
+        if several.any():
+            joined = distinct[several].groupby("group", sort=False)["value"].agg(
+                lambda group_values: join_values(group_values, separator)
+            )
+            column[joined.index.to_numpy()] = joined.to_numpy()
+        fused[col] = column
+    return fused
+
+
+class DiskFusion:
+    """Fuse duplicated nodes and edges with a memory bounded by the largest bucket.
+
+    Nodes are keyed by ID and edges by source, target and label, as in
+    Ontoweaver's `fusion.reconciliate`. They are hash-partitioned by key into
+    bucket files as they are added, as tables (see `extraction.element_tables`),
+    then each bucket is loaded and fused on its own, column by column (see
+    `fuse_table`): properties of duplicates are merged into the distinct
+    values, joined with `separator`, and a node ID seen with different labels
+    raises a ValueError. Unlike Ontoweaver, which collects values in sets,
+    values are joined in the order they were first seen, so the output is the
+    same in every run.
+
+    Given an ID table, node IDs and edge sources and targets are replaced by
+    their integer codes as they are added: the buckets hold, and the fusion
+    matches, integers instead of strings, and the IDs are decoded, a bucket
+    at a time, only when the fused elements are yielded.
+
+    Usage:
+        with DiskFusion(directory, separator=", ") as fusion:
+            fusion.add(nodes, edges)
+            bc.write_nodes(fusion.nodes())
+            bc.write_edges(fusion.edges())
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        nb_buckets: int = NB_BUCKETS,
+        separator: Optional[str] = None,
+        ids: Optional[IdTable] = None,
+    ):
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix="omnipath-fusion-", dir=directory)
+        self.separator = separator
+        self.ids = ids
+        self._nodes = SpilledBuckets(self.directory, "nodes", nb_buckets)
+        self._edges = SpilledBuckets(self.directory, "edges", nb_buckets)
+        self.nb_fused_nodes = 0
+        self.nb_fused_edges = 0
+
+    @property
+    def nb_nodes(self) -> int:
+        """The number of nodes added, duplicates included."""
+        return self._nodes.nb_elements
+
+    @property
+    def nb_edges(self) -> int:
+        """The number of edges added, duplicates included."""
+        return self._edges.nb_elements
+
+    def add(self, nodes: Elements, edges: Elements) -> None:
+        """
+        Spill nodes and edges to the buckets of their keys.
+
+        Args:
+            nodes (Elements): The nodes table, or the (id, label, properties) node tuples.
+            edges (Elements): The edges table, or the (id, source, target, label, properties)
+                edge tuples.
+        """
+        nodes, edges = element_tables(nodes, edges)
+        if len(nodes):
+            nodes = self._encoded(nodes, [NODE_ID])
+            self._nodes.add(buckets_of([nodes[NODE_ID].to_numpy()], self._nodes.nb_buckets), nodes)
+        if len(edges):
+            edges = self._encoded(edges, [EDGE_SOURCE, EDGE_TARGET])
+            keys = [edges[col].to_numpy() for col in EDGE_COLUMNS]
+            self._edges.add(buckets_of(keys, self._edges.nb_buckets), edges)
+
+    def _encoded(self, table: pd.DataFrame, id_columns: List[str]) -> pd.DataFrame:
+        """The table, with the IDs of the given columns replaced by their codes if they are interned."""
+        if self.ids is None:
+            return table
+        ids = np.concatenate([table[col].to_numpy(dtype=object) for col in id_columns])
+        codes = np.split(self.ids.encode(ids), len(id_columns))
+        return table.assign(**dict(zip(id_columns, codes)))
+
+    def _decoded(self, table: pd.DataFrame, id_columns: List[str]) -> pd.DataFrame:
+        if self.ids is None:
+            return table
+        return table.assign(**{col: self.ids.decode(table[col].to_numpy()) for col in id_columns})
+
+    def node_table_batches(self) -> Iterator[pd.DataFrame]:
+        """Yield the fused nodes, as a table per bucket."""
+        self.nb_fused_nodes = 0
+        for bucket in self._nodes:
+            fused = fuse_table(bucket, [NODE_ID, NODE_LABEL], self.separator)
+            conflicts = fused[NODE_ID].duplicated(keep=False).to_numpy()
+            if conflicts.any():
+                node_id = fused[NODE_ID][conflicts].iloc[0]
+                first, other = fused.loc[fused[NODE_ID] == node_id, NODE_LABEL].iloc[:2]
+                node_id = self._decoded(pd.DataFrame({NODE_ID: [node_id]}), [NODE_ID])[NODE_ID][0]
+                raise ValueError(f"Merged value `{first}`/`{other}` not identical for key `{node_id}`.")
+            self.nb_fused_nodes += len(fused)
+            yield self._decoded(fused, [NODE_ID])
+
+    def edge_table_batches(self) -> Iterator[pd.DataFrame]:
+        """Yield the fused edges, as a table per bucket."""
+        self.nb_fused_edges = 0
+        for bucket in self._edges:
+            fused = fuse_table(bucket, EDGE_COLUMNS, self.separator)
+            self.nb_fused_edges += len(fused)
+            yield self._decoded(fused, [EDGE_SOURCE, EDGE_TARGET])
+
+    def node_tables(self) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """Yield the fused nodes, as a table of their `:ID` and properties per bucket and label."""
+        for fused in self.node_table_batches():
+            for label, table in fused.groupby(NODE_LABEL, sort=False):
+                yield label, table.drop(columns=NODE_LABEL).dropna(axis=1, how="all")
+
+    def edge_tables(self) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """Yield the fused edges, as a table of their ends, IDs and properties per bucket and label."""
+        for fused in self.edge_table_batches():
+            for label, table in fused.groupby(EDGE_LABEL, sort=False):
+                yield label, table.drop(columns=EDGE_LABEL).dropna(axis=1, how="all")
+
+    def nodes(self) -> Iterator[tuple]:
+        """Yield the fused node tuples, bucket by bucket."""
+        for fused in self.node_table_batches():
+            yield from node_tuples(fused)
+
+    def edges(self) -> Iterator[tuple]:
+        """Yield the fused edge tuples, bucket by bucket."""
+        for fused in self.edge_table_batches():
+            yield from edge_tuples(fused)
+
+    def close(self) -> None:
+        """Remove the bucket files."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
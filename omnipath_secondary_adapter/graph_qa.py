@@ -0,0 +1,554 @@
+"""
+Run the QA queries of 'cypher_queries/basic_queries.cypher' on a built graph, without Neo4j.
+
+Usage:
+    # The neo4j-admin import files of a build, e.g. written with --merge-import.
+    poetry run omnipath-qa data/build2neo
+
+    # The Parquet datasets or the SQLite database of a build.
+    poetry run omnipath-qa biocypher-out/20260101120000-networks --output parquet
+    poetry run omnipath-qa biocypher-out/merged --output sqlite --report qa.json
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from omnipath_secondary_adapter.json_columns import LIST_SEPARATOR
+from omnipath_secondary_adapter.neo4j_csv import PART_NUMBER_PATTERN
+from omnipath_secondary_adapter.table_outputs import (
+    EDGES_SUBDIRECTORY,
+    NODES_SUBDIRECTORY,
+    OUTPUT_BACKENDS,
+    PARQUET_FILE_EXTENSION,
+    PARTITION_KEY,
+    duckdb,
+    graph_database_path,
+)
+
+
+QA_FILE = "qa.json"
+QA_PROPERTIES = ("sources", "is_stimulation")  # the edge properties read by the queries
+FORBIDDEN_SOURCES = ("Wang", "SPIKE", "SPIKE_LC")
+MAX_SOURCES = 3  # edges with more sources than this are counted by query 6
+SELF_LOOP_TYPE = "ProteinProteinInteraction"  # the relationship type of queries 2 and 3
+DEFAULT_QUOTE = "'"  # the quote character of BioCypher
+HEADER_SUFFIX = "-header.csv"
+NODE_ID_FIELD = ":ID"
+EDGE_FIELDS = {":START_ID": "source", ":END_ID": "target", ":TYPE": "label"}
+
+logger = logging.getLogger("biocypher")
+
+
+def _true(column: pa.ChunkedArray) -> np.ndarray:
+    """Whether each value of a boolean property is true, read as booleans, integers or text."""
+    if pa.types.is_boolean(column.type):
+        values = column
+    elif pa.types.is_integer(column.type):
+        values = pc.not_equal(column, 0)
+    else:
+        text = pc.utf8_lower(pc.cast(column, pa.string()))
+        values = pc.or_(pc.equal(text, "true"), pc.equal(text, "1"))
+    return pc.fill_null(values, False).to_numpy(zero_copy_only=False)
+
+
+def split_sources(value: str) -> List[str]:
+    """Split a `sources` value on ';' as `apoc.text.split` does, which drops the trailing empty items."""
+    items = value.split(LIST_SEPARATOR)
+    while len(items) > 1 and not items[-1]:
+        items.pop()
+    return items
+
+
+class CsrGraph:
+    """A directed graph in compressed sparse row (CSR) form, with integer node IDs.
+
+    The nodes are numbered from 0 in the order of `node_ids`. The targets of
+    the edges leaving node `i` are `indices[indptr[i]:indptr[i + 1]]`, and
+    `edge_order` gives the edge of each of these positions. The sources,
+    targets, type codes (of `edge_types`) and properties of the edges are
+    also kept in their original order, as NumPy and Arrow arrays, so that
+    queries are evaluated on whole arrays at once rather than edge by edge.
+
+    Args:
+        node_ids (pa.Array): The distinct node IDs.
+        sources (np.ndarray): The number of the source node of each edge.
+        targets (np.ndarray): The number of the target node of each edge.
+        type_codes (np.ndarray): The code of the relationship type of each edge.
+        edge_types (Sequence[str]): The relationship type of each code, e.g. "PostTranslational".
+        properties (Dict[str, pa.ChunkedArray]): Edge properties, by name, in the order of the edges.
+    """
+
+    def __init__(
+        self,
+        node_ids: pa.Array,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        type_codes: np.ndarray,
+        edge_types: Sequence[str],
+        properties: Dict[str, pa.ChunkedArray],
+    ):
+        self.node_ids = node_ids
+        self.sources = sources
+        self.targets = targets
+        self.type_codes = type_codes
+        self.edge_types = list(edge_types)
+        self.properties = properties
+        self._sources = None
+
+        self.edge_order = np.argsort(sources)
+        self.indices = targets[self.edge_order]
+        self.indptr = np.zeros(self.nb_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=self.nb_nodes), out=self.indptr[1:])
+
+    @classmethod
+    def from_tables(cls, node_ids: pa.ChunkedArray, edges: pa.Table) -> "CsrGraph":
+        """
+        Number the nodes and build the adjacency of the edges.
+
+        Nodes are kept once per ID. As `neo4j-admin import` with
+        `skip_bad_relationships`, edges whose source or target is not a
+        node are left out, with a warning.
+
+        Args:
+            node_ids (pa.ChunkedArray): The ID of each node.
+            edges (pa.Table): The `source`, `target` and `label` (relationship type) of each edge,
+                and its properties.
+
+        Returns:
+            CsrGraph: The graph.
+        """
+        node_ids = pc.unique(node_ids.combine_chunks() if isinstance(node_ids, pa.ChunkedArray) else node_ids)
+        sources = pc.index_in(edges.column("source"), value_set=node_ids)
+        targets = pc.index_in(edges.column("target"), value_set=node_ids)
+        connected = pc.and_(pc.is_valid(sources), pc.is_valid(targets))
+        nb_dangling = len(edges) - pc.sum(connected).as_py() if len(edges) else 0
+        if nb_dangling:
+            logger.warning(f"Leaving out {nb_dangling} edges whose source or target is not a node.")
+            edges = edges.filter(connected)
+            sources, targets = sources.filter(connected), targets.filter(connected)
+
+        types = pc.dictionary_encode(edges.column("label")).combine_chunks()
+        properties = {name: edges.column(name) for name in edges.column_names if name not in EDGE_FIELDS.values()}
+        return cls(
+            node_ids,
+            sources.to_numpy().astype(np.int32) if len(edges) else np.empty(0, dtype=np.int32),
+            targets.to_numpy().astype(np.int32) if len(edges) else np.empty(0, dtype=np.int32),
+            types.indices.to_numpy(zero_copy_only=False),
+            types.dictionary.to_pylist(),
+            properties,
+        )
+
+    @property
+    def nb_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def nb_edges(self) -> int:
+        return len(self.sources)
+
+    def out_degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def in_degrees(self) -> np.ndarray:
+        return np.bincount(self.targets, minlength=self.nb_nodes)
+
+    def neighbors(self, node_id: str) -> List[str]:
+        """The IDs of the targets of the edges leaving a node."""
+        node = pc.index(self.node_ids, node_id).as_py()
+        if node < 0:
+            raise KeyError(node_id)
+        return self.node_ids.take(pa.array(self.indices[self.indptr[node] : self.indptr[node + 1]])).to_pylist()
+
+    def _type_mask(self, edge_type: str) -> np.ndarray:
+        if edge_type not in self.edge_types:
+            return np.zeros(self.nb_edges, dtype=bool)
+        return self.type_codes == self.edge_types.index(edge_type)
+
+    def _property(self, name: str) -> Optional[pa.ChunkedArray]:
+        return self.properties.get(name)
+
+    def _sources_items(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """For each edge: whether it has `sources`, whether one of them is forbidden, and their number.
+
+        Each distinct `sources` value is split once, for all the queries.
+        """
+        if self._sources is None:
+            self._sources = self._split_sources()
+        return self._sources
+
+    def _split_sources(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        column = self._property("sources")
+        if column is None:
+            nothing = np.zeros(self.nb_edges, dtype=bool)
+            return nothing, nothing, np.zeros(self.nb_edges, dtype=np.int64)
+
+        encoded = pc.dictionary_encode(pc.cast(column, pa.string())).combine_chunks()
+        forbidden = set(FORBIDDEN_SOURCES)
+        splits = [split_sources(value) for value in encoded.dictionary.to_pylist()]
+        has_forbidden = np.array([bool(forbidden.intersection(items)) for items in splits] + [False])
+        nb_items = np.array([len(items) for items in splits] + [0], dtype=np.int64)
+        codes = pc.fill_null(encoded.indices, len(splits)).to_numpy(zero_copy_only=False)
+        return codes < len(splits), has_forbidden[codes], nb_items[codes]
+
+    # ----- Queries of 'basic_queries.cypher' -----
+    def isolated_nodes(self) -> int:
+        """QUERY 1: the number of nodes without any edge, `MATCH (n) WHERE NOT (n)--()`."""
+        return int(np.count_nonzero((self.out_degrees() + self.in_degrees()) == 0))
+
+    def self_loops(self, edge_type: str = SELF_LOOP_TYPE) -> int:
+        """QUERY 2: the number of edges of a type from a node to itself, `MATCH (n)-[:TYPE]->(n)`."""
+        rows = np.repeat(np.arange(self.nb_nodes, dtype=self.indices.dtype), self.out_degrees())
+        loops = rows == self.indices
+        return int(np.count_nonzero(loops & self._type_mask(edge_type)[self.edge_order]))
+
+    def stimulation_edges(self, edge_type: str = SELF_LOOP_TYPE) -> Tuple[List[str], List[str]]:
+        """
+        QUERY 3: the source and target IDs of the edges of a type with `is_stimulation` set.
+
+        `is_stimulation` is a boolean property, compared to 1 by the Cypher
+        query: edges whose property is true (or 1) are returned.
+
+        Args:
+            edge_type (str): The relationship type of the edges.
+
+        Returns:
+            Tuple[List[str], List[str]]: The source IDs and the target IDs.
+        """
+        edges = np.flatnonzero(self._stimulation_mask(edge_type))
+        return (
+            self.node_ids.take(pa.array(self.sources[edges])).to_pylist(),
+            self.node_ids.take(pa.array(self.targets[edges])).to_pylist(),
+        )
+
+    def _stimulation_mask(self, edge_type: str) -> np.ndarray:
+        column = self._property("is_stimulation")
+        if column is None:
+            return np.zeros(self.nb_edges, dtype=bool)
+        return self._type_mask(edge_type) & _true(column)
+
+    def total_edges(self) -> int:
+        """QUERY 4: the number of edges, `MATCH ()-[r]->()`."""
+        return self.nb_edges
+
+    def edges_without_forbidden_sources(self) -> int:
+        """
+        QUERY 5: the number of edges none of whose `sources` is Wang, SPIKE or SPIKE_LC.
+
+        As in Cypher, where `NONE` over the split of a missing property is
+        null, edges without `sources` are not counted.
+
+        Returns:
+            int: The number of edges.
+        """
+        has_sources, has_forbidden, _ = self._sources_items()
+        return int(np.count_nonzero(has_sources & ~has_forbidden))
+
+    def edges_with_many_sources(self, max_sources: int = MAX_SOURCES) -> int:
+        """
+        QUERY 6: the number of edges of query 5 with more than `max_sources` sources.
+
+        The items of the split are counted as the Cypher query does, repeated ones included.
+
+        Args:
+            max_sources (int): The number of sources an edge must exceed.
+
+        Returns:
+            int: The number of edges.
+        """
+        has_sources, has_forbidden, nb_items = self._sources_items()
+        return int(np.count_nonzero(has_sources & ~has_forbidden & (nb_items > max_sources)))
+
+
+def run_queries(graph: CsrGraph) -> Dict[str, Any]:
+    """
+    Run the queries of 'basic_queries.cypher' on a graph.
+
+    Args:
+        graph (CsrGraph): The graph.
+
+    Returns:
+        Dict[str, Any]: The result of each query, named after the columns the Cypher queries
+            return, and the time taken, in seconds.
+    """
+    start = time.perf_counter()
+    results = {
+        "nodes": graph.nb_nodes,
+        "isolated_nodes": graph.isolated_nodes(),
+        "same_source_target_count": graph.self_loops(),
+        "stimulation_edges": int(np.count_nonzero(graph._stimulation_mask(SELF_LOOP_TYPE))),
+        "total_edges": graph.total_edges(),
+        "edges_without_forbidden_sources": graph.edges_without_forbidden_sources(),
+        "edges_with_many_sources": graph.edges_with_many_sources(),
+    }
+    results["query_time"] = time.perf_counter() - start
+    return results
+
+
+# -----------------------------------------------------------------------
+# -----------------------      Loaders       ----------------------------
+# -----------------------------------------------------------------------
+def _empty_edges() -> pa.Table:
+    return pa.table({name: pa.array([], type=pa.string()) for name in EDGE_FIELDS.values()})
+
+
+def _concat_edges(tables: List[pa.Table]) -> pa.Table:
+    return pa.concat_tables(tables, promote_options="permissive") if tables else _empty_edges()
+
+
+def _header_paths(directory: str) -> List[str]:
+    """The header files of an output directory, or of the resource directories under it (--merge-import)."""
+    paths = glob.glob(os.path.join(directory, f"*{HEADER_SUFFIX}"))
+    return sorted(paths or glob.glob(os.path.join(directory, "*", f"*{HEADER_SUFFIX}")))
+
+
+def _read_parts(paths: List[str], names: List[str], columns: List[str], delimiter: str, quote: str) -> pa.Table:
+    tables = []
+    for path in paths:
+        # Gzipped parts are decompressed on the fly, by their extension.
+        with pa.input_stream(path, compression="detect") as stream:
+            tables.append(
+                pv.read_csv(
+                    stream,
+                    read_options=pv.ReadOptions(column_names=names),
+                    parse_options=pv.ParseOptions(delimiter=delimiter, quote_char=quote, newlines_in_values=True),
+                    convert_options=pv.ConvertOptions(
+                        include_columns=columns,
+                        column_types={name: pa.string() for name in columns},
+                        strings_can_be_null=True,  # an empty field is a missing property
+                    ),
+                )
+            )
+    return pa.concat_tables(tables)
+
+
+def load_neo4j_import(directories: Iterable[str], quote: str = DEFAULT_QUOTE) -> CsrGraph:
+    """
+    Load the nodes and edges of neo4j-admin import files.
+
+    Only the node IDs, and the endpoints, types and queried properties of
+    the edges are parsed, with the multithreaded Arrow CSV reader. The
+    delimiter is the one of the header files.
+
+    Args:
+        directories (Iterable[str]): The output directories, or directories of
+            `--merge-import` holding the output directories of the resources.
+        quote (str): The quote character of the files.
+
+    Returns:
+        CsrGraph: The graph.
+    """
+    node_ids, edge_tables = [], []
+    for directory in directories:
+        for header_path in _header_paths(directory):
+            prefix = header_path[: -len(HEADER_SUFFIX)]
+            part_paths = sorted(
+                path for path in glob.glob(f"{prefix}-part*") if PART_NUMBER_PATTERN.search(os.path.basename(path))
+            )
+            with open(header_path, encoding="utf-8") as fd:
+                header = fd.read().rstrip("\n")
+            # The header starts with the `:ID` or `:START_ID` field, followed by the delimiter.
+            first_field = NODE_ID_FIELD if header.startswith(NODE_ID_FIELD) else ":START_ID"
+            delimiter = header[len(first_field)]
+            # Properties are named with their type, e.g. 'is_stimulation:boolean'.
+            names = [name if name.startswith(":") else name.split(":")[0] for name in header.split(delimiter)]
+            names = [f"{name}#{n}" if names.count(name) > 1 else name for n, name in enumerate(names)]
+            if not part_paths:
+                continue
+            if NODE_ID_FIELD in names:
+                table = _read_parts(part_paths, names, [NODE_ID_FIELD], delimiter, quote)
+                node_ids.extend(table.column(NODE_ID_FIELD).chunks)
+            elif ":START_ID" in names:
+                columns = [name for name in (*EDGE_FIELDS, *QA_PROPERTIES) if name in names]
+                table = _read_parts(part_paths, names, columns, delimiter, quote)
+                edge_tables.append(table.rename_columns([EDGE_FIELDS.get(name, name) for name in columns]))
+    return CsrGraph.from_tables(pa.chunked_array(node_ids, type=pa.string()), _concat_edges(edge_tables))
+
+
+def _dataset_directories(directory: str) -> List[str]:
+    """The directory of the Parquet datasets, or the resource directories under it."""
+    if os.path.isdir(os.path.join(directory, NODES_SUBDIRECTORY)):
+        return [directory]
+    return sorted(os.path.dirname(path) for path in glob.glob(os.path.join(directory, "*", NODES_SUBDIRECTORY)))
+
+
+def load_parquet(directories: Iterable[str]) -> CsrGraph:
+    """
+    Load the nodes and edges of Parquet datasets, see `table_outputs.ParquetGraphWriter`.
+
+    Args:
+        directories (Iterable[str]): The output directories, or directories of resource
+            output directories.
+
+    Returns:
+        CsrGraph: The graph.
+    """
+    node_ids, edge_tables = [], []
+    for dataset_directory in (path for directory in directories for path in _dataset_directories(directory)):
+        pattern = os.path.join(dataset_directory, NODES_SUBDIRECTORY, "*", f"*{PARQUET_FILE_EXTENSION}")
+        for path in sorted(glob.glob(pattern)):
+            node_ids.extend(pq.read_table(path, columns=["id"], partitioning=None).column("id").chunks)
+        pattern = os.path.join(dataset_directory, EDGES_SUBDIRECTORY, "*", f"*{PARQUET_FILE_EXTENSION}")
+        for path in sorted(glob.glob(pattern)):
+            names = pq.read_schema(path).names
+            columns = ["source", "target", *(name for name in QA_PROPERTIES if name in names)]
+            table = pq.read_table(path, columns=columns, partitioning=None)
+            label = os.path.basename(os.path.dirname(path))[len(PARTITION_KEY) + 1 :]
+            edge_tables.append(table.append_column("label", pa.array([label] * len(table), type=pa.string())))
+    return CsrGraph.from_tables(pa.chunked_array(node_ids, type=pa.string()), _concat_edges(edge_tables))
+
+
+def load_database(directories: Iterable[str], engine: str = "sqlite") -> CsrGraph:
+    """
+    Load the nodes and edges of graph databases, see `table_outputs.SqlGraphWriter`.
+
+    Args:
+        directories (Iterable[str]): The directories of the databases, or of resource output
+            directories holding them.
+        engine (str): Either "sqlite" or "duckdb".
+
+    Returns:
+        CsrGraph: The graph.
+    """
+    properties = ", ".join(f"properties ->> '$.{name}' AS {name}" for name in QA_PROPERTIES)
+    queries = {"nodes": "SELECT id FROM nodes", "edges": f"SELECT source, target, label, {properties} FROM edges"}
+    node_ids, edge_tables = [], []
+    for directory in directories:
+        path = graph_database_path(directory, engine)
+        if os.path.isfile(path):
+            paths = [path]
+        else:
+            paths = sorted(glob.glob(graph_database_path(os.path.join(directory, "*"), engine)))
+        for path in paths:
+            if engine == "duckdb":
+                connection = duckdb.connect(path, read_only=True)
+                tables = {name: connection.execute(query).fetch_arrow_table() for name, query in queries.items()}
+            else:
+                connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+                tables = {}
+                for name, query in queries.items():
+                    cursor = connection.execute(query)
+                    columns = [description[0] for description in cursor.description]
+                    rows = cursor.fetchall()
+                    tables[name] = pa.table(
+                        {column: pa.array([row[n] for row in rows]) for n, column in enumerate(columns)}
+                    )
+            connection.close()
+            node_ids.extend(tables["nodes"].column("id").chunks)
+            edge_tables.append(tables["edges"])
+    return CsrGraph.from_tables(pa.chunked_array(node_ids, type=pa.string()), _concat_edges(edge_tables))
+
+
+def load_graph(directories: Iterable[str], output: str = "neo4j", quote: str = DEFAULT_QUOTE) -> CsrGraph:
+    """
+    Load a built graph, whatever its output.
+
+    Args:
+        directories (Iterable[str]): The output directories, or the `--merge-import` directory.
+        output (str): What the graph was written as: "neo4j", "parquet", "sqlite" or "duckdb".
+        quote (str): The quote character of the neo4j-admin import files.
+
+    Returns:
+        CsrGraph: The graph.
+    """
+    start = time.perf_counter()
+    directories = list(directories)
+    if output == "parquet":
+        graph = load_parquet(directories)
+    elif output in ("sqlite", "duckdb"):
+        graph = load_database(directories, engine=output)
+    else:
+        graph = load_neo4j_import(directories, quote=quote)
+    logger.info(
+        f"Loaded {graph.nb_nodes} nodes and {graph.nb_edges} edges of {directories} "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return graph
+
+
+def graph_qa(
+    directories: Iterable[str],
+    output: str = "neo4j",
+    report: Optional[str] = None,
+    quote: str = DEFAULT_QUOTE,
+) -> Dict[str, Any]:
+    """
+    Load a built graph, run the QA queries on it, and log their results.
+
+    Args:
+        directories (Iterable[str]): The output directories, or the `--merge-import` directory.
+        output (str): What the graph was written as: "neo4j", "parquet", "sqlite" or "duckdb".
+        report (Optional[str]): Path to a JSON file the results are written to (default: none).
+        quote (str): The quote character of the neo4j-admin import files.
+
+    Returns:
+        Dict[str, Any]: The results, see `run_queries`.
+    """
+    results = run_queries(load_graph(directories, output, quote))
+    logger.info(f"QA: {json.dumps(results)}")
+    if report:
+        os.makedirs(os.path.dirname(report) or ".", exist_ok=True)
+        with open(report, "w") as fd:
+            json.dump(results, fd, indent=2)
+    return results
+
+
+def parse_arguments(arguments: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line of the QA queries."""
+    parser = argparse.ArgumentParser(
+        description="Run the queries of 'cypher_queries/basic_queries.cypher' on a built graph.",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument(
+        "directories",
+        nargs="+",
+        metavar="DIRECTORY",
+        help="the output directories of the resources, or the --merge-import directory.",
+    )
+    parser.add_argument(
+        "--output",
+        choices=OUTPUT_BACKENDS,
+        default="neo4j",
+        help="what the graph was written as (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--quote",
+        default=DEFAULT_QUOTE,
+        help="the quote character of the neo4j-admin import files (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="JSON",
+        default=None,
+        help="where the results are saved (default: printed only).",
+    )
+    return parser.parse_args(arguments)
+
+
+def main() -> None:
+    cli_arguments = parse_arguments()
+    results = graph_qa(cli_arguments.directories, cli_arguments.output, cli_arguments.report, cli_arguments.quote)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+import logging
+import os
+from collections import OrderedDict
+from itertools import islice
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from biocypher import BioCypher
+
+from omnipath_secondary_adapter.biocypher_api import (
+    get_ontology_class,
+    get_translator,
+    parse_label,
+)
+from omnipath_secondary_adapter.extraction import (
+    EDGE_LABEL,
+    EDGE_SOURCE,
+    EDGE_TARGET,
+    NODE_ID,
+    edge_tuples,
+)
+
+
+BATCH_SIZE = 1_000_000  # elements binned by label at once, as by BioCypher
+UNIDENTIFIED_EDGE_LABELS = ("IS_SOURCE_OF", "IS_TARGET_OF", "IS_PART_OF")  # edges without an `id` column
+RESERVED_NODE_PROPERTIES = (":TYPE",)
+RESERVED_EDGE_PROPERTIES = (":TYPE", "id", "_ID")  # only the first one present is removed, as by BioCypher
+
+logger = logging.getLogger("biocypher")
+
+
+def _without_newlines(value: Any) -> Any:
+    """Replace the line breaks of a string, or of the strings of a list, as BioCypher does for nodes."""
+    if isinstance(value, str):
+        return value.replace(os.linesep, " ").replace("\n", " ").replace("\r", " ")
+    if isinstance(value, list):
+        return [_without_newlines(item) for item in value]
+    return value
+
+
+def _batches(elements: Iterable[tuple], size: int) -> Iterable[List[tuple]]:
+    elements = iter(elements)
+    while True:
+        batch = list(islice(elements, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _batched_tables(
+    tables: Iterable[Tuple[str, Union[pd.DataFrame, pa.Table]]], size: int
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """Concatenate successive tables of the same label, until `size` rows are gathered."""
+    pending: Dict[str, List[pd.DataFrame]] = {}
+    nb_pending = 0
+    for label, table in tables:
+        if isinstance(table, pa.Table):
+            table = table.to_pandas()
+        pending.setdefault(label, []).append(table)
+        nb_pending += len(table)
+        if nb_pending >= size:
+            for pending_label, label_tables in pending.items():
+                yield pending_label, pd.concat(label_tables, ignore_index=True, sort=False)
+            pending, nb_pending = {}, 0
+    for label, label_tables in pending.items():
+        yield label, pd.concat(label_tables, ignore_index=True, sort=False)
+
+
+def _values(column: Union[pd.Series, pa.ChunkedArray, np.ndarray]) -> np.ndarray:
+    """The values of a column, as an object array with None for missing values."""
+    if isinstance(column, (pa.Array, pa.ChunkedArray)):
+        return np.asarray(column.to_pylist(), dtype=object)
+    values = pd.Series(column).astype(object)
+    return values.where(values.notna(), None).to_numpy()
+
+
+class GraphTableWriter:
+    """Write the nodes and edges of a BioCypher graph a table of elements per label.
+
+    The elements go through the same steps as in BioCypher: the input label
+    is mapped to its ontology class, nodes without ID are skipped, nodes are
+    kept once per ID and edges once per type and ID (or source and target),
+    across all the calls, and the properties are filtered by the schema.
+    Subclasses then write the rows of each table, see `_write_node_rows` and
+    `_write_edge_rows`.
+
+    Args:
+        bc (BioCypher): The BioCypher instance whose schema and ontology are used.
+
+    Raises:
+        ValueError: If BioCypher is in strict mode.
+    """
+
+    def __init__(self, bc: BioCypher):
+        self.biocypher = bc
+        self.translator = get_translator(bc)
+        if self.translator.strict_mode:
+            raise ValueError(f"{type(self).__name__} does not support the strict mode of BioCypher.")
+        self.schema = self.translator.ontology.mapping.extended_schema
+        self._seen_node_ids = set()
+        self._seen_edge_ids: Dict[str, set] = {}
+
+    # ----- Labels and properties -----
+    def _pascal(self, label: str) -> str:
+        return self.translator.name_sentence_to_pascal(parse_label(label))
+
+    def _ancestor_labels(self, ontology_class: str) -> List[str]:
+        """The labels of the nodes of a class: the class, then its ancestors, in PascalCase."""
+        ancestors = self.translator.ontology.get_ancestors(ontology_class)
+        if not ancestors:
+            return [self.translator.name_sentence_to_pascal(ontology_class)]
+        return list(OrderedDict.fromkeys(self.translator.name_sentence_to_pascal(a) for a in ancestors))
+
+    def _edge_schema_label(self, edge_label: str) -> Optional[str]:
+        """The schema entry of an edge label, which may be the `label_as_edge` of the entry."""
+        if self.schema.get(edge_label):
+            return edge_label
+        for schema_label, entry in self.schema.items():
+            if isinstance(entry, dict) and entry.get("label_as_edge") == edge_label:
+                return schema_label
+        return None
+
+    def _property_types(self, schema_label: Optional[str], table: pd.DataFrame) -> Dict[str, str]:
+        """The properties written, with their type: the ones of the schema, or of the first element."""
+        properties = (self.schema.get(schema_label) or {}).get("properties") if schema_label else None
+        if properties:
+            return dict(properties)
+        first = table.iloc[0] if len(table) else {}
+        return {
+            name: type(first[name]).__name__
+            for name in table.columns
+            if first[name] is not None
+        }
+
+    def _filtered_properties(self, ontology_class: str, table: pd.DataFrame) -> pd.DataFrame:
+        """Keep the properties of the schema, as `Translator._filter_props` does."""
+        entry = self.schema[ontology_class]
+        keep = list(entry.get("properties") or {})
+        exclude = entry.get("exclude_properties") or []
+        if isinstance(exclude, str):
+            exclude = [exclude]
+        columns = [col for col in table.columns if col not in exclude]
+        if keep:
+            # Missing properties of the schema are written empty.
+            return table.reindex(columns=[col for col in keep if col not in exclude])
+        return table[columns]
+
+    # ----- Written by the subclasses -----
+    def _write_node_rows(self, ontology_class: str, ids: np.ndarray, properties: pd.DataFrame) -> None:
+        """Write new nodes of a class, with their filtered properties (None when missing)."""
+        raise NotImplementedError
+
+    def _write_edge_rows(
+        self,
+        edge_label: str,
+        schema_label: Optional[str],
+        sources: np.ndarray,
+        targets: np.ndarray,
+        edge_ids: np.ndarray,
+        properties: pd.DataFrame,
+        property_types: Dict[str, str],
+    ) -> None:
+        """Write new edges of a label, with their filtered properties (None when missing)."""
+        raise NotImplementedError
+
+    def _finish_nodes(self) -> None:
+        """Called once the nodes given to `write_nodes` are written."""
+
+    def _finish_edges(self) -> None:
+        """Called once the edges given to `write_edges` are written."""
+
+    def _write_edges_as_nodes(self, edges: List[tuple]) -> None:
+        """Write edges represented as nodes in the schema."""
+        raise ValueError(f"{type(self).__name__} does not write edges represented as nodes.")
+
+    def write_import_call(self) -> str:
+        """
+        Finish the output, once every node and edge is written.
+
+        Returns:
+            str: The path to the output, e.g. the import script.
+        """
+        raise NotImplementedError
+
+    # ----- Nodes -----
+    def write_node_table(self, label: str, table: Union[pd.DataFrame, pa.Table]) -> int:
+        """
+        Write the nodes of an input label, given as a table.
+
+        Args:
+            label (str): The input label of the nodes, as in the `input_label` of the schema.
+            table (Union[pd.DataFrame, pa.Table]): The `:ID` column and a column per property,
+                with missing values for the properties a node does not have.
+
+        Returns:
+            int: The number of nodes written, duplicates excluded.
+        """
+        if isinstance(table, pa.Table):
+            table = table.to_pandas()
+        ontology_class = get_ontology_class(self.translator, label)
+        if ontology_class is None:
+            logger.error(f"No ontology type defined for `{label}`: {len(table)} nodes skipped.")
+            return 0
+
+        ids = _values(table[NODE_ID])
+        identified = np.fromiter((bool(node_id) for node_id in ids), dtype=bool, count=len(ids))
+        if not identified.all():
+            logger.warning(f"Skipping {(~identified).sum()} nodes of type {ontology_class} without id.")
+        table, ids = table[identified], ids[identified]
+        new = ~pd.Index(ids).duplicated(keep="first")
+        new &= np.fromiter((node_id not in self._seen_node_ids for node_id in ids), dtype=bool, count=len(ids))
+        if not new.all():
+            logger.warning(f"Skipping {(~new).sum()} duplicate nodes of type {ontology_class}.")
+        table, ids = table[new], ids[new]
+        self._seen_node_ids.update(ids)
+        if not len(table):
+            return 0
+
+        properties = self._filtered_properties(
+            ontology_class, table.drop(columns=[NODE_ID, *RESERVED_NODE_PROPERTIES], errors="ignore")
+        )
+        properties = properties.astype(object).where(properties.notna(), None)
+        self._write_node_rows(ontology_class, ids, properties)
+        return len(ids)
+
+    def write_nodes(self, nodes: Iterable[tuple]) -> bool:
+        """
+        Write BioCypher node tuples, binned by label into tables.
+
+        Args:
+            nodes (Iterable[tuple]): The (id, label, properties) node tuples.
+
+        Returns:
+            bool: True, as BioCypher's `write_nodes`.
+        """
+        for batch in _batches(nodes, BATCH_SIZE):
+            bins: Dict[str, List[tuple]] = {}
+            for node in batch:
+                bins.setdefault(node[1], []).append(node)
+            for label, label_nodes in bins.items():
+                table = pd.DataFrame.from_records([properties for _, _, properties in label_nodes])
+                table.insert(0, NODE_ID, [node_id for node_id, _, _ in label_nodes])
+                self.write_node_table(label, table)
+        self._finish_nodes()
+        return True
+
+    def write_node_tables(self, tables: Iterable[Tuple[str, Union[pd.DataFrame, pa.Table]]]) -> int:
+        """
+        Write nodes given as tables, e.g. fused bucket by bucket by a `fusion.DiskFusion`.
+
+        The tables are gathered by label into batches of `BATCH_SIZE` nodes, as
+        the tuples of `write_nodes`, so that small tables do not make small parts.
+
+        Args:
+            tables (Iterable[Tuple[str, Union[pd.DataFrame, pa.Table]]]): The input label and
+                table of each batch of nodes, see `write_node_table`.
+
+        Returns:
+            int: The number of nodes written, duplicates excluded.
+        """
+        nb_nodes = sum(
+            self.write_node_table(label, table) for label, table in _batched_tables(tables, BATCH_SIZE)
+        )
+        self._finish_nodes()
+        return nb_nodes
+
+    # ----- Edges -----
+    def write_edge_table(self, label: str, table: Union[pd.DataFrame, pa.Table]) -> int:
+        """
+        Write the edges of an input label, given as a table.
+
+        Args:
+            label (str): The input label of the edges, as in the `input_label` of the schema.
+            table (Union[pd.DataFrame, pa.Table]): The `:START_ID` and `:END_ID` columns, an
+                optional `:ID` column, and a column per property.
+
+        Returns:
+            int: The number of edges written, duplicates excluded.
+
+        Raises:
+            ValueError: If the edges are represented as nodes in the schema.
+        """
+        if isinstance(table, pa.Table):
+            table = table.to_pandas()
+        ontology_class = get_ontology_class(self.translator, label)
+        if ontology_class is None:
+            logger.error(f"No ontology type defined for `{label}`: {len(table)} edges skipped.")
+            return 0
+        if self.schema[ontology_class]["represented_as"] == "node":
+            raise ValueError(f"Edges `{label}` are represented as nodes: write them with `write_edges`.")
+        edge_label = self.schema[ontology_class].get("label_as_edge") or ontology_class
+
+        sources, targets = _values(table[EDGE_SOURCE]), _values(table[EDGE_TARGET])
+        edge_ids = _values(table[NODE_ID]) if NODE_ID in table else np.full(len(table), None)
+        keys = np.array(
+            [edge_id or f"{source}_{target}" for edge_id, source, target in zip(edge_ids, sources, targets)],
+            dtype=object,
+        )
+        seen = self._seen_edge_ids.setdefault(edge_label, set())
+        new = ~pd.Index(keys).duplicated(keep="first")
+        new &= np.fromiter((key not in seen for key in keys), dtype=bool, count=len(keys))
+        if not new.all():
+            logger.warning(f"Skipping {(~new).sum()} duplicate edges of type {edge_label}.")
+        seen.update(keys[new])
+        table, sources, targets, edge_ids = table[new], sources[new], targets[new], edge_ids[new]
+        if not len(table):
+            return 0
+
+        properties = table.drop(columns=[EDGE_SOURCE, EDGE_TARGET, NODE_ID], errors="ignore")
+        reserved = [name for name in RESERVED_EDGE_PROPERTIES if name in properties]
+        properties = self._filtered_properties(ontology_class, properties.drop(columns=reserved[:1]))
+        properties = properties.astype(object).where(properties.notna(), None)
+        schema_label = self._edge_schema_label(edge_label)
+        property_types = self._property_types(schema_label, properties)
+        self._write_edge_rows(edge_label, schema_label, sources, targets, edge_ids, properties, property_types)
+        return len(table)
+
+    def write_edge_tables(self, tables: Iterable[Tuple[str, Union[pd.DataFrame, pa.Table]]]) -> int:
+        """
+        Write edges given as tables, e.g. fused bucket by bucket by a `fusion.DiskFusion`.
+
+        The tables are gathered by label into batches, as for `write_node_tables`.
+        The edges represented as nodes in the schema are written as tuples.
+
+        Args:
+            tables (Iterable[Tuple[str, Union[pd.DataFrame, pa.Table]]]): The input label and
+                table of each batch of edges, see `write_edge_table`.
+
+        Returns:
+            int: The number of edges written, duplicates excluded.
+        """
+        nb_edges = 0
+        for label, table in _batched_tables(tables, BATCH_SIZE):
+            ontology_class = get_ontology_class(self.translator, label)
+            if ontology_class and self.schema[ontology_class]["represented_as"] == "node":
+                self._write_edges_as_nodes(list(edge_tuples(table.assign(**{EDGE_LABEL: label}))))
+                nb_edges += len(table)
+            else:
+                nb_edges += self.write_edge_table(label, table)
+        self._finish_edges()
+        return nb_edges
+
+    def write_edges(self, edges: Iterable[tuple]) -> bool:
+        """
+        Write BioCypher edge tuples, binned by label into tables.
+
+        Args:
+            edges (Iterable[tuple]): The (id, source, target, label, properties) edge tuples.
+
+        Returns:
+            bool: True, as BioCypher's `write_edges`.
+        """
+        for batch in _batches(edges, BATCH_SIZE):
+            bins: Dict[str, List[tuple]] = {}
+            as_nodes = []
+            for edge in batch:
+                ontology_class = get_ontology_class(self.translator, edge[3])
+                if ontology_class and self.schema[ontology_class]["represented_as"] == "node":
+                    as_nodes.append(edge)
+                else:
+                    bins.setdefault(edge[3], []).append(edge)
+            for label, label_edges in bins.items():
+                table = pd.DataFrame.from_records([properties for *_, properties in label_edges])
+                table.insert(0, NODE_ID, [edge[0] for edge in label_edges])
+                table.insert(1, EDGE_SOURCE, [edge[1] for edge in label_edges])
+                table.insert(2, EDGE_TARGET, [edge[2] for edge in label_edges])
+                self.write_edge_table(label, table)
+            if as_nodes:
+                self._write_edges_as_nodes(as_nodes)
+        self._finish_edges()
+        return True
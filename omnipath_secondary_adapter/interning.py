@@ -0,0 +1,185 @@
+import fcntl
+import logging
+import os
+from contextlib import contextmanager
+from typing import (
+    Iterator,
+    Optional,
+    Sequence,
+)
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+
+ID_TABLE_SUBDIRECTORY = "ids"
+ID_TABLE_FILE = "ids.arrow"
+LOCK_FILE_EXTENSION = ".lock"
+ID_COLUMN = "id"  # the IDs, in the order of their codes
+SORTED_HASH_COLUMN = "sorted_hash"  # the hashes of the IDs, sorted
+SORTED_CODE_COLUMN = "sorted_code"  # the code of the ID of each sorted hash
+
+logger = logging.getLogger("biocypher")
+
+
+def id_hashes(ids: np.ndarray) -> np.ndarray:
+    """Hash string IDs into 64-bit integers, the same in every run and process."""
+    return pd.util.hash_array(np.asarray(ids, dtype=object), categorize=False)
+
+
+@contextmanager
+def _locked(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on a file next to `path`, shared by the processes of every run."""
+    with open(path + LOCK_FILE_EXTENSION, "w") as fd:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class IdTable:
+    """Dense integer codes of the node IDs (UniProt accessions, complexes, categories...).
+
+    Each distinct ID gets the next code the first time it is encoded, and
+    keeps it: the table is append-only, and shared by every resource and
+    every run through an Arrow file under `directory`. The file holds the
+    IDs in the order of their codes, and their 64-bit hashes sorted with the
+    code of each, so that it is memory-mapped rather than loaded, and IDs are
+    looked up by binary search on the hashes instead of through a dictionary
+    of strings. Colliding hashes are told apart by comparing the IDs.
+
+    The IDs encoded since the table was opened are kept in memory until
+    `save` appends them to the file; concurrent processes append theirs in
+    turn, under a lock.
+
+    Args:
+        directory (Optional[str]): The directory of the table file, or None for a table
+            kept in memory only.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.path = os.path.join(directory, ID_TABLE_FILE) if directory else None
+        self._load()
+
+    def _load(self) -> None:
+        if self.path and os.path.isfile(self.path):
+            table = ipc.open_file(pa.memory_map(self.path, "r")).read_all().combine_chunks()
+            self._ids = table.column(ID_COLUMN)
+            self._sorted_hashes = table.column(SORTED_HASH_COLUMN).chunk(0).to_numpy()
+            self._sorted_codes = table.column(SORTED_CODE_COLUMN).chunk(0).to_numpy()
+        else:
+            self._ids = pa.chunked_array([], type=pa.large_string())
+            self._sorted_hashes = np.empty(0, dtype=np.uint64)
+            self._sorted_codes = np.empty(0, dtype=np.int64)
+        self.nb_saved = len(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def decode(self, codes: Sequence[int]) -> np.ndarray:
+        """
+        Turn codes back into their IDs.
+
+        Args:
+            codes (Sequence[int]): The codes.
+
+        Returns:
+            np.ndarray: An object array of the ID strings.
+        """
+        codes = pa.array(np.asarray(codes, dtype=np.int64))
+        return self._ids.take(codes).to_numpy(zero_copy_only=False)
+
+    def encode(self, ids: Sequence[str]) -> np.ndarray:
+        """
+        Turn IDs into their codes, giving the next codes to the IDs not in the table yet.
+
+        Each distinct ID is looked up once.
+
+        Args:
+            ids (Sequence[str]): The IDs.
+
+        Returns:
+            np.ndarray: The code of each ID, as 64-bit integers.
+        """
+        positions, uniques = pd.factorize(np.asarray(ids, dtype=object))
+        uniques = np.asarray(uniques, dtype=object)
+        hashes = id_hashes(uniques)
+        codes = self._lookup(uniques, hashes)
+        missing = codes < 0
+        if missing.any():
+            codes[missing] = self._append(uniques[missing], hashes[missing])
+        return codes[positions]
+
+    def _lookup(self, ids: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+        """Return the code of each distinct ID, or -1 if it is not in the table."""
+        codes = np.full(len(ids), -1, dtype=np.int64)
+        first = np.searchsorted(self._sorted_hashes, hashes, side="left")
+        end = np.searchsorted(self._sorted_hashes, hashes, side="right")
+
+        single = np.flatnonzero(end - first == 1)
+        candidates = self._sorted_codes[first[single]]
+        matches = self.decode(candidates) == ids[single]
+        codes[single[matches]] = candidates[matches]
+
+        # IDs sharing their hash with other ones: vanishingly rare with 64 bits.
+        for position in np.flatnonzero(end - first > 1):
+            candidates = self._sorted_codes[first[position]:end[position]]
+            matches = np.flatnonzero(self.decode(candidates) == ids[position])
+            if len(matches):
+                codes[position] = candidates[matches[0]]
+        return codes
+
+    def _append(self, ids: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+        """Give the next codes to new distinct IDs."""
+        codes = np.arange(len(self), len(self) + len(ids), dtype=np.int64)
+        self._ids = pa.chunked_array(
+            self._ids.chunks + [pa.array(ids, type=pa.large_string())], type=pa.large_string()
+        )
+        order = np.argsort(hashes, kind="stable")
+        insertions = np.searchsorted(self._sorted_hashes, hashes[order], side="right")
+        self._sorted_hashes = np.insert(self._sorted_hashes, insertions, hashes[order])
+        self._sorted_codes = np.insert(self._sorted_codes, insertions, codes[order])
+        return codes
+
+    def save(self) -> None:
+        """
+        Append the IDs encoded since the table was opened to its file.
+
+        If another process appended IDs meanwhile, the new IDs of this table are
+        appended after them, so they may get other codes than the ones this
+        table gave: call it once the codes given out are no longer needed. The
+        table is then reloaded from the file.
+        """
+        if self.path is None or len(self) == self.nb_saved:
+            return
+
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        with _locked(self.path):
+            table = IdTable(directory)
+            if table.nb_saved == self.nb_saved:
+                table = self
+            else:
+                table.encode(self.decode(np.arange(self.nb_saved, len(self))))
+            nb_new = len(table) - table.nb_saved
+            table._write()
+        self._load()
+        logger.info(f"Saved {nb_new} new IDs to the ID table ({len(self)} IDs): {self.path}")
+
+    def _write(self) -> None:
+        table = pa.table(
+            {
+                ID_COLUMN: self._ids.combine_chunks(),
+                SORTED_HASH_COLUMN: self._sorted_hashes,
+                SORTED_CODE_COLUMN: self._sorted_codes,
+            }
+        )
+        temporary_path = f"{self.path}.tmp"
+        with pa.OSFile(temporary_path, "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        # The processes still mapping the previous file keep reading it.
+        os.replace(temporary_path, self.path)
@@ -0,0 +1,179 @@
+import json
+import logging
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+
+LIST_SEPARATOR = ";"  # separator of the flattened lists, as in the `sources` and `references` columns
+EVIDENCE_DIRECTIONS = ("positive", "negative", "directed", "undirected")
+
+logger = logging.getLogger("biocypher")
+
+
+def _distinct(values: Iterable[str]) -> Optional[str]:
+    """Join the distinct values, in the order they are seen, or None if there are none."""
+    return LIST_SEPARATOR.join(dict.fromkeys(values)) or None
+
+
+def _evidence_resources(direction: str) -> Callable[[dict], Optional[str]]:
+    return lambda evidences: _distinct(
+        evidence["resource"] for evidence in evidences.get(direction) or []
+    )
+
+
+def _evidence_count(direction: str) -> Callable[[dict], int]:
+    return lambda evidences: len(evidences.get(direction) or [])
+
+
+def _evidence_references(evidences: dict) -> Optional[str]:
+    return _distinct(
+        reference
+        for direction in EVIDENCE_DIRECTIONS
+        for evidence in evidences.get(direction) or []
+        for reference in evidence.get("references") or []
+    )
+
+
+# The flat columns derived from each JSON column: name -> (pandas dtype, field of the decoded object).
+DERIVED_COLUMNS: Dict[str, Dict[str, tuple]] = {
+    "evidences": {
+        "evidences_positive_resources": ("category", _evidence_resources("positive")),
+        "evidences_negative_resources": ("category", _evidence_resources("negative")),
+        "evidences_references": ("category", _evidence_references),
+        **{
+            f"evidences_nb_{direction}": ("Int64", _evidence_count(direction))
+            for direction in EVIDENCE_DIRECTIONS
+        },
+    },
+    "extra_attrs": {
+        "extra_attrs_keys": ("category", lambda attrs: _distinct(attrs)),
+    },
+}
+
+
+def json_loads(text: str) -> Any:
+    """Decode a JSON document, with orjson if it is installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def json_dumps(value: Any) -> str:
+    """Encode a JSON document, with orjson if it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _decode(text: str) -> Optional[dict]:
+    """Decode a JSON object, or None if the text is not one."""
+    try:
+        document = json_loads(text)
+    except ValueError:  # both json and orjson decoding errors
+        return None
+    return document if isinstance(document, dict) else None
+
+
+def derived_columns() -> List[str]:
+    """
+    List the flat columns that can be derived from the JSON columns.
+
+    Returns:
+        List[str]: The names of the derived columns, usable in the mappings like any other column.
+    """
+    return [name for derived in DERIVED_COLUMNS.values() for name in derived]
+
+
+def source_columns(columns: List[str]) -> List[str]:
+    """
+    Replace the derived columns by the JSON columns they are decoded from.
+
+    Args:
+        columns (List[str]): Column names, e.g. the columns read by a mapping.
+
+    Returns:
+        List[str]: The columns to read from the file, in the same order.
+    """
+    json_column_of = {
+        name: json_column
+        for json_column, derived in DERIVED_COLUMNS.items()
+        for name in derived
+    }
+    return list(dict.fromkeys(json_column_of.get(col, col) for col in columns))
+
+
+def _derive(series: pd.Series, fields: Dict[str, tuple]) -> Dict[str, pd.Series]:
+    """Decode the distinct documents of a JSON column once, and compute the requested fields."""
+    codes, uniques = pd.factorize(series)
+    documents = [_decode(text) for text in np.asarray(uniques, dtype=object)]
+
+    malformed = [position for position, document in enumerate(documents) if document is None]
+    if malformed:
+        logger.warning(
+            f"{int(np.isin(codes, malformed).sum())} values of column '{series.name}' "
+            f"are not JSON objects, their fields are missing"
+        )
+
+    columns = {}
+    for name, (dtype, field) in fields.items():
+        values = [None if document is None else field(document) for document in documents]
+        if dtype == "category":
+            # Many documents share the same field value (e.g. resource names): encode them once.
+            value_codes, categories = pd.factorize(pd.Series(values, dtype=object))
+            column = pd.Categorical.from_codes(
+                np.append(value_codes, -1)[codes], categories=categories
+            )
+        else:
+            column = pd.array(values, dtype=dtype).take(codes, allow_fill=True)
+        columns[name] = pd.Series(column, index=series.index, name=name)
+    return columns
+
+
+def project_json_columns(dataframe: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    Replace the JSON columns of a DataFrame by the flat columns read by a mapping.
+
+    Only the derived columns listed in `columns` are computed, by decoding
+    each distinct JSON document once. A JSON column is dropped once its
+    fields are extracted, unless it is itself listed in `columns`. Missing
+    or malformed documents, and empty lists, give missing values.
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame holding the JSON columns (e.g. `evidences`).
+        columns (List[str]): The columns read by the mapping.
+
+    Returns:
+        pd.DataFrame: The DataFrame with the derived columns, without the unused JSON columns.
+    """
+    for json_column, derivable in DERIVED_COLUMNS.items():
+        if json_column not in dataframe.columns:
+            continue
+
+        fields = {name: spec for name, spec in derivable.items() if name in columns}
+        if fields:
+            start = time.perf_counter()
+            dataframe = dataframe.assign(**_derive(dataframe[json_column], fields))
+            logger.info(
+                f"Decoded column '{json_column}' into {', '.join(fields)} "
+                f"in {time.perf_counter() - start:.2f} s"
+            )
+
+        if json_column not in columns:
+            dataframe = dataframe.drop(columns=json_column)
+            logger.info(f"Dropped column '{json_column}', not read by the mapping")
+    return dataframe
@@ -0,0 +1,324 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+
+try:
+    from opentelemetry import trace
+except ImportError:  # opentelemetry-api is optional
+    trace = None
+
+from omnipath_secondary_adapter.scheduler import peak_rss
+
+
+PROMETHEUS_PREFIX = "omnipath"
+PROMETHEUS_FILE_EXTENSION = ".prom"  # read by the textfile collector of the node exporter
+TRACER_NAME = "omnipath_secondary_adapter"
+TOTAL_STAGE = "total"  # the record summing up a resource
+
+# The measures exported to Prometheus, with their unit suffix and help text.
+PROMETHEUS_MEASURES = {
+    "wall_time": ("seconds", "Wall-clock time of the stage."),
+    "cpu_time": ("cpu_seconds", "CPU time of the process and its terminated workers during the stage."),
+    "peak_rss_delta": ("peak_rss_delta_bytes", "Growth of the peak resident memory during the stage."),
+    "rows": ("rows", "Rows handled by the stage."),
+    "rows_per_second": ("rows_per_second", "Rows handled per second of wall-clock time."),
+    "nodes": ("nodes", "Nodes produced by the stage."),
+    "nodes_per_second": ("nodes_per_second", "Nodes produced per second of wall-clock time."),
+    "edges": ("edges", "Edges produced by the stage."),
+    "edges_per_second": ("edges_per_second", "Edges produced per second of wall-clock time."),
+}
+COUNTS = ("rows", "nodes", "edges")
+
+logger = logging.getLogger("biocypher")
+
+
+def cpu_time() -> float:
+    """CPU time of this process and of its terminated children, e.g. extraction workers."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class StageRecord:
+    """The measures of a stage of a resource: times, memory, and the rows, nodes and edges it handled.
+
+    A stage run several times, e.g. once per chunk, accumulates its times
+    and counts in the same record.
+    """
+
+    def __init__(self, resource_name: str, stage: str):
+        self.resource_name = resource_name
+        self.stage = stage
+        self.start = None  # epoch time of the first run, in seconds
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_rss = 0
+        self.peak_rss_delta = 0
+        self.counts: Dict[str, int] = {}
+
+    def count(self, rows: Optional[int] = None, nodes: Optional[int] = None, edges: Optional[int] = None) -> None:
+        """Add to the rows, nodes or edges handled by the stage."""
+        for name, value in zip(COUNTS, (rows, nodes, edges)):
+            if value is not None:
+                self.counts[name] = self.counts.get(name, 0) + value
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The record as a flat dictionary, with the throughput of each count."""
+        record = {
+            "resource": self.resource_name,
+            "stage": self.stage,
+            "start": datetime.fromtimestamp(self.start).isoformat(timespec="milliseconds"),
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_rss": self.peak_rss,
+            "peak_rss_delta": self.peak_rss_delta,
+        }
+        for name, value in self.counts.items():
+            record[name] = value
+            record[f"{name}_per_second"] = value / self.wall_time if self.wall_time else None
+        return record
+
+
+class StageMetrics:
+    """Measure the stages of the processing of a resource.
+
+    Each stage records its wall-clock time, the CPU time of the process (and
+    of the worker processes that terminated meanwhile), the growth of the
+    peak resident memory of the process, and the number of rows, nodes and
+    edges it handled, with their throughput. Once the resource is processed,
+    or failed, `close` (called on exiting the `with` block) adds a total
+    record and hands all the records to the sinks.
+
+    Args:
+        resource_name (str): The name of the resource, i.e networks, annotations, etc.
+        sinks (Iterable): Objects with a `write(records)` method, see `JsonLinesSink`,
+            `PrometheusSink` and `OpenTelemetrySink`.
+    """
+
+    def __init__(self, resource_name: str, sinks: Iterable = ()):
+        self.resource_name = resource_name
+        self.sinks = list(sinks)
+        self.records: Dict[str, StageRecord] = {}
+        self.start = time.time()
+        self._start_counter, self._start_cpu = time.perf_counter(), cpu_time()
+        self._start_peak = peak_rss()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        """
+        Measure a stage, accumulating in its record if it already ran.
+
+        Args:
+            name (str): The name of the stage, e.g. "load".
+
+        Yields:
+            StageRecord: The record of the stage, to `count` what the stage handled.
+        """
+        record = self.records.setdefault(name, StageRecord(self.resource_name, name))
+        if record.start is None:
+            record.start = time.time()
+        start, cpu_start, peak_start = time.perf_counter(), cpu_time(), peak_rss()
+        try:
+            yield record
+        finally:
+            record.wall_time += time.perf_counter() - start
+            record.cpu_time += cpu_time() - cpu_start
+            record.peak_rss = peak_rss()
+            record.peak_rss_delta += record.peak_rss - peak_start
+
+    def iterate(self, name: str, iterable: Iterable, count_rows: bool = True) -> Iterator[Any]:
+        """
+        Measure the time spent producing the items of an iterator as a stage, e.g. reading chunks.
+
+        Args:
+            name (str): The name of the stage.
+            iterable (Iterable): The iterator, e.g. of DataFrame chunks.
+            count_rows (bool): Whether to count the length of each item as rows.
+
+        Yields:
+            Any: The items of the iterator.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name) as record:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                if count_rows:
+                    record.count(rows=len(item))
+            yield item
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # The stages that ran are reported even if one of them failed.
+        self.close(error=None if exc_type is None else f"{exc_type.__name__}: {exc_value}")
+        return False
+
+    def close(self, error: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Add the total record of the resource, and write every record to the sinks.
+
+        Args:
+            error (Optional[str]): The error the processing of the resource failed with, if any,
+                reported in the total record.
+
+        Returns:
+            List[Dict[str, Any]]: The records, in the order the stages first ran.
+        """
+        total = StageRecord(self.resource_name, TOTAL_STAGE)
+        total.start = self.start
+        total.wall_time = time.perf_counter() - self._start_counter
+        total.cpu_time = cpu_time() - self._start_cpu
+        total.peak_rss = peak_rss()
+        total.peak_rss_delta = total.peak_rss - self._start_peak
+        for name in COUNTS:
+            # The rows read, and the nodes and edges written, by the last stage counting them.
+            values = [record.counts[name] for record in self.records.values() if name in record.counts]
+            if values:
+                total.counts[name] = values[-1]
+
+        total = total.as_dict()
+        if error is not None:
+            total["error"] = error
+        records = [record.as_dict() for record in self.records.values()] + [total]
+        for sink in self.sinks:
+            try:
+                sink.write(records)
+            except Exception as e:  # the metrics never fail the build
+                logger.warning(f"Cannot write the metrics of {self.resource_name}: {e}")
+        for record in records:
+            logger.info(f"Metrics: {json.dumps(record)}")
+        return records
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Sinks      --------------------------------
+# -----------------------------------------------------------------------
+class JsonLinesSink:
+    """Append each record as a line of JSON to a file, shared by the processes of a run.
+
+    Args:
+        path (str): Path to the file.
+        run_id (str): Identifies the run in every line, e.g. its start time.
+    """
+
+    def __init__(self, path: str, run_id: str):
+        self.path = path
+        self.run_id = run_id
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        text = "".join(json.dumps({"run": self.run_id, **record}) + "\n" for record in records)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # A single appending write, so that the lines of concurrent jobs do not interleave.
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, text.encode())
+        finally:
+            os.close(fd)
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class PrometheusSink:
+    """Write the records as gauges in a file of the textfile collector of the node exporter.
+
+    Each resource has its own file, `omnipath_<resource>.prom`, replaced
+    atomically, so that the collector never reads a partial file and
+    concurrent jobs do not overwrite each other.
+
+    Args:
+        directory (str): The directory read by the textfile collector.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        lines = []
+        for measure, (suffix, help_text) in PROMETHEUS_MEASURES.items():
+            samples = [record for record in records if record.get(measure) is not None]
+            if not samples:
+                continue
+            metric = f"{PROMETHEUS_PREFIX}_stage_{suffix}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            lines += [
+                f'{metric}{{resource="{_label_value(record["resource"])}",'
+                f'stage="{_label_value(record["stage"])}"}} {record[measure]}'
+                for record in samples
+            ]
+
+        resource_name = records[0]["resource"]
+        path = os.path.join(self.directory, f"{PROMETHEUS_PREFIX}_{resource_name}{PROMETHEUS_FILE_EXTENSION}")
+        os.makedirs(self.directory, exist_ok=True)
+        temporary_path = f"{path}.tmp"  # not read by the collector
+        with open(temporary_path, "w") as fd:
+            fd.write("\n".join(lines) + "\n")
+        os.replace(temporary_path, path)
+
+
+class OpenTelemetrySink:
+    """Emit the records as OpenTelemetry spans: one per resource, with a child span per stage.
+
+    The spans go to the tracer provider configured for the process, e.g. by
+    the OpenTelemetry SDK or `opentelemetry-instrument`; without one, they
+    are dropped. The measures are the attributes of the spans.
+
+    Raises:
+        ImportError: If `opentelemetry-api` is not installed.
+    """
+
+    def __init__(self):
+        if trace is None:
+            raise ImportError("OpenTelemetry spans need the opentelemetry-api package (otel extra).")
+        self.tracer = trace.get_tracer(TRACER_NAME)
+
+    @staticmethod
+    def _time_ns(record: Dict[str, Any]) -> tuple:
+        start = int(datetime.fromisoformat(record["start"]).timestamp() * 1e9)
+        return start, start + int(record["wall_time"] * 1e9)
+
+    @staticmethod
+    def _attributes(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            f"omnipath.{key}": value
+            for key, value in record.items()
+            if key not in ("start", "stage", "error") and value is not None
+        }
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        *stages, total = records
+        start, end = self._time_ns(total)
+        resource_span = self.tracer.start_span(
+            f"process_resource {total['resource']}",
+            start_time=start,
+            attributes=self._attributes(total),
+        )
+        if "error" in total:
+            resource_span.set_status(trace.Status(trace.StatusCode.ERROR, total["error"]))
+        context = trace.set_span_in_context(resource_span)
+        for record in stages:
+            # Stages run several times (e.g. per chunk) span from their first run, for their total time.
+            stage_start, stage_end = self._time_ns(record)
+            span = self.tracer.start_span(
+                record["stage"],
+                context=context,
+                start_time=stage_start,
+                attributes=self._attributes(record),
+            )
+            span.end(end_time=stage_end)
+        resource_span.end(end_time=end)
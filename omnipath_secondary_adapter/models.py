@@ -2,12 +2,23 @@ from functools import lru_cache
 
 import pandas as pd
 import pandera as pa
-from pandera.typing import Series
+import pyarrow
+from pandera.typing import Category, Series
 
 
 BASE_SCHEMA_NAME = "BaseSchema"
 DEFAULT_PANDAS_TYPE = "object"
 
+# Arrow counterparts of the pandas data types returned by `_map_pandera_to_pandas_type`.
+PANDAS_TO_ARROW_TYPES = {
+    "string": pyarrow.string(),
+    "Int64": pyarrow.int64(),
+    "Float64": pyarrow.float64(),
+    "boolean": pyarrow.bool_(),
+    "datetime64[ns]": pyarrow.timestamp("ns"),
+    "category": pyarrow.dictionary(pyarrow.int32(), pyarrow.string()),
+}
+
 
 def _map_pandera_to_pandas_type(pandera_datatype: pa.typing.pandas.Series) -> str:
     """
@@ -55,6 +66,20 @@ class BasePanderaModel(pa.DataFrameModel):
             raise ValueError("Unsupported Pandera data type found.")
         return dtypes
 
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _return_arrow_dtypes(cls):
+        """Returns a dictionary mapping columns to the Arrow types of their Pandas dtypes.
+
+        Columns falling back to the default `object` dtype are left out,
+        so that the Arrow reader infers their type.
+        """
+        return {
+            col: PANDAS_TO_ARROW_TYPES[pandas_type]
+            for col, pandas_type in cls._return_pandas_dtypes().items()
+            if pandas_type in PANDAS_TO_ARROW_TYPES
+        }
+
     class Config:
         strict = True
         coerce = False  # Redundancy here is intended, to force the type conversion.
@@ -96,15 +121,15 @@ class NetworksPanderaModel(BasePanderaModel):
     dorothea_chipseq: Series[bool] = pa.Field(nullable=True)
     dorothea_tfbs: Series[bool] = pa.Field(nullable=True)
     dorothea_coexp: Series[bool] = pa.Field(nullable=True)
-    dorothea_level: Series[str] = pa.Field(nullable=True)
-    type: Series[str] = pa.Field(nullable=False)
+    dorothea_level: Series[Category] = pa.Field(nullable=True)
+    type: Series[Category] = pa.Field(nullable=False)
     curation_effort: Series[int] = pa.Field(nullable=False)
     extra_attrs: Series[str] = pa.Field(nullable=True)
     evidences: Series[str] = pa.Field(nullable=True)
     ncbi_tax_id_source: Series[int] = pa.Field(nullable=False)
-    entity_type_source: Series[str] = pa.Field(nullable=False)
+    entity_type_source: Series[Category] = pa.Field(nullable=False)
     ncbi_tax_id_target: Series[int] = pa.Field(nullable=False)
-    entity_type_target: Series[str] = pa.Field(nullable=False)
+    entity_type_target: Series[Category] = pa.Field(nullable=False)
 
     # ---- DataFrame Model Configuration
     class Config(BasePanderaModel.Config):
@@ -125,9 +150,9 @@ class EnzymePTMPanderaModel(BasePanderaModel):
     substrate: Series[str] = pa.Field(nullable=False)
     substrate_genesymbol: Series[str] = pa.Field(nullable=False)
     isoforms: Series[str] = pa.Field(nullable=False)
-    residue_type: Series[str] = pa.Field(nullable=False)
+    residue_type: Series[Category] = pa.Field(nullable=False)
     residue_offset: Series[int] = pa.Field(nullable=False)
-    modification: Series[str] = pa.Field(nullable=False)
+    modification: Series[Category] = pa.Field(nullable=False)
     sources: Series[str] = pa.Field(nullable=False)
     references: Series[str] = pa.Field(nullable=True)
     curation_effort: Series[int] = pa.Field(nullable=False)
@@ -136,3 +161,80 @@ class EnzymePTMPanderaModel(BasePanderaModel):
     # ---- DataFrame Model Configuration
     class Config(BasePanderaModel.Config):
         name = BASE_SCHEMA_NAME
+
+
+class ComplexesPanderaModel(BasePanderaModel):
+    """Pandera DataFrame Model for Omnipath Complexes Table.
+    This schema defines the expected structure of the DataFrame
+    containing protein complexes, ensuring type and constraint validation.
+    """
+
+    __slots__ = ()  # to avoid any possible dynamic creation of attributes (fields)
+
+    # ---- Column: Pandera datatype validator
+    name: Series[str] = pa.Field(nullable=True)
+    components: Series[str] = pa.Field(nullable=False)
+    components_genesymbols: Series[str] = pa.Field(nullable=False)
+    stoichiometry: Series[str] = pa.Field(nullable=False)
+    sources: Series[str] = pa.Field(nullable=False)
+    references: Series[str] = pa.Field(nullable=True)
+    identifiers: Series[str] = pa.Field(nullable=True)
+
+    # ---- DataFrame Model Configuration
+    class Config(BasePanderaModel.Config):
+        name = BASE_SCHEMA_NAME
+
+
+class AnnotationsPanderaModel(BasePanderaModel):
+    """Pandera DataFrame Model for Omnipath Annotations Table.
+    This schema defines the expected structure of the DataFrame
+    containing annotation records, ensuring type and constraint validation.
+    Each record is a group of (label, value) rows sharing the same `record_id`.
+    """
+
+    __slots__ = ()  # to avoid any possible dynamic creation of attributes (fields)
+
+    # ---- Column: Pandera datatype validator
+    uniprot: Series[str] = pa.Field(nullable=False)
+    genesymbol: Series[str] = pa.Field(nullable=True)
+    entity_type: Series[Category] = pa.Field(nullable=False)
+    source: Series[Category] = pa.Field(nullable=False)
+    label: Series[Category] = pa.Field(nullable=False)
+    value: Series[str] = pa.Field(nullable=True)
+    record_id: Series[int] = pa.Field(nullable=False, ge=0)
+
+    # ---- DataFrame Model Configuration
+    class Config(BasePanderaModel.Config):
+        name = BASE_SCHEMA_NAME
+
+
+class IntercellPanderaModel(BasePanderaModel):
+    """Pandera DataFrame Model for Omnipath Intercell Table.
+    This schema defines the expected structure of the DataFrame
+    containing intercellular communication roles, ensuring type and constraint validation.
+    """
+
+    __slots__ = ()  # to avoid any possible dynamic creation of attributes (fields)
+
+    # ---- Column: Pandera datatype validator
+    category: Series[Category] = pa.Field(nullable=False)
+    parent: Series[Category] = pa.Field(nullable=False)
+    database: Series[Category] = pa.Field(nullable=False)
+    scope: Series[Category] = pa.Field(nullable=False, isin=["generic", "specific"])
+    aspect: Series[Category] = pa.Field(nullable=False, isin=["functional", "locational"])
+    source: Series[Category] = pa.Field(
+        nullable=False, isin=["composite", "resource_specific"]
+    )
+    uniprot: Series[str] = pa.Field(nullable=False)
+    genesymbol: Series[str] = pa.Field(nullable=True)
+    entity_type: Series[Category] = pa.Field(nullable=False)
+    consensus_score: Series[int] = pa.Field(nullable=False, ge=0)
+    transmitter: Series[bool] = pa.Field(nullable=False)
+    receiver: Series[bool] = pa.Field(nullable=False)
+    secreted: Series[bool] = pa.Field(nullable=False)
+    plasma_membrane_transmembrane: Series[bool] = pa.Field(nullable=False)
+    plasma_membrane_peripheral: Series[bool] = pa.Field(nullable=False)
+
+    # ---- DataFrame Model Configuration
+    class Config(BasePanderaModel.Config):
+        name = BASE_SCHEMA_NAME
@@ -0,0 +1,356 @@
+import glob
+import gzip
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+try:
+    from isal import igzip
+except ImportError:  # python-isal is optional
+    igzip = None
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from biocypher import BioCypher
+
+from omnipath_secondary_adapter.biocypher_api import (
+    array_string,
+    get_writer,
+    is_neo4j_writer,
+    preferred_id,
+    set_import_call_files,
+    write_headers,
+)
+from omnipath_secondary_adapter.extraction import EDGE_SOURCE
+from omnipath_secondary_adapter.graph_tables import (
+    UNIDENTIFIED_EDGE_LABELS,
+    GraphTableWriter,
+    _without_newlines,
+)
+
+
+WRITERS = ("biocypher", "columnar")
+PART_FILE_EXTENSION = ".csv"
+COMPRESSED_FILE_EXTENSION = ".gz"  # read as is by neo4j-admin import
+COMPRESSION_LEVEL = 1
+# Property types written without quotes, as BioCypher does.
+UNQUOTED_TYPES = {"int", "integer", "long", "float", "double", "dbl", "bool", "boolean"}
+PART_NUMBER_PATTERN = re.compile(r"-part(\d+)\.csv")
+
+logger = logging.getLogger("biocypher")
+
+
+def _open_part(path: str, compress: bool):
+    if not compress:
+        return open(path, "wb")
+    if igzip is not None:
+        return igzip.open(path, "wb", compresslevel=COMPRESSION_LEVEL)
+    return gzip.open(path, "wb", compresslevel=COMPRESSION_LEVEL)
+
+
+class Neo4jCsvWriter(GraphTableWriter):
+    """Write node and edge tables as neo4j-admin import files, column by column.
+
+    The files are the ones the BioCypher Neo4j writer produces from the same
+    nodes and edges: a header file per label, part files with the same
+    lines, and the same 'neo4j-admin-import-call.sh'. The labels, the
+    properties kept and their order, the headers and the import call come
+    from the BioCypher instance (its schema, ontology and Neo4j settings),
+    but the lines are formatted a column at a time: each distinct value of a
+    column is quoted once, and the columns are joined with Arrow string
+    kernels instead of serializing each node and edge on its own. Part files
+    can be compressed (`.csv.gz`) and split once they reach a size, and each
+    batch of a label can be split into several parts written by as many
+    threads, which neo4j-admin then parses in parallel.
+
+    As with BioCypher, nodes are written once per ID and edges once per
+    type and ID (or source and target), across all the calls, see
+    `GraphTableWriter`. Edges represented as nodes in the schema are handed
+    to BioCypher.
+
+    Args:
+        bc (BioCypher): The BioCypher instance, configured for Neo4j, whose output
+            directory, schema and settings are used.
+        compress (bool): Whether to gzip the part files.
+        max_part_size (Optional[int]): The maximum size of a part file before compression,
+            in bytes (default: a part per batch of elements, as BioCypher).
+        parts (int): The number of part files each batch of a label is split into, written
+            in parallel.
+
+    Raises:
+        ValueError: If BioCypher is not configured for Neo4j, or in strict mode.
+    """
+
+    def __init__(
+        self,
+        bc: BioCypher,
+        compress: bool = False,
+        max_part_size: Optional[int] = None,
+        parts: int = 1,
+    ):
+        self.writer = get_writer(bc)
+        if not is_neo4j_writer(self.writer):
+            raise ValueError("The columnar writer only writes neo4j-admin import files.")
+        super().__init__(bc)
+        self.compress = compress
+        self.max_part_size = max_part_size
+        self.parts = parts
+
+    # ----- Labels and properties -----
+    def _node_labels(self, ontology_class: str) -> str:
+        """The `:LABEL` value of the nodes of a class, with its ancestors, as BioCypher writes it."""
+        if not self.translator.ontology.get_ancestors(ontology_class):
+            return self.translator.name_sentence_to_pascal(ontology_class)
+
+        labels = self._ancestor_labels(ontology_class)
+        order = self.writer.labels_order
+        if order == "Alphabetical":
+            labels.sort()
+        elif order == "Descending":
+            labels.reverse()
+        elif order == "Leaves":
+            labels = labels[:1]
+        return array_string(self.writer, labels)
+
+    def _format(self, values: np.ndarray, property_type: str, replace_newlines: bool) -> np.ndarray:
+        """Format the values of a property as BioCypher does, each distinct value once."""
+        try:
+            codes, uniques = pd.factorize(values)
+        except TypeError:  # lists
+            codes, uniques = np.arange(len(values)), values
+        texts = []
+        for value in np.asarray(uniques, dtype=object):
+            if replace_newlines:
+                value = _without_newlines(value)
+            if value is None:
+                texts.append("")
+            elif property_type in UNQUOTED_TYPES:
+                texts.append(str(value))
+            elif isinstance(value, list):
+                texts.append(array_string(self.writer, value))
+            else:
+                texts.append(f"{self.writer.quote}{value}{self.writer.quote}")
+        return np.array(texts + [""], dtype=object)[codes]
+
+    # ----- Part files -----
+    def _next_part(self, pascal_label: str) -> int:
+        paths = glob.glob(os.path.join(self.writer.outdir, f"{pascal_label}-part*{PART_FILE_EXTENSION}*"))
+        numbers = [int(match.group(1)) for match in map(PART_NUMBER_PATTERN.search, paths) if match]
+        return max(numbers) + 1 if numbers else 0
+
+    def _part_bounds(self, offsets: np.ndarray) -> List[int]:
+        """The first line of each part: `parts` parts of about the same size, split at `max_part_size`."""
+        nb_lines = len(offsets) - 1
+        sizes = (offsets[-1] - offsets[0]) * np.arange(1, self.parts) / self.parts
+        bounds = sorted({0, nb_lines, *np.searchsorted(offsets, offsets[0] + sizes).tolist()})
+        if not self.max_part_size:
+            return bounds
+
+        split_bounds = [0]
+        for end in bounds[1:]:
+            start = split_bounds[-1]
+            while start < end:
+                start = int(np.searchsorted(offsets, offsets[start] + self.max_part_size, side="right")) - 1
+                start = min(max(start, split_bounds[-1] + 1), end)
+                split_bounds.append(start)
+        return split_bounds
+
+    def _write_lines(self, pascal_label: str, columns: List[np.ndarray]) -> None:
+        """Join the columns into lines and write them to new part files, in parallel."""
+        lines = pc.binary_join_element_wise(
+            *[pa.array(column, type=pa.large_string()) for column in columns],
+            pa.scalar(self.writer.delim, type=pa.large_string()),
+        )
+        lines = pc.binary_join_element_wise(
+            lines, pa.scalar("\n", type=pa.large_string()), pa.scalar("", type=pa.large_string())
+        )
+        # The lines are contiguous in the data buffer of the array: parts are slices of it.
+        offsets = np.frombuffer(lines.buffers()[1], dtype=np.int64)[lines.offset : lines.offset + len(lines) + 1]
+        data = memoryview(lines.buffers()[2]) if len(lines) else memoryview(b"")
+
+        os.makedirs(self.writer.outdir, exist_ok=True)
+        bounds = self._part_bounds(offsets)
+        first_part = self._next_part(pascal_label)
+        parts = []
+        for n_part, (start, end) in enumerate(zip(bounds[:-1], bounds[1:]), first_part):
+            part = f"{pascal_label}-part{str(n_part).zfill(3)}{PART_FILE_EXTENSION}"
+            if self.compress:
+                part += COMPRESSED_FILE_EXTENSION
+            logger.info(f"Writing {end - start} entries to {part}")
+            parts.append((part, data[offsets[start] : offsets[end]]))
+
+        def write_part(part: str, part_data: memoryview) -> None:
+            with _open_part(os.path.join(self.writer.outdir, part), self.compress) as fd:
+                fd.write(part_data)
+
+        if len(parts) > 1 and self.parts > 1:
+            # Writing and compressing release the GIL: the parts are written by threads.
+            with ThreadPoolExecutor(max_workers=min(self.parts, len(parts))) as pool:
+                list(pool.map(lambda part: write_part(*part), parts))
+        else:
+            for part in parts:
+                write_part(*part)
+        self.writer.parts.setdefault(pascal_label, []).extend(part for part, _ in parts)
+
+    # ----- Nodes and edges -----
+    def _write_node_rows(self, ontology_class: str, ids: np.ndarray, properties: pd.DataFrame) -> None:
+        properties = properties.assign(id=ids, preferred_id=preferred_id(self.translator, ontology_class))
+        property_types = self._property_types(ontology_class, properties)
+        if self.schema.get(ontology_class, {}).get("properties"):
+            property_types.update(id="str", preferred_id="str")
+
+        columns = [ids]
+        columns += [
+            self._format(properties[name].to_numpy() if name in properties else np.full(len(ids), None), kind, True)
+            for name, kind in property_types.items()
+        ]
+        columns.append(np.full(len(ids), self._node_labels(ontology_class), dtype=object))
+        self._write_lines(self._pascal(ontology_class), columns)
+        self.writer.node_property_dict[ontology_class] = property_types
+
+    def _write_edge_rows(
+        self,
+        edge_label: str,
+        schema_label: Optional[str],
+        sources: np.ndarray,
+        targets: np.ndarray,
+        edge_ids: np.ndarray,
+        properties: pd.DataFrame,
+        property_types: Dict[str, str],
+    ) -> None:
+        skip_id = edge_label in UNIDENTIFIED_EDGE_LABELS or (
+            schema_label is not None and self.schema[schema_label].get("use_id") is False
+        )
+        columns = [sources]
+        if not skip_id:
+            columns.append(np.array([edge_id or "" for edge_id in edge_ids], dtype=object))
+        nb_edges = len(sources)
+        columns += [
+            self._format(properties[name].to_numpy() if name in properties else np.full(nb_edges, None), kind, False)
+            for name, kind in property_types.items()
+        ]
+        columns.append(targets)
+        columns.append(np.full(nb_edges, self.translator.name_sentence_to_pascal(edge_label), dtype=object))
+        self._write_lines(self._pascal(edge_label), columns)
+        self.writer.edge_property_dict[edge_label] = property_types
+
+    def _finish_nodes(self) -> None:
+        if self.writer.node_property_dict:
+            write_headers(self.writer, "nodes")
+
+    def _finish_edges(self) -> None:
+        if self.writer.edge_property_dict:
+            write_headers(self.writer, "edges")
+
+    def _write_edges_as_nodes(self, edges: List[tuple]) -> None:
+        self.biocypher.write_edges(edges)
+
+    def write_import_call(self) -> str:
+        """
+        Write the neo4j-admin import script listing the header and part files, as BioCypher does.
+
+        Returns:
+            str: The path to the import script.
+        """
+        return self.writer.write_import_call()
+
+
+def graph_writer(
+    bc: BioCypher,
+    writer: str = "biocypher",
+    compress: bool = False,
+    max_part_size: Optional[int] = None,
+    parts: int = 1,
+) -> Any:
+    """
+    Choose the writer of the nodes and edges.
+
+    Args:
+        bc (BioCypher): The BioCypher instance of the resource.
+        writer (str): Either "biocypher", to write through BioCypher, or "columnar", see
+            `Neo4jCsvWriter`.
+        compress (bool): Whether the columnar writer gzips the part files.
+        max_part_size (Optional[int]): The maximum size of a part file of the columnar writer,
+            in bytes.
+        parts (int): The number of part files the columnar writer splits each batch of a label
+            into.
+
+    Returns:
+        Any: An object with the `write_nodes`, `write_edges` and `write_import_call`
+            methods of BioCypher.
+    """
+    if writer == "columnar":
+        return Neo4jCsvWriter(bc, compress=compress, max_part_size=max_part_size, parts=parts)
+    return bc
+
+
+def _import_call_path(writer: Any, path: str) -> str:
+    """The path of a file in the import call, relative to the import call prefix of the writer."""
+    relative_path = os.path.relpath(path, writer.outdir)
+    return os.path.normpath(os.path.join(writer.import_call_file_prefix, relative_path))
+
+
+def write_merged_import_call(bc: BioCypher, directories: Iterable[str]) -> str:
+    """
+    Write a single neo4j-admin import script importing the output of several resources.
+
+    Every header file of the directories is listed, with each of its part
+    files named explicitly, so that neo4j-admin imports all the resources
+    into one database and parses the part files in parallel. Labels whose
+    header files are the same across resources (e.g. `Protein`) are imported
+    as one group of files. Nodes shared by resources are imported once,
+    provided the Neo4j settings skip duplicate nodes.
+
+    Args:
+        bc (BioCypher): The BioCypher instance whose Neo4j settings (delimiters, database,
+            import call prefix...) are used, and whose output directory gets the script.
+        directories (Iterable[str]): The output directories of the resources.
+
+    Returns:
+        str: The path to the import script.
+
+    Raises:
+        ValueError: If BioCypher is not configured for Neo4j.
+    """
+    writer = get_writer(bc)
+    if not is_neo4j_writer(writer):
+        raise ValueError("The merged import call is a neo4j-admin import script.")
+
+    directories = list(directories)
+    groups: Dict[tuple, List[str]] = {}
+    for directory in directories:
+        for header_path in sorted(glob.glob(os.path.join(directory, "*-header.csv"))):
+            pascal_label = os.path.basename(header_path)[: -len("-header.csv")]
+            part_paths = sorted(
+                path
+                for path in glob.glob(os.path.join(directory, f"{pascal_label}-part*"))
+                if PART_NUMBER_PATTERN.search(os.path.basename(path))
+            )
+            if not part_paths:
+                continue
+            with open(header_path, encoding="utf-8") as fd:
+                header = fd.read()
+            kind = "edges" if EDGE_SOURCE in header.split(writer.delim) else "nodes"
+            groups.setdefault((kind, header), [header_path]).extend(part_paths)
+
+    # Lists rather than the sets of BioCypher, so that the files keep their order.
+    entries = {"nodes": [], "edges": []}
+    for (kind, _), paths in groups.items():
+        header_path, *part_paths = [_import_call_path(writer, path) for path in paths]
+        entries[kind].append((header_path, ",".join(part_paths)))
+    set_import_call_files(writer, entries["nodes"], entries["edges"])
+    logger.info(
+        f"Merging {len(entries['nodes'])} node and {len(entries['edges'])} "
+        f"edge file groups of {len(directories)} directories into one import call."
+    )
+    return writer.write_import_call()
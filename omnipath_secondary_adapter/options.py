@@ -0,0 +1,67 @@
+import argparse
+from dataclasses import (
+    dataclass,
+    fields,
+)
+from typing import (
+    List,
+    Optional,
+)
+
+from omnipath_secondary_adapter.scheduler import MEGABYTE
+
+
+@dataclass(frozen=True)
+class PipelineOptions:
+    """The options each resource of a run is processed with.
+
+    They are the command line options of 'weave_knowledge_graph.py' of the
+    same names, which describes them: only the resources to process, how
+    many are processed at a time, and the verbosity are not options of a
+    resource. The defaults are the ones of the command line, except for
+    `fusion`, which the command line sets to "disk" with `chunksize`.
+
+    Being frozen and picklable, an instance is shared as is by the resource
+    processes and the worker processes they start.
+    """
+
+    # Loading
+    chunksize: Optional[int] = None
+    cache: bool = True
+    engine: str = "c"
+    columns: str = "all"
+    filters: Optional[List[str]] = None
+    filter_file: Optional[str] = None
+    validation: str = "off"
+    # Extraction
+    extractor: str = "ontoweaver"
+    workers: int = 1
+    # Fusion and writing
+    fusion: str = "ontoweaver"
+    intern_ids: bool = False
+    output: str = "neo4j"
+    writer: str = "biocypher"
+    compress: bool = False
+    part_size: Optional[int] = None  # megabytes
+    parts: int = 1
+    # Incremental builds
+    delta: bool = False
+    checkpoint: bool = False
+    resume: bool = False
+    # Checks and measures
+    qa: bool = False
+    metrics: Optional[str] = None
+    metrics_prometheus: Optional[str] = None
+    metrics_otel: bool = False
+    run_id: Optional[str] = None  # identifies the run in the JSON lines of `metrics`
+
+    @classmethod
+    def from_arguments(cls, cli_arguments: argparse.Namespace) -> "PipelineOptions":
+        """Gather the options among the parsed command line arguments, ignoring the other ones."""
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in vars(cli_arguments).items() if key in names})
+
+    @property
+    def max_part_size(self) -> Optional[int]:
+        """The size, in bytes, at which the columnar writer splits the part files, if any."""
+        return self.part_size * MEGABYTE if self.part_size else None
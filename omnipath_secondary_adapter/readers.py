@@ -0,0 +1,402 @@
+import io
+import logging
+import sys
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+
+from omnipath_secondary_adapter.decompress import (
+    open_source,
+    pause_parsing,
+)
+
+
+ENGINES = ("c", "pyarrow")
+
+TSV_DELIMITER = "\t"
+TRUE_VALUES = ["True", "true", "1"]
+FALSE_VALUES = ["False", "false", "0"]
+ARROW_BLOCK_SIZE = 16 * 1024**2  # bytes of text parsed at once by each pyarrow thread
+FILTER_BLOCK_ROWS = 50_000  # rows parsed at once when filtering a whole file
+CATEGORICAL_MAX_RATIO = 0.05  # distinct values per row under which a text column is encoded
+POINTER_SIZE = 8  # bytes of each row of an object column
+
+logger = logging.getLogger("biocypher")
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Arrow options      ------------------------
+# -----------------------------------------------------------------------
+def _read_options() -> pv.ReadOptions:
+    return pv.ReadOptions(use_threads=True, block_size=ARROW_BLOCK_SIZE)
+
+
+def _parse_options() -> pv.ParseOptions:
+    return pv.ParseOptions(delimiter=TSV_DELIMITER)
+
+
+def _convert_options(
+    column_types: Dict[str, pa.DataType],
+    columns: Optional[List[str]] = None,
+) -> pv.ConvertOptions:
+    return pv.ConvertOptions(
+        column_types=column_types,
+        include_columns=columns or [],  # an empty list reads every column
+        true_values=TRUE_VALUES,
+        false_values=FALSE_VALUES,
+        strings_can_be_null=True,
+    )
+
+
+def read_header(resource_path: str) -> List[str]:
+    """
+    Read the column names of a (possibly compressed) TSV file.
+
+    Args:
+        resource_path (str): Path to the TSV file.
+
+    Returns:
+        List[str]: The column names.
+    """
+    with pa.input_stream(resource_path, compression="detect") as stream:
+        with io.TextIOWrapper(stream, encoding="utf-8") as text:
+            header = text.readline()
+    return header.rstrip("\r\n").split(TSV_DELIMITER)
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Conversion      ---------------------------
+# -----------------------------------------------------------------------
+def cast_columns(table: pa.Table, arrow_types: Dict[str, pa.DataType]) -> pa.Table:
+    """
+    Convert the columns of an Arrow table one by one to their expected type.
+
+    A column that cannot be converted is kept as read, and a warning is logged.
+
+    Args:
+        table (pa.Table): The table read from the TSV file.
+        arrow_types (Dict[str, pa.DataType]): The expected Arrow type of each column.
+
+    Returns:
+        pa.Table: The converted table.
+    """
+    for col, arrow_type in arrow_types.items():
+        index = table.schema.get_field_index(col)
+        if index < 0 or table.schema.field(index).type == arrow_type:
+            continue
+        try:
+            column = pc.cast(table.column(index), arrow_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            logger.warning(
+                f"Column `{col}` cannot be converted to {arrow_type}, keeping it as "
+                f"{table.schema.field(index).type}: {e}"
+            )
+            continue
+        table = table.set_column(index, col, column)
+    return table
+
+
+def arrow_types_mapper(arrow_type: pa.DataType) -> Optional[pd.ArrowDtype]:
+    """
+    Map Arrow types to `ArrowDtype`, except dictionaries which become pandas categoricals.
+
+    Args:
+        arrow_type (pa.DataType): The Arrow type of a column.
+
+    Returns:
+        Optional[pd.ArrowDtype]: The pandas dtype, or None to use the default conversion.
+    """
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+def table_to_dataframe(
+    table: pa.Table,
+    row_mask: Optional[Callable[[pa.Table], np.ndarray]] = None,
+    offset: int = 0,
+    types_mapper: Optional[Callable] = arrow_types_mapper,
+) -> pd.DataFrame:
+    """
+    Convert the rows of an Arrow table selected by a mask into a pandas DataFrame.
+
+    The rows are filtered on the Arrow side, so that the rejected ones are
+    never converted. They keep their position in the file as index.
+
+    Args:
+        table (pa.Table): The table to convert, starting at row `offset` of the file.
+        row_mask (Optional[Callable[[pa.Table], np.ndarray]]): Computes which rows to keep,
+            e.g. `filters.table_mask` (default: all of them).
+        offset (int): The position in the file of the first row of the table.
+        types_mapper (Optional[Callable]): Mapping from Arrow types to pandas dtypes.
+
+    Returns:
+        pd.DataFrame: The kept rows.
+    """
+    if row_mask is None:
+        dataframe = table.to_pandas(types_mapper=types_mapper)
+        dataframe.index = pd.RangeIndex(offset, offset + len(dataframe))
+        return dataframe
+
+    mask = row_mask(table)
+    # Unlike `take`, `filter` selects the rows chunk by chunk, without concatenating the chunks first.
+    dataframe = table.filter(pa.array(mask)).to_pandas(types_mapper=types_mapper)
+    dataframe.index = pd.Index(np.flatnonzero(mask) + offset)
+    return dataframe
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Readers      ------------------------------
+# -----------------------------------------------------------------------
+def read_table_arrow(
+    resource_path: str,
+    arrow_types: Dict[str, pa.DataType],
+    columns: Optional[List[str]] = None,
+    row_mask: Optional[Callable[[pa.Table], np.ndarray]] = None,
+) -> pd.DataFrame:
+    """
+    Read a (possibly compressed) TSV file with the multithreaded pyarrow CSV reader.
+
+    Gzip-compressed files are decompressed in a background thread while being
+    parsed, see `decompress.open_source`. The columns are converted at parse time to the given types. If one of them
+    cannot be, the file is read again with those columns as strings and they are
+    converted one by one, so that only the faulty columns stay as strings.
+
+    When rows are filtered, the file is streamed by blocks of `FILTER_BLOCK_ROWS`
+    rows instead, each filtered as soon as it is parsed, so that the whole
+    table is never held.
+
+    Args:
+        resource_path (str): Path to the TSV file.
+        arrow_types (Dict[str, pa.DataType]): The expected Arrow type of each column.
+        columns (Optional[List[str]]): The columns to read, in file order (default: all).
+            The other columns are skipped by the parser.
+        row_mask (Optional[Callable[[pa.Table], np.ndarray]]): Computes which rows to keep,
+            see `table_to_dataframe` (default: all of them).
+
+    Returns:
+        pd.DataFrame: The DataFrame of `ArrowDtype` columns.
+    """
+    if row_mask is not None:
+        blocks = list(
+            iter_table_arrow(resource_path, arrow_types, FILTER_BLOCK_ROWS, columns, row_mask)
+        )
+        if blocks:
+            return pd.concat(blocks)
+        # No row at all: the columns of the header, with their expected types.
+        return table_to_dataframe(
+            pa.schema(
+                (col, arrow_types.get(col, pa.string()))
+                for col in read_header(resource_path)
+                if columns is None or col in columns
+            ).empty_table()
+        )
+
+    try:
+        with open_source(resource_path) as source:
+            table = pv.read_csv(
+                source,
+                read_options=_read_options(),
+                parse_options=_parse_options(),
+                convert_options=_convert_options(arrow_types, columns),
+            )
+    except pa.ArrowInvalid as e:
+        logger.warning(f"Typed parsing failed, converting columns one by one: {e}")
+        with open_source(resource_path) as source:
+            table = pv.read_csv(
+                source,
+                read_options=_read_options(),
+                parse_options=_parse_options(),
+                convert_options=_convert_options(
+                    {col: pa.string() for col in arrow_types}, columns
+                ),
+            )
+        table = cast_columns(table, arrow_types)
+
+    return table_to_dataframe(table)
+
+
+def iter_table_arrow(
+    resource_path: str,
+    arrow_types: Dict[str, pa.DataType],
+    chunksize: int,
+    columns: Optional[List[str]] = None,
+    row_mask: Optional[Callable[[pa.Table], np.ndarray]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a (possibly compressed) TSV file with the pyarrow CSV reader.
+
+    Every column is parsed as a string, then converted chunk by chunk, so that
+    the types of the successive chunks do not depend on type inference.
+
+    Args:
+        resource_path (str): Path to the TSV file.
+        arrow_types (Dict[str, pa.DataType]): The expected Arrow type of each column.
+        chunksize (int): The maximum number of rows per chunk.
+        columns (Optional[List[str]]): The columns to read, in file order (default: all).
+        row_mask (Optional[Callable[[pa.Table], np.ndarray]]): Computes which rows of each
+            chunk to keep, see `table_to_dataframe` (default: all of them).
+
+    Yields:
+        pd.DataFrame: The successive chunks of `ArrowDtype` columns, possibly filtered.
+    """
+    column_types = {
+        col: pa.string()
+        for col in read_header(resource_path)
+        if columns is None or col in columns
+    }
+    with open_source(resource_path) as source:
+        yield from _iter_batches(source, column_types, arrow_types, chunksize, row_mask)
+
+
+def _iter_batches(
+    source,
+    column_types: Dict[str, pa.DataType],
+    arrow_types: Dict[str, pa.DataType],
+    chunksize: int,
+    row_mask: Optional[Callable[[pa.Table], np.ndarray]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Rebatch the record batches of the streaming CSV reader into chunks of `chunksize` rows."""
+    reader = pv.open_csv(
+        source,
+        read_options=_read_options(),
+        parse_options=_parse_options(),
+        convert_options=_convert_options(column_types, list(column_types)),
+    )
+
+    offset = 0
+    pending, nb_pending = [], 0
+
+    def make_chunk(batches):
+        table = cast_columns(pa.Table.from_batches(batches), arrow_types)
+        return table_to_dataframe(table, row_mask, offset)
+
+    for batch in reader:
+        pending.append(batch)
+        nb_pending += batch.num_rows
+        while nb_pending >= chunksize:
+            table = pa.Table.from_batches(pending)
+            chunk = make_chunk(table.slice(0, chunksize).to_batches())
+            with pause_parsing(source):
+                yield chunk
+            offset += chunksize
+            pending = table.slice(chunksize).to_batches()
+            nb_pending -= chunksize
+
+    if nb_pending:
+        chunk = make_chunk(pending)
+        with pause_parsing(source):
+            yield chunk
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Categorical encoding      -----------------
+# -----------------------------------------------------------------------
+def low_cardinality_columns(
+    dataframe: pd.DataFrame,
+    max_ratio: float = CATEGORICAL_MAX_RATIO,
+) -> List[str]:
+    """
+    Find the text columns whose number of distinct values is small compared to the number of rows.
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame (or first chunk of it) to inspect.
+        max_ratio (float): The maximum number of distinct values per row.
+
+    Returns:
+        List[str]: The names of the columns worth dictionary-encoding.
+    """
+    if dataframe.empty:
+        return []
+
+    return [
+        col
+        for col, dtype in dataframe.dtypes.items()
+        if not isinstance(dtype, pd.CategoricalDtype)
+        and pd.api.types.is_string_dtype(dtype)
+        and dataframe[col].nunique() <= max_ratio * len(dataframe)
+    ]
+
+
+def encode_categorical(dataframe: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    Dictionary-encode the given columns as pandas categoricals.
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame to encode.
+        columns (List[str]): The columns to encode; missing or already encoded ones are skipped.
+
+    Returns:
+        pd.DataFrame: The encoded DataFrame.
+    """
+    for col in columns:
+        if col not in dataframe or isinstance(dataframe[col].dtype, pd.CategoricalDtype):
+            continue
+        if isinstance(dataframe[col].dtype, pd.ArrowDtype):
+            # Encode on the Arrow side, so that categories match the ones read from the cache.
+            encoded = pa.array(dataframe[col]).dictionary_encode().to_pandas()
+            dataframe[col] = pd.Categorical(encoded)
+        else:
+            dataframe[col] = dataframe[col].astype("category")
+    return dataframe
+
+
+def share_categories(dataframe: pd.DataFrame, categories: Dict[str, pd.Index]) -> pd.DataFrame:
+    """
+    Give the categorical columns of a chunk the categories of the previous chunks.
+
+    The values not seen in the previous chunks are appended to their
+    categories, so that the categories of a chunk always start with the ones
+    of the chunk before it: written to an Arrow IPC file, the dictionaries of
+    the columns then only grow by deltas, instead of being replaced.
+
+    Args:
+        dataframe (pd.DataFrame): The encoded chunk.
+        categories (Dict[str, pd.Index]): The categories of each column so far, updated in place.
+
+    Returns:
+        pd.DataFrame: The chunk, with the shared categories.
+    """
+    for col, dtype in dataframe.dtypes.items():
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+        known = categories.get(col)
+        if known is None:
+            categories[col] = dtype.categories
+            continue
+        if not dtype.categories.equals(known):
+            categories[col] = known.append(dtype.categories.difference(known, sort=False))
+            dataframe[col] = dataframe[col].cat.set_categories(categories[col])
+    return dataframe
+
+
+def categorical_memory_saved(dataframe: pd.DataFrame) -> int:
+    """
+    Estimate the memory saved by the categorical columns compared to one string object per row.
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame to inspect.
+
+    Returns:
+        int: The number of bytes saved.
+    """
+    saved = 0
+    for col, dtype in dataframe.dtypes.items():
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+        codes = dataframe[col].cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(dtype.categories))
+        sizes = np.array([sys.getsizeof(str(value)) for value in dtype.categories])
+        as_text = int((counts * sizes).sum()) + POINTER_SIZE * len(codes)
+        saved += as_text - dataframe[col].memory_usage(index=False, deep=True)
+    return saved
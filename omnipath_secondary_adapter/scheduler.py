@@ -0,0 +1,270 @@
+import logging
+import multiprocessing
+import os
+import resource
+import signal
+import sys
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import (
+    Connection,
+    wait,
+)
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+)
+
+
+START_METHOD = "spawn"  # each job starts from a fresh interpreter, see sharding.START_METHOD
+MEGABYTE = 1024**2
+RUSAGE_UNIT = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is in bytes on macOS, KB on Linux
+PROC_STATUS_PATH = "/proc/self/status"  # Linux only
+PROC_DIRECTORY = "/proc"  # Linux only
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096  # bytes, unit of /proc/PID/statm
+POLL_INTERVAL = 0.2  # seconds between two checks of the memory of the jobs and of their inputs
+
+logger = logging.getLogger("biocypher")
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Reports      ------------------------------
+# -----------------------------------------------------------------------
+class JobReport:
+    """Outcome of a job: its wall-clock time, peak resident memory and error, if any."""
+
+    def __init__(
+        self,
+        name: str,
+        wall_time: float,
+        peak_rss: Optional[int] = None,
+        error: Optional[str] = None,
+    ):
+        self.name = name
+        self.wall_time = wall_time
+        self.peak_rss = peak_rss
+        self.error = error
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+    def __str__(self) -> str:
+        peak_rss = "unknown" if self.peak_rss is None else f"{self.peak_rss / MEGABYTE:.0f} MB"
+        status = "done" if self.succeeded else f"FAILED ({self.error})"
+        return f"{self.name}: {status} in {self.wall_time:.1f} s, peak RSS {peak_rss}"
+
+
+def _own_peak_rss() -> int:
+    """
+    Peak resident memory of the current process, in bytes.
+
+    On Linux, `ru_maxrss` survives `exec`: a spawned process starts with the
+    resident memory of its parent at the time of the fork. The high water
+    mark of its own address space (`VmHWM`) is used instead.
+    """
+    try:
+        with open(PROC_STATUS_PATH) as fd:
+            for line in fd:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RUSAGE_UNIT
+
+
+def peak_rss() -> int:
+    """
+    Peak resident memory of the current process and of its largest terminated child.
+
+    Returns:
+        int: The peak resident set size, in bytes.
+    """
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * RUSAGE_UNIT
+    return max(_own_peak_rss(), children)
+
+
+def _descendants(pid: int) -> List[int]:
+    """The process and all the processes it started, still running, e.g. extraction workers."""
+    children = {}
+    for entry in os.listdir(PROC_DIRECTORY):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(os.path.join(PROC_DIRECTORY, entry, "stat")) as fd:
+                stat = fd.read()
+        except OSError:  # the process ended meanwhile
+            continue
+        # The parent PID follows the state, after the command name, which may hold spaces.
+        parent = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(parent, []).append(int(entry))
+
+    tree, stack = [], [pid]
+    while stack:
+        tree.append(stack.pop())
+        stack.extend(children.get(tree[-1], []))
+    return tree
+
+
+def tree_rss(pid: int) -> Optional[int]:
+    """
+    Resident memory of a process and of all its descendants.
+
+    Args:
+        pid (int): The process ID.
+
+    Returns:
+        Optional[int]: The sum of their resident set sizes, in bytes, or None where it
+            cannot be measured (no `/proc`, i.e. not on Linux).
+    """
+    if not os.path.isdir(os.path.join(PROC_DIRECTORY, str(pid))):
+        return None
+    total = 0
+    for process_id in _descendants(pid):
+        try:
+            with open(os.path.join(PROC_DIRECTORY, str(process_id), "statm")) as fd:
+                total += int(fd.read().split()[1]) * PAGE_SIZE
+        except (OSError, IndexError, ValueError):  # the process ended meanwhile
+            continue
+    return total
+
+
+def kill_tree(pid: int) -> None:
+    """Kill a process and all its descendants, e.g. a job and its extraction workers."""
+    for process_id in reversed(_descendants(pid)):
+        try:
+            os.kill(process_id, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Scheduler      ----------------------------
+# -----------------------------------------------------------------------
+def _run_job(
+    connection: Connection,
+    name: str,
+    function: Callable,
+    kwargs: Dict[str, Any],
+) -> None:
+    """Job process entry point: run the function and send back its peak memory and error."""
+    error = None
+    try:
+        function(**kwargs)
+    except Exception as e:
+        logger.exception(f"Job {name} failed")
+        error = f"{type(e).__name__}: {e}"
+
+    connection.send((peak_rss(), error))
+    connection.close()
+    if error is not None:
+        sys.exit(1)
+
+
+def _is_ready(kwargs: Dict[str, Any]) -> bool:
+    return all(value.done() for value in kwargs.values() if isinstance(value, Future))
+
+
+def _resolved(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value.result() if isinstance(value, Future) else value for key, value in kwargs.items()}
+
+
+def run_jobs(
+    function: Callable,
+    jobs: Dict[str, Dict[str, Any]],
+    max_jobs: int = 1,
+    memory_budget: Optional[int] = None,
+) -> Dict[str, JobReport]:
+    """
+    Run independent jobs, each in its own process, at most `max_jobs` at a time.
+
+    A job failing, even killed, does not stop the others. The arguments of a
+    job may be futures, e.g. of the files being downloaded: the job starts
+    once they are all done, with their results, so that the jobs whose
+    inputs are ready start first; a job with a failed future fails without
+    starting.
+
+    With a memory budget, the resident memory of each job and of the
+    processes it started (e.g. extraction workers) is checked every
+    `POLL_INTERVAL` seconds, and a job exceeding its budget is killed with its
+    processes. On platforms without `/proc`, the budget is not enforced.
+
+    Args:
+        function (Callable): A module-level function, called with the keyword arguments of each job.
+        jobs (Dict[str, Dict[str, Any]]): The keyword arguments of each job, by job name, some of
+            them possibly futures.
+        max_jobs (int): The maximum number of jobs running at the same time.
+        memory_budget (Optional[int]): The memory limit of each job, in bytes, see `tree_rss`.
+
+    Returns:
+        Dict[str, JobReport]: The report of each job, in the order of `jobs`.
+    """
+    context = multiprocessing.get_context(START_METHOD)
+    pending = list(jobs.items())
+    running = {}
+    reports = {}
+    peaks, exceeded = {}, set()
+    if memory_budget and not os.path.isdir(PROC_DIRECTORY):
+        logger.warning("The memory budget cannot be enforced on this platform, which has no /proc")
+
+    while pending or running:
+        for name, kwargs in [job for job in pending if _is_ready(job[1])]:
+            if len(running) >= max_jobs:
+                break
+            pending.remove((name, kwargs))
+            try:
+                kwargs = _resolved(kwargs)
+            except Exception as e:
+                logger.error(f"Job {name} not started, as one of its inputs failed: {e}")
+                reports[name] = JobReport(name, 0.0, error=f"input failed: {type(e).__name__}: {e}")
+                continue
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_run_job,
+                args=(sender, name, function, kwargs),
+                name=f"job-{name}",
+            )
+            process.start()
+            sender.close()
+            running[process.sentinel] = (name, process, receiver, time.perf_counter())
+            logger.info(f"Started job {name} (pid {process.pid})")
+        if not running:
+            if pending:
+                time.sleep(POLL_INTERVAL)  # waiting for the inputs of the pending jobs
+            continue
+
+        waiting = memory_budget or any(not _is_ready(kwargs) for _, kwargs in pending)
+        for sentinel in wait(list(running), timeout=POLL_INTERVAL if waiting else None):
+            name, process, receiver, start = running.pop(sentinel)
+            process.join()
+            wall_time = time.perf_counter() - start
+
+            try:
+                job_peak_rss, error = receiver.recv()
+            except EOFError:  # the job died before reporting, e.g. killed
+                job_peak_rss, error = peaks.get(name), f"process exited with code {process.exitcode}"
+            receiver.close()
+            if name in exceeded:
+                error = f"memory budget of {memory_budget / MEGABYTE:.0f} MB exceeded"
+
+            reports[name] = JobReport(name, wall_time, job_peak_rss, error)
+            logger.info(f"Finished job {name} (exit code {process.exitcode})")
+
+        if memory_budget:
+            for name, process, _, _ in running.values():
+                rss = tree_rss(process.pid)
+                if rss is None or name in exceeded:
+                    continue
+                peaks[name] = max(peaks.get(name, 0), rss)
+                if rss > memory_budget:
+                    logger.error(
+                        f"Job {name} uses {rss / MEGABYTE:.0f} MB, over its memory budget of "
+                        f"{memory_budget / MEGABYTE:.0f} MB: killing it"
+                    )
+                    exceeded.add(name)
+                    kill_tree(process.pid)
+
+    return {name: reports[name] for name in jobs}
@@ -0,0 +1,196 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+)
+from contextlib import nullcontext
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from omnipath_secondary_adapter.cache import read_cached_table
+from omnipath_secondary_adapter.readers import arrow_types_mapper
+
+
+MIN_SHARD_ROWS = 10_000  # rows under which a shard is not worth a worker process
+SHARED_FILE_NAME = "shards.arrow"
+START_METHOD = "spawn"  # forking after pyarrow started its thread pools is unsafe
+
+logger = logging.getLogger("biocypher")
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Workers      ------------------------------
+# -----------------------------------------------------------------------
+def process_pool(workers: int) -> ContextManager[Optional[Executor]]:
+    """
+    Start a pool of worker processes, or nothing if a single worker is requested.
+
+    Args:
+        workers (int): The number of worker processes.
+
+    Returns:
+        ContextManager[Optional[Executor]]: The pool, shut down on exit, or None.
+    """
+    if workers <= 1:
+        return nullcontext(None)
+
+    logger.info(f"Starting {workers} worker processes")
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(START_METHOD),
+    )
+
+
+def shard_bounds(nb_rows: int, nb_shards: int) -> List[Tuple[int, int]]:
+    """
+    Split a range of rows into contiguous shards of (almost) equal size.
+
+    Args:
+        nb_rows (int): The number of rows.
+        nb_shards (int): The number of shards wanted.
+
+    Returns:
+        List[Tuple[int, int]]: The start (included) and stop (excluded) row of each shard, in order.
+    """
+    nb_shards = max(1, min(nb_shards, nb_rows))
+    return [
+        (nb_rows * i // nb_shards, nb_rows * (i + 1) // nb_shards)
+        for i in range(nb_shards)
+    ]
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Shared table      -------------------------
+# -----------------------------------------------------------------------
+def write_shared_table(dataframe: pd.DataFrame, path: str) -> None:
+    """
+    Write a DataFrame, without its index, to an Arrow IPC file the workers can memory-map.
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame to share.
+        path (str): Path to the Arrow file.
+    """
+    table = pa.Table.from_pandas(dataframe, preserve_index=False)
+    with pa.OSFile(path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def read_shard(
+    path: str,
+    start: int,
+    stop: int,
+    index: pd.Index,
+    types_mapper: Optional[Callable] = None,
+) -> pd.DataFrame:
+    """
+    Load the rows `start:stop` of a shared Arrow file as a pandas DataFrame.
+
+    Only the buffers of these rows are read from the memory-mapped file. Missing
+    values of untyped (object) columns are restored as NaN, as the pandas parser
+    produces them, rather than None.
+
+    Args:
+        path (str): Path to the Arrow file, see `write_shared_table`.
+        start (int): The first row of the shard.
+        stop (int): The row after the last one of the shard.
+        index (pd.Index): The row labels of the shard in the original DataFrame.
+        types_mapper (Optional[Callable]): Mapping from Arrow types to pandas dtypes.
+
+    Returns:
+        pd.DataFrame: The shard, with the dtypes and row labels of the original DataFrame.
+    """
+    table = read_cached_table(path).slice(start, stop - start)
+    dataframe_shard = table.to_pandas(types_mapper=types_mapper)
+    for col in dataframe_shard.select_dtypes(include="object"):
+        column = dataframe_shard[col]
+        dataframe_shard[col] = column.where(column.notna(), np.nan)
+    dataframe_shard.index = index
+    return dataframe_shard
+
+
+def _run_shard(
+    function: Callable,
+    path: str,
+    start: int,
+    stop: int,
+    index: pd.Index,
+    types_mapper: Optional[Callable],
+    kwargs: Dict[str, Any],
+) -> Any:
+    """Worker entry point: load a shard and apply the function to it."""
+    dataframe_shard = read_shard(path, start, stop, index, types_mapper)
+    return function(dataframe_resource=dataframe_shard, **kwargs)
+
+
+def map_shards(
+    executor: Executor,
+    function: Callable,
+    dataframe: pd.DataFrame,
+    nb_shards: int,
+    min_shard_rows: int = MIN_SHARD_ROWS,
+    **kwargs,
+) -> List[Any]:
+    """
+    Apply a function to contiguous row shards of a DataFrame in worker processes.
+
+    The DataFrame is written once to a temporary Arrow file, which each worker
+    memory-maps to load its own rows, so that the DataFrame itself is never
+    pickled. Row labels and dtypes (including Arrow-backed and categorical
+    ones) are the same as in the original DataFrame.
+
+    Args:
+        executor (Executor): The pool running the shards, see `process_pool`.
+        function (Callable): A module-level function taking the shard as `dataframe_resource`.
+        dataframe (pd.DataFrame): The DataFrame to split.
+        nb_shards (int): The maximum number of shards.
+        min_shard_rows (int): The minimum number of rows per shard.
+        **kwargs: The other arguments of the function.
+
+    Returns:
+        List[Any]: The results of the function, in the order of the shards.
+    """
+    nb_shards = min(nb_shards, len(dataframe) // min_shard_rows)
+    if nb_shards <= 1:
+        return [function(dataframe_resource=dataframe, **kwargs)]
+
+    has_arrow_dtypes = any(
+        isinstance(dtype, pd.ArrowDtype) for dtype in dataframe.dtypes
+    )
+    types_mapper = arrow_types_mapper if has_arrow_dtypes else None
+
+    with tempfile.TemporaryDirectory(prefix="omnipath-shards-") as directory:
+        path = os.path.join(directory, SHARED_FILE_NAME)
+        write_shared_table(dataframe, path)
+
+        bounds = shard_bounds(len(dataframe), nb_shards)
+        logger.info(f"Processing {len(dataframe)} rows in {len(bounds)} shards")
+        futures = [
+            executor.submit(
+                _run_shard,
+                function,
+                path,
+                start,
+                stop,
+                dataframe.index[start:stop],
+                types_mapper,
+                kwargs,
+            )
+            for start, stop in bounds
+        ]
+        return [future.result() for future in futures]
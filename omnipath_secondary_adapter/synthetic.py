@@ -0,0 +1,333 @@
+import gzip
+import logging
+import os
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+import pandas as pd
+
+
+SYNTHETIC_FORMAT_VERSION = 1  # part of the file names, bump when the generated tables change
+SYNTHETIC_SIZES = (10_000, 100_000, 1_000_000, 10_000_000)
+BLOCK_ROWS = 100_000  # rows generated and written at once
+ROWS_PER_IDENTIFIER = 20  # the number of distinct entities grows with the table...
+MIN_IDENTIFIERS = 1_000
+MAX_IDENTIFIERS = 200_000  # ... up to about the size of the human proteome and its complexes
+ZIPF_EXPONENT = 0.8  # a few hub entities take part in many rows, as in the real tables
+COMPLEX_PREFIX = "COMPLEX:"
+COMPONENT_SEPARATOR = "_"
+ACCESSION_CHARACTERS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+QUOTED_CHARACTERS = ("\t", '"', "\n", "\r")  # values holding them are quoted, as by `csv.QUOTE_MINIMAL`
+
+# The real rows the synthetic ones are drawn from.
+TEMPLATE_FILES = {
+    "networks": "./data_testing/subset_networks_1000.tsv",
+    "enzyme_PTM": "./data_testing/subset_enz_sub.tsv",
+    "complexes": "./data_testing/subset_complexes.tsv",
+    "annotations": "./data_testing/subset_annotations_1000.tsv",
+    "intercell": "./data_testing/subset_intercell_1000.tsv",
+}
+
+# The (identifier, gene symbol) columns replaced by synthetic entities, so that their
+# number of distinct values grows with the table. Values with `COMPLEX_PREFIX` are
+# replaced by complexes of as many synthetic entities.
+IDENTIFIER_COLUMNS = {
+    "networks": [("source", "source_genesymbol"), ("target", "target_genesymbol")],
+    "enzyme_PTM": [("enzyme", "enzyme_genesymbol"), ("substrate", "substrate_genesymbol")],
+    "annotations": [("uniprot", "genesymbol")],
+    "intercell": [("uniprot", "genesymbol")],
+}
+# The (components, gene symbols) columns listing the members of a complex, without prefix.
+COMPONENT_COLUMNS = {
+    "complexes": ("components", "components_genesymbols"),
+}
+# The column grouping the rows of a record, which are drawn and renumbered together.
+RECORD_COLUMNS = {
+    "annotations": "record_id",
+}
+
+logger = logging.getLogger("biocypher")
+
+
+def identifier_pool_size(nb_rows: int) -> int:
+    """The number of distinct synthetic entities of a table of `nb_rows` rows."""
+    return int(np.clip(nb_rows // ROWS_PER_IDENTIFIER, MIN_IDENTIFIERS, MAX_IDENTIFIERS))
+
+
+def accession(number: int) -> str:
+    """
+    Build the UniProt-like accession of a synthetic entity, e.g. `P0A1B2`.
+
+    Args:
+        number (int): The number of the entity.
+
+    Returns:
+        str: An accession in the `[OPQ][0-9][A-Z0-9]{3}[0-9]` format, distinct for each number.
+    """
+    first = "OPQ"[number % 3]
+    number //= 3
+    characters = [first, str(number % 10)]
+    number //= 10
+    for _ in range(3):
+        characters.append(ACCESSION_CHARACTERS[number % len(ACCESSION_CHARACTERS)])
+        number //= len(ACCESSION_CHARACTERS)
+    characters.append(str(number % 10))
+    return "".join(characters)
+
+
+class SyntheticTable:
+    """Draw rows of an OmniPath table of any size, with the distributions of the real one.
+
+    Rows are drawn with replacement from a sample of the real table (see
+    `TEMPLATE_FILES`), as raw text, so that every column keeps its values,
+    formatting and correlations with the other columns, and the rows comply
+    with the Pandera model of the table. The identifier columns (see
+    `IDENTIFIER_COLUMNS` and `COMPONENT_COLUMNS`) are replaced by entities
+    drawn from a pool growing with the table, with a Zipf-like popularity.
+    Records (see `RECORD_COLUMNS`) are drawn whole and renumbered.
+
+    Args:
+        resource_name (str): The name of the resource, i.e networks, annotations, etc.
+        nb_identifiers (int): The number of distinct entities, see `identifier_pool_size`.
+        seed (int): The seed of the random generator: the same seed draws the same table.
+        template_path (Optional[str]): The TSV file rows are drawn from (default: `TEMPLATE_FILES`).
+    """
+
+    def __init__(
+        self,
+        resource_name: str,
+        nb_identifiers: int,
+        seed: int = 0,
+        template_path: Optional[str] = None,
+    ):
+        if resource_name not in TEMPLATE_FILES:
+            raise ValueError(f"No synthetic data for resource: {resource_name}")
+        self.resource_name = resource_name
+        self.template = pd.read_csv(
+            template_path or TEMPLATE_FILES[resource_name],
+            sep="\t",
+            dtype=str,
+            keep_default_na=False,
+        )
+        self.rng = np.random.default_rng(seed)
+
+        self.identifiers = np.array([accession(n) for n in range(nb_identifiers)], dtype=object)
+        self.symbols = np.array([f"SYN{n}" for n in range(nb_identifiers)], dtype=object)
+        popularity = 1.0 / np.arange(1, nb_identifiers + 1) ** ZIPF_EXPONENT
+        self._cumulative = np.cumsum(popularity / popularity.sum())
+
+        record_column = RECORD_COLUMNS.get(resource_name)
+        if record_column:
+            codes, _ = pd.factorize(self.template[record_column])
+            order = np.argsort(codes, kind="stable")
+            self._record_rows = np.split(order, np.flatnonzero(np.diff(codes[order])) + 1)
+        else:
+            self._record_rows = None
+        self._next_record = 0
+
+    # ----- Entities -----
+    def _draw(self, size: int) -> np.ndarray:
+        positions = np.searchsorted(self._cumulative, self.rng.random(size), side="right")
+        return np.minimum(positions, len(self._cumulative) - 1)
+
+    def _members(self, nb_members: int) -> Tuple[str, str]:
+        drawn = self._draw(nb_members)
+        return (
+            COMPONENT_SEPARATOR.join(self.identifiers[drawn]),
+            COMPONENT_SEPARATOR.join(self.symbols[drawn]),
+        )
+
+    def _replace_identifiers(self, identifiers: np.ndarray, symbols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Replace identifiers by synthetic entities, complexes by complexes of as many members."""
+        identifiers, symbols = identifiers.copy(), symbols.copy()
+        is_complex = np.array([value.startswith(COMPLEX_PREFIX) for value in identifiers], dtype=bool)
+        is_single = ~is_complex & (identifiers != "")  # missing identifiers stay missing
+
+        drawn = self._draw(int(is_single.sum()))
+        identifiers[is_single] = self.identifiers[drawn]
+        symbols[is_single] = self.symbols[drawn]
+        for position in np.flatnonzero(is_complex):
+            nb_members = identifiers[position].count(COMPONENT_SEPARATOR) + 1
+            members, member_symbols = self._members(nb_members)
+            identifiers[position] = COMPLEX_PREFIX + members
+            symbols[position] = COMPLEX_PREFIX + member_symbols
+        return identifiers, symbols
+
+    def _replace_components(self, components: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Replace the members of complexes by as many synthetic entities."""
+        replaced = [self._members(value.count(COMPONENT_SEPARATOR) + 1) for value in components]
+        return (
+            np.array([members for members, _ in replaced], dtype=object),
+            np.array([symbols for _, symbols in replaced], dtype=object),
+        )
+
+    # ----- Rows -----
+    def _draw_rows(self, nb_rows: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Draw template rows, and for tables of records the new record of each row."""
+        if self._record_rows is None:
+            return self.rng.integers(0, len(self.template), nb_rows), None
+
+        mean_size = len(self.template) / len(self._record_rows)
+        records = self.rng.integers(0, len(self._record_rows), int(nb_rows / mean_size) + 1)
+        while sum(len(self._record_rows[record]) for record in records) < nb_rows:
+            records = np.append(records, self.rng.integers(0, len(self._record_rows), len(records) // 10 + 1))
+        rows = np.concatenate([self._record_rows[record] for record in records])[:nb_rows]
+        sizes = np.array([len(self._record_rows[record]) for record in records])
+        new_records = np.repeat(np.arange(len(records)), sizes)[:nb_rows]
+        return rows, new_records
+
+    def block(self, nb_rows: int) -> pd.DataFrame:
+        """
+        Draw a block of synthetic rows, as raw text.
+
+        Successive blocks continue the same table: records keep being numbered
+        from where the previous block stopped.
+
+        Args:
+            nb_rows (int): The number of rows.
+
+        Returns:
+            pd.DataFrame: The rows, with every column as text.
+        """
+        rows, records = self._draw_rows(nb_rows)
+        block = self.template.take(rows).reset_index(drop=True)
+
+        for identifier_column, symbol_column in IDENTIFIER_COLUMNS.get(self.resource_name, []):
+            identifiers = block[identifier_column].to_numpy(dtype=object)
+            symbols = block[symbol_column].to_numpy(dtype=object)
+            if records is None:
+                identifiers, symbols = self._replace_identifiers(identifiers, symbols)
+            else:
+                # A record annotates a single entity: replace it once per record.
+                first_rows = np.flatnonzero(np.diff(records, prepend=-1))
+                record_identifiers, record_symbols = self._replace_identifiers(
+                    identifiers[first_rows], symbols[first_rows]
+                )
+                identifiers = record_identifiers[records - records[0]]
+                symbols = record_symbols[records - records[0]]
+            block[identifier_column], block[symbol_column] = identifiers, symbols
+
+        if self.resource_name in COMPONENT_COLUMNS:
+            components_column, symbols_column = COMPONENT_COLUMNS[self.resource_name]
+            block[components_column], block[symbols_column] = self._replace_components(
+                block[components_column].to_numpy(dtype=object)
+            )
+
+        if records is not None:
+            block[RECORD_COLUMNS[self.resource_name]] = (records + self._next_record).astype(str)
+            self._next_record += int(records[-1]) + 1
+        return block
+
+    def blocks(self, nb_rows: int, block_rows: int = BLOCK_ROWS) -> Iterator[pd.DataFrame]:
+        """Draw `nb_rows` synthetic rows, by blocks of at most `block_rows` rows."""
+        for start in range(0, nb_rows, block_rows):
+            yield self.block(min(block_rows, nb_rows - start))
+
+
+def _quote(value: str) -> str:
+    if any(character in value for character in QUOTED_CHARACTERS):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def tsv_text(block: pd.DataFrame, header: bool = False) -> str:
+    """
+    Format a block of rows as TSV text, as `to_csv(sep="\t", quoting=csv.QUOTE_MINIMAL)` does.
+
+    The rows repeat the values of a few template rows: each distinct value is
+    quoted once, which is several times faster than quoting every cell.
+
+    Args:
+        block (pd.DataFrame): The rows, with every column as text.
+        header (bool): Whether to start with the column names.
+
+    Returns:
+        str: The lines of the rows, each ending with a newline.
+    """
+    columns = []
+    for col in block.columns:
+        codes, uniques = pd.factorize(block[col])
+        columns.append(np.array([_quote(value) for value in uniques], dtype=object)[codes])
+    lines = ["\t".join(map(_quote, block.columns))] if header else []
+    lines += map("\t".join, zip(*columns))
+    return "\n".join(lines) + "\n"
+
+
+def synthetic_file_path(
+    directory: str, resource_name: str, nb_rows: int, seed: int = 0, compressed: bool = False
+) -> str:
+    """The path of a synthetic table, named after everything it is generated from."""
+    file_name = f"{resource_name}-{nb_rows}-seed{seed}-v{SYNTHETIC_FORMAT_VERSION}.tsv"
+    return os.path.join(directory, f"{file_name}.gz" if compressed else file_name)
+
+
+def write_synthetic_table(
+    resource_name: str,
+    nb_rows: int,
+    path: str,
+    seed: int = 0,
+    block_rows: int = BLOCK_ROWS,
+) -> str:
+    """
+    Generate a synthetic table and write it as a TSV file, formatted as the OmniPath dumps.
+
+    The table is generated and written block by block, so that tables larger
+    than memory can be generated. Paths ending with '.gz' are compressed.
+
+    Args:
+        resource_name (str): The name of the resource, i.e networks, annotations, etc.
+        nb_rows (int): The number of rows.
+        path (str): Path to the TSV file.
+        seed (int): The seed of the random generator.
+        block_rows (int): The number of rows generated at once.
+
+    Returns:
+        str: The path to the TSV file.
+    """
+    table = SyntheticTable(resource_name, identifier_pool_size(nb_rows), seed=seed)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary_path = f"{path}.tmp"
+
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(temporary_path, "wt", newline="") as fd:
+        for n_block, block in enumerate(table.blocks(nb_rows, block_rows)):
+            fd.write(tsv_text(block, header=n_block == 0))
+    os.replace(temporary_path, path)
+    logger.info(f"Generated {nb_rows} synthetic {resource_name} rows: {path}")
+    return path
+
+
+def synthetic_tables(
+    directory: str,
+    resource_names: List[str],
+    sizes: List[int],
+    seed: int = 0,
+    compressed: bool = False,
+) -> Dict[Tuple[str, int], str]:
+    """
+    Generate the synthetic tables of the given resources and sizes, unless already generated.
+
+    Args:
+        directory (str): The directory holding the synthetic tables.
+        resource_names (List[str]): The names of the resources.
+        sizes (List[int]): The numbers of rows.
+        seed (int): The seed of the random generator.
+        compressed (bool): Whether the tables are gzip-compressed, as the OmniPath dumps.
+
+    Returns:
+        Dict[Tuple[str, int], str]: The path of each table, by resource name and number of rows.
+    """
+    paths = {}
+    for resource_name in resource_names:
+        for nb_rows in sizes:
+            path = synthetic_file_path(directory, resource_name, nb_rows, seed, compressed)
+            if not os.path.isfile(path):
+                write_synthetic_table(resource_name, nb_rows, path, seed=seed)
+            paths[resource_name, nb_rows] = path
+    return paths
@@ -0,0 +1,490 @@
+import glob
+import logging
+import os
+import shutil
+import sqlite3
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+try:
+    import duckdb
+except ImportError:  # duckdb is optional
+    duckdb = None
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from biocypher import BioCypher
+
+from omnipath_secondary_adapter.biocypher_api import (
+    get_output_directory,
+    preferred_id,
+)
+from omnipath_secondary_adapter.graph_tables import GraphTableWriter
+from omnipath_secondary_adapter.json_columns import (
+    LIST_SEPARATOR,
+    json_dumps,
+)
+
+
+OUTPUT_BACKENDS = ("neo4j", "parquet", "sqlite", "duckdb")
+NODES_SUBDIRECTORY = "nodes"
+EDGES_SUBDIRECTORY = "edges"
+PARTITION_KEY = "label"  # the Hive partitioning of the Parquet datasets: nodes/label=Protein/...
+PARQUET_FILE_EXTENSION = ".parquet"
+PARQUET_COMPRESSION = "zstd"
+GRAPH_DATABASE_FILE = "graph"
+DATABASE_FILE_EXTENSIONS = {"sqlite": ".sqlite", "duckdb": ".duckdb"}
+INTEGER_TYPES = {"int", "integer", "long"}
+FLOAT_TYPES = {"float", "double", "dbl"}
+BOOLEAN_TYPES = {"bool", "boolean"}
+TRUE_TEXTS = {"true", "1", "yes"}
+FALSE_TEXTS = {"false", "0", "no"}
+
+# The tables of the graph databases: the properties are a JSON object per element.
+SQL_TABLES = (
+    "CREATE TABLE IF NOT EXISTS nodes (id TEXT PRIMARY KEY, label TEXT NOT NULL, labels TEXT, properties TEXT)",
+    "CREATE TABLE IF NOT EXISTS edges "
+    "(id TEXT, source TEXT NOT NULL, target TEXT NOT NULL, label TEXT NOT NULL, properties TEXT)",
+)
+SQL_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS nodes_label ON nodes (label)",
+    "CREATE INDEX IF NOT EXISTS edges_id ON edges (id)",
+    "CREATE INDEX IF NOT EXISTS edges_source ON edges (source)",
+    "CREATE INDEX IF NOT EXISTS edges_target ON edges (target)",
+    "CREATE INDEX IF NOT EXISTS edges_label ON edges (label)",
+)
+NODE_COLUMNS = ("id", "label", "labels", "properties")
+EDGE_COLUMNS = ("id", "source", "target", "label", "properties")
+
+logger = logging.getLogger("biocypher")
+
+
+# -----------------------------------------------------------------------
+# -----------------------   Property types   ----------------------------
+# -----------------------------------------------------------------------
+def _map_distinct(values: np.ndarray, function: Callable[[Any], Any]) -> List[Any]:
+    """Apply a function to each distinct value once."""
+    try:
+        codes, uniques = pd.factorize(values)
+    except TypeError:  # lists
+        return [None if value is None else function(value) for value in values]
+    results = [function(value) for value in np.asarray(uniques, dtype=object)] + [None]
+    return [results[code] for code in codes]
+
+
+def _boolean(value: Any) -> Optional[bool]:
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in TRUE_TEXTS:
+        return True
+    if text in FALSE_TEXTS:
+        return False
+    return None
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return LIST_SEPARATOR.join(map(str, value))
+    return str(value)
+
+
+def _texts(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value]
+    return [str(value)]
+
+
+def typed_values(values: np.ndarray, property_type: str) -> pa.Array:
+    """
+    Convert the values of a property to the type declared in the schema.
+
+    Values that are not of the type, e.g. a fused "True, False" boolean,
+    are missing, as neo4j-admin import would not parse them either.
+    Properties of any other type are strings, with the items of lists
+    joined by ';'.
+
+    Args:
+        values (np.ndarray): The values, with None for missing values.
+        property_type (str): The type of the property in the schema, e.g. "int" or "str[]".
+
+    Returns:
+        pa.Array: The typed values.
+    """
+    values = np.asarray(values, dtype=object)
+    if property_type in INTEGER_TYPES or property_type in FLOAT_TYPES:
+        numbers = pd.to_numeric(pd.Series(_map_distinct(values, _text), dtype=object), errors="coerce")
+        if property_type in FLOAT_TYPES:
+            return pa.array(numbers.astype("float64"), type=pa.float64(), from_pandas=True)
+        return pa.array(numbers.where(numbers == numbers.round()).astype("Int64"), type=pa.int64())
+    if property_type in BOOLEAN_TYPES:
+        return pa.array(_map_distinct(values, _boolean), type=pa.bool_())
+    if property_type.endswith("[]") or property_type == "list":
+        return pa.array(_map_distinct(values, _texts), type=pa.list_(pa.string()))
+    return pa.array(_map_distinct(values, _text), type=pa.string())
+
+
+class _TypedGraphWriter(GraphTableWriter):
+    """Turn the nodes and edges into Arrow tables of typed properties, see `typed_values`."""
+
+    @staticmethod
+    def _typed_table(
+        columns: Dict[str, pa.Array], properties: pd.DataFrame, property_types: Dict[str, str]
+    ) -> pa.Table:
+        """The columns of the elements, then their typed properties, but the ones named as these columns."""
+        columns = dict(columns)
+        for name, kind in property_types.items():
+            if name not in columns:
+                values = properties[name].to_numpy() if name in properties else np.full(len(properties), None)
+                columns[name] = typed_values(values, kind)
+        return pa.table(columns)
+
+    def _node_table(self, ontology_class: str, ids: np.ndarray, properties: pd.DataFrame) -> pa.Table:
+        """The `id`, `labels` (the class first, then its ancestors) and properties of nodes."""
+        properties = properties.assign(preferred_id=preferred_id(self.translator, ontology_class))
+        property_types = self._property_types(ontology_class, properties)
+        property_types.setdefault("preferred_id", "str")
+        labels = self._ancestor_labels(ontology_class)
+        columns = {
+            "id": pa.array(ids, type=pa.string()),
+            "labels": pa.array([labels] * len(ids), type=pa.list_(pa.string())),
+        }
+        return self._typed_table(columns, properties, property_types)
+
+    def _edge_table(
+        self,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        edge_ids: np.ndarray,
+        properties: pd.DataFrame,
+        property_types: Dict[str, str],
+    ) -> pa.Table:
+        """The `id` (missing when the edges have none), `source`, `target` and properties of edges."""
+        columns = {
+            "id": pa.array([edge_id or None for edge_id in edge_ids], type=pa.string()),
+            "source": pa.array(sources, type=pa.string()),
+            "target": pa.array(targets, type=pa.string()),
+        }
+        return self._typed_table(columns, properties, property_types)
+
+
+# -----------------------------------------------------------------------
+# -----------------------      Parquet       ----------------------------
+# -----------------------------------------------------------------------
+def _next_parquet_part(directory: str) -> str:
+    nb_parts = len(glob.glob(os.path.join(directory, f"part-*{PARQUET_FILE_EXTENSION}")))
+    return os.path.join(directory, f"part-{str(nb_parts).zfill(3)}{PARQUET_FILE_EXTENSION}")
+
+
+class ParquetGraphWriter(_TypedGraphWriter):
+    """Write the nodes and edges as Parquet datasets, partitioned by label.
+
+    The output directory gets a `nodes` and an `edges` dataset, with a
+    directory per label in the Hive style (`nodes/label=Protein/part-000.parquet`),
+    so that pyarrow, pandas, DuckDB or Spark read a whole dataset, or only
+    some labels, with the label as a column. Nodes have an `id` and a
+    `labels` column (the class first, then its ancestors), edges an `id`, a
+    `source` and a `target` column, and both a column per property of the
+    schema, of its type.
+
+    Args:
+        bc (BioCypher): The BioCypher instance whose schema, ontology and output directory are used.
+    """
+
+    def __init__(self, bc: BioCypher):
+        super().__init__(bc)
+        self.output_directory = get_output_directory(bc)
+
+    def _write_part(self, subdirectory: str, pascal_label: str, table: pa.Table) -> None:
+        directory = os.path.join(self.output_directory, subdirectory, f"{PARTITION_KEY}={pascal_label}")
+        os.makedirs(directory, exist_ok=True)
+        path = _next_parquet_part(directory)
+        logger.info(f"Writing {table.num_rows} entries to {os.path.relpath(path, self.output_directory)}")
+        pq.write_table(table, path, compression=PARQUET_COMPRESSION)
+
+    def _write_node_rows(self, ontology_class: str, ids: np.ndarray, properties: pd.DataFrame) -> None:
+        table = self._node_table(ontology_class, ids, properties)
+        self._write_part(NODES_SUBDIRECTORY, self._pascal(ontology_class), table)
+
+    def _write_edge_rows(
+        self,
+        edge_label: str,
+        schema_label: Optional[str],
+        sources: np.ndarray,
+        targets: np.ndarray,
+        edge_ids: np.ndarray,
+        properties: pd.DataFrame,
+        property_types: Dict[str, str],
+    ) -> None:
+        table = self._edge_table(sources, targets, edge_ids, properties, property_types)
+        self._write_part(EDGES_SUBDIRECTORY, self._pascal(edge_label), table)
+
+    def write_import_call(self) -> str:
+        """
+        Nothing is left to write once the parts are.
+
+        Returns:
+            str: The output directory, holding the `nodes` and `edges` datasets.
+        """
+        return self.output_directory
+
+
+def _as_text(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    if pa.types.is_list(column.type):
+        return pc.binary_join(column, LIST_SEPARATOR)
+    return pc.cast(column, pa.string())
+
+
+def _concat_tables(tables: List[pa.Table]) -> pa.Table:
+    """Concatenate tables, keeping as text the columns whose type differs between them."""
+    types: Dict[str, set] = {}
+    for table in tables:
+        for field in table.schema:
+            if not pa.types.is_null(field.type):
+                types.setdefault(field.name, set()).add(field.type)
+    conflicting = [name for name, field_types in types.items() if len(field_types) > 1]
+    if conflicting:
+        # e.g. a property declared as an int by the schema of one resource and a str by another
+        logger.warning(f"Merging the properties {conflicting}, of different types across resources, as text.")
+        for n_table, table in enumerate(tables):
+            for name in conflicting:
+                if name in table.column_names:
+                    table = table.set_column(
+                        table.schema.get_field_index(name), name, _as_text(table.column(name))
+                    )
+            tables[n_table] = table
+    return pa.concat_tables(tables, promote_options="permissive")
+
+
+def merge_parquet_datasets(directories: Iterable[str], output_directory: str) -> str:
+    """
+    Gather the Parquet datasets of several resources into one.
+
+    Nodes are written once per ID, e.g. the proteins shared by several
+    resources, with the label and properties of the first resource that has
+    them, as neo4j-admin imports them. The edge parts are linked (or
+    copied) as they are.
+
+    Args:
+        directories (Iterable[str]): The output directories of the resources.
+        output_directory (str): The directory of the merged `nodes` and `edges` datasets.
+
+    Returns:
+        str: The output directory.
+    """
+    directories = list(directories)
+    seen_ids = set()
+    label_tables: Dict[str, List[pa.Table]] = {}
+    for directory in directories:
+        paths = glob.glob(os.path.join(directory, NODES_SUBDIRECTORY, "*", f"*{PARQUET_FILE_EXTENSION}"))
+        for path in sorted(paths):
+            table = pq.read_table(path, partitioning=None)
+            ids = table.column("id").to_pylist()
+            new = ~pd.Index(ids).duplicated(keep="first")
+            new &= np.fromiter((node_id not in seen_ids for node_id in ids), dtype=bool, count=len(ids))
+            seen_ids.update(ids)
+            label_tables.setdefault(os.path.basename(os.path.dirname(path)), []).append(table.filter(pa.array(new)))
+
+    shutil.rmtree(os.path.join(output_directory, NODES_SUBDIRECTORY), ignore_errors=True)
+    for label, tables in label_tables.items():
+        label_directory = os.path.join(output_directory, NODES_SUBDIRECTORY, label)
+        os.makedirs(label_directory)
+        pq.write_table(_concat_tables(tables), _next_parquet_part(label_directory), compression=PARQUET_COMPRESSION)
+
+    shutil.rmtree(os.path.join(output_directory, EDGES_SUBDIRECTORY), ignore_errors=True)
+    for directory in directories:
+        paths = glob.glob(os.path.join(directory, EDGES_SUBDIRECTORY, "*", f"*{PARQUET_FILE_EXTENSION}"))
+        for path in sorted(paths):
+            label = os.path.basename(os.path.dirname(path))
+            label_directory = os.path.join(output_directory, EDGES_SUBDIRECTORY, label)
+            os.makedirs(label_directory, exist_ok=True)
+            merged_path = _next_parquet_part(label_directory)
+            try:
+                os.link(path, merged_path)
+            except OSError:  # across file systems
+                shutil.copyfile(path, merged_path)
+    logger.info(f"Merged the Parquet datasets of {len(directories)} directories into {output_directory}.")
+    return output_directory
+
+
+# -----------------------------------------------------------------------
+# -----------------------   SQLite / DuckDB  ----------------------------
+# -----------------------------------------------------------------------
+def graph_database_path(directory: str, engine: str) -> str:
+    """The path to the graph database of an output directory."""
+    return os.path.join(directory, GRAPH_DATABASE_FILE + DATABASE_FILE_EXTENSIONS[engine])
+
+
+def _connect(path: str, engine: str) -> Any:
+    """Open a graph database, creating its tables if needed."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if engine == "duckdb":
+        if duckdb is None:
+            raise ImportError("The DuckDB output needs the duckdb package (duckdb extra).")
+        connection = duckdb.connect(path)
+    else:
+        connection = sqlite3.connect(path)
+        # A build output, built again rather than recovered.
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+    for statement in SQL_TABLES:
+        connection.execute(statement)
+    return connection
+
+
+def _finish_database(connection: Any) -> None:
+    """Index the IDs and labels, once the rows are inserted, and close the database."""
+    for statement in SQL_INDEXES:
+        connection.execute(statement)
+    connection.commit()
+    connection.close()
+
+
+class SqlGraphWriter(_TypedGraphWriter):
+    """Write the nodes and edges into an embedded SQLite or DuckDB database.
+
+    The database, `graph.sqlite` or `graph.duckdb` in the output directory,
+    has a `nodes` table (`id`, `label`, `labels`, `properties`) and an
+    `edges` table (`id`, `source`, `target`, `label`, `properties`). The
+    labels of a node (the class first, then its ancestors) are a JSON array
+    and the properties a JSON object of typed values, queried with the JSON
+    functions of the engine, e.g. `properties ->> '$.sources'`. The node
+    IDs are the primary key, and the edge IDs, sources, targets and the
+    labels are indexed once every element is written.
+
+    Args:
+        bc (BioCypher): The BioCypher instance whose schema, ontology and output directory are used.
+        engine (str): Either "sqlite" or "duckdb".
+
+    Raises:
+        ImportError: If the engine is DuckDB and `duckdb` is not installed.
+    """
+
+    def __init__(self, bc: BioCypher, engine: str = "sqlite"):
+        super().__init__(bc)
+        self.engine = engine
+        self.path = graph_database_path(get_output_directory(bc), engine)
+        self.connection = _connect(self.path, engine)
+
+    @staticmethod
+    def _json_objects(table: pa.Table) -> List[str]:
+        if not table.num_columns:
+            return ["{}"] * table.num_rows
+        names = table.column_names
+        return [
+            json_dumps({name: value for name, value in zip(names, row) if value is not None})
+            for row in zip(*(column.to_pylist() for column in table.columns))
+        ]
+
+    def _insert(self, table_name: str, columns: Iterable[str], rows: Dict[str, list]) -> None:
+        columns = list(columns)
+        if self.engine == "duckdb":
+            frame = pd.DataFrame({column: rows[column] for column in columns})
+            self.connection.register("new_rows", frame)
+            self.connection.execute(f"INSERT OR IGNORE INTO {table_name} SELECT * FROM new_rows")
+            self.connection.unregister("new_rows")
+        else:
+            self.connection.executemany(
+                f"INSERT OR IGNORE INTO {table_name} VALUES ({', '.join('?' * len(columns))})",
+                zip(*(rows[column] for column in columns)),
+            )
+
+    def _write_node_rows(self, ontology_class: str, ids: np.ndarray, properties: pd.DataFrame) -> None:
+        table = self._node_table(ontology_class, ids, properties)
+        labels = json_dumps(self._ancestor_labels(ontology_class))
+        rows = {
+            "id": list(ids),
+            "label": [self._pascal(ontology_class)] * len(ids),
+            "labels": [labels] * len(ids),
+            "properties": self._json_objects(table.drop_columns(["id", "labels"])),
+        }
+        logger.info(f"Writing {len(ids)} entries to the {ontology_class} nodes of {self.path}")
+        self._insert("nodes", NODE_COLUMNS, rows)
+
+    def _write_edge_rows(
+        self,
+        edge_label: str,
+        schema_label: Optional[str],
+        sources: np.ndarray,
+        targets: np.ndarray,
+        edge_ids: np.ndarray,
+        properties: pd.DataFrame,
+        property_types: Dict[str, str],
+    ) -> None:
+        table = self._edge_table(sources, targets, edge_ids, properties, property_types)
+        rows = {
+            "id": table.column("id").to_pylist(),
+            "source": list(sources),
+            "target": list(targets),
+            "label": [self.translator.name_sentence_to_pascal(edge_label)] * len(sources),
+            "properties": self._json_objects(table.drop_columns(["id", "source", "target"])),
+        }
+        logger.info(f"Writing {len(sources)} entries to the {edge_label} edges of {self.path}")
+        self._insert("edges", EDGE_COLUMNS, rows)
+
+    def write_import_call(self) -> str:
+        """
+        Index the database and close it.
+
+        Returns:
+            str: The path to the database.
+        """
+        _finish_database(self.connection)
+        return self.path
+
+
+def merge_graph_databases(paths: Iterable[str], path: str, engine: str = "sqlite") -> str:
+    """
+    Gather the graph databases of several resources into one.
+
+    Nodes are inserted once per ID, e.g. the proteins shared by several
+    resources, with the properties of the first resource that has them.
+
+    Args:
+        paths (Iterable[str]): The paths to the databases of the resources.
+        path (str): The path to the merged database, replaced if it exists.
+        engine (str): Either "sqlite" or "duckdb".
+
+    Returns:
+        str: The path to the merged database.
+    """
+    paths = list(paths)
+    if os.path.exists(path):
+        os.remove(path)
+    connection = _connect(path, engine)
+    for resource_path in paths:
+        quoted_path = resource_path.replace("'", "''")
+        connection.execute(f"ATTACH DATABASE '{quoted_path}' AS resource")
+        connection.execute("INSERT OR IGNORE INTO nodes SELECT * FROM resource.nodes")
+        connection.execute("INSERT INTO edges SELECT * FROM resource.edges")
+        connection.commit()
+        connection.execute("DETACH DATABASE resource")
+    _finish_database(connection)
+    logger.info(f"Merged the graph databases of {len(paths)} resources into {path}.")
+    return path
+
+
+def output_writer(bc: BioCypher, output: str) -> GraphTableWriter:
+    """
+    Create the writer of a table output backend.
+
+    Args:
+        bc (BioCypher): The BioCypher instance of the resource.
+        output (str): Either "parquet", "sqlite" or "duckdb".
+
+    Returns:
+        GraphTableWriter: An object with the `write_nodes`, `write_edges` and `write_import_call`
+            methods of BioCypher.
+    """
+    if output == "parquet":
+        return ParquetGraphWriter(bc)
+    return SqlGraphWriter(bc, engine=output)
@@ -0,0 +1,234 @@
+from typing import (
+    List,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+import pandas as pd
+import pandera as pa
+from pandera.engines import pandas_engine
+
+
+VALIDATION_MODES = ("off", "fast", "full")
+SAMPLE_MODE_PREFIX = "sample:"
+SAMPLE_SEED = 0  # the same rows are sampled in every run
+MAX_FAILURE_CASES = 5  # failing values quoted in the error message of each check
+
+# Whether a pandas dtype belongs to the family of a Pandera data type, whatever its backend
+# (numpy, nullable extension or Arrow).
+DTYPE_FAMILIES = {
+    pa.dtypes.Bool: pd.api.types.is_bool_dtype,
+    pa.dtypes.Int: pd.api.types.is_integer_dtype,
+    pa.dtypes.Float: pd.api.types.is_float_dtype,
+    pa.dtypes.DateTime: pd.api.types.is_datetime64_any_dtype,
+    pa.dtypes.Category: lambda dtype: isinstance(dtype, pd.CategoricalDtype),
+    pa.dtypes.String: lambda dtype: pd.api.types.is_string_dtype(dtype)
+    and not isinstance(dtype, pd.CategoricalDtype),
+}
+
+
+class SchemaValidationError(ValueError):
+    """A DataFrame does not comply with its schema."""
+
+    def __init__(self, failures: List[str]):
+        self.failures = failures
+        super().__init__(
+            f"{len(failures)} schema checks failed:\n" + "\n".join(failures)
+        )
+
+
+def parse_validation_mode(validation: str) -> Tuple[str, Optional[int]]:
+    """
+    Parse a validation mode: "off", "fast", "full" or "sample:N".
+
+    Args:
+        validation (str): The validation mode.
+
+    Returns:
+        Tuple[str, Optional[int]]: The mode ("sample" for "sample:N") and the sample size, if any.
+
+    Raises:
+        ValueError: If the mode is unknown or the sample size is not a positive integer.
+    """
+    if validation.startswith(SAMPLE_MODE_PREFIX):
+        size = validation[len(SAMPLE_MODE_PREFIX) :]
+        if not size.isdigit() or int(size) <= 0:
+            raise ValueError(f"Invalid sample size: {size}")
+        return "sample", int(size)
+    if validation not in VALIDATION_MODES:
+        raise ValueError(f"Invalid validation mode: {validation}")
+    return validation, None
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Sampling      -----------------------------
+# -----------------------------------------------------------------------
+def sample_rows(
+    dataframe: pd.DataFrame,
+    size: int,
+    seed: int = SAMPLE_SEED,
+) -> pd.DataFrame:
+    """
+    Draw a stratified sample of rows: random rows, plus one row for each value of each categorical column.
+
+    Rare values of the categorical columns (e.g. the interaction `type`) are
+    thus always part of the sample, along with the rows they come with.
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame to sample.
+        size (int): The number of random rows.
+        seed (int): The seed of the random generator.
+
+    Returns:
+        pd.DataFrame: The sampled rows, in their original order.
+    """
+    if len(dataframe) <= size:
+        return dataframe
+
+    positions = [np.random.default_rng(seed).choice(len(dataframe), size, replace=False)]
+    for col, dtype in dataframe.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            first_rows = ~dataframe[col].cat.codes.duplicated().to_numpy()
+            positions.append(np.flatnonzero(first_rows))
+    return dataframe.iloc[np.unique(np.concatenate(positions))]
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Full validation      ----------------------
+# -----------------------------------------------------------------------
+def coerce_arrow_columns(dataframe: pd.DataFrame, schema: pa.DataFrameSchema) -> pd.DataFrame:
+    """
+    Convert the Arrow-backed columns to the data types of their fields, for Pandera's validation.
+
+    Pandera checks the exact dtype of each column, so that e.g. a `bool[pyarrow]`
+    column, as produced by the pyarrow parser, is not a `bool` one. Only the
+    columns failing that check are converted. Columns whose values cannot be
+    converted are left as they are, for the validation to report them.
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame to validate.
+        schema (pa.DataFrameSchema): The Pandera schema, e.g. `Model.to_schema()`.
+
+    Returns:
+        pd.DataFrame: The DataFrame with the converted columns.
+    """
+    coerced = {}
+    for col, column_schema in schema.columns.items():
+        if col not in dataframe.columns or column_schema.dtype is None:
+            continue
+        series = dataframe[col]
+        if not isinstance(series.dtype, pd.ArrowDtype):
+            continue
+        if column_schema.dtype.check(pandas_engine.Engine.dtype(series.dtype)):
+            continue
+        try:
+            coerced[col] = column_schema.dtype.coerce(series)
+        except (TypeError, ValueError, pa.errors.ParserError):
+            continue
+    return dataframe.assign(**coerced) if coerced else dataframe
+
+
+# -----------------------------------------------------------------------
+# -----------------------     Fast validation      ----------------------
+# -----------------------------------------------------------------------
+def _dtype_failure(col: str, column_schema: pa.Column, series: pd.Series) -> Optional[str]:
+    """
+    Check that a column has a dtype of the family of its Pandera data type.
+
+    The dictionary-encoded text columns (see `readers.encode_categorical`) are
+    checked on their categories.
+    """
+    for pandera_type, in_family in DTYPE_FAMILIES.items():
+        if isinstance(column_schema.dtype, pandera_type):
+            break
+    else:
+        return None  # no constraint on the dtype
+
+    values = series
+    if isinstance(series.dtype, pd.CategoricalDtype) and pandera_type is not pa.dtypes.Category:
+        values = pd.Series(series.cat.categories)
+
+    if not in_family(values.dtype):
+        return f"column '{col}': expected {column_schema.dtype}, got {series.dtype}"
+
+    if pandera_type is pa.dtypes.String and values.dtype == object:
+        inferred = pd.api.types.infer_dtype(values, skipna=True)
+        if inferred not in ("string", "empty"):
+            return f"column '{col}': expected {column_schema.dtype}, got {inferred} values"
+    return None
+
+
+def _checked_values(series: pd.Series) -> pd.Series:
+    """The distinct used categories of a categorical column, else the non-missing values."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        used = np.unique(codes[codes >= 0])
+        return pd.Series(series.cat.categories[used], name=series.name)
+    return series.dropna()
+
+
+def _check_failures(col: str, column_schema: pa.Column, series: pd.Series) -> List[str]:
+    """Run the checks of a column (e.g. `isin`, `ge`) on its values, all at once."""
+    checks_schema = pa.SeriesSchema(checks=column_schema.checks, nullable=True, name=col)
+    try:
+        checks_schema.validate(_checked_values(series), lazy=True)
+    except pa.errors.SchemaErrors as e:
+        return [
+            f"column '{col}': {check} failed for {len(cases)} values, "
+            f"e.g. {cases.head(MAX_FAILURE_CASES).tolist()}"
+            for check, cases in e.failure_cases.groupby("check")["failure_case"]
+        ]
+    return []
+
+
+def fast_validate(dataframe: pd.DataFrame, schema: pa.DataFrameSchema) -> None:
+    """
+    Validate a DataFrame against a schema with bulk column operations.
+
+    Columns are checked once each, as a whole: presence (and absence of other
+    columns for strict schemas), dtype family, missing values in non-nullable
+    columns, then the checks of the fields on the distinct values of
+    categorical columns, or the non-missing values of other ones. The dtype
+    check accepts the numpy, nullable and Arrow-backed variants of a type,
+    as produced by the C and pyarrow parsers, and dictionary-encoded text.
+
+    Args:
+        dataframe (pd.DataFrame): The DataFrame to validate.
+        schema (pa.DataFrameSchema): The Pandera schema, e.g. `Model.to_schema()`.
+
+    Raises:
+        SchemaValidationError: Listing every failed check.
+    """
+    failures = []
+
+    missing = [col for col in schema.columns if col not in dataframe.columns]
+    failures += [f"column '{col}': missing" for col in missing]
+    if schema.strict:
+        failures += [
+            f"column '{col}': not in the schema"
+            for col in dataframe.columns
+            if col not in schema.columns
+        ]
+
+    for col, column_schema in schema.columns.items():
+        if col in missing:
+            continue
+        series = dataframe[col]
+
+        dtype_failure = _dtype_failure(col, column_schema, series)
+        if dtype_failure:
+            failures.append(dtype_failure)
+
+        if not column_schema.nullable:
+            nb_missing = int(series.isna().sum())
+            if nb_missing:
+                failures.append(
+                    f"column '{col}': {nb_missing} missing values in a non-nullable column"
+                )
+
+        if column_schema.checks:
+            failures += _check_failures(col, column_schema, series)
+
+    if failures:
+        raise SchemaValidationError(failures)
@@ -3,5 +3,8 @@ cd /usr/app/
 cp -r /src/* .
 cp config/biocypher_docker_config.yaml config/biocypher_config.yaml
 poetry install
-python3 create_knowledge_graph.py
+# Write the five resources under data/build2neo, with a single import call for all of them,
+# and check the graph with the queries of cypher_queries/basic_queries.cypher (data/build2neo/qa.json).
+python3 weave_knowledge_graph.py -net download -enz download -co download -an download -inter download \
+    --jobs 5 --writer columnar --parts 4 --merge-import data/build2neo --qa
 chmod -R 777 biocypher-log
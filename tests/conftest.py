@@ -0,0 +1,51 @@
+import os
+
+import pytest
+import yaml
+
+import weave_knowledge_graph as pipeline
+
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_TESTING = os.path.join(ROOT_DIRECTORY, "data_testing")
+ONTOLOGY_PATH = os.path.join(ROOT_DIRECTORY, "tests", "data", "ontology.ttl")
+
+# A sample of each OmniPath dump, by resource name.
+RESOURCE_FILES = {
+    "annotations": os.path.join(DATA_TESTING, "subset_annotations_1000.tsv"),
+    "complexes": os.path.join(DATA_TESTING, "subset_complexes.tsv"),
+    "enzyme_PTM": os.path.join(DATA_TESTING, "subset_enz_sub.tsv"),
+    "intercell": os.path.join(DATA_TESTING, "subset_intercell_1000.tsv"),
+    "networks": os.path.join(DATA_TESTING, "subset_networks_1000.tsv"),
+}
+
+
+@pytest.fixture(autouse=True)
+def root_directory(monkeypatch):
+    """Run from the root of the repository, as the pipeline reads its configs by relative paths."""
+    monkeypatch.chdir(ROOT_DIRECTORY)
+    return ROOT_DIRECTORY
+
+
+@pytest.fixture
+def cache_directory(tmp_path, monkeypatch):
+    """Keep the caches, checkpoints and spilled buckets of the pipeline under a temporary directory."""
+    directory = str(tmp_path / "data")
+    monkeypatch.setattr(pipeline, "CACHE_DATA_PATH", directory)
+    return directory
+
+
+@pytest.fixture
+def local_ontology(tmp_path, monkeypatch):
+    """Configure BioCypher with the ontology of the tests, instead of downloading the Biolink model."""
+    config_paths = {}
+    for resource_name, config_path in pipeline.BIOCYPHER_CONFIG_PATHS.items():
+        with open(config_path) as fd:
+            config = yaml.safe_load(fd)
+        config["biocypher"]["head_ontology"]["url"] = ONTOLOGY_PATH
+        path = tmp_path / "config" / os.path.basename(config_path)
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(yaml.safe_dump(config))
+        config_paths[resource_name] = str(path)
+    monkeypatch.setattr(pipeline, "BIOCYPHER_CONFIG_PATHS", config_paths)
+    return config_paths
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from omnipath_secondary_adapter import benchmark
+from omnipath_secondary_adapter.options import PipelineOptions
+from omnipath_secondary_adapter.synthetic import synthetic_tables
+
+
+NB_ROWS = 2000
+
+
+@pytest.fixture
+def synthetic_networks(tmp_path):
+    paths = synthetic_tables(str(tmp_path / "synthetic"), ["networks"], [NB_ROWS], compressed=True)
+    return paths["networks", NB_ROWS]
+
+
+@pytest.mark.parametrize("fusion", ["ontoweaver", "disk"])
+def test_run_case(fusion, synthetic_networks, tmp_path, cache_directory):
+    result_path = tmp_path / "result.json"
+    options = PipelineOptions(cache=False, validation="fast", extractor="native", fusion=fusion)
+    benchmark.run_case("networks", synthetic_networks, str(result_path), options=options)
+
+    result = json.loads(result_path.read_text())
+    # Up to the fusion by default, measured as the stages of the pipeline.
+    assert [stage["stage"] for stage in result["stages"]] == list(benchmark.BENCHMARK_STAGES[:-1])
+    assert result["rows"] == NB_ROWS
+    fuse = result["stages"][-1]
+    assert 0 < fuse["nodes"] <= result["nodes"] and 0 < fuse["edges"] <= result["edges"]
+    assert result["read"]["decompression_mb_per_second"] > 0 and result["read"]["parsing_mb_per_second"] > 0
+
+
+def test_write_stage(synthetic_networks, local_ontology, tmp_path, cache_directory):
+    result_path = tmp_path / "result.json"
+    benchmark.run_case("networks", synthetic_networks, str(result_path), until="write")
+    stages = [stage["stage"] for stage in json.loads(result_path.read_text())["stages"]]
+    assert stages == list(benchmark.BENCHMARK_STAGES)
+
+
+def test_regressions():
+    def results(wall_time, name="stage"):
+        stages = [{name: "load", "wall_time": wall_time, "peak_rss": 100 * benchmark.MEGABYTE}]
+        case = {"resource": "networks", "size": NB_ROWS, "error": None, "stages": stages}
+        return {"cases": [{**case, "peak_rss": 100 * benchmark.MEGABYTE}]}
+
+    # The results of format 1 name their stages by "name".
+    assert benchmark.regressions(results(1.0), results(1.0, name="name")) == []
+    assert benchmark.regressions(results(2.0), results(1.0, name="name")) == [
+        "networks-2000-load: wall_time 1 -> 2",
+        "networks-2000-total: wall_time 1 -> 2",
+    ]
+    assert "x2.00 time" in benchmark.format_results(results(2.0), results(1.0))
@@ -0,0 +1,143 @@
+import glob
+import os
+
+import pandas as pd
+import pytest
+
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter.cache import (
+    CACHE_FILE_EXTENSION,
+    CACHE_SUBDIRECTORY,
+)
+
+from tests.conftest import RESOURCE_FILES
+
+
+@pytest.fixture
+def networks_file(tmp_path):
+    """A copy of the networks sample, that the tests may change."""
+    path = tmp_path / "networks.tsv"
+    path.write_bytes(open(RESOURCE_FILES["networks"], "rb").read())
+    return str(path)
+
+
+def _cached_files(cache_directory, resource_name="networks"):
+    return sorted(glob.glob(os.path.join(cache_directory, CACHE_SUBDIRECTORY, f"{resource_name}-*")))
+
+
+def _values(dataframe):
+    """The values of a DataFrame as Python objects, whatever the dtypes of its columns."""
+    return {col: dataframe[col].astype(object).where(dataframe[col].notna(), None).tolist() for col in dataframe}
+
+
+def _fail_parsing(monkeypatch):
+    def read_tsv(*args, **kwargs):
+        raise AssertionError("the file is parsed instead of read from the cache")
+
+    monkeypatch.setattr(pipeline, "_read_tsv", read_tsv)
+
+
+@pytest.mark.parametrize("engine", pipeline.ENGINES)
+def test_cache_miss_then_hit(networks_file, engine, cache_directory, monkeypatch):
+    parsed = pipeline.load_dataframe(networks_file, "networks", engine=engine)
+    cache_path = pipeline._cache_path(networks_file, "networks", engine)
+    assert _cached_files(cache_directory) == [cache_path]
+
+    _fail_parsing(monkeypatch)
+    cached = pipeline.load_dataframe(networks_file, "networks", engine=engine)
+    assert cached.index.equals(parsed.index)
+    assert _values(cached) == _values(parsed)
+
+    chunks = list(pipeline.load_dataframe_chunks(networks_file, "networks", 300, engine=engine))
+    assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+    assert _values(pd.concat(chunks)) == _values(parsed)
+
+
+def test_changed_dump_is_a_miss_and_prunes_its_stale_file(networks_file, cache_directory):
+    pipeline.load_dataframe(networks_file, "networks")
+    stale_path = pipeline._cache_path(networks_file, "networks")
+
+    with open(networks_file) as fd:
+        lines = fd.readlines()
+    with open(networks_file, "w") as fd:
+        fd.writelines(lines[:-1])
+    dataframe = pipeline.load_dataframe(networks_file, "networks")
+
+    assert len(dataframe) == len(lines) - 2
+    assert _cached_files(cache_directory) == [pipeline._cache_path(networks_file, "networks")]
+    assert not os.path.exists(stale_path)
+
+
+def test_changed_schema_is_a_miss(networks_file, cache_directory, monkeypatch):
+    pipeline.load_dataframe(networks_file, "networks")
+    stale_path = pipeline._cache_path(networks_file, "networks")
+
+    read_table_options = pipeline._read_table_options
+
+    def options(resource_name, *args, **kwargs):
+        options = read_table_options(resource_name, *args, **kwargs)
+        return {**options, "dtype": {**options["dtype"], "curation_effort": "float64"}}
+
+    monkeypatch.setattr(pipeline, "_read_table_options", options)
+    cache_path = pipeline._cache_path(networks_file, "networks")
+    assert cache_path != stale_path
+
+    pipeline.load_dataframe(networks_file, "networks")
+    assert _cached_files(cache_directory) == [cache_path]
+
+
+def test_other_readers_keep_their_files(networks_file, cache_directory, monkeypatch):
+    usecols = ["source", "target", "is_directed", "type"]
+    readings = [(engine, columns) for engine in pipeline.ENGINES for columns in (None, usecols)]
+    for engine, columns in readings:
+        pipeline.load_dataframe(networks_file, "networks", engine=engine, usecols=columns)
+
+    cache_paths = sorted(pipeline._cache_path(networks_file, "networks", *reading) for reading in readings)
+    assert len(set(cache_paths)) == len(readings)
+    assert _cached_files(cache_directory) == cache_paths
+
+    _fail_parsing(monkeypatch)
+    dataframe = pipeline.load_dataframe(networks_file, "networks", engine="pyarrow", usecols=usecols)
+    assert list(dataframe.columns) == usecols
+
+
+def test_files_of_an_older_format_are_pruned(networks_file, cache_directory):
+    old_path = os.path.join(cache_directory, CACHE_SUBDIRECTORY, f"networks-0123456789abcdef{CACHE_FILE_EXTENSION}")
+    other_resource_path = os.path.join(cache_directory, CACHE_SUBDIRECTORY, f"complexes-0-1{CACHE_FILE_EXTENSION}")
+    for path in (old_path, other_resource_path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "wb").close()
+
+    pipeline.load_dataframe(networks_file, "networks")
+    assert not os.path.exists(old_path)
+    assert os.path.exists(other_resource_path)
+
+
+def test_cache_off_writes_nothing(networks_file, cache_directory):
+    pipeline.load_dataframe(networks_file, "networks", cache=False)
+    assert not os.path.exists(cache_directory)
+
+
+@pytest.mark.parametrize("resource_name", RESOURCE_FILES)
+def test_engines_load_the_same_values(resource_name, cache_directory):
+    loaded = {
+        engine: pipeline.load_dataframe(RESOURCE_FILES[resource_name], resource_name, cache=False, engine=engine)
+        for engine in pipeline.ENGINES
+    }
+    c_dataframe, arrow_dataframe = loaded["c"], loaded["pyarrow"]
+    assert list(c_dataframe.columns) == list(arrow_dataframe.columns)
+    assert c_dataframe.index.equals(arrow_dataframe.index)
+    assert _values(c_dataframe) == _values(arrow_dataframe)
+
+
+@pytest.mark.parametrize("engine", pipeline.ENGINES)
+@pytest.mark.parametrize("resource_name", RESOURCE_FILES)
+def test_chunks_are_cached(resource_name, engine, cache_directory, monkeypatch):
+    path = RESOURCE_FILES[resource_name]
+    chunks = list(pipeline.load_dataframe_chunks(path, resource_name, 30, engine=engine))
+    assert _cached_files(cache_directory, resource_name) == [pipeline._cache_path(path, resource_name, engine)]
+
+    parsed = pipeline.load_dataframe(path, resource_name, cache=False, engine=engine)
+    _fail_parsing(monkeypatch)
+    cached = pipeline.load_dataframe(path, resource_name, engine=engine)
+    assert _values(pd.concat(chunks)) == _values(cached) == _values(parsed)
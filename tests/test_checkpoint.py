@@ -0,0 +1,116 @@
+import glob
+import os
+import shutil
+
+import pytest
+
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter import checkpoint
+from omnipath_secondary_adapter.checkpoint import (
+    CHECKPOINT_SUBDIRECTORY,
+    ELEMENTS_STAGE,
+    TABLE_STAGE,
+    Checkpoints,
+    code_version,
+)
+from omnipath_secondary_adapter.extraction import element_lists
+from omnipath_secondary_adapter.options import PipelineOptions
+
+from tests.conftest import RESOURCE_FILES
+
+
+def _load(resource_name):
+    dataframe = pipeline.load_dataframe(RESOURCE_FILES[resource_name], resource_name, cache=False)
+    return pipeline.transform_json_columns(resource_name, dataframe)
+
+
+def _outputs(directory):
+    """The content of each CSV file of a build, by file name."""
+    outputs = {}
+    for path in glob.glob(os.path.join(directory, "*.csv")):
+        with open(path) as fd:
+            outputs[os.path.basename(path)] = fd.read()
+    return outputs
+
+
+def _fail(*args, **kwargs):
+    raise AssertionError("a checkpointed stage ran again")
+
+
+@pytest.mark.parametrize("extractor", ["ontoweaver", "native"])
+@pytest.mark.parametrize("resource_name", RESOURCE_FILES)
+def test_elements_are_kept(resource_name, extractor, tmp_path, cache_directory):
+    nodes, edges = pipeline.extract_nodes_edges(resource_name, _load(resource_name), extractor=extractor)
+    checkpoints = Checkpoints(str(tmp_path), resource_name)
+    checkpoints.write_elements("0" * 64, nodes, edges)
+
+    assert checkpoints.elements("1" * 64) is None
+    assert element_lists(*checkpoints.elements("0" * 64)) == element_lists(nodes, edges)
+    assert Checkpoints(str(tmp_path), resource_name, resume=False).elements("0" * 64) is None
+
+    # Only the latest output of a stage is kept.
+    checkpoints.write_elements("1" * 64, nodes, edges)
+    assert checkpoints.elements("0" * 64) is None
+    assert len(glob.glob(str(tmp_path / f"{resource_name}-{ELEMENTS_STAGE}-*"))) == 2
+
+
+def test_resume(local_ontology, tmp_path, cache_directory, monkeypatch):
+    options = PipelineOptions(checkpoint=True, extractor="native")
+    pipeline.process_resource("networks", RESOURCE_FILES["networks"], options, str(tmp_path / "first"))
+    expected = _outputs(str(tmp_path / "first"))
+    assert expected
+
+    # The nodes and edges are extracted again from the checkpointed table with another extractor...
+    monkeypatch.setattr(pipeline, "load_dataframe", _fail)
+    options = PipelineOptions(resume=True, extractor="ontoweaver")
+    pipeline.process_resource("networks", RESOURCE_FILES["networks"], options, str(tmp_path / "table"))
+    assert _outputs(str(tmp_path / "table")) == expected
+
+    # ... and are not extracted again when unchanged.
+    monkeypatch.setattr(pipeline, "extract_nodes_edges_parallel", _fail)
+    pipeline.process_resource("networks", RESOURCE_FILES["networks"], options, str(tmp_path / "elements"))
+    assert _outputs(str(tmp_path / "elements")) == expected
+
+    # Checkpoints of other builds are not used.
+    with pytest.raises(AssertionError, match="checkpointed stage"):
+        options = PipelineOptions(resume=True, engine="pyarrow")
+        pipeline.process_resource("networks", RESOURCE_FILES["networks"], options, str(tmp_path / "engine"))
+    directory = os.path.join(cache_directory, CHECKPOINT_SUBDIRECTORY)
+    assert len(glob.glob(os.path.join(directory, f"networks-{TABLE_STAGE}-*"))) == 1
+
+
+def test_invalidation(tmp_path):
+    path_resource = str(tmp_path / "networks.tsv")
+    shutil.copy(RESOURCE_FILES["networks"], path_resource)
+    keys = pipeline.stage_keys("networks", path_resource)
+
+    # The nodes and edges depend on the options of the stages before them.
+    other = pipeline.stage_keys("networks", path_resource, PipelineOptions(extractor="native"))
+    assert other[TABLE_STAGE] == keys[TABLE_STAGE] and other[ELEMENTS_STAGE] != keys[ELEMENTS_STAGE]
+    other = pipeline.stage_keys("networks", path_resource, usecols=["source", "target"])
+    assert other[TABLE_STAGE] != keys[TABLE_STAGE] and other[ELEMENTS_STAGE] != keys[ELEMENTS_STAGE]
+    # The options of the fusion and writing are not.
+    assert pipeline.stage_keys("networks", path_resource, PipelineOptions(fusion="disk", writer="columnar")) == keys
+
+    with open(path_resource, "a") as fd:
+        fd.write("\n")
+    other = pipeline.stage_keys("networks", path_resource)
+    assert other[TABLE_STAGE] != keys[TABLE_STAGE] and other[ELEMENTS_STAGE] != keys[ELEMENTS_STAGE]
+
+
+def test_code_version(tmp_path, monkeypatch):
+    source_directory = str(tmp_path / "package")
+    shutil.copytree(checkpoint.SOURCE_DIRECTORY, source_directory, ignore=shutil.ignore_patterns("__pycache__"))
+    monkeypatch.setattr(checkpoint, "SOURCE_DIRECTORY", source_directory)
+    version = code_version()
+
+    # Editing a module the stages do not run keeps the checkpoints...
+    for module in ("benchmark", "fusion", "synthetic"):
+        with open(os.path.join(source_directory, f"{module}.py"), "a") as fd:
+            fd.write("\n")
+    assert code_version() == version
+
+    # ... but not editing one they run.
+    with open(os.path.join(source_directory, "extraction.py"), "a") as fd:
+        fd.write("\n")
+    assert code_version() != version
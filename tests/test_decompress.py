@@ -0,0 +1,58 @@
+import gzip
+import io
+import os
+import shutil
+import time
+
+import pytest
+
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter.decompress import (
+    DECOMPRESSION_BACKENDS,
+    PipelinedGzipReader,
+    igzip,
+    read_throughputs,
+)
+
+from tests.conftest import RESOURCE_FILES
+
+
+CONSUMER_TIME = 0.2  # seconds spent on each chunk once parsed, e.g. extracting it
+
+
+def _compressed(tmp_path, resource_name):
+    path = str(tmp_path / f"{resource_name}.tsv.gz")
+    with open(RESOURCE_FILES[resource_name], "rb") as source, gzip.open(path, "wb") as target:
+        shutil.copyfileobj(source, target)
+    return path
+
+
+@pytest.mark.parametrize("backend", DECOMPRESSION_BACKENDS)
+def test_backends(backend, tmp_path):
+    if backend == "isal" and igzip is None or backend == "pigz" and not shutil.which("pigz"):
+        pytest.skip(f"{backend} is not available")
+    path = _compressed(tmp_path, "networks")
+    reader = PipelinedGzipReader(path, backend=backend, block_size=4096, depth=2)
+    try:
+        data = io.BufferedReader(reader).read()
+    finally:
+        reader.close()
+    with open(RESOURCE_FILES["networks"], "rb") as fd:
+        assert data == fd.read()
+    assert reader.decompressed_bytes == len(data)
+
+
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_parsing_time_leaves_out_the_consumer(engine, tmp_path):
+    path = _compressed(tmp_path, "networks")
+    chunks = pipeline.load_dataframe_chunks(path, "networks", 100, cache=False, engine=engine)
+    nb_chunks = 0
+    for _ in chunks:
+        time.sleep(CONSUMER_TIME)
+        nb_chunks += 1
+    assert nb_chunks == 10
+
+    read = read_throughputs()[-1]
+    assert read["path"] == path
+    assert read["decompressed_size"] == pytest.approx(os.path.getsize(RESOURCE_FILES["networks"]) / 1024**2)
+    assert read["parsing_time"] < nb_chunks * CONSUMER_TIME / 2
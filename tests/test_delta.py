@@ -0,0 +1,142 @@
+import os
+
+import numpy as np
+import ontoweaver
+import pandas as pd
+import pytest
+
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter.delta import (
+    DELTA_SUBDIRECTORY,
+    ELEMENT_KEY_COLUMNS,
+    DeltaState,
+    diff_rows,
+    element_counts,
+    element_tuples,
+    fuse_elements,
+    row_fingerprints,
+    update_counts,
+)
+from omnipath_secondary_adapter.options import PipelineOptions
+
+from tests.conftest import RESOURCE_FILES
+
+
+SEPARATOR = ", "
+CHANGED_COLUMNS = {  # a column of each resource mapped to a property, but not a key column
+    "annotations": "genesymbol",  # the name of the proteins, shared by many rows
+    "networks": "sources",
+}
+NB_ROWS = 5  # rows added and removed between the releases, and twice as many changed
+
+
+def _load(resource_name):
+    dataframe = pipeline.load_dataframe(RESOURCE_FILES[resource_name], resource_name, cache=False)
+    return pipeline.transform_json_columns(resource_name, dataframe)
+
+
+def _releases(resource_name):
+    """Two releases of a sample: the second adds, removes and changes rows of the first one."""
+    dataframe = _load(resource_name)
+    first = dataframe.iloc[NB_ROWS:].reset_index(drop=True)
+    second = dataframe.iloc[:-NB_ROWS].copy()
+    col = CHANGED_COLUMNS[resource_name]
+    second[col] = second[col].astype(object)
+    changed = second.index[100 : 100 + 2 * NB_ROWS]
+    second.loc[changed, col] = [f"Changed{n}" for n in range(len(changed))]
+    return first, second.reset_index(drop=True)
+
+
+def _normalized(nodes, edges):
+    """The elements by key, with the distinct values of each property, whatever their order."""
+
+    def values(value):
+        return frozenset(value.split(SEPARATOR)) if value else frozenset()
+
+    elements = {("node", node_id, "", label): properties for node_id, label, properties in nodes}
+    elements.update(
+        {("edge", source, target, label): properties for _, source, target, label, properties in edges}
+    )
+    return {key: {prop: values(value) for prop, value in properties.items()} for key, properties in elements.items()}
+
+
+def _counts(counts):
+    return dict(zip(counts[ELEMENT_KEY_COLUMNS].itertuples(index=False, name=None), counts["count"]))
+
+
+def test_diff_rows():
+    old_keys, old_rows = np.array([1, 2, 3, 4], dtype=np.uint64), np.array([10, 20, 30, 40], dtype=np.uint64)
+    new_keys, new_rows = np.array([2, 3, 5], dtype=np.uint64), np.array([20, 31, 50], dtype=np.uint64)
+    diff = diff_rows(old_keys, old_rows, new_keys, new_rows)
+    assert diff.new_positions.tolist() == [1, 2]  # key 3 changed, key 5 added
+    assert diff.gone_positions.tolist() == [0, 2, 3]  # key 1 and 4 removed, key 3 changed
+    assert (diff.nb_added, diff.nb_changed, diff.nb_removed) == (1, 1, 2)
+
+
+def test_update_counts():
+    nodes = [("A", "protein", {}), ("B", "protein", {}), ("A", "protein", {})]
+    edges = [("", "A", "B", "interacts", {})]
+    counts, retracted = update_counts(
+        element_counts(nodes, edges),
+        element_counts([("C", "protein", {})], []),
+        element_counts(nodes[:2], edges),
+    )
+    assert _counts(counts) == {("node", "A", "", "protein"): 1, ("node", "C", "", "protein"): 1}
+    assert element_tuples(retracted) == ([("B", "protein", {})], [("", "A", "B", "interacts", {})])
+
+
+@pytest.mark.parametrize("extractor", pipeline.EXTRACTORS)
+@pytest.mark.parametrize("resource_name", CHANGED_COLUMNS)
+def test_two_releases(resource_name, extractor, local_ontology, tmp_path, cache_directory):
+    first, second = _releases(resource_name)
+    options = PipelineOptions(delta=True, extractor=extractor)
+
+    def build(dataframe, release, **kwargs):
+        return pipeline.delta_fuse_and_write(
+            resource_name, dataframe, options, output_directory=str(tmp_path / release), **kwargs
+        )
+
+    build(first, "first")
+    import_file, nb_nodes, nb_edges = build(second, "second")
+
+    # The nodes and edges of the changed rows are fused from all the rows of the second release.
+    first_elements = pipeline.extract_nodes_edges(resource_name, first)
+    second_elements = pipeline.extract_nodes_edges(resource_name, second)
+    expected = _normalized(*ontoweaver.fusion.reconciliate(*second_elements, separator=SEPARATOR))
+    state = DeltaState(os.path.join(cache_directory, DELTA_SUBDIRECTORY), resource_name)
+    assert _counts(state.counts()) == _counts(element_counts(*second_elements))
+
+    diff = diff_rows(*_fingerprints(first, resource_name), *_fingerprints(second, resource_name))
+    assert (diff.nb_added, diff.nb_changed, diff.nb_removed) == (NB_ROWS, 2 * NB_ROWS, NB_ROWS)
+    new_elements = pipeline.extract_nodes_edges(resource_name, second.iloc[diff.new_positions])
+    gone_elements = pipeline.extract_nodes_edges(resource_name, first.iloc[diff.gone_positions])
+    touched = (set(_normalized(*new_elements)) | set(_normalized(*gone_elements))) & set(expected)
+    retracted = set(_normalized(*first_elements)) - set(expected)
+    assert touched and retracted
+
+    touched_keys = pd.DataFrame(sorted(touched), columns=ELEMENT_KEY_COLUMNS)
+    values = state.values()
+    fused_nodes, fused_edges = fuse_elements(touched_keys, values, values.iloc[:0], SEPARATOR)
+    assert _normalized(fused_nodes, fused_edges) == {key: expected[key] for key in touched}
+    assert (nb_nodes, nb_edges) == (len(fused_nodes), len(fused_edges))
+
+    output_directory = os.path.dirname(import_file)
+    with open(os.path.join(output_directory, "delta-merge.cypher")) as fd:
+        merge_script = fd.read()
+    with open(os.path.join(output_directory, "delta-delete.cypher")) as fd:
+        delete_script = fd.read()
+    assert "Changed0" in merge_script
+    for node_id, *_ in fused_nodes:
+        assert f'id: "{node_id}"' in merge_script
+    for _, element_id, _, _ in retracted:
+        assert f'"{element_id}"' in delete_script
+
+    # Reading other columns makes another build: the whole graph is built again.
+    _, nb_nodes, nb_edges = build(second, "columns", usecols=sorted(second.columns))
+    assert (nb_nodes, nb_edges) == tuple(map(len, second_elements))
+    _, nb_nodes, nb_edges = build(second, "unchanged", usecols=sorted(second.columns))
+    assert (nb_nodes, nb_edges) == (0, 0)
+
+
+def _fingerprints(dataframe, resource_name):
+    return row_fingerprints(dataframe, pipeline.DELTA_KEY_COLUMNS[resource_name])
@@ -0,0 +1,171 @@
+import hashlib
+import os
+import threading
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+
+import pytest
+
+from omnipath_secondary_adapter import download
+from omnipath_secondary_adapter.download import (
+    METADATA_FILE_EXTENSION,
+    PARTIAL_FILE_EXTENSION,
+    DownloadError,
+    download_file,
+)
+
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    """Serve the file of the archive, with an ETag, conditional and range requests."""
+
+    def do_GET(self):
+        archive = self.server.archive
+        archive.requests.append(dict(self.headers))
+        etag = f'"{hashlib.sha256(archive.content).hexdigest()[:16]}"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self._reply(304, etag)
+            return
+
+        content, status, content_range = archive.content, 200, None
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") == etag:
+            offset = int(range_header.split("=")[1].rstrip("-"))
+            content, status = archive.content[offset:], 206
+            content_range = f"bytes {offset}-{len(archive.content) - 1}/{len(archive.content)}"
+
+        if archive.truncate:
+            # Announce the whole content, send half of it and drop the connection.
+            archive.truncate = False
+            self._reply(status, etag, len(content), content_range)
+            self.wfile.write(content[: len(content) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        self._reply(status, etag, len(content), content_range)
+        self.wfile.write(content)
+
+    def _reply(self, status, etag, length=0, content_range=None):
+        self.server.archive.statuses.append(status)
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(length))
+        if content_range:
+            self.send_header("Content-Range", content_range)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Archive:
+    def __init__(self, content: bytes):
+        self.content = content
+        self.truncate = False
+        self.requests = []
+        self.statuses = []
+
+
+@pytest.fixture
+def archive():
+    archive = Archive(os.urandom(256 * 1024))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ArchiveHandler)
+    server.archive = archive
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    archive.url = f"http://127.0.0.1:{server.server_address[1]}/omnipath_webservice_interactions__latest.tsv.gz"
+    yield archive
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(download, "RETRY_DELAY", 0)
+    # Small blocks, so that the partial file keeps what was received before the connection dropped.
+    monkeypatch.setattr(download, "DOWNLOAD_BLOCK_SIZE", 1024)
+
+
+def _read(path):
+    with open(path, "rb") as fd:
+        return fd.read()
+
+
+def test_download_then_not_modified(archive, tmp_path):
+    path = str(tmp_path / "networks.tsv.gz")
+
+    assert download_file(archive.url, path) == path
+    assert _read(path) == archive.content
+    assert os.path.isfile(path + METADATA_FILE_EXTENSION)
+
+    download_file(archive.url, path)
+    assert archive.statuses == [200, 304]
+    assert "If-None-Match" in archive.requests[-1]
+    assert _read(path) == archive.content
+
+
+def test_changed_file_is_downloaded_again(archive, tmp_path):
+    path = str(tmp_path / "networks.tsv.gz")
+    download_file(archive.url, path)
+
+    archive.content = os.urandom(1000)
+    download_file(archive.url, path)
+    assert archive.statuses == [200, 200]
+    assert _read(path) == archive.content
+
+
+def test_interrupted_download_is_resumed(archive, tmp_path):
+    path = str(tmp_path / "networks.tsv.gz")
+    archive.truncate = True
+
+    download_file(archive.url, path)
+    assert archive.statuses == [200, 206]
+    offset = len(archive.content) // 2
+    assert archive.requests[1]["Range"] == f"bytes={offset}-"
+    assert _read(path) == archive.content
+    assert not os.path.exists(path + PARTIAL_FILE_EXTENSION)
+
+
+def test_partial_download_of_a_changed_file_restarts(archive, tmp_path):
+    path = str(tmp_path / "networks.tsv.gz")
+    archive.truncate = True
+    with pytest.raises(DownloadError):
+        download_file(archive.url, path, max_attempts=1)
+    assert os.path.exists(path + PARTIAL_FILE_EXTENSION)
+
+    # The remote file changes: If-Range does not match, the whole new file is sent.
+    archive.content = os.urandom(100 * 1024)
+    download_file(archive.url, path)
+    assert archive.requests[-1]["If-Range"]
+    assert archive.statuses[-1] == 200
+    assert _read(path) == archive.content
+
+
+def test_checksum_mismatch(archive, tmp_path):
+    path = str(tmp_path / "networks.tsv.gz")
+
+    with pytest.raises(DownloadError, match="SHA-256 mismatch"):
+        download_file(archive.url, path, expected_sha256="0" * 64)
+    assert not os.path.exists(path)
+    assert not os.path.exists(path + PARTIAL_FILE_EXTENSION)
+
+    sha256 = hashlib.sha256(archive.content).hexdigest()
+    download_file(archive.url, path, expected_sha256=sha256)
+    assert _read(path) == archive.content
+
+
+def test_local_copy_is_used_when_the_server_is_down(archive, tmp_path):
+    path = str(tmp_path / "networks.tsv.gz")
+    download_file(archive.url, path)
+
+    url = archive.url.replace(archive.url.split("/")[2], "127.0.0.1:9")
+    with open(path + METADATA_FILE_EXTENSION) as fd:
+        metadata = fd.read()
+    with open(path + METADATA_FILE_EXTENSION, "w") as fd:
+        fd.write(metadata.replace(archive.url, url))
+
+    assert download_file(url, path, max_attempts=1) == path
+    assert _read(path) == archive.content
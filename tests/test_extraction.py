@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter.extraction import (
+    concat_elements,
+    element_lists,
+    element_tables,
+    last_items,
+    split_text,
+)
+
+from tests.conftest import RESOURCE_FILES
+
+
+@pytest.fixture(scope="module")
+def extracted():
+    """The table, and the nodes and edges Ontoweaver extracts, of the sample of each resource."""
+    return {}
+
+
+def _ontoweaver(extracted, resource_name):
+    if resource_name not in extracted:
+        dataframe = pipeline.load_dataframe(RESOURCE_FILES[resource_name], resource_name, cache=False)
+        dataframe = pipeline.transform_json_columns(resource_name, dataframe)
+        extracted[resource_name] = dataframe, pipeline.extract_nodes_edges(resource_name, dataframe)
+    return extracted[resource_name]
+
+
+@pytest.mark.parametrize("resource_name", RESOURCE_FILES)
+def test_native_matches_ontoweaver(resource_name, extracted, cache_directory):
+    dataframe, (nodes, edges) = _ontoweaver(extracted, resource_name)
+    native_nodes, native_edges = pipeline.extract_nodes_edges(resource_name, dataframe, extractor="native")
+
+    if resource_name != "complexes":  # its mapping is not compiled: Ontoweaver extracts it
+        assert isinstance(native_nodes, pd.DataFrame) and isinstance(native_edges, pd.DataFrame)
+    assert element_lists(native_nodes, native_edges) == (nodes, edges)
+
+
+@pytest.mark.parametrize("resource_name", RESOURCE_FILES)
+def test_tuples_as_tables(resource_name, extracted, cache_directory):
+    _, (nodes, edges) = _ontoweaver(extracted, resource_name)
+    tables = element_tables(nodes, edges)
+    assert element_lists(*tables) == (nodes, edges)
+
+    # Parts extracted as tables or as tuples are concatenated in order.
+    half_nodes, half_edges = len(nodes) // 2, len(edges) // 2
+    parts = [
+        (tables[0].iloc[:half_nodes], tables[1].iloc[:half_edges]),
+        (nodes[half_nodes:], edges[half_edges:]),
+    ]
+    assert element_lists(*concat_elements(parts)) == (nodes, edges)
+    assert concat_elements([(nodes, edges), ([], [])]) == (nodes, edges)
+
+
+def test_split_text():
+    text = np.array(["P1_P2", "P2", "", "P1_P3_P2"], dtype=object)
+    positions, items = split_text(text, "_")
+    assert positions.tolist() == [0, 0, 1, 2, 3, 3, 3]
+    assert items.tolist() == ["P1", "P2", "P2", "", "P1", "P3", "P2"]
+    assert last_items(positions, items).tolist() == ["P2", "P2", "", "P2"]
+    # The repeated items are a single string each.
+    assert items[1] is items[2] is items[6] and items[0] is items[4]
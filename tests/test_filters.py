@@ -0,0 +1,80 @@
+import csv
+
+import pandas as pd
+import pytest
+
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter.filters import parse_filter
+
+from tests.conftest import RESOURCE_FILES
+
+
+# Every way a table is loaded: engine, and whether its cache is not used, created or read.
+LOADINGS = [(engine, cache) for engine in pipeline.ENGINES for cache in ("off", "create", "hit")]
+
+
+@pytest.fixture
+def networks_with_missing_booleans(tmp_path):
+    """The networks sample, with missing `is_stimulation` values in one row out of three."""
+    table = pd.read_table(
+        RESOURCE_FILES["networks"], dtype=str, keep_default_na=False, quoting=csv.QUOTE_NONE
+    )
+    table.loc[::3, "is_stimulation"] = ""
+    path = tmp_path / "networks.tsv"
+    table.to_csv(path, sep="\t", index=False, quoting=csv.QUOTE_NONE)
+    return str(path)
+
+
+def _load(path, engine, cache, row_filters, chunksize=None):
+    if cache == "hit":
+        # Create the cache, then read it.
+        _load(path, engine, "create", None, chunksize)
+    options = dict(cache=cache != "off", engine=engine, row_filters=row_filters)
+    if chunksize:
+        chunks = list(pipeline.load_dataframe_chunks(path, "networks", chunksize, **options))
+        return pd.concat(chunks) if chunks else None
+    return pipeline.load_dataframe(path, "networks", **options)
+
+
+@pytest.mark.parametrize("chunksize", [None, 128])
+@pytest.mark.parametrize("engine,cache", LOADINGS)
+def test_filters_read_missing_booleans_as_false(
+    networks_with_missing_booleans, engine, cache, chunksize, cache_directory
+):
+    row_filters = [parse_filter("is_stimulation == False"), parse_filter("curation_effort >= 2")]
+    dataframe = _load(networks_with_missing_booleans, engine, cache, row_filters, chunksize)
+
+    table = pd.read_table(
+        networks_with_missing_booleans, dtype=str, keep_default_na=False, quoting=csv.QUOTE_NONE
+    )
+    expected = table.index[
+        (table["is_stimulation"] != "1") & (table["curation_effort"].astype(int) >= 2)
+    ]
+    assert expected.isin(range(0, len(table), 3)).any()
+    assert dataframe.index.tolist() == expected.tolist()
+    assert not dataframe["is_stimulation"].any()
+
+
+@pytest.mark.parametrize("chunksize", [None, 128])
+@pytest.mark.parametrize("engine,cache", LOADINGS)
+def test_filters_keeping_no_row(engine, cache, chunksize, cache_directory):
+    row_filters = [parse_filter("type == nonexistent")]
+    dataframe = _load(RESOURCE_FILES["networks"], engine, cache, row_filters, chunksize)
+    if chunksize:
+        assert dataframe is None  # empty chunks are skipped
+    else:
+        assert dataframe.empty
+        assert list(dataframe.columns) == pipeline.read_header(RESOURCE_FILES["networks"])
+
+
+@pytest.mark.parametrize("engine", pipeline.ENGINES)
+def test_filters_on_a_file_without_rows(engine, tmp_path, cache_directory):
+    path = tmp_path / "networks.tsv"
+    path.write_text(open(RESOURCE_FILES["networks"]).readline())
+
+    dataframe = pipeline.load_dataframe(
+        str(path), "networks", cache=False, engine=engine, row_filters=[parse_filter("curation_effort >= 2")]
+    )
+    assert dataframe.empty
+    assert list(dataframe.columns) == pipeline.read_header(str(path))
+    assert pd.api.types.is_bool_dtype(dataframe["is_directed"])
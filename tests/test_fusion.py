@@ -0,0 +1,118 @@
+import os
+
+import numpy as np
+import ontoweaver
+import pytest
+
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter.extraction import (
+    element_lists,
+    element_tables,
+)
+from omnipath_secondary_adapter.fusion import DiskFusion
+from omnipath_secondary_adapter.interning import IdTable
+
+from tests.conftest import RESOURCE_FILES
+
+
+SEPARATOR = ", "
+
+
+def _extract(resource_name):
+    dataframe = pipeline.load_dataframe(RESOURCE_FILES[resource_name], resource_name, cache=False)
+    dataframe = pipeline.transform_json_columns(resource_name, dataframe)
+    return element_lists(*pipeline.extract_nodes_edges(resource_name, dataframe, extractor="native"))
+
+
+def _with_duplicated_edges(edges):
+    """The edges, plus a copy of every other one with other `sources` and references."""
+    duplicates = [
+        (edge_id, source, target, label, {**properties, "sources": "Test", "references": f"Test:{n}"})
+        for n, (edge_id, source, target, label, properties) in enumerate(edges[::2])
+    ]
+    return edges + duplicates
+
+
+def _values(value):
+    """The distinct values joined by a fusion, whatever their order."""
+    return frozenset(value.split(SEPARATOR)) if value else frozenset()
+
+
+def _normalized_nodes(nodes):
+    return {
+        node_id: (label, {prop: _values(value) for prop, value in properties.items()})
+        for node_id, label, properties in nodes
+    }
+
+
+def _normalized_edges(edges):
+    return {
+        (source, target, label): (_values(edge_id), {prop: _values(value) for prop, value in properties.items()})
+        for edge_id, source, target, label, properties in edges
+    }
+
+
+@pytest.mark.parametrize("as_tables", [False, True], ids=["tuples", "tables"])
+@pytest.mark.parametrize("intern_ids", [False, True])
+@pytest.mark.parametrize("resource_name", RESOURCE_FILES)
+def test_disk_fusion_matches_ontoweaver(resource_name, intern_ids, as_tables, tmp_path, cache_directory):
+    nodes, edges = _extract(resource_name)
+    edges = _with_duplicated_edges(edges)
+    fused_nodes, fused_edges = ontoweaver.fusion.reconciliate(nodes, edges, separator=SEPARATOR)
+
+    ids = IdTable(str(tmp_path / "ids")) if intern_ids else None
+    with DiskFusion(str(tmp_path), nb_buckets=4, separator=SEPARATOR, ids=ids) as fusion:
+        fusion.add(*(element_tables(nodes, edges) if as_tables else (nodes, edges)))
+        assert (fusion.nb_nodes, fusion.nb_edges) == (len(nodes), len(edges))
+        disk_nodes, disk_edges = list(fusion.nodes()), list(fusion.edges())
+        assert (fusion.nb_fused_nodes, fusion.nb_fused_edges) == (len(disk_nodes), len(disk_edges))
+        directory = fusion.directory
+
+    assert len(disk_nodes) == len(fused_nodes)
+    assert len(disk_edges) == len(fused_edges)
+    assert _normalized_nodes(disk_nodes) == _normalized_nodes(fused_nodes)
+    assert _normalized_edges(disk_edges) == _normalized_edges(fused_edges)
+    assert not os.path.exists(directory)
+
+
+def test_disk_fusion_output_is_deterministic(tmp_path, cache_directory):
+    nodes, edges = _extract("networks")
+    edges = _with_duplicated_edges(edges)
+    outputs = []
+    for ids in (None, IdTable()):
+        with DiskFusion(str(tmp_path), separator=SEPARATOR, ids=ids) as fusion:
+            fusion.add(nodes, edges)
+            outputs.append((sorted(fusion.nodes()), sorted(fusion.edges(), key=lambda edge: edge[1:4])))
+    assert outputs[0] == outputs[1]
+    # Values are joined in the order they were first seen.
+    edge = next(edge for edge in outputs[0][1] if "Test" in edge[4]["sources"])
+    assert edge[4]["sources"].endswith(f"{SEPARATOR}Test")
+
+
+@pytest.mark.parametrize("intern_ids", [False, True])
+def test_disk_fusion_conflicting_labels(intern_ids, tmp_path):
+    nodes = [("P12345", "protein", {}), ("P12345", "complex", {})]
+    with DiskFusion(str(tmp_path), ids=IdTable() if intern_ids else None) as fusion:
+        fusion.add(nodes, [])
+        with pytest.raises(ValueError, match="P12345"):
+            list(fusion.nodes())
+
+
+def test_id_table_codes_are_kept(tmp_path):
+    directory = str(tmp_path / "ids")
+    ids = IdTable(directory)
+    codes = ids.encode(["P12345", "Q67890", "P12345"])
+    assert codes.tolist() == [0, 1, 0]
+    ids.save()
+
+    reopened = IdTable(directory)
+    assert len(reopened) == 2
+    assert reopened.encode(["Q67890", "O11111"]).tolist() == [1, 2]
+    assert reopened.decode(np.array([2, 0])).tolist() == ["O11111", "P12345"]
+
+    # Another table appended its own IDs meanwhile: they keep their codes.
+    other = IdTable(directory)
+    other.encode(["A00001"])
+    other.save()
+    reopened.save()
+    assert IdTable(directory).decode(np.arange(4)).tolist() == ["P12345", "Q67890", "A00001", "O11111"]
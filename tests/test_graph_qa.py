@@ -0,0 +1,124 @@
+import json
+
+import ontoweaver
+import pyarrow as pa
+import pytest
+
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter.extraction import element_lists
+from omnipath_secondary_adapter.graph_qa import (
+    FORBIDDEN_SOURCES,
+    MAX_SOURCES,
+    CsrGraph,
+    graph_qa,
+    load_graph,
+    run_queries,
+    split_sources,
+)
+from omnipath_secondary_adapter.options import PipelineOptions
+
+from tests.conftest import RESOURCE_FILES
+
+
+@pytest.fixture
+def graph():
+    """A graph of 5 nodes, one of them isolated, and 6 edges, one of them to a missing node."""
+    node_ids = pa.chunked_array([["A", "B", "C"], ["D", "E", "A"]])
+    edges = pa.table(
+        {
+            "source": ["A", "A", "B", "C", "B", "D"],
+            "target": ["A", "B", "C", "D", "B", "Z"],
+            "label": [
+                "ProteinProteinInteraction",
+                "ProteinProteinInteraction",
+                "PostTranslational",
+                "ProteinProteinInteraction",
+                "PostTranslational",
+                "ProteinProteinInteraction",
+            ],
+            "sources": ["Wang;X", "X;Y;Z;W", "SPIKE", None, "X;X;Y;Z;", "X"],
+            "is_stimulation": ["true", "1", "true", "false", None, "true"],
+        }
+    )
+    return CsrGraph.from_tables(node_ids, edges)
+
+
+def test_queries_on_a_known_graph(graph):
+    assert graph.nb_nodes == 5
+    assert sorted(graph.neighbors("A")) == ["A", "B"]
+    assert graph.neighbors("E") == []
+    with pytest.raises(KeyError):
+        graph.neighbors("Z")
+
+    assert graph.stimulation_edges() == (["A", "A"], ["A", "B"])
+
+    results = run_queries(graph)
+    assert results.pop("query_time") >= 0
+    assert results == {
+        "nodes": 5,
+        "isolated_nodes": 1,  # E
+        "same_source_target_count": 1,  # A -> A, B -> B being of another type
+        "stimulation_edges": 2,  # A -> A and A -> B
+        "total_edges": 5,  # D -> Z is left out
+        "edges_without_forbidden_sources": 2,  # A -> B and B -> B
+        "edges_with_many_sources": 2,  # the repeated X of B -> B is counted
+    }
+
+
+def test_split_sources():
+    assert split_sources("X;Y;") == ["X", "Y"]
+    assert split_sources("X;;Y") == ["X", "", "Y"]
+    assert split_sources("") == [""]
+
+
+def _expected_results(nodes, edges):
+    """The results of the queries, computed on the fused node and edge tuples."""
+    connected = {edge[1] for edge in edges} | {edge[2] for edge in edges}
+    many_sources = without_forbidden = 0
+    for *_, properties in edges:
+        items = split_sources(properties["sources"])
+        if not set(FORBIDDEN_SOURCES).intersection(items):
+            without_forbidden += 1
+            many_sources += len(items) > MAX_SOURCES
+    return {
+        "nodes": len(nodes),
+        "isolated_nodes": len({node[0] for node in nodes} - connected),
+        # The networks resource has no edge of the type of queries 2 and 3.
+        "same_source_target_count": 0,
+        "stimulation_edges": 0,
+        "total_edges": len(edges),
+        "edges_without_forbidden_sources": without_forbidden,
+        "edges_with_many_sources": many_sources,
+    }
+
+
+@pytest.mark.parametrize("output", ["neo4j", "parquet", "sqlite"])
+def test_loaded_build(output, local_ontology, tmp_path, cache_directory):
+    dataframe = pipeline.load_dataframe(RESOURCE_FILES["networks"], "networks", cache=False)
+    dataframe = pipeline.transform_json_columns("networks", dataframe)
+    nodes, edges = pipeline.extract_nodes_edges("networks", dataframe, extractor="native")
+    output_directory = str(tmp_path / "networks")
+    options = PipelineOptions(output=output, writer="columnar" if output == "neo4j" else "biocypher")
+    pipeline.fuse_and_write(nodes, edges, "networks", options, output_directory=output_directory)
+
+    fused_nodes, fused_edges = ontoweaver.fusion.reconciliate(*element_lists(nodes, edges), separator=", ")
+    graph = load_graph([output_directory], output)
+    results = run_queries(graph)
+    del results["query_time"]
+    assert results == _expected_results(fused_nodes, fused_edges)
+
+    # The queries 2 and 3 on the edges of another type.
+    loops = [edge for edge in fused_edges if edge[1] == edge[2] and edge[3] == "post_translational"]
+    stimulations = [
+        edge for edge in fused_edges if edge[3] == "post_translational" and edge[4]["is_stimulation"] == "True"
+    ]
+    assert loops and stimulations
+    assert graph.self_loops("PostTranslational") == len(loops)
+    assert sorted(zip(*graph.stimulation_edges("PostTranslational"))) == sorted(
+        (edge[1], edge[2]) for edge in stimulations
+    )
+
+    report = tmp_path / "qa" / "qa.json"
+    results = graph_qa([str(tmp_path)], output, report=str(report))
+    assert json.loads(report.read_text()) == results
+    assert results["total_edges"] == len(fused_edges)
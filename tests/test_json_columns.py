@@ -0,0 +1,28 @@
+import logging
+
+import pandas as pd
+
+from omnipath_secondary_adapter.json_columns import project_json_columns
+
+
+def test_malformed_documents_give_missing_fields(caplog):
+    evidences = [
+        '{"positive": [{"resource": "SIGNOR", "references": ["1"]}], "directed": [{"resource": "SIGNOR"}]}',
+        '{"positive": [{"resource": "SIGNOR"',  # truncated
+        "[1, 2]",  # not an object
+        None,
+        '{"positive": [{"resource": "SIGNOR", "references": ["1"]}], "directed": [{"resource": "SIGNOR"}]}',
+    ]
+    dataframe = pd.DataFrame({"source": list("abcde"), "evidences": evidences})
+
+    with caplog.at_level(logging.WARNING, logger="biocypher"):
+        projected = project_json_columns(
+            dataframe, ["source", "evidences_positive_resources", "evidences_nb_directed"]
+        )
+
+    assert list(projected.columns) == ["source", "evidences_positive_resources", "evidences_nb_directed"]
+    assert projected["evidences_positive_resources"].tolist()[::4] == ["SIGNOR", "SIGNOR"]
+    assert projected["evidences_positive_resources"][1:4].isna().all()
+    assert projected["evidences_nb_directed"].tolist()[::4] == [1, 1]
+    assert projected["evidences_nb_directed"][1:4].isna().all()
+    assert "2 values of column 'evidences' are not JSON objects" in caplog.text
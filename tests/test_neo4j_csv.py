@@ -0,0 +1,114 @@
+import glob
+import gzip
+import os
+import re
+
+import pytest
+
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter import (
+    biocypher_api,
+    options as pipeline_options,
+)
+from omnipath_secondary_adapter.biocypher_api import UnsupportedBioCypherError
+from omnipath_secondary_adapter.options import PipelineOptions
+
+from tests.conftest import RESOURCE_FILES
+
+
+IMPORT_CALL = "neo4j-admin-import-call.sh"
+
+
+def _read(path):
+    with (gzip.open if path.endswith(".gz") else open)(path, "rb") as fd:
+        return fd.read()
+
+
+def _import_files(directory):
+    """The headers, the lines of the part files of each label, and the words of the import call."""
+    files = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.endswith("-header.csv"):
+            files[name] = _read(path)
+        elif "-part" in name:
+            label = name.split("-part")[0]
+            files[label] = files.get(label, b"") + _read(path)
+    with open(os.path.join(directory, IMPORT_CALL)) as fd:
+        # The files of BioCypher's import call are listed in the order of a set.
+        files[IMPORT_CALL] = sorted(fd.read().replace(directory, "OUTPUT").split())
+    return files
+
+
+@pytest.fixture(scope="module")
+def extracted():
+    """The nodes and edges extracted from the sample of each resource."""
+    return {}
+
+
+def _nodes_edges(extracted, resource_name):
+    if resource_name not in extracted:
+        dataframe = pipeline.load_dataframe(RESOURCE_FILES[resource_name], resource_name, cache=False)
+        dataframe = pipeline.transform_json_columns(resource_name, dataframe)
+        extracted[resource_name] = pipeline.extract_nodes_edges(
+            resource_name, dataframe, extractor="native"
+        )
+    return extracted[resource_name]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"compress": True}, {"part_size": 1, "parts": 3}, {"fusion": "disk"}],
+    ids=["plain", "compress", "parts", "disk"],
+)
+@pytest.mark.parametrize("resource_name", sorted(RESOURCE_FILES))
+def test_columnar_writer_matches_biocypher(
+    resource_name, options, extracted, local_ontology, tmp_path, cache_directory, monkeypatch
+):
+    nodes, edges = _nodes_edges(extracted, resource_name)
+    monkeypatch.setattr(pipeline_options, "MEGABYTE", 10_000)  # part files of 10 kB
+
+    outputs = {}
+    # The disk fusion hands tables to the columnar writer, and tuples to BioCypher.
+    fusion = {"fusion": options.get("fusion", "ontoweaver")}
+    for writer, writer_options in (("biocypher", fusion), ("columnar", {**fusion, **options})):
+        outputs[writer] = str(tmp_path / writer)
+        options = PipelineOptions(writer=writer, **writer_options)
+        pipeline.fuse_and_write(nodes, edges, resource_name, options, output_directory=outputs[writer])
+
+    expected = _import_files(outputs["biocypher"])
+    written = _import_files(outputs["columnar"])
+    assert written.keys() == expected.keys()
+    for name in expected:
+        assert written[name] == expected[name], name
+
+
+def test_merged_import_call(extracted, local_ontology, tmp_path, cache_directory):
+    resource_names = ["enzyme_PTM", "networks"]
+    directories = pipeline.resource_output_directories(resource_names, str(tmp_path))
+    for resource_name in resource_names:
+        nodes, edges = _nodes_edges(extracted, resource_name)
+        options = PipelineOptions(writer="columnar", parts=2)
+        pipeline.fuse_and_write(nodes, edges, resource_name, options, output_directory=directories[resource_name])
+
+    import_file = pipeline.merge_import_calls(directories.values(), str(tmp_path))
+
+    # Each header file of each resource, with all its part files.
+    expected = set()
+    for directory in directories.values():
+        for header_path in glob.glob(os.path.join(directory, "*-header.csv")):
+            pascal_label = os.path.basename(header_path)[: -len("-header.csv")]
+            part_paths = sorted(glob.glob(os.path.join(directory, f"{pascal_label}-part*.csv")))
+            assert len(part_paths) == 2
+            kind = "nodes" if pascal_label == "Protein" else "relationships"
+            expected.add((kind, ",".join([header_path, *part_paths])))
+    with open(import_file) as fd:
+        assert set(re.findall(r'--(nodes|relationships)="([^"]+)"', fd.read())) == expected
+
+
+def test_unsupported_biocypher_version(monkeypatch):
+    biocypher_api.check_version.cache_clear()
+    monkeypatch.setattr(biocypher_api, "package_version", lambda name: "0.10.0")
+    with pytest.raises(UnsupportedBioCypherError, match="0.10.0"):
+        biocypher_api.check_version()
+    biocypher_api.check_version.cache_clear()
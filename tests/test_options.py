@@ -0,0 +1,60 @@
+import glob
+import json
+import os
+import sys
+from dataclasses import fields
+
+import pytest
+
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter.options import PipelineOptions
+
+from tests.conftest import RESOURCE_FILES
+
+
+RUN_ARGUMENTS = ("jobs", "memory_budget", "merge_import", "verbose")  # options of the run, not of each resource
+
+
+def _parse(monkeypatch, *arguments):
+    monkeypatch.setattr(sys, "argv", ["weave_knowledge_graph.py", *arguments])
+    return pipeline.parse_arguments()
+
+
+def test_command_line_options(monkeypatch):
+    cli_arguments = _parse(
+        monkeypatch, "-net", "download", "--chunksize", "10", "--writer", "columnar", "--part-size", "5"
+    )
+    options = pipeline.options_to_process(cli_arguments)
+
+    # Every argument is a resource, an option of the run, or a field of the options (set by main: `run_id`).
+    names = {field.name for field in fields(PipelineOptions)} - {"run_id"}
+    assert set(vars(cli_arguments)) == names | set(pipeline.URLS_OMNIPATH) | set(RUN_ARGUMENTS)
+
+    assert options == PipelineOptions(chunksize=10, fusion="disk", writer="columnar", part_size=5)
+    assert options.max_part_size == 5 * pipeline.MEGABYTE
+    # The defaults of the command line are the ones of the options.
+    defaults = pipeline.options_to_process(_parse(monkeypatch, "-net", "download"))
+    assert defaults == PipelineOptions()
+
+
+@pytest.mark.parametrize(
+    "options",
+    [PipelineOptions(qa=True), PipelineOptions(chunksize=300, fusion="disk", intern_ids=True, qa=True)],
+    ids=["whole", "chunks"],
+)
+def test_process_resource(options, local_ontology, tmp_path, cache_directory):
+    output_directory = str(tmp_path / "networks")
+    metrics = str(tmp_path / "metrics.jsonl")
+    options = PipelineOptions(
+        **{**vars(options), "extractor": "native", "metrics": metrics, "run_id": "test"}
+    )
+
+    pipeline.process_resource("networks", RESOURCE_FILES["networks"], options, output_directory=output_directory)
+
+    assert glob.glob(os.path.join(output_directory, "*-part*.csv"))
+    with open(os.path.join(output_directory, pipeline.QA_FILE)) as fd:
+        assert json.load(fd)["total_edges"] == 1000
+    with open(metrics) as fd:
+        measures = [json.loads(line) for line in fd]
+    assert {measure["run"] for measure in measures} == {"test"}
+    assert {"load", "extract", "fuse", "write", "qa", "total"} <= {measure["stage"] for measure in measures}
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from omnipath_secondary_adapter.scheduler import (
+    MEGABYTE,
+    PROC_DIRECTORY,
+    run_jobs,
+    tree_rss,
+)
+
+
+MEMORY_BUDGET = 400 * MEGABYTE
+
+
+def _job(log_path, name, fail=False, exit_code=None, allocate=0):
+    """A job appending its name to a log, then failing, exiting or allocating as told."""
+    with open(log_path, "a") as fd:
+        fd.write(f"{name}\n")
+    if fail:
+        raise ValueError(f"{name} failed")
+    if exit_code is not None:
+        os._exit(exit_code)
+    if allocate:
+        memory = bytearray(b"x") * allocate  # written, hence resident
+        time.sleep(30)
+        return len(memory)
+
+
+def _jobs(tmp_path, **jobs):
+    log_path = str(tmp_path / "jobs.log")
+    return log_path, {name: dict(log_path=log_path, name=name, **kwargs) for name, kwargs in jobs.items()}
+
+
+def _log(log_path):
+    with open(log_path) as fd:
+        return fd.read().split()
+
+
+def test_failures_do_not_stop_the_others(tmp_path):
+    log_path, jobs = _jobs(tmp_path, done={}, failed={"fail": True}, killed={"exit_code": 3}, last={})
+    reports = run_jobs(_job, jobs, max_jobs=2)
+
+    assert list(reports) == ["done", "failed", "killed", "last"]
+    assert sorted(_log(log_path)) == sorted(jobs)
+    assert reports["done"].succeeded and reports["last"].succeeded
+    assert reports["done"].peak_rss > 0
+    assert reports["failed"].error == "ValueError: failed failed"
+    assert reports["killed"].error == "process exited with code 3"
+
+
+def test_jobs_start_once_their_inputs_are_ready(tmp_path):
+    download, failed_download = Future(), Future()
+    log_path, jobs = _jobs(tmp_path, downloaded={}, ready={}, not_downloaded={})
+    jobs["downloaded"]["name"] = download
+    jobs["not_downloaded"]["name"] = failed_download
+    threading.Timer(1.0, download.set_result, ["downloaded"]).start()
+    failed_download.set_exception(OSError("archive unreachable"))
+
+    reports = run_jobs(_job, jobs, max_jobs=1)
+
+    # The job waiting for its download starts after the one whose input is there.
+    assert _log(log_path) == ["ready", "downloaded"]
+    assert reports["downloaded"].succeeded and reports["ready"].succeeded
+    assert reports["not_downloaded"].error == "input failed: OSError: archive unreachable"
+
+
+@pytest.mark.skipif(not os.path.isdir(PROC_DIRECTORY), reason="no /proc to measure the memory of the jobs")
+def test_memory_budget(tmp_path):
+    assert tree_rss(os.getpid()) > 0
+    log_path, jobs = _jobs(tmp_path, large={"allocate": 2 * MEMORY_BUDGET}, small={})
+    start = time.perf_counter()
+    reports = run_jobs(_job, jobs, max_jobs=2, memory_budget=MEMORY_BUDGET)
+
+    assert time.perf_counter() - start < 20  # killed rather than left sleeping
+    assert reports["large"].error == f"memory budget of {MEMORY_BUDGET // MEGABYTE} MB exceeded"
+    assert reports["large"].peak_rss > MEMORY_BUDGET
+    assert reports["small"].succeeded
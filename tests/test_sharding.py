@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter.extraction import element_lists
+from omnipath_secondary_adapter.options import PipelineOptions
+from omnipath_secondary_adapter.sharding import (
+    map_shards,
+    process_pool,
+    shard_bounds,
+)
+
+from tests.conftest import RESOURCE_FILES
+
+
+MIN_SHARD_ROWS = 100  # low enough for the samples to be split between the workers
+WORKERS = 2
+
+
+def _shard(dataframe_resource, suffix):
+    """Return the shard as loaded by the worker, and an argument passed along."""
+    return dataframe_resource, suffix
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with process_pool(WORKERS) as executor:
+        yield executor
+
+
+def test_shard_bounds():
+    assert shard_bounds(10, 3) == [(0, 3), (3, 6), (6, 10)]
+    assert shard_bounds(2, 4) == [(0, 1), (1, 2)]
+
+
+NB_ROWS = 1000
+
+
+def _pandas_table():
+    """A table of pandas dtypes, as loaded by the C parser: object, categorical and nullable."""
+    return pd.DataFrame(
+        {
+            "text": np.array([f"P{n}" if n % 7 else np.nan for n in range(NB_ROWS)], dtype=object),
+            "category": pd.Categorical([("a", "b", None)[n % 3] for n in range(NB_ROWS)]),
+            "integer": pd.array([None if n % 11 == 0 else n for n in range(NB_ROWS)], dtype="Int64"),
+        }
+    )
+
+
+def _arrow_table():
+    """A table of `ArrowDtype` columns and a categorical one, as loaded by the pyarrow parser."""
+    return pd.DataFrame(
+        {
+            "text": pd.array(
+                [None if n % 5 == 0 else f"x{n}" for n in range(NB_ROWS)], dtype=pd.ArrowDtype(pa.string())
+            ),
+            "flag": pd.array([n % 2 == 0 for n in range(NB_ROWS)], dtype=pd.ArrowDtype(pa.bool_())),
+            "category": pd.Categorical([("a", "b", None)[n % 3] for n in range(NB_ROWS)]),
+        }
+    )
+
+
+@pytest.mark.parametrize("make_table", [_pandas_table, _arrow_table], ids=["pandas", "arrow"])
+def test_shards_keep_dtypes_and_labels(make_table, executor):
+    dataframe = make_table()
+    dataframe.index = dataframe.index * 2 + 5  # the labels of a filtered table
+    shards = map_shards(executor, _shard, dataframe, nb_shards=WORKERS, min_shard_rows=MIN_SHARD_ROWS, suffix="s")
+
+    assert len(shards) == WORKERS and all(suffix == "s" for _, suffix in shards)
+    pd.testing.assert_frame_equal(pd.concat([shard for shard, _ in shards]), dataframe)
+    # Too few rows for a second shard: the function runs in this process.
+    assert len(map_shards(executor, _shard, dataframe, nb_shards=WORKERS, suffix="s")) == 1
+
+
+@pytest.mark.parametrize("extractor", ["ontoweaver", "native"])
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+@pytest.mark.parametrize("resource_name", ["annotations", "networks"])
+def test_workers_match_a_single_process(resource_name, engine, extractor, executor, cache_directory, monkeypatch):
+    dataframe = pipeline.load_dataframe(RESOURCE_FILES[resource_name], resource_name, cache=False, engine=engine)
+    dataframe = pipeline.transform_json_columns(resource_name, dataframe)
+    dtypes = dataframe.dtypes
+    assert any(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes)
+    if engine == "pyarrow":
+        assert any(isinstance(dtype, pd.ArrowDtype) for dtype in dtypes)
+
+    expected = pipeline.extract_nodes_edges_parallel(
+        resource_name, dataframe, PipelineOptions(extractor=extractor, workers=1)
+    )
+    nb_shards = []
+
+    def sharded_map(*args, **kwargs):
+        results = map_shards(*args, min_shard_rows=MIN_SHARD_ROWS, **kwargs)
+        nb_shards.append(len(results))
+        return results
+
+    monkeypatch.setattr(pipeline, "map_shards", sharded_map)
+    sharded = pipeline.extract_nodes_edges_parallel(
+        resource_name, dataframe, PipelineOptions(extractor=extractor, workers=WORKERS), executor=executor
+    )
+    assert nb_shards == [WORKERS]
+    assert element_lists(*sharded) == element_lists(*expected)
@@ -0,0 +1,79 @@
+import os
+import sqlite3
+
+import ontoweaver
+import pyarrow.parquet as pq
+import pytest
+
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter.extraction import element_lists
+from omnipath_secondary_adapter.options import PipelineOptions
+from omnipath_secondary_adapter.table_outputs import (
+    EDGES_SUBDIRECTORY,
+    NODES_SUBDIRECTORY,
+    graph_database_path,
+)
+
+from tests.conftest import RESOURCE_FILES
+
+
+def _nodes_edges(resource_name):
+    dataframe = pipeline.load_dataframe(RESOURCE_FILES[resource_name], resource_name, cache=False)
+    dataframe = pipeline.transform_json_columns(resource_name, dataframe)
+    return pipeline.extract_nodes_edges(resource_name, dataframe, extractor="native")
+
+
+def _read_graph(path, output):
+    """The node IDs with their label, and the (source, target, label) of the edges of a table output."""
+    if output == "parquet":
+        nodes = pq.read_table(os.path.join(path, NODES_SUBDIRECTORY)).to_pydict()
+        edges = pq.read_table(os.path.join(path, EDGES_SUBDIRECTORY)).to_pydict()
+        return (
+            sorted(zip(nodes["id"], nodes["label"])),
+            sorted(zip(edges["source"], edges["target"], edges["label"])),
+        )
+    connection = sqlite3.connect(path)
+    try:
+        return (
+            sorted(connection.execute("SELECT id, label FROM nodes")),
+            sorted(connection.execute("SELECT source, target, label FROM edges")),
+        )
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize("fusion", ["ontoweaver", "disk"])
+@pytest.mark.parametrize("output", ["parquet", "sqlite"])
+def test_table_output(output, fusion, local_ontology, tmp_path, cache_directory):
+    nodes, edges = _nodes_edges("networks")
+    options = PipelineOptions(output=output, fusion=fusion)
+    path = pipeline.fuse_and_write(nodes, edges, "networks", options, output_directory=str(tmp_path / "networks"))
+
+    fused_nodes, fused_edges = ontoweaver.fusion.reconciliate(*element_lists(nodes, edges), separator=", ")
+    written_nodes, written_edges = _read_graph(path, output)
+    assert [node_id for node_id, _ in written_nodes] == sorted(node[0] for node in fused_nodes)
+    assert {label for _, label in written_nodes} == {"Protein"}
+    assert len(written_edges) == len(fused_edges)
+    assert {label for *_, label in written_edges} == {"PostTranslational"}
+
+
+@pytest.mark.parametrize("output", ["parquet", "sqlite"])
+def test_merged_table_outputs(output, local_ontology, tmp_path, cache_directory):
+    resource_names = ["enzyme_PTM", "networks"]
+    directories = pipeline.resource_output_directories(resource_names, str(tmp_path))
+    graphs = []
+    for resource_name in resource_names:
+        nodes, edges = _nodes_edges(resource_name)
+        path = pipeline.fuse_and_write(
+            nodes, edges, resource_name, PipelineOptions(output=output), output_directory=directories[resource_name]
+        )
+        graphs.append(_read_graph(path, output))
+
+    path = pipeline.merge_import_calls(directories.values(), str(tmp_path / "merged"), output)
+    if output != "parquet":
+        assert path == graph_database_path(str(tmp_path / "merged"), output)
+
+    # The proteins shared by the resources are kept once.
+    merged_nodes, merged_edges = _read_graph(path, output)
+    assert [node_id for node_id, _ in merged_nodes] == sorted({node_id for nodes, _ in graphs for node_id, _ in nodes})
+    assert merged_edges == sorted(edge for _, edges in graphs for edge in edges)
@@ -0,0 +1,102 @@
+import pandas as pd
+import pandera
+import pytest
+
+import weave_knowledge_graph as pipeline
+from omnipath_secondary_adapter.validation import SchemaValidationError
+
+from tests.conftest import RESOURCE_FILES
+
+
+VALIDATION_MODES = ("full", "fast", "sample:100")
+# A value breaking a field of each model: the sample validation only catches new categories,
+# as a stratified sample keeps a row of each of them.
+INVALID_VALUES = [
+    ("annotations", "label", "", False),  # missing in a non-nullable column
+    ("annotations", "record_id", "-1", False),  # below its minimum
+    ("complexes", "components", "", False),
+    ("intercell", "aspect", "temporal", True),  # not one of the allowed values
+    ("intercell", "consensus_score", "-1", False),
+]
+
+
+@pytest.mark.parametrize("engine", pipeline.ENGINES)
+@pytest.mark.parametrize("resource_name", sorted(RESOURCE_FILES))
+def test_samples_comply_with_their_schema(resource_name, engine, cache_directory):
+    dataframe = pipeline.load_dataframe(
+        RESOURCE_FILES[resource_name], resource_name, cache=False, engine=engine
+    )
+    for validation in VALIDATION_MODES:
+        pipeline.validate_schema(dataframe, resource_name, validation=validation)
+
+
+@pytest.mark.parametrize("engine", pipeline.ENGINES)
+def test_cached_table_complies_with_its_schema(engine, cache_directory):
+    for _ in range(2):  # creates the cache, then reads it
+        dataframe = pipeline.load_dataframe(RESOURCE_FILES["networks"], "networks", engine=engine)
+        pipeline.validate_schema(dataframe, "networks", validation="full")
+
+
+@pytest.mark.parametrize("engine", pipeline.ENGINES)
+def test_selected_columns_comply_with_their_schema(engine, cache_directory):
+    columns = ["source", "target", "is_directed", "curation_effort", "type"]
+    dataframe = pipeline.load_dataframe(
+        RESOURCE_FILES["networks"], "networks", cache=False, engine=engine, usecols=columns
+    )
+    for validation in VALIDATION_MODES:
+        pipeline.validate_schema(dataframe, "networks", validation=validation, columns=columns)
+
+
+@pytest.mark.parametrize("engine", pipeline.ENGINES)
+@pytest.mark.parametrize("validation", VALIDATION_MODES)
+def test_invalid_value_is_reported(validation, engine, tmp_path, cache_directory):
+    table = pd.read_table(RESOURCE_FILES["intercell"], dtype=str, keep_default_na=False)
+    table.loc[len(table) // 2, "scope"] = "global"
+    path = tmp_path / "intercell.tsv"
+    table.to_csv(path, sep="\t", index=False)
+
+    dataframe = pipeline.load_dataframe(str(path), "intercell", cache=False, engine=engine)
+    with pytest.raises(Exception, match="isin|global") as error:
+        pipeline.validate_schema(dataframe, "intercell", validation=validation)
+    if validation != "full":
+        assert isinstance(error.value, SchemaValidationError)
+
+
+@pytest.mark.parametrize("engine", pipeline.ENGINES)
+@pytest.mark.parametrize("resource_name", sorted(RESOURCE_FILES))
+def test_category_columns(resource_name, engine, cache_directory):
+    dataframe = pipeline.load_dataframe(
+        RESOURCE_FILES[resource_name], resource_name, cache=False, engine=engine
+    )
+    schema = pipeline.PANDERA_SCHEMAS[resource_name].to_schema()
+    category_columns = [
+        col for col, column in schema.columns.items() if isinstance(column.dtype, pandera.dtypes.Category)
+    ]
+    for col in category_columns:
+        assert isinstance(dataframe[col].dtype, pd.CategoricalDtype), col
+        # The categories are the values of the sample, read as text.
+        values = pd.read_table(RESOURCE_FILES[resource_name], usecols=[col], dtype=str)[col]
+        assert set(dataframe[col].cat.categories) == set(values.dropna())
+
+
+@pytest.mark.parametrize("engine", pipeline.ENGINES)
+@pytest.mark.parametrize(
+    "resource_name, col, value, sampled", INVALID_VALUES, ids=[f"{case[0]}-{case[1]}" for case in INVALID_VALUES]
+)
+def test_invalid_values_of_each_model(resource_name, col, value, sampled, engine, tmp_path, cache_directory):
+    table = pd.read_table(RESOURCE_FILES[resource_name], dtype=str, keep_default_na=False)
+    table.loc[len(table) // 2, col] = value
+    path = tmp_path / f"{resource_name}.tsv"
+    table.to_csv(path, sep="\t", index=False)
+
+    dataframe = pipeline.load_dataframe(str(path), resource_name, cache=False, engine=engine)
+    for validation in VALIDATION_MODES if sampled else VALIDATION_MODES[:2]:
+        with pytest.raises(Exception, match=col):
+            pipeline.validate_schema(dataframe, resource_name, validation=validation)
+
+
+def test_off_skips_validation(cache_directory):
+    dataframe = pd.DataFrame({"unexpected": [1]})
+    pipeline.validate_schema(dataframe, "networks", validation="off")
+    with pytest.raises(SchemaValidationError):
+        pipeline.validate_schema(dataframe, "networks", validation="fast")
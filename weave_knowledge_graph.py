@@ -15,13 +15,13 @@ Usage:
     poetry run python weave_knowledge_graph.py \
     -net ./data_testing/networks/subset_interactions_edgecases.tsv
 
+    Example 3:
+    # Stream the latest 'networks' file by chunks of 500k rows to bound memory usage.
+    poetry run python weave_knowledge_graph.py \
+    -net download --chunksize 500000
+
 Arguments:
-    -net, --networks        Path to the 'networks' dataset, or download the latest from the archive.
-    -enz, --enzyme-PTM      Path to the 'enz-PTM' dataset, or download the latest from archive.
-    -co, --complexes        Path to the 'complexes' dataset, or download the latest from archive.
-    -an, --annotations      Path to the 'annotations' dataset, or download the latest from archive.
-    -inter, --intercell     Path to the 'intercell' dataset, or download the latest from archive.
-    -v, --verbose
+    See the help of the options: poetry run python weave_knowledge_graph.py --help
 
 """
 
@@ -29,30 +29,174 @@ Arguments:
 import argparse
 import logging
 import os
+import time
+from functools import (
+    lru_cache,
+    partial,
+)
+from concurrent.futures import (
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+)
+from dataclasses import replace
+from datetime import datetime
 import yaml
 import sys
 from typing import (
     Any,
     Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
 )
 
 import ontoweaver
 import pandas as pd
-from biocypher._get import (
-    Downloader,
-    FileDownload,
+from biocypher import BioCypher
+
+from omnipath_secondary_adapter.biocypher_api import (
+    get_ontology,
+    get_translator,
+    get_writer,
+    translate_edges,
+    translate_nodes,
+)
+from omnipath_secondary_adapter.cache import (
+    ArrowCacheWriter,
+    cache_file_path,
+    file_digest,
+    iter_cached_dataframe,
+    read_cached_dataframe,
+    reader_key,
+    schema_version,
+    write_cached_dataframe,
+)
+from omnipath_secondary_adapter.checkpoint import (
+    CHECKPOINT_SUBDIRECTORY,
+    ELEMENTS_STAGE,
+    TABLE_STAGE,
+    Checkpoints,
+    code_version,
+    stage_key,
+)
+from omnipath_secondary_adapter.decompress import (
+    open_source,
+    pause_parsing,
+)
+from omnipath_secondary_adapter.delta import (
+    DELTA_SUBDIRECTORY,
+    ELEMENT_KEY_COLUMNS,
+    ELEMENT_VALUE_COLUMNS,
+    CypherPatchWriter,
+    DeltaState,
+    diff_rows,
+    element_counts,
+    element_tuples,
+    element_values,
+    fuse_elements,
+    row_fingerprints,
+    update_counts,
+    uses_row_index,
+)
+from omnipath_secondary_adapter.download import download_file
+from omnipath_secondary_adapter.extraction import (
+    EXTRACTORS,
+    CompiledMapping,
+    Elements,
+    UnsupportedMapping,
+    concat_elements,
+    element_lists,
+    mapping_columns,
+)
+from omnipath_secondary_adapter.filters import (
+    RowFilter,
+    filter_dataframe,
+    parse_resource_filter,
+    resource_filters,
+    table_mask,
+)
+from omnipath_secondary_adapter.fusion import (
+    FUSION_METHODS,
+    DiskFusion,
+)
+from omnipath_secondary_adapter.graph_qa import (
+    QA_FILE,
+    graph_qa,
+)
+from omnipath_secondary_adapter.interning import (
+    ID_TABLE_SUBDIRECTORY,
+    IdTable,
+)
+from omnipath_secondary_adapter.json_columns import (
+    project_json_columns,
+    source_columns,
+)
+from omnipath_secondary_adapter.neo4j_csv import (
+    WRITERS,
+    graph_writer,
+    write_merged_import_call,
+)
+from omnipath_secondary_adapter.options import PipelineOptions
+from omnipath_secondary_adapter.table_outputs import (
+    OUTPUT_BACKENDS,
+    GraphTableWriter,
+    duckdb,
+    graph_database_path,
+    merge_graph_databases,
+    merge_parquet_datasets,
+    output_writer,
+)
+from omnipath_secondary_adapter.readers import (
+    ENGINES,
+    FILTER_BLOCK_ROWS,
+    arrow_types_mapper,
+    categorical_memory_saved,
+    encode_categorical,
+    iter_table_arrow,
+    low_cardinality_columns,
+    read_header,
+    read_table_arrow,
+    share_categories,
+)
+from omnipath_secondary_adapter.scheduler import (
+    MEGABYTE,
+    JobReport,
+    run_jobs,
+)
+from omnipath_secondary_adapter.sharding import (
+    map_shards,
+    process_pool,
+)
+from omnipath_secondary_adapter.metrics import (
+    PROMETHEUS_FILE_EXTENSION,
+    PROMETHEUS_PREFIX,
+    JsonLinesSink,
+    OpenTelemetrySink,
+    PrometheusSink,
+    StageMetrics,
+    trace as opentelemetry_trace,
 )
-
 from omnipath_secondary_adapter.models import (
-    # AnnotationsPanderaModel,
-    # ComplexesPanderaModel,
-    # IntercellPanderaModel,
+    AnnotationsPanderaModel,
+    ComplexesPanderaModel,
     EnzymePTMPanderaModel,
+    IntercellPanderaModel,
     NetworksPanderaModel,
 )
+from omnipath_secondary_adapter.validation import (
+    coerce_arrow_columns,
+    fast_validate,
+    parse_validation_mode,
+    sample_rows,
+)
 
 # ----------------------    CONSTANTS    ----------------------
 CACHE_DATA_PATH = "./data"
+BIOCYPHER_OUTPUT_PATH = "biocypher-out"
+COLUMN_SELECTIONS = ("all", "mapping")
 
 URLS_OMNIPATH = {
     "annotations": "https://archive.omnipathdb.org/omnipath_webservice_annotations__latest.tsv.gz",
@@ -63,10 +207,10 @@ URLS_OMNIPATH = {
 }
 
 PANDERA_SCHEMAS = {
-    # "annotations": AnnotationsPanderaModel,
-    # "complexes": ComplexesPanderaModel,
+    "annotations": AnnotationsPanderaModel,
+    "complexes": ComplexesPanderaModel,
     "enzyme_PTM": EnzymePTMPanderaModel,
-    # "intercell": IntercellPanderaModel,
+    "intercell": IntercellPanderaModel,
     "networks": NetworksPanderaModel,
 }
 
@@ -86,6 +230,15 @@ BIOCYPHER_CONFIG_PATHS = {
     "networks": "config/biocypher_config.yaml",
 }
 
+# The columns identifying a row across OmniPath releases, see `delta_fuse_and_write`.
+DELTA_KEY_COLUMNS = {
+    "annotations": ["uniprot", "source", "label", "record_id"],
+    "complexes": ["components", "sources"],
+    "enzyme_PTM": ["enzyme", "substrate", "residue_type", "residue_offset", "modification"],
+    "intercell": ["category", "parent", "database", "uniprot"],
+    "networks": ["source", "target", "type"],
+}
+
 BIOCYPHER_SCHEMA_PATHS = {
     "annotations": "config/schema_config_annotations.yaml",
     "complexes": "config/schema_config_complexes.yaml",
@@ -99,6 +252,37 @@ logger = logging.getLogger("biocypher")
 
 
 # ----------------------    HELPER FUNCTIONS    ----------------------
+def positive_int(value: str) -> int:
+    """Argparse type accepting only strictly positive integers."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer value: '{value}'")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got: {number}")
+    return number
+
+
+def validation_mode(value: str) -> str:
+    """Argparse type accepting the validation modes: off, fast, full or sample:N."""
+    try:
+        parse_validation_mode(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def resource_filter(value: str) -> str:
+    """Argparse type accepting filters of the form RESOURCE:CONDITION, e.g. 'networks:type==transcriptional'."""
+    try:
+        resource_name, _ = parse_resource_filter(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    if resource_name not in URLS_OMNIPATH:
+        raise argparse.ArgumentTypeError(f"unknown resource in filter: '{resource_name}'")
+    return value
+
+
 def parse_arguments():
     """
     Extract nodes and edges from CSV tables of the Omnipath database: networks, enzyme-PTM, complexes, annotations, and intercell.
@@ -108,13 +292,8 @@ def parse_arguments():
     annotations, and intercellular interactions. Additionally, it allows setting the
     verbosity level for logging.
 
-    Arguments:
-        -net, --networks        Path to the 'networks' dataset, or download latest from archive.
-        -enz, --enzyme-PTM      Path to the 'enz-PTM' dataset, or download latest from archive.
-        -co, --complexes        Path to the 'complexes' dataset, or download latest from archive.
-        -an, --annotations      Path to the 'annotations' dataset, or download latest from archive.
-        -inter, --intercell     Path to the 'intercell' dataset, or download latest from archive.
-        -v, --verbose
+    Each option is described by its `help` only, as printed by `--help`; the ones of
+    the resources are gathered by `options_to_process`.
 
     Returns:
         argparse.Namespace: An object containing the parsed command-line arguments.
@@ -126,6 +305,7 @@ def parse_arguments():
     epilog = """Example Usage:
         poetry run python weave_knowledge_graph_backup.py -net download
         poetry run python weave_knowledge_graph.py -net ./data_testing/networks/subset_interactions_edgecases.tsv
+        poetry run python weave_knowledge_graph.py -net download --chunksize 500000
     """
 
     parser = argparse.ArgumentParser(
@@ -172,6 +352,245 @@ def parse_arguments():
         help="extract from the Omnipath 'intercell' TSV file.",
     )
 
+    parser.add_argument(
+        "--chunksize",
+        metavar="N",
+        type=positive_int,
+        default=None,
+        help="stream the TSV file by chunks of N rows (default: load the whole file at once).",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help=f"do not reuse nor store the parsed TSV file under '{CACHE_DATA_PATH}'.",
+    )
+
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="c",
+        help="parser used to load the TSV file: pandas' C parser with nullable dtypes,\n"
+        "or the multithreaded pyarrow parser with Arrow-backed dtypes (default: %(default)s).",
+    )
+
+    parser.add_argument(
+        "--extractor",
+        choices=EXTRACTORS,
+        default="ontoweaver",
+        help="engine used to extract nodes and edges: Ontoweaver, row by row, or the native\n"
+        "column-wise engine, which falls back to Ontoweaver for mappings it cannot compile\n"
+        "(default: %(default)s).",
+    )
+
+    parser.add_argument(
+        "--workers",
+        metavar="N",
+        type=positive_int,
+        default=1,
+        help="split the table (or each chunk) into N row shards extracted in parallel\n"
+        "worker processes (default: %(default)s).",
+    )
+
+    parser.add_argument(
+        "--fusion",
+        choices=FUSION_METHODS,
+        default=None,
+        help="how duplicated nodes and edges are fused: by Ontoweaver, in memory, or by\n"
+        f"buckets of IDs spilled to disk under '{CACHE_DATA_PATH}', which also fuses them\n"
+        "across chunks (default: ontoweaver, or disk with --chunksize).",
+    )
+
+    parser.add_argument(
+        "--intern-ids",
+        action="store_true",
+        help="with --fusion disk, replace the node IDs and edge endpoints by integer codes\n"
+        "while fusing, and decode them only when writing; the codes are kept in a\n"
+        "memory-mapped table shared by all resources and runs, under\n"
+        f"'{CACHE_DATA_PATH}/{ID_TABLE_SUBDIRECTORY}' (default: match the string IDs).",
+    )
+
+    parser.add_argument(
+        "--output",
+        choices=OUTPUT_BACKENDS,
+        default="neo4j",
+        help="what the fused graph is written as: neo4j-admin import files, Parquet node and\n"
+        "edge datasets partitioned by label ('nodes/label=<Label>/', 'edges/label=<Label>/'),\n"
+        "or an embedded SQLite or DuckDB database ('graph.sqlite', 'graph.duckdb') with\n"
+        "indexes on the IDs and labels, queried without Neo4j (default: %(default)s).",
+    )
+
+    parser.add_argument(
+        "--writer",
+        choices=WRITERS,
+        default="biocypher",
+        help="how the neo4j-admin import files are written: by BioCypher, node by node and\n"
+        "edge by edge, or by labels, formatting each column of the nodes and edges at once;\n"
+        "the files and the import script are the same (default: %(default)s).",
+    )
+
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="with --writer columnar, gzip the part files of the import ('.csv.gz'), which\n"
+        "neo4j-admin reads as is (default: plain CSV files).",
+    )
+
+    parser.add_argument(
+        "--part-size",
+        metavar="MB",
+        type=positive_int,
+        default=None,
+        help="with --writer columnar, start a new part file once a part reaches MB megabytes\n"
+        "before compression (default: a part per batch of nodes or edges).",
+    )
+
+    parser.add_argument(
+        "--parts",
+        metavar="N",
+        type=positive_int,
+        default=1,
+        help="with --writer columnar, split each batch of nodes or edges of a label into N\n"
+        "part files of about the same size, written by N threads and listed in the import\n"
+        "call, so that neo4j-admin parses them in parallel (default: %(default)s).",
+    )
+
+    parser.add_argument(
+        "--merge-import",
+        metavar="DIRECTORY",
+        default=None,
+        help="write each resource to 'DIRECTORY/<timestamp>-<resource>', and then a single\n"
+        "'DIRECTORY/neo4j-admin-import-call.sh' importing all of them into one database,\n"
+        "with the Neo4j settings of the networks config; with another --output, the Parquet\n"
+        "datasets or the database of all of them under DIRECTORY (default: an output per resource).",
+    )
+
+    parser.add_argument(
+        "--qa",
+        action="store_true",
+        help="load the graph written for each resource (and the merged one, with --merge-import)\n"
+        "into integer arrays, run the queries of 'cypher_queries/basic_queries.cypher' on it,\n"
+        f"and write their results to '{QA_FILE}' next to it (default: no QA).",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        metavar="N",
+        type=positive_int,
+        default=1,
+        help="process up to N of the requested resources at the same time, each in its own\n"
+        f"process writing to '{BIOCYPHER_OUTPUT_PATH}/<timestamp>-<resource>' (default: %(default)s).",
+    )
+
+    parser.add_argument(
+        "--memory-budget",
+        metavar="MB",
+        type=positive_int,
+        default=None,
+        help="limit the resident memory of each resource process, with its extraction workers,\n"
+        "to MB megabytes; a resource exceeding it is killed without stopping the others\n"
+        "(default: no limit).",
+    )
+
+    parser.add_argument(
+        "--validate",
+        dest="validation",
+        metavar="{off,fast,full,sample:N}",
+        type=validation_mode,
+        default="off",
+        help="validate the table, or each chunk, against its Pandera schema: 'full' runs\n"
+        "Pandera, 'fast' checks whole columns at once (dtype family, nulls, field checks\n"
+        "on distinct values), 'sample:N' runs the fast checks on N random rows plus one\n"
+        "row per value of each categorical column (default: %(default)s).",
+    )
+
+    parser.add_argument(
+        "--columns",
+        choices=COLUMN_SELECTIONS,
+        default="all",
+        help="parse every column of the TSV file, or only the columns named in the mapping\n"
+        "(column, id_from_column, match_type_from_column); the other columns are skipped\n"
+        "by the parser and never allocated (default: %(default)s).",
+    )
+
+    parser.add_argument(
+        "--filter",
+        dest="filters",
+        metavar="RESOURCE:CONDITION",
+        type=resource_filter,
+        action="append",
+        default=None,
+        help="keep only the rows of RESOURCE satisfying CONDITION, a column, an operator and\n"
+        "comma-separated values: ==, != (one of the values), >=, <=, >, <, ~= (one of the\n"
+        "';'-separated items is one of the values), !~ (none of them is), e.g.\n"
+        "'networks:ncbi_tax_id_source==9606' or 'networks:sources!~Wang,SPIKE'; can be\n"
+        "repeated, rows must satisfy all the conditions (default: keep all rows).",
+    )
+
+    parser.add_argument(
+        "--filter-file",
+        metavar="YAML",
+        default=None,
+        help="YAML file listing the conditions of each resource, with the syntax of --filter,\n"
+        "e.g. 'networks: [\"curation_effort >= 2\"]' (default: none).",
+    )
+
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="compare the rows to the ones of the previous build, recorded under\n"
+        f"'{CACHE_DATA_PATH}/{DELTA_SUBDIRECTORY}', and only extract the added and changed\n"
+        "rows: the output holds their nodes and edges, plus 'delta-delete.cypher' and\n"
+        "'delta-merge.cypher' scripts patching the database of the previous build\n"
+        "(default: build the whole graph).",
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="keep the output of the loading and extraction stages of each resource, i.e.\n"
+        "the transformed table and the nodes and edges before fusion, under\n"
+        f"'{CACHE_DATA_PATH}/{CHECKPOINT_SUBDIRECTORY}', keyed by the input file, the mapping,\n"
+        "the code and the options they depend on (default: keep nothing).",
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="reuse the checkpoints still valid instead of running their stage again, and\n"
+        "checkpoint the stages that run, as --checkpoint; fusion and writing always run,\n"
+        "so a change of the BioCypher schema or config only runs them again\n"
+        "(default: run every stage).",
+    )
+
+    parser.add_argument(
+        "--metrics",
+        metavar="JSONL",
+        default=None,
+        help="append a JSON line per stage of each resource (access, load, validate,\n"
+        "transform, extract, fuse, write, ...) and per resource, with its wall-clock and\n"
+        "CPU time, the growth of the peak memory, and the rows, nodes and edges it handled\n"
+        "per second, to the file JSONL (default: only log them).",
+    )
+
+    parser.add_argument(
+        "--metrics-prometheus",
+        metavar="DIRECTORY",
+        default=None,
+        help="write the stage measures of each resource as gauges to\n"
+        f"'DIRECTORY/{PROMETHEUS_PREFIX}_<resource>{PROMETHEUS_FILE_EXTENSION}', for the textfile collector\n"
+        "of the Prometheus node exporter (default: none).",
+    )
+
+    parser.add_argument(
+        "--metrics-otel",
+        action="store_true",
+        help="emit a span per resource, with a child span per stage, to the OpenTelemetry\n"
+        "tracer provider of the process, e.g. set up by 'opentelemetry-instrument'\n"
+        "(requires the otel extra; default: no spans).",
+    )
+
     levels = {
         "DEBUG": logging.DEBUG,
         "INFO": logging.INFO,
@@ -192,28 +611,75 @@ def parse_arguments():
         parser.print_help(sys.stderr)
         sys.exit(1)  # Exit with error code 1
 
-    return parser.parse_args()
+    cli_arguments = parser.parse_args()
+    if cli_arguments.chunksize and cli_arguments.fusion == "ontoweaver":
+        parser.error("--chunksize fuses the duplicates of all the chunks on disk, use it with --fusion disk")
+    if cli_arguments.fusion is None:
+        cli_arguments.fusion = "disk" if cli_arguments.chunksize else "ontoweaver"
+    if cli_arguments.delta and cli_arguments.chunksize:
+        parser.error("--delta needs the whole table and cannot be combined with --chunksize")
+    if (cli_arguments.checkpoint or cli_arguments.resume) and cli_arguments.chunksize:
+        parser.error("--checkpoint and --resume keep whole stages and cannot be combined with --chunksize")
+    if cli_arguments.intern_ids and cli_arguments.fusion != "disk":
+        parser.error("--intern-ids applies to the disk fusion, use it with --fusion disk")
+    if (cli_arguments.compress or cli_arguments.part_size) and cli_arguments.writer != "columnar":
+        parser.error("--compress and --part-size apply to the columnar writer, use them with --writer columnar")
+    if cli_arguments.parts > 1 and cli_arguments.writer != "columnar":
+        parser.error("--parts applies to the columnar writer, use it with --writer columnar")
+    if cli_arguments.merge_import and cli_arguments.delta:
+        parser.error("--merge-import imports whole graphs and cannot be combined with --delta")
+    if cli_arguments.qa and cli_arguments.delta:
+        parser.error("--qa checks whole graphs and cannot be combined with --delta")
+    if cli_arguments.output != "neo4j" and cli_arguments.delta:
+        parser.error("--delta patches a Neo4j database, use it with --output neo4j")
+    if cli_arguments.output != "neo4j" and cli_arguments.writer != "biocypher":
+        parser.error("--writer applies to the neo4j-admin import files, use it with --output neo4j")
+    if cli_arguments.output == "duckdb" and duckdb is None:
+        parser.error("--output duckdb needs the duckdb package (duckdb extra)")
+    if cli_arguments.metrics_otel and opentelemetry_trace is None:
+        parser.error("--metrics-otel needs the opentelemetry-api package (otel extra)")
+    return cli_arguments
 
 
 def download_resource(resource_name: str, url_resource: str) -> list:
+    """Download a resource, or reuse the local copy if it did not change on the archive.
 
-    # Define the directory where the data will be store
-    cache_directory = CACHE_DATA_PATH
+    The file is kept compressed, as the readers decompress it while parsing.
 
-    # Instantiate the Downloader class
-    downloader = Downloader(cache_dir=cache_directory)
+    Args:
+        resource_name (str): Name of the database, i.e networks, annotations, etc.
+        url_resource (str): The URL of the file in the archive.
 
-    # Create a resource to download
-    file_resource = FileDownload(
-        name="omnipath_" + resource_name,
-        url_s=url_resource,
-        lifetime=7,  # Cache for 7 days
-    )
+    Returns:
+        list: The path to the downloaded file.
+    """
+
+    # Define the directory where the data will be store
+    file_name = url_resource[url_resource.rfind("/") + 1 :].split("?")[0]
+    path = os.path.join(CACHE_DATA_PATH, "omnipath_" + resource_name, file_name)
 
     # Download the resource and return the stored file paths
-    paths = downloader.download(file_resource)
+    return [download_file(url_resource, path)]
 
-    return paths
+
+def start_downloads(
+    resource_mapping: Dict[str, Any],
+    executor: Executor,
+) -> Dict[str, Future]:
+    """Start the download of every resource requested with "download", all at once.
+
+    Args:
+        resource_mapping (Dict[str, Any]): The path (or "download") of each resource, by name.
+        executor (Executor): The threads running the downloads.
+
+    Returns:
+        Dict[str, Future]: The future path to the downloaded file of each resource.
+    """
+    return {
+        resource_name: executor.submit(access_to_resource, resource_name, argument_resource)
+        for resource_name, argument_resource in resource_mapping.items()
+        if argument_resource == "download"
+    }
 
 
 def access_to_resource(resource_name: str, argument_resource: str) -> str:
@@ -244,124 +710,547 @@ def access_to_resource(resource_name: str, argument_resource: str) -> str:
     raise ValueError(f"Invalid option: {argument_resource}")
 
 
-def load_dataframe(resource_path: str, resource_name: str) -> pd.DataFrame:
+def _read_table_options(
+    resource_name: str,
+    usecols: Optional[List[str]] = None,
+) -> Dict[str, Any]:
     """
-    Load a TSV file into a pandas DataFrame using a specified Pandera schema.
+    Build the keyword arguments given to `pd.read_table` for a resource.
+
+    Args:
+        resource_name (str): The name of the resource used to retrieve the schema.
+        usecols (Optional[List[str]]): The columns to read (default: all).
+
+    Returns:
+        Dict[str, Any]: The options for reading the TSV file.
+    """
+    schema_model = PANDERA_SCHEMAS.get(resource_name)
+    dtype = schema_model._return_pandas_dtypes() if schema_model else None
+    if dtype and usecols is not None:
+        dtype = {col: dtype[col] for col in usecols if col in dtype}
+
+    return {
+        "sep": "\t",
+        "dtype": dtype,
+        "usecols": usecols,
+    }
+
+
+def select_columns(
+    resource_name: str,
+    resource_path: str,
+    columns: str = "all",
+    required: Optional[List[str]] = None,
+) -> Optional[List[str]]:
+    """
+    Choose the columns of a TSV file to parse, from the mapping of its resource.
+
+    The mapping is analyzed statically, whatever its transformers, see
+    `extraction.mapping_columns`. The JSON columns are read when the mapping
+    reads fields decoded from them, see `json_columns.source_columns`.
+
+    Args:
+        resource_name (str): Name of the database, i.e networks, annotations, etc.
+        resource_path (str): Path to the TSV file.
+        columns (str): Either "all" or "mapping".
+        required (Optional[List[str]]): Columns read in any case, e.g. by the row filters.
+
+    Returns:
+        Optional[List[str]]: The columns to read, in file order, or None to read all of them.
+    """
+    if columns == "all":
+        return None
+
+    header = read_header(resource_path)
+    used = source_columns(mapping_columns(_read_mapping(resource_name)) + (required or []))
+    selected = [col for col in header if col in used]
+
+    missing = [col for col in used if col not in header]
+    if missing:
+        logger.warning(f"Columns read by the mapping but not in the file: {', '.join(missing)}")
+    if not selected:
+        logger.warning("The mapping reads none of the columns of the file, reading all of them.")
+        return None
+
+    skipped = [col for col in header if col not in used]
+    logger.info(
+        f"Reading {len(selected)} of {len(header)} columns, skipping: {', '.join(skipped) or 'none'}"
+    )
+    return selected
+
+
+def select_row_filters(
+    resource_name: str,
+    resource_path: str,
+    filters: Optional[List[str]] = None,
+    filter_file: Optional[str] = None,
+) -> List[RowFilter]:
+    """
+    Gather the row filters of a resource and check that the columns they read are in the TSV file.
+
+    Args:
+        resource_name (str): Name of the database, i.e networks, annotations, etc.
+        resource_path (str): Path to the TSV file.
+        filters (Optional[List[str]]): The filters given on the command line, as RESOURCE:CONDITION.
+        filter_file (Optional[str]): Path to the YAML file listing the conditions of each resource.
+
+    Returns:
+        List[RowFilter]: The conditions the rows must satisfy (none keeps every row).
+
+    Raises:
+        ValueError: If a condition reads a column that is not in the file.
+    """
+    row_filters = resource_filters(resource_name, filters, filter_file)
+    if not row_filters:
+        return row_filters
+
+    header = read_header(resource_path)
+    unknown = [row_filter.column for row_filter in row_filters if row_filter.column not in header]
+    if unknown:
+        raise ValueError(f"Filtered columns not in the file: {', '.join(unknown)}")
+
+    logger.info(f"Row filters: {', '.join(map(repr, row_filters))}")
+    return row_filters
+
+
+def _read_tsv(
+    resource_path: str,
+    resource_name: str,
+    engine: str = "c",
+    chunksize: Optional[int] = None,
+    usecols: Optional[List[str]] = None,
+    row_filters: Optional[List[RowFilter]] = None,
+):
+    """
+    Parse a TSV file with the chosen engine, at once or by chunks.
+
+    Gzip-compressed files are decompressed in a background thread while they
+    are parsed, see `decompress.open_source`.
+
+    The row filters are applied as the file is parsed: on each Arrow table
+    before its conversion to pandas, or on each block of rows of the C parser,
+    so that the rejected rows are never held for the whole file. They are
+    evaluated on the cleaned values (see `_clean_dataframe`), as when they are
+    applied to the cached table.
 
     Args:
         resource_path (str): Path to the TSV file.
         resource_name (str): The name of the resource used to retrieve the schema.
+        engine (str): Either "c" (pandas parser, nullable dtypes) or "pyarrow"
+            (multithreaded pyarrow parser, `ArrowDtype` columns).
+        chunksize (Optional[int]): If set, return an iterator over chunks of this many rows.
+        usecols (Optional[List[str]]): The columns to read (default: all).
+        row_filters (Optional[List[RowFilter]]): The conditions the kept rows satisfy
+            (default: keep all rows).
 
     Returns:
-        pd.DataFrame: A cleaned and schema-conformant DataFrame.
+        The parsed DataFrame, or an iterator over its chunks.
     """
     schema_model = PANDERA_SCHEMAS.get(resource_name)
 
     if schema_model is None:
         logger.warning(f"No schema model found for resource: {resource_name}")
 
-    try:
-        dataframe_resource = pd.read_table(
-            resource_path,
-            sep="\t",
-            dtype=schema_model._return_pandas_dtypes() if schema_model else None,
+    if engine == "pyarrow":
+        arrow_types = schema_model._return_arrow_dtypes() if schema_model else {}
+        row_mask = (
+            partial(table_mask, row_filters, prepare=_clean_dataframe) if row_filters else None
         )
-        logger.info("DataFrame successfully loaded.")
-    except Exception as e:
-        logger.error(f"Failed to load dataset from {resource_path}: {e}")
-        raise
+        if chunksize:
+            return iter_table_arrow(resource_path, arrow_types, chunksize, usecols, row_mask)
+        return read_table_arrow(resource_path, arrow_types, usecols, row_mask)
+
+    if chunksize:
+        return _iter_table_pandas(resource_path, resource_name, chunksize, usecols, row_filters)
+
+    if row_filters:
+        blocks = list(
+            _iter_table_pandas(
+                resource_path, resource_name, FILTER_BLOCK_ROWS, usecols, row_filters
+            )
+        )
+        if not blocks:
+            # No row at all: the columns of the header, with their schema dtypes.
+            with open_source(resource_path) as source:
+                return pd.read_table(source, nrows=0, **_read_table_options(resource_name, usecols))
+        # The categories of the blocks differ: encode the concatenated columns again.
+        categorical_columns = [
+            col
+            for col, dtype in blocks[0].dtypes.items()
+            if isinstance(dtype, pd.CategoricalDtype)
+        ]
+        return encode_categorical(pd.concat(blocks), categorical_columns)
+
+    with open_source(resource_path) as source:
+        return pd.read_table(source, **_read_table_options(resource_name, usecols))
+
+
+def _iter_table_pandas(
+    resource_path: str,
+    resource_name: str,
+    chunksize: int,
+    usecols: Optional[List[str]] = None,
+    row_filters: Optional[List[RowFilter]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Stream a TSV file with the pandas C parser, keeping its source open until the last chunk.
+
+    The row filters are evaluated on the cleaned chunks, see `_clean_dataframe`.
+    """
+    with open_source(resource_path) as source:
+        with pd.read_table(
+            source, chunksize=chunksize, **_read_table_options(resource_name, usecols)
+        ) as reader:
+            for dataframe_chunk in reader:
+                if row_filters:
+                    dataframe_chunk = filter_dataframe(row_filters, _clean_dataframe(dataframe_chunk))
+                with pause_parsing(source):
+                    yield dataframe_chunk
+
+
+def _cache_path(
+    resource_path: str,
+    resource_name: str,
+    engine: str = "c",
+    usecols: Optional[List[str]] = None,
+) -> str:
+    """
+    Locate the cached parsed data of a TSV file, keyed by how it is read, its content and schema version.
+
+    Args:
+        resource_path (str): Path to the TSV file.
+        resource_name (str): The name of the resource used to retrieve the schema.
+        engine (str): The engine used to parse the TSV file.
+        usecols (Optional[List[str]]): The columns read (default: all).
+
+    Returns:
+        str: The path to the cached file (which may not exist yet).
+    """
+    return cache_file_path(
+        cache_directory=CACHE_DATA_PATH,
+        resource_name=resource_name,
+        reader=reader_key(engine, usecols),
+        digest=file_digest(resource_path),
+        version=schema_version(_read_table_options(resource_name)["dtype"]),
+    )
+
+
+def _clean_dataframe(dataframe_resource: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize a freshly loaded DataFrame (or chunk of it).
 
+    Args:
+        dataframe_resource (pd.DataFrame): The DataFrame read from the TSV file.
+
+    Returns:
+        pd.DataFrame: The DataFrame with missing booleans set to False.
+    """
     # Identify boolean columns using pandas type system
-    boolean_columns = dataframe_resource.select_dtypes(include=["boolean"]).columns
+    boolean_columns = [
+        col
+        for col, dtype in dataframe_resource.dtypes.items()
+        if isinstance(dtype, pd.BooleanDtype)
+    ]
 
-    if not boolean_columns.empty:
+    if boolean_columns:
         # Replace NaN with False and ensure dtype is bool
         dataframe_resource[boolean_columns] = (
             dataframe_resource[boolean_columns].fillna(False).astype(bool)
         )
 
-    logger.info(f"DataFrame shape: {dataframe_resource.shape}")
+    # Arrow-backed booleans keep their dtype, only missing values are replaced
+    for col, dtype in dataframe_resource.dtypes.items():
+        if isinstance(dtype, pd.ArrowDtype) and pd.api.types.is_bool_dtype(dtype):
+            dataframe_resource[col] = dataframe_resource[col].fillna(False)
+
+    return dataframe_resource
+
+
+def _encode_dataframe(
+    dataframe_resource: pd.DataFrame,
+    categorical_columns: Optional[List[str]] = None,
+) -> tuple:
+    """
+    Dictionary-encode the low-cardinality text columns of a DataFrame (or chunk of it).
+
+    Args:
+        dataframe_resource (pd.DataFrame): The cleaned DataFrame.
+        categorical_columns (Optional[List[str]]): The columns to encode. If None,
+            they are detected from the DataFrame itself.
+
+    Returns:
+        tuple: The encoded DataFrame and the encoded columns.
+    """
+    if categorical_columns is None:
+        categorical_columns = low_cardinality_columns(dataframe_resource)
+        if categorical_columns:
+            logger.info(
+                f"Dictionary-encoding low-cardinality columns: {', '.join(categorical_columns)}"
+            )
+
+    return encode_categorical(dataframe_resource, categorical_columns), categorical_columns
+
+
+def _log_memory_usage(dataframe_resource: pd.DataFrame, label: str) -> None:
+    """Log the memory used by a DataFrame, and the part saved by its categorical columns."""
     memory_mb = dataframe_resource.memory_usage(deep=True).sum() / 1024**2
-    logger.info(f"Memory usage (MB): {memory_mb:.2f}")
+    saved_mb = categorical_memory_saved(dataframe_resource) / 1024**2
+    logger.info(
+        f"{label} (MB): {memory_mb:.2f} (saved by categorical encoding: {saved_mb:.2f})"
+    )
+
+
+def load_dataframe(
+    resource_path: str,
+    resource_name: str,
+    cache: bool = True,
+    engine: str = "c",
+    usecols: Optional[List[str]] = None,
+    row_filters: Optional[List[RowFilter]] = None,
+) -> pd.DataFrame:
+    """
+    Load a TSV file into a pandas DataFrame using a specified Pandera schema.
+
+    The cache holds every row of the file, so that any filter can be applied
+    to it: the row filters are applied on the memory-mapped table when it is
+    cached, while parsing the file when it is not cached at all, and after
+    parsing when the cache is being created.
+
+    Args:
+        resource_path (str): Path to the TSV file.
+        resource_name (str): The name of the resource used to retrieve the schema.
+        cache (bool): Whether to reuse (or create) the cached parsed data of the file.
+        engine (str): The engine used to parse the TSV file, either "c" or "pyarrow".
+        usecols (Optional[List[str]]): The columns to read, see `select_columns` (default: all).
+        row_filters (Optional[List[RowFilter]]): The conditions the kept rows satisfy, see
+            `select_row_filters` (default: keep all rows). Rows keep their position in the
+            file as index.
+
+    Returns:
+        pd.DataFrame: A cleaned and schema-conformant DataFrame.
+    """
+    cache_path = _cache_path(resource_path, resource_name, engine, usecols) if cache else None
+    types_mapper = arrow_types_mapper if engine == "pyarrow" else None
+    row_mask = partial(table_mask, row_filters) if row_filters else None
+
+    if cache_path and os.path.isfile(cache_path):
+        logger.info(f"Loading parsed data from cache: {cache_path}")
+        dataframe_resource = read_cached_dataframe(
+            cache_path, types_mapper=types_mapper, row_mask=row_mask
+        )
+    else:
+        try:
+            dataframe_resource = _read_tsv(
+                resource_path,
+                resource_name,
+                engine=engine,
+                usecols=usecols,
+                row_filters=None if cache_path else row_filters,
+            )
+            logger.info(f"DataFrame successfully loaded (engine: {engine}).")
+        except Exception as e:
+            logger.error(f"Failed to load dataset from {resource_path}: {e}")
+            raise
+
+        dataframe_resource = _clean_dataframe(dataframe_resource)
+        dataframe_resource, _ = _encode_dataframe(dataframe_resource)
+
+        if cache_path:
+            write_cached_dataframe(dataframe_resource, cache_path, resource_name)
+            dataframe_resource = filter_dataframe(row_filters, dataframe_resource)
+
+    logger.info(f"DataFrame shape: {dataframe_resource.shape}")
+    _log_memory_usage(dataframe_resource, "Memory usage")
 
     return dataframe_resource
 
 
+def _clean_chunks(reader: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    Clean and encode freshly read chunks.
+
+    The low-cardinality columns are detected on the first chunk, and the same
+    columns are encoded in all the following ones, with categories shared
+    across chunks (see `share_categories`) so that the chunks can be cached
+    in one Arrow file.
+
+    Args:
+        reader (Iterator[pd.DataFrame]): The chunks read from the TSV file.
+
+    Yields:
+        pd.DataFrame: The cleaned and encoded chunks.
+    """
+    categorical_columns = None
+    categories = {}
+    for dataframe_chunk in reader:
+        if dataframe_chunk.empty:
+            continue  # every row filtered out, nothing to detect the encoded columns on
+        dataframe_chunk = _clean_dataframe(dataframe_chunk)
+        dataframe_chunk, categorical_columns = _encode_dataframe(
+            dataframe_chunk, categorical_columns
+        )
+        yield share_categories(dataframe_chunk, categories)
+
+
+def load_dataframe_chunks(
+    resource_path: str,
+    resource_name: str,
+    chunksize: int,
+    cache: bool = True,
+    engine: str = "c",
+    usecols: Optional[List[str]] = None,
+    row_filters: Optional[List[RowFilter]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a TSV file as cleaned pandas DataFrames of at most `chunksize` rows.
+
+    The row index keeps increasing across chunks, so that row-based identifiers
+    stay unique over the whole file. The row filters are applied to each chunk
+    as in `load_dataframe`; chunks left empty are skipped.
+
+    Args:
+        resource_path (str): Path to the TSV file.
+        resource_name (str): The name of the resource used to retrieve the schema.
+        chunksize (int): The maximum number of rows per chunk.
+        cache (bool): Whether to reuse (or create) the cached parsed data of the file.
+        engine (str): The engine used to parse the TSV file, either "c" or "pyarrow".
+        usecols (Optional[List[str]]): The columns to read, see `select_columns` (default: all).
+        row_filters (Optional[List[RowFilter]]): The conditions the kept rows satisfy
+            (default: keep all rows).
+
+    Yields:
+        pd.DataFrame: The successive cleaned and schema-conformant chunks.
+    """
+    cache_path = _cache_path(resource_path, resource_name, engine, usecols) if cache else None
+    types_mapper = arrow_types_mapper if engine == "pyarrow" else None
+    row_mask = partial(table_mask, row_filters) if row_filters else None
+
+    if cache_path and os.path.isfile(cache_path):
+        logger.info(f"Streaming parsed data from cache: {cache_path}")
+        chunks = iter_cached_dataframe(
+            cache_path, chunksize, types_mapper=types_mapper, row_mask=row_mask
+        )
+        cache_writer = None
+    else:
+        try:
+            reader = _read_tsv(
+                resource_path,
+                resource_name,
+                engine=engine,
+                chunksize=chunksize,
+                usecols=usecols,
+                row_filters=None if cache_path else row_filters,
+            )
+        except Exception as e:
+            logger.error(f"Failed to load dataset from {resource_path}: {e}")
+            raise
+        chunks = _clean_chunks(reader)
+        cache_writer = ArrowCacheWriter(cache_path, resource_name) if cache_path else None
+
+    try:
+        for n_chunk, dataframe_chunk in enumerate(chunks):
+            logger.info(f"Chunk #{n_chunk} shape: {dataframe_chunk.shape}")
+            _log_memory_usage(dataframe_chunk, f"Chunk #{n_chunk} memory usage")
+
+            if cache_writer:
+                cache_writer.write(dataframe_chunk)
+                dataframe_chunk = filter_dataframe(row_filters, dataframe_chunk)
+
+            if not dataframe_chunk.empty:
+                yield dataframe_chunk
+    except BaseException:
+        # Never keep a cache of a partially read file.
+        if cache_writer:
+            cache_writer.abort()
+        raise
+
+    if cache_writer:
+        cache_writer.close()
+
+
 def validate_schema(
     dataframe: pd.DataFrame,
     resource_name: str,
-    enable_validation: bool = False,
+    validation: str = "off",
+    columns: Optional[List[str]] = None,
 ) -> None:
     """
-    Whether to enable schema validation. Set to False to skip validation.
+    Validate a DataFrame against the Pandera schema of its resource.
 
     Args:
         dataframe (pd.DataFrame): The DataFrame to validate.
         resource_name (str): The key to retrieve the schema from PANDERA_SCHEMAS.
-        enable_validation (bool): Whether to perform schema validation.
+        validation (str): The validation mode: "off" to skip validation, "full" for
+            Pandera's validation, "fast" for the column-wise checks of `fast_validate`,
+            or "sample:N" for the fast checks on a stratified sample of N rows.
+        columns (Optional[List[str]]): The columns read from the file, if not all of them:
+            only those are expected.
     """
-    if not enable_validation:
+    mode, sample_size = parse_validation_mode(validation)
+    if mode == "off":
         logger.info("Skipping schema validation.")
         return
 
-    schema = PANDERA_SCHEMAS.get(resource_name)
-    if schema is None:
+    schema_model = PANDERA_SCHEMAS.get(resource_name)
+    if schema_model is None:
         logger.warning(
             f"No schema defined for resource: {resource_name}. Skipping validation."
         )
         return
 
+    schema = schema_model.to_schema()
+    if columns is not None:
+        schema = schema.select_columns([col for col in columns if col in schema.columns])
+
+    start = time.perf_counter()
     try:
-        schema.validate(dataframe)
-        logger.info("DataFrame complies with the schema.")
+        if mode == "full":
+            schema.validate(coerce_arrow_columns(dataframe, schema))
+        else:
+            if sample_size:
+                dataframe = sample_rows(dataframe, sample_size)
+            fast_validate(dataframe, schema)
+        logger.info(
+            f"DataFrame complies with the schema ({validation} validation of {len(dataframe)} "
+            f"rows in {time.perf_counter() - start:.2f} s)."
+        )
     except Exception as e:
         logger.error(f"Schema validation failed: {e}")
         raise
 
 
-def filtering_data(resource_name: str, dataframe: pd.DataFrame) -> pd.DataFrame:
-    """Apply additional filtering to the data in before using it
+def transform_json_columns(resource_name: str, dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Decode the fields of the JSON columns read by the mapping, see `project_json_columns`.
 
     Args:
         resource_name (str): Name of the database, i.e networks, annotations, etc.
-        dataframe (pd.DataFrame): DataFrame, for now it is a Pandas DataFrame_
+        dataframe (pd.DataFrame): The DataFrame (or chunk of it) to transform.
 
     Returns:
-        pd.DataFrame: Returns a Pandas DataFrame
+        pd.DataFrame: The transformed DataFrame.
     """
-    if resource_name == "annotations":
-        dataframe = dataframe
-
-    if resource_name == "complexes":
-        dataframe = dataframe
-
-    if resource_name == "enzyme_PTM":
-        dataframe = dataframe
-
-    if resource_name == "intercell":
-        dataframe = dataframe
+    return project_json_columns(dataframe, mapping_columns(_read_mapping(resource_name)))
 
-    if resource_name == "networks":
-        dataframe = dataframe
 
-    return dataframe
-
-
-def extract_nodes_edges_ontoweaver(resource_name: str, dataframe_resource: pd.DataFrame):
-
-    # Read Ontoweaver mapping file
+def _read_mapping(resource_name: str) -> dict:
+    """Read the Ontoweaver mapping file of a resource."""
     mapping_file = ONTOWEAVER_MAPPING_FILES.get(resource_name)
     if mapping_file is None:
         raise ValueError(f"No mapping file found for resource: {resource_name}")
 
     try:
         with open(mapping_file) as fd:
-            mapping = yaml.full_load(fd)
+            return yaml.full_load(fd)
     except FileNotFoundError:
         raise FileNotFoundError(f"Mapping file not found: {mapping_file}")
     except Exception as e:
         raise RuntimeError(f"An error occurred while reading the mapping file: {e}")
 
+
+def extract_nodes_edges_ontoweaver(resource_name: str, dataframe_resource: pd.DataFrame):
+
+    # Read Ontoweaver mapping file
+    mapping = _read_mapping(resource_name)
+
     # Extract nodes and edges with Ontoweaver
     logger.info("Ontoweaver adapter start...")
     nodes, edges = [], []
@@ -380,74 +1269,829 @@ def extract_nodes_edges_ontoweaver(resource_name: str, dataframe_resource: pd.Da
     return nodes, edges
 
 
-def fuse_and_write(nodes, edges, resource_name):
-    """Fuse duplicated nodes and edges and write the output."""
-    logger.info("Fuse step starting...")
+def extract_nodes_edges_native(resource_name: str, dataframe_resource: pd.DataFrame):
+    """Extract nodes and edges column by column, with the Ontoweaver mapping compiled.
+
+    The nodes and edges are built as tables, whose rows are the BioCypher
+    tuples Ontoweaver produces, in the same order (see `extraction.node_tuples`).
+    They stay tables through the disk fusion and the columnar and table
+    writers; the other consumers convert them (see `extraction.element_lists`).
+    Mappings using transformers that cannot be compiled, or data they cannot
+    handle, are extracted by Ontoweaver instead, as tuples.
+
+    Args:
+        resource_name (str): Name of the database, i.e networks, annotations, etc.
+        dataframe_resource (pd.DataFrame): The table to extract.
+
+    Returns:
+        tuple: The node and edge tables, or the lists of node and edge tuples.
+    """
+    mapping = _read_mapping(resource_name)
+
+    try:
+        logger.info("Native extraction start...")
+        node_table, edge_table = CompiledMapping(mapping).extract(dataframe_resource)
+    except UnsupportedMapping as e:
+        logger.warning(f"Native extraction not possible ({e}) Falling back to Ontoweaver.")
+        return extract_nodes_edges_ontoweaver(resource_name, dataframe_resource)
+
+    logger.info(f"Node table shape: {node_table.shape}")
+    logger.info(f"Edge table shape: {edge_table.shape}")
+    logger.info("Native extraction end.")
+
+    return node_table, edge_table
 
-    schema_path = BIOCYPHER_SCHEMA_PATHS.get(resource_name)
-    biocypher_config_path = BIOCYPHER_CONFIG_PATHS.get(resource_name)
 
-    import_file = ontoweaver.reconciliate_write(
-        nodes=nodes,
-        edges=edges,
-        biocypher_config_path=biocypher_config_path,
-        schema_path=schema_path,
-        separator=", ",
+def extract_nodes_edges(
+    resource_name: str,
+    dataframe_resource: pd.DataFrame,
+    extractor: str = "ontoweaver",
+):
+    """Extract nodes and edges with the chosen engine, either "ontoweaver" (tuples) or "native" (tables)."""
+    if extractor == "native":
+        return extract_nodes_edges_native(resource_name, dataframe_resource)
+    return extract_nodes_edges_ontoweaver(resource_name, dataframe_resource)
+
+
+def extract_nodes_edges_parallel(
+    resource_name: str,
+    dataframe_resource: pd.DataFrame,
+    options: Optional[PipelineOptions] = None,
+    executor: Optional[Executor] = None,
+):
+    """Extract nodes and edges from row shards of the table in worker processes.
+
+    The shards are contiguous, and their nodes and edges are concatenated in
+    the order of the shards, so the result is the same as extracting the
+    whole table at once.
+
+    Args:
+        resource_name (str): Name of the database, i.e networks, annotations, etc.
+        dataframe_resource (pd.DataFrame): The table to extract.
+        options (Optional[PipelineOptions]): The `extractor` and the number of shards (`workers`).
+        executor (Optional[Executor]): The worker processes, or None to extract in this process.
+
+    Returns:
+        tuple: The nodes and edges, see `extract_nodes_edges`.
+    """
+    options = options or PipelineOptions()
+    if executor is None:
+        return extract_nodes_edges(resource_name, dataframe_resource, extractor=options.extractor)
+
+    return concat_elements(
+        map_shards(
+            executor,
+            extract_nodes_edges,
+            dataframe_resource,
+            nb_shards=options.workers,
+            resource_name=resource_name,
+            extractor=options.extractor,
+        )
+    )
+
+
+def write_fused(bc: Union[BioCypher, GraphTableWriter], disk_fusion: DiskFusion):
+    """Write the nodes and edges of a disk fusion, fused bucket by bucket.
+
+    Args:
+        bc (Union[BioCypher, GraphTableWriter]): The BioCypher instance, or the columnar or
+            table writer, writing the output.
+        disk_fusion (DiskFusion): The fusion holding the spilled nodes and edges.
+
+    Returns:
+        tuple: The number of fused nodes and edges written.
+    """
+    logger.info(
+        f"Fusing {disk_fusion.nb_nodes} nodes and {disk_fusion.nb_edges} edges "
+        f"spilled to: {disk_fusion.directory}"
+    )
+    if isinstance(bc, GraphTableWriter):
+        # The fused tables are written as they are, without going through tuples.
+        if disk_fusion.nb_nodes:
+            bc.write_node_tables(disk_fusion.node_tables())
+        if disk_fusion.nb_edges:
+            bc.write_edge_tables(disk_fusion.edge_tables())
+    else:
+        if disk_fusion.nb_nodes:
+            bc.write_nodes(disk_fusion.nodes())
+        if disk_fusion.nb_edges:
+            bc.write_edges(disk_fusion.edges())
+    return disk_fusion.nb_fused_nodes, disk_fusion.nb_fused_edges
+
+
+def _biocypher(resource_name: str, output_directory: Optional[str] = None) -> BioCypher:
+    """Create the BioCypher instance writing a resource, with its own config and schema."""
+    return BioCypher(
+        biocypher_config_path=BIOCYPHER_CONFIG_PATHS.get(resource_name),
+        schema_config_path=BIOCYPHER_SCHEMA_PATHS.get(resource_name),
+        output_directory=output_directory,
+    )
+
+
+def _graph_writer(
+    resource_name: str,
+    output_directory: Optional[str] = None,
+    options: Optional[PipelineOptions] = None,
+) -> Union[BioCypher, GraphTableWriter]:
+    """Create the writer of a resource: its BioCypher instance, or the columnar or table writer built on it."""
+    options = options or PipelineOptions()
+    if options.output != "neo4j":
+        return output_writer(_biocypher(resource_name, output_directory), options.output)
+    return _neo4j_writer(_biocypher(resource_name, output_directory), options)
+
+
+def _neo4j_writer(bc: BioCypher, options: PipelineOptions) -> Union[BioCypher, GraphTableWriter]:
+    """The writer of the neo4j-admin import files: the BioCypher instance, or the columnar writer."""
+    return graph_writer(
+        bc,
+        options.writer,
+        compress=options.compress,
+        max_part_size=options.max_part_size,
+        parts=options.parts,
     )
+
+
+def _id_table(intern_ids: bool) -> Optional[IdTable]:
+    """Open the ID table shared by the resources, if the IDs are interned."""
+    if not intern_ids:
+        return None
+    ids = IdTable(os.path.join(CACHE_DATA_PATH, ID_TABLE_SUBDIRECTORY))
+    logger.info(f"Interning the IDs, {len(ids)} already in the ID table: {ids.path}")
+    return ids
+
+
+def fuse_and_write(
+    nodes: Elements,
+    edges: Elements,
+    resource_name,
+    options: Optional[PipelineOptions] = None,
+    output_directory: Optional[str] = None,
+    stage_metrics: Optional[StageMetrics] = None,
+):
+    """Fuse duplicated nodes and edges and write the output.
+
+    With the "disk" fusion, the buckets are fused while they are written:
+    the "fuse" stage only spills the nodes and edges to disk. With
+    `intern_ids`, it matches the IDs by their integer codes in the ID table
+    shared by the resources, see `interning.IdTable`.
+
+    Args:
+        nodes (Elements): The node table or tuples, see `extract_nodes_edges`.
+        edges (Elements): The edge table or tuples.
+        resource_name (str): Name of the database, i.e networks, annotations, etc.
+        options (Optional[PipelineOptions]): The `fusion`, and how the output is written: its
+            `output` and, for the import files, the `writer` and its options.
+        output_directory (Optional[str]): Where BioCypher writes the output (default: a new
+            timestamped directory under 'biocypher-out').
+        stage_metrics (Optional[StageMetrics]): Measures the "fuse" and "write" stages.
+
+    Returns:
+        str: The path to the import file, or to the table output.
+    """
+    logger.info("Fuse step starting...")
+    options = options or PipelineOptions()
+    stage_metrics = stage_metrics or StageMetrics(resource_name)
+
+    bc = _graph_writer(resource_name, output_directory, options)
+
+    if options.fusion == "disk":
+        ids = _id_table(options.intern_ids)
+        with DiskFusion(CACHE_DATA_PATH, separator=", ", ids=ids) as disk_fusion:
+            with stage_metrics.stage("fuse") as record:
+                disk_fusion.add(nodes, edges)
+                record.count(nodes=len(nodes), edges=len(edges))
+            with stage_metrics.stage("write") as record:
+                nb_nodes, nb_edges = write_fused(bc, disk_fusion)
+                record.count(nodes=nb_nodes, edges=nb_edges)
+        if ids is not None:
+            ids.save()
+        logger.info(f"Fused into {nb_nodes} nodes and {nb_edges} edges.")
+    else:
+        with stage_metrics.stage("fuse") as record:
+            fused_nodes, fused_edges = ontoweaver.fusion.reconciliate(
+                *element_lists(nodes, edges), separator=", "
+            )
+            record.count(nodes=len(nodes), edges=len(edges))
+        with stage_metrics.stage("write") as record:
+            if fused_nodes:
+                bc.write_nodes(fused_nodes)
+            if fused_edges:
+                bc.write_edges(fused_edges)
+            record.count(nodes=len(fused_nodes), edges=len(fused_edges))
+
+    with stage_metrics.stage("write"):
+        import_file = bc.write_import_call()
     logger.info("Fuse step end.")
     return import_file
 
 
-def process_resource(resource_name: str, argument_resource: str):
-    """Process a given resource, extract nodes and edges, and update the lists."""
+def stream_fuse_and_write(
+    resource_name: str,
+    path_resource: str,
+    options: PipelineOptions,
+    executor: Optional[Executor] = None,
+    output_directory: Optional[str] = None,
+    usecols: Optional[List[str]] = None,
+    row_filters: Optional[List[RowFilter]] = None,
+    stage_metrics: Optional[StageMetrics] = None,
+):
+    """Load, transform, fuse and write a resource chunk by chunk.
+
+    Each chunk goes through filtering and extraction, then its nodes and edges
+    are spilled to the buckets of a disk fusion before the next chunk is read,
+    so that the peak memory depends on `chunksize` and not on the file size.
+    The buckets are fused and written once all chunks are extracted, so that
+    duplicates are fused across chunks, and the graph is the same as when the
+    whole table is loaded at once.
+
+    Args:
+        resource_name (str): Name of the database, i.e networks, annotations, etc.
+        path_resource (str): Path to the TSV file.
+        options (PipelineOptions): The options of the stages, `chunksize` (the maximum number
+            of rows per chunk) included; the `fusion` is always "disk".
+        executor (Optional[Executor]): The worker processes extracting each chunk, if any.
+        output_directory (Optional[str]): Where BioCypher writes the output (default: a new
+            timestamped directory under 'biocypher-out').
+        usecols (Optional[List[str]]): The columns to read, see `select_columns` (default: all).
+        row_filters (Optional[List[RowFilter]]): The conditions the kept rows satisfy, see
+            `select_row_filters` (default: keep all rows).
+        stage_metrics (Optional[StageMetrics]): Measures each stage, summed over the chunks.
 
-    logger.info(f"Resource Option: {argument_resource}")
-    logger.info(f"Resource Name: {resource_name}")
+    Returns:
+        tuple: The path to the import file (or table output), the number of nodes and edges written.
+    """
+    stage_metrics = stage_metrics or StageMetrics(resource_name)
+    bc = _graph_writer(resource_name, output_directory, options)
+
+    ids = _id_table(options.intern_ids)
+    with DiskFusion(CACHE_DATA_PATH, separator=", ", ids=ids) as disk_fusion:
+        chunks = load_dataframe_chunks(
+            path_resource,
+            resource_name=resource_name,
+            chunksize=options.chunksize,
+            cache=options.cache,
+            engine=options.engine,
+            usecols=usecols,
+            row_filters=row_filters,
+        )
+        for dataframe_chunk in stage_metrics.iterate("load", chunks):
+            with stage_metrics.stage("validate") as record:
+                validate_schema(
+                    dataframe_chunk, resource_name, validation=options.validation, columns=usecols
+                )
+                record.count(rows=len(dataframe_chunk))
+            with stage_metrics.stage("transform") as record:
+                dataframe_chunk = transform_json_columns(resource_name, dataframe_chunk)
+                record.count(rows=len(dataframe_chunk))
+
+            with stage_metrics.stage("extract") as record:
+                nodes, edges = extract_nodes_edges_parallel(
+                    resource_name=resource_name,
+                    dataframe_resource=dataframe_chunk,
+                    options=options,
+                    executor=executor,
+                )
+                record.count(rows=len(dataframe_chunk), nodes=len(nodes), edges=len(edges))
+            del dataframe_chunk
+
+            with stage_metrics.stage("fuse") as record:
+                disk_fusion.add(nodes, edges)
+                record.count(nodes=len(nodes), edges=len(edges))
+            del nodes, edges
+
+        with stage_metrics.stage("write") as record:
+            nb_nodes, nb_edges = write_fused(bc, disk_fusion)
+            record.count(nodes=nb_nodes, edges=nb_edges)
+    if ids is not None:
+        ids.save()
+
+    with stage_metrics.stage("write"):
+        import_file = bc.write_import_call()
+    return import_file, nb_nodes, nb_edges
+
+
+def _cypher_patch_writer(bc: BioCypher) -> CypherPatchWriter:
+    """Build the Cypher writer labelling nodes and edges as the BioCypher Neo4j writer does."""
+    translator = get_translator(bc)
+    ontology = get_ontology(bc)
+
+    @lru_cache(maxsize=None)
+    def node_labels(label: str) -> List[str]:
+        primary = translator.name_sentence_to_pascal(label)
+        ancestors = [translator.name_sentence_to_pascal(ancestor) for ancestor in ontology.get_ancestors(label)]
+        return list(dict.fromkeys([primary] + ancestors))
+
+    return CypherPatchWriter(node_labels, translator.name_sentence_to_pascal)
+
+
+def delta_fuse_and_write(
+    resource_name: str,
+    dataframe: pd.DataFrame,
+    options: Optional[PipelineOptions] = None,
+    executor: Optional[Executor] = None,
+    output_directory: Optional[str] = None,
+    usecols: Optional[List[str]] = None,
+    row_filters: Optional[List[RowFilter]] = None,
+):
+    """Extract, fuse and write only the rows that changed since the previous build of a resource.
+
+    Each row is fingerprinted, by its key columns (see `DELTA_KEY_COLUMNS`) and
+    by all its columns. The rows whose fingerprint is not in the previous build
+    (added or changed rows) are extracted, and the rows of the previous build
+    that are not in the new dump (removed rows, or previous versions of changed
+    ones) are extracted again from the recorded build to retract their nodes
+    and edges. Each node and edge keeps the number of rows producing it, and
+    each of its property values the number of rows producing that value: the
+    elements no row produces anymore are deleted, and the other elements of the
+    extracted and retracted rows are fused again from the values of all the
+    rows still producing them (see `delta.fuse_elements`), then written as usual.
+
+    Besides the BioCypher files, two scripts patch the database of the
+    previous build when run in this order with `cypher-shell -f`:
+    'delta-delete.cypher' deletes the retracted edges, and then the retracted
+    nodes left without edges, and 'delta-merge.cypher' creates or updates the
+    fused nodes and edges, setting all their properties. Without a recorded
+    build, or when the previous one was read or extracted otherwise (another
+    mapping, columns or row filters), the whole graph is built and recorded.
 
-    # EXTRACTION
-    logger.info("======================")
-    logger.info("=  STEP: Extraction  =")
-    logger.info("======================")
-    path_resource = access_to_resource(
-        resource_name=resource_name,
-        argument_resource=argument_resource,
+    Args:
+        resource_name (str): Name of the database, i.e networks, annotations, etc.
+        dataframe (pd.DataFrame): The whole table of the new dump, filtered and transformed.
+        options (Optional[PipelineOptions]): The options of the extraction and writing; the
+            `fusion` only applies when building the whole graph, as the changes are always
+            fused in memory.
+        executor (Optional[Executor]): The worker processes, or None to extract in this process.
+        output_directory (Optional[str]): Where BioCypher writes the output (default: a new
+            timestamped directory under 'biocypher-out').
+        usecols (Optional[List[str]]): The columns read (default: all).
+        row_filters (Optional[List[RowFilter]]): The conditions the kept rows satisfy.
+
+    Returns:
+        tuple: The path to the import file, the number of nodes and edges written.
+
+    Raises:
+        ValueError: If the mapping of the resource uses the `rowIndex` transformer, whose IDs
+            depend on the position of the rows.
+    """
+    if uses_row_index(_read_mapping(resource_name)):
+        raise ValueError(
+            f"The mapping of {resource_name} uses row numbers as IDs, which change between "
+            "releases: it cannot be built incrementally."
+        )
+    options = options or PipelineOptions()
+
+    def extract(rows: pd.DataFrame):
+        if rows.empty:
+            return [], []
+        return element_lists(
+            *extract_nodes_edges_parallel(resource_name, rows, options=options, executor=executor)
+        )
+
+    build = {
+        "mapping": file_digest(ONTOWEAVER_MAPPING_FILES[resource_name]),
+        "columns": usecols,
+        "filters": [repr(row_filter) for row_filter in row_filters or []],
+    }
+    state = DeltaState(os.path.join(CACHE_DATA_PATH, DELTA_SUBDIRECTORY), resource_name, build)
+    key_hashes, row_hashes = row_fingerprints(dataframe, DELTA_KEY_COLUMNS[resource_name])
+
+    if not state.exists() or not state.matches():
+        if state.exists():
+            logger.warning(
+                f"The previous build of {resource_name} was made with another mapping, columns "
+                "or row filters, building the whole graph."
+            )
+        else:
+            logger.warning(f"No previous build of {resource_name} recorded, building the whole graph.")
+        nodes, edges = extract(dataframe)
+        import_file = fuse_and_write(nodes, edges, resource_name, options, output_directory=output_directory)
+        state.write(dataframe, key_hashes, row_hashes, element_counts(nodes, edges), element_values(nodes, edges))
+        return import_file, len(nodes), len(edges)
+
+    diff = diff_rows(*state.fingerprints(), key_hashes, row_hashes)
+    logger.info(f"Changes since the previous build of {resource_name}: {diff}")
+
+    new_nodes, new_edges = extract(dataframe.iloc[diff.new_positions])
+    gone_nodes, gone_edges = extract(state.rows(diff.gone_positions))
+    new_counts = element_counts(new_nodes, new_edges)
+    gone_counts = element_counts(gone_nodes, gone_edges)
+    counts, retracted = update_counts(state.counts(), new_counts, gone_counts)
+    values, dropped = update_counts(
+        state.values(),
+        element_values(new_nodes, new_edges),
+        element_values(gone_nodes, gone_edges),
+        columns=ELEMENT_VALUE_COLUMNS,
+    )
+    retracted_nodes, retracted_edges = element_tuples(retracted)
+    logger.info(
+        f"Retracting {len(retracted_nodes)} nodes and {len(retracted_edges)} edges no row produces anymore."
     )
 
-    # LOADING
-    logger.info("===================")
-    logger.info("=  STEP: Loading  =")
-    logger.info("===================")
-    dataframe = load_dataframe(path_resource, resource_name=resource_name)
-    validate_schema(dataframe, resource_name, enable_validation=False)
+    # The elements of the changed rows that some row still produces.
+    touched = pd.concat([new_counts, gone_counts])[ELEMENT_KEY_COLUMNS]
+    touched = touched.merge(counts[ELEMENT_KEY_COLUMNS], on=ELEMENT_KEY_COLUMNS)
+    fused_nodes, fused_edges = fuse_elements(touched, values, dropped, separator=", ")
+
+    bc = _biocypher(resource_name, output_directory)
+    output = _neo4j_writer(bc, options)
+    if fused_nodes:
+        output.write_nodes(fused_nodes)
+    if fused_edges:
+        output.write_edges(fused_edges)
+    get_writer(bc)  # not created by BioCypher when nothing changed, but the import call needs it
+    import_file = output.write_import_call()
+
+    translator = get_translator(bc)
+    cypher = _cypher_patch_writer(bc)
+    merged_nodes = translate_nodes(translator, fused_nodes)
+    deleted_nodes = translate_nodes(translator, retracted_nodes)
+    cypher.register_nodes(translate_nodes(translator, gone_nodes))
+    cypher.register_nodes(merged_nodes)
+    script_directory = os.path.dirname(import_file)
+    cypher.write(
+        os.path.join(script_directory, "delta-delete.cypher"),
+        cypher.delete_statements(deleted_nodes, translate_edges(translator, retracted_edges)),
+    )
+    cypher.write(
+        os.path.join(script_directory, "delta-merge.cypher"),
+        cypher.merge_statements(merged_nodes, translate_edges(translator, fused_edges)),
+    )
 
-    # TRANSFORMATION
-    # -- Filtering information
-    logger.info("==========================")
-    logger.info("=  STEP: Transformation  =")
-    logger.info("==========================")
-    dataframe = filtering_data(resource_name, dataframe)
+    state.write(dataframe, key_hashes, row_hashes, counts, values)
+    return import_file, len(fused_nodes), len(fused_edges)
 
-    # -- Extract nodes and edges
-    nodes, edges = extract_nodes_edges_ontoweaver(
-        resource_name=resource_name,
-        dataframe_resource=dataframe,
+
+def stage_keys(
+    resource_name: str,
+    path_resource: str,
+    options: Optional[PipelineOptions] = None,
+    usecols: Optional[List[str]] = None,
+    row_filters: Optional[List[RowFilter]] = None,
+) -> Dict[str, str]:
+    """Compute the checkpoint keys of the table and elements stages of a resource.
+
+    Both depend on the input file, the mapping and the code (see
+    `checkpoint.code_version`), and on the options of the stages leading to
+    them. Neither depends on the BioCypher schema and config, which are only
+    read by the fusion and writing.
+
+    Args:
+        resource_name (str): Name of the database, i.e networks, annotations, etc.
+        path_resource (str): Path to the TSV file.
+        options (Optional[PipelineOptions]): The `engine`, `validation` and `extractor` of the stages.
+        usecols (Optional[List[str]]): The columns read (default: all).
+        row_filters (Optional[List[RowFilter]]): The conditions the kept rows satisfy.
+
+    Returns:
+        Dict[str, str]: The key of each stage, see `checkpoint.stage_key`.
+    """
+    options = options or PipelineOptions()
+    table_key = stage_key(
+        TABLE_STAGE,
+        input=file_digest(path_resource),
+        mapping=file_digest(ONTOWEAVER_MAPPING_FILES[resource_name]),
+        code=code_version([os.path.abspath(__file__)]),
+        engine=options.engine,
+        columns=usecols,
+        filters=[repr(row_filter) for row_filter in row_filters or []],
+        validation=options.validation,
     )
+    return {
+        TABLE_STAGE: table_key,
+        ELEMENTS_STAGE: stage_key(ELEMENTS_STAGE, table=table_key, extractor=options.extractor),
+    }
 
-    # -- Fuse nodes, edges and write script for importing to Neo4j
-    import_file = fuse_and_write(nodes, edges, resource_name)
-    logger.info(f"Processed {resource_name}: {len(nodes)} nodes, {len(edges)} edges.")
+
+def metric_sinks(options: PipelineOptions) -> list:
+    """Create the sinks the stage measures are written to, see `metrics.StageMetrics`.
+
+    Args:
+        options (PipelineOptions): The `metrics` JSON lines file, shared by the resources of a
+            run and identifying it by `run_id` (default: now), the `metrics_prometheus`
+            directory, and whether to emit OpenTelemetry spans (`metrics_otel`).
+
+    Returns:
+        list: The sinks.
+    """
+    sinks = []
+    if options.metrics:
+        run_id = options.run_id or datetime.now().strftime("%Y%m%d%H%M%S")
+        sinks.append(JsonLinesSink(options.metrics, run_id))
+    if options.metrics_prometheus:
+        sinks.append(PrometheusSink(options.metrics_prometheus))
+    if options.metrics_otel:
+        sinks.append(OpenTelemetrySink())
+    return sinks
+
+
+def process_resource(
+    resource_name: str,
+    argument_resource: str,
+    options: Optional[PipelineOptions] = None,
+    output_directory: Optional[str] = None,
+):
+    """Process a given resource, extract nodes and edges, and update the lists.
+
+    The table is loaded at once, or streamed by chunks with `chunksize` (see
+    `stream_fuse_and_write`); with `delta`, only the changes since the
+    previous build are written (see `delta_fuse_and_write`), and with
+    `checkpoint` or `resume`, the stages are checkpointed or skipped (see
+    `checkpoint.Checkpoints`). Each stage is measured (see
+    `metrics.StageMetrics`), and the measures are logged, and written to the
+    requested sinks once the resource is processed.
+
+    Args:
+        resource_name (str): Name of the database, i.e networks, annotations, etc.
+        argument_resource (str): Path to the TSV file, or "download".
+        options (Optional[PipelineOptions]): The options of the run (default: the defaults
+            of the command line).
+        output_directory (Optional[str]): Where BioCypher writes the output (default: a new
+            timestamped directory under 'biocypher-out').
+    """
+    options = options or PipelineOptions()
+
+    logger.info(f"Resource Option: {argument_resource}")
+    logger.info(f"Resource Name: {resource_name}")
+
+    sinks = metric_sinks(options)
+    with StageMetrics(resource_name, sinks) as stage_metrics:
+        # EXTRACTION
+        logger.info("======================")
+        logger.info("=  STEP: Extraction  =")
+        logger.info("======================")
+        with stage_metrics.stage("access"):
+            path_resource = access_to_resource(
+                resource_name=resource_name,
+                argument_resource=argument_resource,
+            )
+            row_filters = select_row_filters(
+                resource_name, path_resource, options.filters, options.filter_file
+            )
+            usecols = select_columns(
+                resource_name,
+                path_resource,
+                options.columns,
+                required=[row_filter.column for row_filter in row_filters],
+            )
+
+        if options.chunksize:
+            # LOADING, TRANSFORMATION AND WRITING, chunk by chunk
+            logger.info("=====================")
+            logger.info("=  STEP: Streaming  =")
+            logger.info("=====================")
+            logger.info(f"Chunk size: {options.chunksize} rows")
+            with process_pool(options.workers) as executor:
+                import_file, nb_nodes, nb_edges = stream_fuse_and_write(
+                    resource_name,
+                    path_resource,
+                    options,
+                    executor=executor,
+                    output_directory=output_directory,
+                    usecols=usecols,
+                    row_filters=row_filters,
+                    stage_metrics=stage_metrics,
+                )
+            logger.info(f"Processed {resource_name}: {nb_nodes} nodes, {nb_edges} edges.")
+            if options.qa:
+                with stage_metrics.stage("qa"):
+                    run_qa(import_file, options.output)
+            return
+
+        checkpoints, keys = None, {}
+        if options.checkpoint or options.resume:
+            checkpoints = Checkpoints(
+                os.path.join(CACHE_DATA_PATH, CHECKPOINT_SUBDIRECTORY), resource_name, resume=options.resume
+            )
+            keys = stage_keys(
+                resource_name,
+                path_resource,
+                options,
+                usecols=usecols,
+                row_filters=row_filters,
+            )
+
+        elements, dataframe = None, None
+        if checkpoints:
+            with stage_metrics.stage("checkpoint"):
+                # Nodes and edges extracted by a previous run make the table useless.
+                if not options.delta:
+                    elements = checkpoints.elements(keys[ELEMENTS_STAGE])
+                if elements is None:
+                    types_mapper = arrow_types_mapper if options.engine == "pyarrow" else None
+                    dataframe = checkpoints.table(keys[TABLE_STAGE], types_mapper=types_mapper)
+
+        if elements is None and dataframe is None:
+            # LOADING
+            logger.info("===================")
+            logger.info("=  STEP: Loading  =")
+            logger.info("===================")
+            with stage_metrics.stage("load") as record:
+                dataframe = load_dataframe(
+                    path_resource,
+                    resource_name=resource_name,
+                    cache=options.cache,
+                    engine=options.engine,
+                    usecols=usecols,
+                    row_filters=row_filters,
+                )
+                record.count(rows=len(dataframe))
+            with stage_metrics.stage("validate") as record:
+                validate_schema(dataframe, resource_name, validation=options.validation, columns=usecols)
+                record.count(rows=len(dataframe))
+
+            # TRANSFORMATION
+            # -- Decoding the JSON columns
+            logger.info("==========================")
+            logger.info("=  STEP: Transformation  =")
+            logger.info("==========================")
+            with stage_metrics.stage("transform") as record:
+                dataframe = transform_json_columns(resource_name, dataframe)
+                record.count(rows=len(dataframe))
+
+            if checkpoints:
+                with stage_metrics.stage("checkpoint"):
+                    checkpoints.write_table(keys[TABLE_STAGE], dataframe)
+
+        if options.delta:
+            # -- Extract, fuse and write the changed rows only
+            with stage_metrics.stage("delta") as record:
+                with process_pool(options.workers) as executor:
+                    import_file, nb_nodes, nb_edges = delta_fuse_and_write(
+                        resource_name,
+                        dataframe,
+                        options,
+                        executor=executor,
+                        output_directory=output_directory,
+                        usecols=usecols,
+                        row_filters=row_filters,
+                    )
+                record.count(rows=len(dataframe), nodes=nb_nodes, edges=nb_edges)
+            logger.info(f"Processed {resource_name}: {nb_nodes} nodes, {nb_edges} edges.")
+            return
+
+        # -- Extract nodes and edges
+        if elements is None:
+            with stage_metrics.stage("extract") as record:
+                with process_pool(options.workers) as executor:
+                    elements = extract_nodes_edges_parallel(
+                        resource_name=resource_name,
+                        dataframe_resource=dataframe,
+                        options=options,
+                        executor=executor,
+                    )
+                record.count(rows=len(dataframe), nodes=len(elements[0]), edges=len(elements[1]))
+            if checkpoints:
+                with stage_metrics.stage("checkpoint"):
+                    checkpoints.write_elements(keys[ELEMENTS_STAGE], *elements)
+        del dataframe
+        nodes, edges = elements
+
+        # -- Fuse nodes, edges and write script for importing to Neo4j
+        import_file = fuse_and_write(
+            nodes,
+            edges,
+            resource_name,
+            options,
+            output_directory=output_directory,
+            stage_metrics=stage_metrics,
+        )
+        logger.info(f"Processed {resource_name}: {len(nodes)} nodes, {len(edges)} edges.")
+        if options.qa:
+            with stage_metrics.stage("qa"):
+                run_qa(import_file, options.output)
 
 
 def resources_to_process(cli_arguments: argparse.Namespace) -> Dict[str, Any]:
     resource_mapping = {
         key: value
         for key, value in vars(cli_arguments).items()
-        if value is not None and key != "verbose"
+        if value is not None and key in URLS_OMNIPATH
     }
 
     return resource_mapping
 
 
+def options_to_process(cli_arguments: argparse.Namespace) -> PipelineOptions:
+    """Gather the pipeline options, i.e. the CLI arguments that are neither resources, scheduling nor verbosity."""
+    options = PipelineOptions.from_arguments(cli_arguments)
+
+    return options
+
+
+def resource_output_directories(
+    resource_names: Iterable[str], output_path: str = BIOCYPHER_OUTPUT_PATH
+) -> Dict[str, str]:
+    """Name the output directory of each resource after the start time of the run and the resource."""
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    return {
+        resource_name: os.path.join(output_path, f"{timestamp}-{resource_name}")
+        for resource_name in resource_names
+    }
+
+
+def process_resources_parallel(
+    resource_mapping: Dict[str, Any],
+    options: PipelineOptions,
+    jobs: int = 1,
+    memory_budget: Optional[int] = None,
+    output_directories: Optional[Dict[str, str]] = None,
+    downloads: Optional[Dict[str, Future]] = None,
+) -> Dict[str, JobReport]:
+    """Process the resources at the same time, each in its own process.
+
+    Each resource is written to its own BioCypher output directory, named
+    after the start time of the run and the resource, so that resources
+    finishing at the same time do not share one. A resource being
+    downloaded is processed once its download is done, while the resources
+    already there are processed meanwhile, see `scheduler.run_jobs`.
+
+    Args:
+        resource_mapping (Dict[str, Any]): The path (or "download") of each resource, by name.
+        options (PipelineOptions): The pipeline options, shared by the resources.
+        jobs (int): The maximum number of resources processed at the same time.
+        memory_budget (Optional[int]): The resident memory limit of each resource process, with
+            its extraction workers, in megabytes.
+        output_directories (Optional[Dict[str, str]]): The output directory of each resource
+            (default: see `resource_output_directories`).
+        downloads (Optional[Dict[str, Future]]): The future path to the downloaded file of the
+            resources being downloaded, see `start_downloads`.
+
+    Returns:
+        Dict[str, JobReport]: The wall-clock time, peak RSS and error, if any, of each resource.
+    """
+    output_directories = output_directories or resource_output_directories(resource_mapping)
+    downloads = downloads or {}
+    job_arguments = {
+        resource_name: dict(
+            resource_name=resource_name,
+            argument_resource=downloads.get(resource_name, argument_resource),
+            options=options,
+            output_directory=output_directories[resource_name],
+        )
+        for resource_name, argument_resource in resource_mapping.items()
+    }
+
+    logger.info(f"Processing {len(job_arguments)} resources, {jobs} at a time")
+    reports = run_jobs(
+        process_resource,
+        job_arguments,
+        max_jobs=jobs,
+        memory_budget=memory_budget * MEGABYTE if memory_budget else None,
+    )
+
+    for report in reports.values():
+        if report.succeeded:
+            logger.info(str(report))
+        else:
+            logger.error(str(report))
+
+    return reports
+
+
+def merge_import_calls(directories: Iterable[str], output_directory: str, output: str = "neo4j") -> str:
+    """Write a single import call for the output of all the resources, see `neo4j_csv.write_merged_import_call`.
+
+    With a table output, the Parquet datasets or the databases of the
+    resources are merged instead, see `table_outputs.merge_parquet_datasets`
+    and `table_outputs.merge_graph_databases`.
+
+    Args:
+        directories (Iterable[str]): The output directories of the resources.
+        output_directory (str): Where the import call is written, with the Neo4j settings of
+            the networks config, or the merged output.
+        output (str): What the graph is written as, either "neo4j", "parquet", "sqlite" or "duckdb".
+
+    Returns:
+        str: The path to the import call, or to the merged output.
+    """
+    if output == "parquet":
+        import_file = merge_parquet_datasets(directories, output_directory)
+    elif output != "neo4j":
+        import_file = merge_graph_databases(
+            [graph_database_path(directory, output) for directory in directories],
+            graph_database_path(output_directory, output),
+            engine=output,
+        )
+    else:
+        import_file = write_merged_import_call(_biocypher("networks", output_directory), directories)
+    logger.info(f"Merged {output} output: {import_file}")
+    return import_file
+
+
+def run_qa(import_file: str, output: str = "neo4j") -> Dict[str, Any]:
+    """Run the queries of 'basic_queries.cypher' on a written graph, see `graph_qa.graph_qa`.
+
+    Args:
+        import_file (str): The import call of the graph, or its table output.
+        output (str): What the graph is written as, either "neo4j", "parquet", "sqlite" or "duckdb".
+
+    Returns:
+        Dict[str, Any]: The result of each query, also written to 'qa.json' next to the graph.
+    """
+    directory = import_file if output == "parquet" else os.path.dirname(import_file)
+    return graph_qa([directory], output, report=os.path.join(directory, QA_FILE))
+
+
 # ---------------------------------------------------------------------------
 # ----------------------    M A I N   F U N T I O N    ----------------------
 # ---------------------------------------------------------------------------
@@ -461,9 +2105,51 @@ def main():
     resource_mapping = resources_to_process(cli_arguments=cli_parsed)
     logger.info(f"Resources to process: {resource_mapping}")
 
-    # Process the resources (ELT)
-    for resource_name, argument_resource in resource_mapping.items():
-        process_resource(resource_name, argument_resource)
+    # Gather the options shared by all the resources
+    options = options_to_process(cli_arguments=cli_parsed)
+    logger.info(f"Pipeline options: {options}")
+    # Identifies the measures of the resources of this run in a shared metrics file.
+    options = replace(options, run_id=datetime.now().strftime("%Y%m%d%H%M%S"))
+
+    # Download the requested resources concurrently, while the first ones are processed
+    with ThreadPoolExecutor(max_workers=len(URLS_OMNIPATH)) as download_pool:
+        downloads = start_downloads(resource_mapping, download_pool)
+
+        # Each resource has its own directory under the merged one, if any
+        output_directories = None
+        if cli_parsed.merge_import:
+            output_directories = resource_output_directories(resource_mapping, cli_parsed.merge_import)
+
+        # Process the resources (ELT)
+        if cli_parsed.jobs > 1 or cli_parsed.memory_budget:
+            reports = process_resources_parallel(
+                resource_mapping,
+                options,
+                jobs=cli_parsed.jobs,
+                memory_budget=cli_parsed.memory_budget,
+                output_directories=output_directories,
+                downloads=downloads,
+            )
+            if not all(report.succeeded for report in reports.values()):
+                sys.exit(1)
+        else:
+            for resource_name, argument_resource in resource_mapping.items():
+                if resource_name in downloads:
+                    argument_resource = downloads[resource_name].result()
+                output_directory = output_directories[resource_name] if output_directories else None
+                process_resource(
+                    resource_name, argument_resource, options, output_directory=output_directory
+                )
+
+    # Import all the resources at once
+    if output_directories:
+        merge_import_calls(output_directories.values(), cli_parsed.merge_import, cli_parsed.output)
+        if cli_parsed.qa:
+            graph_qa(
+                [cli_parsed.merge_import],
+                cli_parsed.output,
+                report=os.path.join(cli_parsed.merge_import, QA_FILE),
+            )
 
 
 if __name__ == "__main__":
@@ -474,5 +2160,7 @@ if __name__ == "__main__":
 # poetry run python weave_knowledge_graph.py -net download
 # poetry run python weave_knowledge_graph.py -net ./data_testing/networks/subset_interactions_edgecases.tsv
 # poetry run python -m cProfile -s time weave_knowledge_graph.py -net ./data_testing/networks/subset_interactions_edgecases.tsv > profile_.txt
+# poetry run omnipath-bench --resources networks --sizes 1000000 --until extract
 
 # poetry run python weave_knowledge_graph.py -enz download
+# poetry run python weave_knowledge_graph.py -net download --chunksize 500000